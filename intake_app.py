@@ -1,1488 +1,1666 @@
-import streamlit as st
-import pandas as pd
-from datetime import datetime, timedelta, time, date
-from dateutil.relativedelta import relativedelta
-from io import BytesIO
-
-# =========================
-# PAGE SETUP & STYLES
-# =========================
-st.set_page_config(page_title="Rideshare Intake Qualifier", layout="wide")
-
-st.markdown("""
-<style>
-h1 {font-size: 2.0rem !important;}
-h2 {font-size: 1.5rem !important; margin-top: 0.6rem;}
-.section {padding: 0.5rem 0 0.25rem 0;}
-.badge-ok   {background:#16a34a; color:white; padding:10px 14px; border-radius:10px; font-size:18px; text-align:center;}
-.badge-no   {background:#dc2626; color:white; padding:10px 14px; border-radius:10px; font-size:18px; text-align:center;}
-.badge-note {background:#1f2937; color:#f9fafb; padding:6px 10px; border-radius:10px; font-size:13px; display:inline-block; margin-bottom:4px;}
-.note-muted {border:1px dashed #d1d5db; border-radius:8px; padding:10px 12px; margin:8px 0; background:#f9fafb; color:#374151;}
-.script {border-left:4px solid #9ca3af; background:#f3f4f6; color:#111827; padding:12px 14px; border-radius:8px; margin:8px 0 12px 0; font-size:0.97rem; white-space:pre-wrap;}
-.callout {border-left:6px solid #2563eb; background:#eef2ff; color:#1e3a8a; padding:12px 14px; border-radius:12px; margin:8px 0 12px 0;}
-.small {font-size: 0.9rem; color:#4b5563;}
-hr {border:0; border-top:1px solid #e5e7eb; margin:12px 0;}
-[data-testid="stDataFrame"] div, [data-testid="stTable"] div {font-size: 1rem;}
-.copy {font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace; white-space:pre-wrap;}
-.kv {font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace; white-space:pre-wrap;}
-.level-legend {display:flex; gap:8px; align-items:center; margin:6px 0 10px 0;}
-.level-pill {padding:6px 10px; border-radius:12px; color:#111827; font-weight:600; border:1px solid #d1d5db;}
-.l-yellow {background:#fef9c3;}   /* Yellow */
-.l-orange {background:#ffedd5;}   /* Orange */
-.l-lgreen {background:#dcfce7;}   /* Light Green */
-.l-green  {background:#bbf7d0;}   /* Green */
-
-fieldset {border:1px dashed #d1d5db; padding:10px 12px; border-radius:8px;}
-legend {font-weight:600; color:#111827;}
-</style>
-""", unsafe_allow_html=True)
-
-TODAY = datetime.now()
-
-# =========================
-# EXCEL ENGINE DETECTION
-# =========================
-try:
-    import xlsxwriter  # noqa: F401
-    XLSX_ENGINE = "xlsxwriter"
-except Exception:
-    try:
-        import openpyxl  # noqa: F401
-        XLSX_ENGINE = "openpyxl"
-    except Exception:
-        XLSX_ENGINE = None
-
-# =========================
-# SOL TABLES
-# =========================
-TORT_SOL = {
-    # 1 year
-    "Kentucky": 1, "Louisiana": 1, "Tennessee": 1,
-    # 2 years
-    "Alabama": 2, "Alaska": 2, "Arizona": 2, "California": 2, "Colorado": 2, "Connecticut": 2, "Delaware": 2,
-    "Georgia": 2, "Hawaii": 2, "Idaho": 2, "Illinois": 2, "Indiana": 2, "Iowa": 2, "Kansas": 2, "Minnesota": 2,
-    "Nevada": 2, "New Jersey": 2, "Ohio": 2, "Oklahoma": 2, "Oregon": 2, "Pennsylvania": 2, "Texas": 2,
-    "Virginia": 2, "West Virginia": 2,
-    # 3 years
-    "Arkansas": 3, "D.C.": 3, "Maryland": 3, "Massachusetts": 3, "Michigan": 3, "Mississippi": 3, "Montana": 3,
-    "New Hampshire": 3, "New Mexico": 3, "New York": 3, "North Carolina": 3, "Rhode Island": 3, "South Carolina": 3,
-    "South Dakota": 3, "Vermont": 3, "Washington": 3, "Wisconsin": 3,
-    # 4 years
-    "Florida": 4, "Nebraska": 4, "Utah": 4, "Wyoming": 4,
-    # 5 years
-    "Missouri": 5,
-    # 6 years
-    "Maine": 6, "North Dakota": 6,
-}
-STATE_ALIAS = {"Washington DC": "D.C.", "District of Columbia": "D.C."}
-STATES = sorted(set(list(TORT_SOL.keys()) + ["D.C."]))
-
-SA_EXT = {
-    "California":   {"penetration": None, "other": None,
-                     "summary": "No SOL for touching of sexual body parts, rape, digital penetration, oral penetration, vaginal penetration, anal penetration, etc."},
-    "New York":     {"penetration": 10,   "other": 10,
-                     "summary": "10-year SOL for touching of sexual body parts, rape, digital penetration, oral penetration, vaginal penetration, anal penetration, etc."},
-    "Texas":        {"penetration": 5,    "other": 2,
-                     "summary": "5-year SOL for rape/penetration of mouth, anus, or vagina; 2-year SOL for all other conduct."},
-    "Illinois":     {"penetration": None, "other": 2,
-                     "summary": "No SOL for rape/penetration of mouth, anus, or vagina; 2-year SOL for all other conduct."},
-    "Connecticut":  {"penetration": None, "other": 2,
-                     "summary": "No SOL for rape/penetration of mouth, anus, or vagina; 2-year SOL for all other conduct."},
-}
-
-STATE_LIST_FORM = [
-    "Alabama","Alaska","Arizona","Arkansas","California","Colorado","Connecticut","Delaware","Florida","Georgia","Hawaii",
-    "Idaho","Illinois","Indiana","Iowa","Kansas","Kentucky","Louisiana","Maine","Maryland","Massachusetts","Michigan",
-    "Minnesota","Mississippi","Missouri","Montana","Nebraska","Nevada","New Hampshire","New Jersey","New Mexico","New York",
-    "North Carolina","North Dakota","Ohio","Oklahoma","Oregon","Pennsylvania","Rhode Island","South Carolina","South Dakota",
-    "Tennessee","Texas","Utah","Vermont","Virginia","Washington","Washington DC","West Virginia","Wisconsin","Wyoming","Puerto Rico"
-]
-
-# Marketing sources
-MARKETING_SOURCES = [
-    "Client Referral","DMEI","DMEI Rideshare","Facebook","FB Rideshare","FB Rideshare Assault",
-    "FB RS Lawsuit","Main Office Line","Web Form Submission","Website Phone Call"
-]
-
-# =========================
-# OBJECTION SCRIPTS / REFERENCES
-# =========================
-OBJECTION_SCRIPTS = {
-    "Incident Not Qualified":
-        "I apologize, but the incident does not meet our firm's criteria. If that changes in the future, we'll contact you. "
-        "In the meantime, please consider reaching out to other law firms.",
-    "How much is the settlement":
-        "I don't want to misinform you, as it really depends on the specifics of your case and the trauma involved. "
-        "Factors like the incident and extent of damage are crucial. For example, in December 2022, the California Public Utilities "
-        "Commission approved a $9 million settlement with Uber for not properly documenting and reporting sexual assault incidents.",
-    "How much will the law firm charge me":
-        "The standard fee is 40%, typical for law firms due to the risks involved. Our experienced lawyers can help you secure a larger "
-        "settlement faster, and we’ll hire an expert witness to connect your health issues to your rideshare sexual assault case. "
-        "You won’t pay anything upfront—we’ll handle your medical records and evidence gathering. "
-        "Choosing a firm with seasoned professionals is crucial for achieving the best settlement. If we prove a link but don’t secure a settlement "
-        "(which is rare), you won't owe anything.",
-    "PC Disagreement Over 40% Fee":
-        "I respect your decision, but the standard fee is 40%. Other firms may not charge less due to the uncertainty of securing a settlement. "
-        "With our superlawyers and an expert witness, we’ll link your health issues to the rideshare sexual assault incident. You’re paying for convenience—"
-        "there’s no need to gather records or go to court. If you proceed today, we can help with no upfront payment.",
-    "Asking ID and other evidences":
-        "To qualify for a settlement, it's crucial to retrieve your medical records. This ensures the funds go to the right person, protecting your benefits "
-        "and strengthening your case. Please provide a copy of your government-issued ID and a selfie for verification. Additionally, any records, photos, "
-        "or medication bottles as proof would be valuable. Your evidence is essential for us to help you effectively.",
-    "Asking SSN":
-        "The hospital must ensure they send the correct information. For legal purposes and proper documentation, we need your full name, address, date of birth, "
-        "and Social Security number. I understand your concerns about sharing your Social Security number, but it’s essential for protecting your identity and ensuring "
-        "that any settlement goes to the right person. This helps prevent relatives from falsely claiming the settlement and avoids potential financial issues. "
-        "Your cooperation is vital for a smooth legal process.",
-    "Asking last 4 digits - SSN":
-        "Can I get the last four digits of your Social Security number for the HIPAA Release Form, which confirms your consent to release your medical records, "
-        "and rest assured, they will remain private and confidential since law firms don’t file them and can be sanctioned if they do.",
-    "I did not submit my information":
-        "You probably filled out a survey or form online. If you or a loved one were involved in a rideshare sexual assault incident, we can connect you with top attorneys "
-        "who are Super Lawyers. I'm here to help you pursue a settlement, and your case is important to us.",
-    "Where are you from":
-        "I'm calling from Dallas, Texas, representing the Advocate Rights Center, an intake center for ______ Law Firm. "
-        "We assist clients in pursuing settlements related to rideshare sexual assault incidents.",
-    "Scam Suspicions":
-        "I understand your concern, but I won’t need your financial information or bank details. I only require your basic information to pursue your claim. "
-        "Providing this information allows us to obtain essential records, like medical records and proof of injury, which are crucial for filing your claim and securing a settlement. "
-        "Your cooperation is vital for building a strong case.",
-    "Multi-District Litigation (MDL) vs. Class Action":
-        "In multi-district litigation (MDL), settlements are based on each individual impact of their injuries from a rideshare sexual assault, ensuring fair compensation. "
-        "On the other hand, class action lawsuits split settlements equally among all members, regardless of how much each person was affected.",
-    "Class Action Clarification":
-        "This isn't like a Class Action. Because each injury is different, the compensation is customized to match exactly what happened to you.",
-    "I Need a Local Law Firm":
-        "Claims about rideshare sexual assault incidents are now consolidated in the U.S. District Court for the Northern District of California under Judge Charles Breyer (MDL No. 3084). "
-        "You don’t need an attorney licensed in your state anymore, making the process faster and outcomes more predictable. You can choose the law firm you prefer. "
-        "We work with ______ Law, which has won hundreds of millions in liability settlements.",
-    "What kind of claim is this?":
-        "These are personal injury claims against the rideshare company for harm caused by incidents involving sexual assault. "
-        "Victims have suffered injuries resulting in pain, suffering, and long-term trauma. The rideshare company is primarily responsible due to negligence in failing to properly screen drivers.",
-    "Are settlements taxable?":
-        "I'm not a tax expert and can't provide tax advice, but generally, settlements for personal injury or emotional/psychological damage (pain and suffering) are non-taxable. "
-        "However, I can't confirm this definitively.",
-    "What happens if I die?":
-        "After you file the claim, the law firm will update it to name a new plaintiff, usually the estate administrator, since you can't represent yourself if you pass away. "
-        "It's a good idea to create a will to ensure your assets go to your heirs as you want; otherwise, state laws will apply. "
-        "A case manager will reach out after you sign the forms to verify your information and guide you through the process.",
-    "Reasons for Using Plaid":
-        "1) Verification: It helps confirm your identity and prevents impersonation, saving the law firm time and money on false claims.\n"
-        "2) Medical Records: Your government ID allows us to obtain medical records while following privacy laws (HIPAA).\n"
-        "3) Settlement Accuracy: We ensure settlement funds go to the right person and don’t ask for banking details until the law firm confirms the settlement.\n\n"
-        "These steps are important for protecting your case and ensuring everything runs smoothly.",
-    "Using Plaid: Quick Directions (verbal)":
-        "To use Plaid, click the link, and you'll be taken to their platform. Here’s what to do:\n\n"
-        "1. Enter the last four digits of your SSN.\n"
-        "2. Allow access to your camera to take photos of the front and back of your driver’s license.\n"
-        "3. Then, take a selfie by holding your phone up for about 10 seconds.\n"
-        "This process matches your selfie with your driver’s license to confirm your identity.",
-    "Has Attorney":
-        "To avoid double representation issues, please ensure you don't have another attorney for your rideshare sexual assault case. "
-        "If you do, we cannot assist you to protect your interests.",
-    "Unanswered Client Callback Script":
-        "The law firm has been trying to reach you to verify a few things. They might check in occasionally about your condition, "
-        "especially since complications can affect your settlement.\n\n"
-        "You can call them at (Number of Lawfirm). They might give you another number for direct contact with an attorney or paralegal, "
-        "but this number will connect you to their office.\n\n"
-        "Optional: If you can, let them know you have their number and will answer future calls. This builds trust and shows you’re engaged, "
-        "which is important since they will invest time and resources in your case.",
-    "RSA District Court?":
-        "Claims about rideshare sexual assault incidents are now consolidated in the U.S. District Court for the Northern District of California under Judge Charles Breyer (MDL No. 3084).",
-    "Rideshare Companies in Litigation":
-        "Uber, Lyft, Via, Ola, Grab, Didi Chuxing, Bolt, Gett",
-    "Settlement Claims in Rideshare Assault":
-        "• Medical Expenses: Treatment and rehabilitation costs.\n"
-        "• Emotional Distress: Compensation for psychological trauma.\n"
-        "• Lost Wages: Income loss due to inability to work.\n"
-        "• Punitive Damages: Penalties to deter misconduct.\n"
-        "• Legal Fees: Reimbursement for attorney costs.\n"
-        "• Pain and Suffering: Compensation for physical and emotional pain.\n"
-        "• Future Medical Costs: Estimated ongoing treatment expenses.\n"
-        "• Loss of Enjoyment: Diminished quality of life.\n"
-        "• Property Damage: Reimbursement for damaged personal items.\n"
-        "• Loss of Consortium: Claims for loss of companionship.",
-    "Medical Office Three-Way Call":
-        "We can do a three-way call with the medical office to confirm your injury. We'll ask them when you were last seen for your condition. "
-        "With your permission, we can record the call and send it to the law firm. They just need proof that you’re a genuine claimant. "
-        "This isn’t for evidence—your medical records will handle that—but to show that investing time and money in your case is worthwhile. "
-        "They want to avoid claims that look like a lottery ticket. They aren’t asking for guarantees.",
-    "Wagstaff Law Information":
-        "Wagstaff Lawfirm\n940 Lincoln St, Denver, CO 80203\n303-376-6360\nhttps://www.wagstafflawfirm.com/\n\n"
-        "About Us\nWagstaff Law Firm: National Mass Tort Attorneys with 40 years of experience. We offer a personal approach to help victims recover and hold negligent "
-        "parties accountable for maximum compensation. Contact us at (972) 573-6040 or visit https://www.wagstafflawfirm.com/",
-    "Instructions for Resending Rideshare Receipts":
-        "Uber: Go to the Activity tab, select the ride, click the Receipt icon, and then choose resend email.\n\n"
-        "Lyft: Open Lyft app > Ride history > Tap the ride > Scroll down > Tap 'Resend receipt' > Enter your email to send",
-    "How to Report an Assault to Uber/Lyft (link)":
-        "https://docs.google.com/document/d/1Oiljbf3oHqtoKDv2jArsXMIVw5hhuNrRiZ1MDl0aoqo/edit?usp=sharing",
-    "Script for Irate Callers (link)":
-        "https://docs.google.com/document/d/1wlQurtqG_0tVIUhBfHXL2R8fF58i8s64/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
-    "Responding to Law Firm (link)":
-        "https://docs.google.com/document/d/1BNJoF14vqEkH2WojUC_H7AsWUmu-ZC1NVmvO0J_GN9Q/edit?usp=sharing",
-    "Using Plaid: Quick Directions (doc link)":
-        "https://docs.google.com/document/d/1P_jodMzz-2vc0vQsDbgCimCBDGDHyuNaFqyE7KmbO5Y/edit?usp=sharing",
-    "ID and Proof Retrieval Script (link)":
-        "https://docs.google.com/document/d/1DTcBIWg4NJfEgETe4bwagbz4refPSyoP/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
-    "Mailer – Commitment Script (link)":
-        "https://docs.google.com/document/d/1VMxf5JcVIFN2ABXmkLHKdkvYJ6tfmSmIp0jlMrh7glE/edit?usp=sharing",
-    "Esign Guide Text (link)":
-        "https://docs.google.com/document/d/1e6sGJB8wRPwa2_sBEvLbDl4wUM4TsS8f46agwNWvIRE/edit?usp=sharing",
-    "Esign Guide Email (link)":
-        "https://docs.google.com/document/d/1zVTewqs7jtAB_yL0cdz8vz_8o-IfgoYVhj4KPNNG9M8/edit?usp=sharing",
-    "Identity Verification Links (site)":
-        "https://besthistorysites.net/",
-    "PLAID Link":
-        "https://advocaterightscenter.com/plaid_verification/",
-    "How to Send Plaid Link to Clients (link)":
-        "https://docs.google.com/document/d/1huakazfAU_-P3PORmcP5DLrdIn_pHRzGNjjdjnOWwVw/edit?usp=sharing",
-    "How to Guide Clients in Plaid Text (link)":
-        "https://docs.google.com/document/d/19Uj2gXI1WKOlnaVprvryvYipOgMAAum2gR4uDsMJ7B8/edit?usp=sharing",
-    "SOP for Plaid (link)":
-        "https://docs.google.com/document/d/1Rc_C3mqQ21CdpfbHAXzqDNernl32Jr-2/edit",
-    "Call Transfers with C9 and Law Ruler (link)":
-        "https://docs.google.com/document/d/1powoAbPlhqVV3q54ZlgFIZml70Iudrzh/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
-    "RSA - Objection Script (link)":
-        "https://docs.google.com/document/d/14fYJyeWYuuIbQmwrzGMCkuvnVoIwqrKy/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
-    "Rideshare Waggy (SMS templates)":
-        "Lorenia: 213-347-9246\n"
-        "• We received your signed docs for your Rideshare Assault Claim. A paralegal from Wagstaff will call from 213-347-9246 within 5-10 business days.\n"
-        "• Hi Monica, the paralegal for your Rideshare Assault Claim is trying to reach you. Call her at 213-347-9246 to reconfirm your details."
-}
-
-# =========================
-# HELPERS
-# =========================
-def script_block(text: str):
-    if not text: return
-    st.markdown(f"<div class='script'>{text}</div>", unsafe_allow_html=True)
-
-def badge(ok: bool, label: str):
-    css = "badge-ok" if ok else "badge-no"
-    st.markdown(f"<div class='{css}'>{label}</div>", unsafe_allow_html=True)
-
-def fmt_date(dt): return dt.strftime("%Y-%m-%d") if dt else "—"
-def fmt_dt(dt): return dt.strftime("%Y-%m-%d %H:%M") if dt else "—"
-
-def join_list(values, dash_if_empty=True):
-    if not values:
-        return "—" if dash_if_empty else ""
-    return ", ".join([str(v) for v in values])
-
-def tier_and_aggravators(flags):
-    t1 = bool(flags.get("Rape/Penetration") or flags.get("Forced Oral/Forced Touching"))
-    t2 = bool(flags.get("Touching/Kissing w/o Consent") or flags.get("Indecent Exposure") or flags.get("Masturbation Observed"))
-    aggr_kidnap = bool(flags.get("Kidnapping Off-Route w/ Threats"))
-    aggr_imprison = bool(flags.get("False Imprisonment w/ Threats"))
-    aggr = []
-    if aggr_kidnap: aggr.append("Kidnapping w/ threats")
-    if aggr_imprison: aggr.append("False imprisonment w/ threats")
-    if t1: base = "Tier 1"
-    elif t2: base = "Tier 2"
-    else: base = "Unclear"
-    label = f"{base} (+ Aggravators: {', '.join(aggr)})" if base in ("Tier 1","Tier 2") and aggr else base
-    return label, aggr
-
-def sa_category(flags):
-    if flags.get("Rape/Penetration") or flags.get("Forced Oral/Forced Touching"):
-        return "penetration"
-    if flags.get("Touching/Kissing w/o Consent") or flags.get("Indecent Exposure") or flags.get("Masturbation Observed"):
-        return "other"
-    return None
-
-def sol_rule_for(state, category):
-    if category and state in SA_EXT:
-        data = SA_EXT[state]
-        years = data[category]
-        summary = data["summary"]
-        return years, f"{state}: {summary}", True
-    years = TORT_SOL.get(state)
-    return years, f"{state}: General tort SOL = {years} year(s).", False
-
-def categorical_brief(flags):
-    buckets = []
-    if flags.get("Rape/Penetration"): buckets.append("rape/penetration")
-    if flags.get("Forced Oral/Forced Touching"): buckets.append("forced oral/forced touching")
-    if flags.get("Touching/Kissing w/o Consent"): buckets.append("unwanted touching/kissing")
-    if flags.get("Indecent Exposure"): buckets.append("indecent exposure")
-    if flags.get("Masturbation Observed"): buckets.append("masturbation observed")
-    if flags.get("Kidnapping Off-Route w/ Threats"): buckets.append("kidnapping w/ threats")
-    if flags.get("False Imprisonment w/ Threats"): buckets.append("false imprisonment w/ threats")
-    return ", ".join(buckets) if buckets else "—"
-
-def split_legal_name(full_legal: str):
-    first = middle = last = ""
-    if not full_legal:
-        return first, middle, last
-    parts = [p for p in full_legal.strip().split() if p]
-    if len(parts) == 1:
-        first = parts[0]
-    elif len(parts) == 2:
-        first, last = parts
-    else:
-        first, middle, last = parts[0], " ".join(parts[1:-1]), parts[-1]
-    return first, middle, last
-
-def calc_age(dob: date):
-    if not dob: return ""
-    today = date.today()
-    years = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-    return max(0, years)
-
-# =========================
-# APP
-# =========================
-st.title("Rideshare Intake Qualifier · Script-Calibrated (Vertical)")
-
-# Legend
-st.markdown(
-    "<div class='level-legend'>"
-    "<span class='level-pill l-yellow'>Level 1</span>"
-    "<span class='level-pill l-orange'>Level 2</span>"
-    "<span class='level-pill l-lgreen'>Level 3</span>"
-    "<span class='level-pill l-green'>Level 4</span>"
-    "</div>",
-    unsafe_allow_html=True
-)
-
-def render():
-    # ---------- INTRODUCTION ----------
-    script_block(
-        "INTRODUCTION\n"
-        "Thank you for calling the Advocate Rights Center, this is **[Your Name]**. How are you doing today?\n\n"
-        "May I have your **full name**, and then your **full legal name** exactly as it appears on your ID?\n\n"
-        "Before we continue, may I have your **permission to record** this call for legal and training purposes? "
-        "It will remain private and confidential, and it’s never filed publicly unless you approve and a case goes to court. "
-        "Fewer than 1 in 1,000 cases ever do, since most resolve through settlement."
-    )
-    caller_full_name = st.text_input("Full name (as provided verbally)", key="caller_full_name")
-    caller_legal_name = st.text_input("Full legal name (exact on ID)", key="caller_legal_name")
-    consent_recording = st.toggle("Permission to record (private & confidential)", value=False, key="consent_recording")
-
-    # Prior firm question right under permission
-    st.markdown("**As far as you can remember, have you signed up with any Law Firm to represent you on this case but then got disqualified for any reason?**")
-    prior_firm_radio = st.radio("We still might be able to help but need to know.", ["No", "Yes"], horizontal=True, key="prior_firm_any")
-    prior_firm_any = (prior_firm_radio == "Yes")
-    prior_firm_note = ""
-    if prior_firm_any:
-        prior_firm_note = st.text_area("If yes, share anything you recall (optional — dates, firm name, reason):", key="prior_firm_note")
-        script_block("“Thank you for sharing that. Prior disqualifications can happen for technical reasons and do not close the door here. "
-                     "Knowing this helps us prevent any conflicts and move your file faster.”")
-    else:
-        script_block("“Thanks for confirming. That keeps the intake simple and avoids any duplicate-representation issues.”")
-
-    st.markdown("---")
-
-    # =========================
-    # LEVEL 1 — Story & First-Level Qualification (Yellow)
-    # =========================
-    st.markdown("<div class='level-pill l-yellow'>Level 1 — Story & First-Level Qualification</div>", unsafe_allow_html=True)
-
-    # Q1 — Narrative
-    st.markdown("**Q1. In your own words, please feel free to describe what happened during the ride.**")
-    narr = st.text_area("Caller narrative", key="q1_narr")
-    if narr.strip():
-        script_block(
-            "“Thank you for trusting me with that. What you’ve shared is painful and important. "
-            "You’re in control of this conversation, and we’ll move at your pace. "
-            "If anything feels hard to say, we can take a moment and continue when you’re ready.”"
-        )
-
-    # Acts (under Q1)
-    st.subheader("Acts (check all that apply)")
-    rape = st.checkbox("Rape/Penetration", key="act_rape")
-    forced_oral = st.checkbox("Forced Oral/Forced Touching", key="act_forced_oral")
-    touching = st.checkbox("Touching/Kissing w/o Consent", key="act_touch")
-    exposure = st.checkbox("Indecent Exposure", key="act_exposure")
-    masturb = st.checkbox("Masturbation Observed", key="act_masturb")
-    kidnap = st.checkbox("Kidnapping Off-Route w/ Threats (Tier-3 aggravator; must have Tier 1 or 2)", key="act_kidnap")
-    imprison = st.checkbox("False Imprisonment w/ Threats (Tier-3 aggravator; must have Tier 1 or 2)", key="act_imprison")
-    # These two flags drive DQ for both firms per your rule
-    verbal_only = st.checkbox("Verbal Abuse only (No Sexual Acts)", key="act_verbal_only")
-    attempt_only = st.checkbox("Attempt/minor contact only", key="act_attempt_only")
-
-    act_flags = {
-        "Rape/Penetration": rape,
-        "Forced Oral/Forced Touching": forced_oral,
-        "Touching/Kissing w/o Consent": touching,
-        "Indecent Exposure": exposure,
-        "Masturbation Observed": masturb,
-        "Kidnapping Off-Route w/ Threats": kidnap,
-        "False Imprisonment w/ Threats": imprison
-    }
-    tier_label, aggr_list = tier_and_aggravators(act_flags)
-    base_tier_ok = ("Tier 1" in tier_label) or ("Tier 2" in tier_label)
-
-    # Q2 — Platform
-    st.markdown("**Q2. Which rideshare platform was it?**")
-    company = st.selectbox("Select platform", ["Uber", "Lyft", "Other"], key="q2_company")
-    if company:
-        script_block(f"“Thanks for confirming it was {company}. That helps us pull the right records and policies.”")
-
-    # ---- Education #1A (moved above Pickup/Drop-off) ----
-    script_block(
-        "HOW THIS HAPPENED →  EDUCATE CLIENT / SAFETY ZONE\n"
-        "Well, let me tell you what people have uncovered about Rideshares and why people like you are coming forward. "
-        "And again, I appreciate you trusting us with this.\n\n"
-        "Uber & Lyft have been exposed for improperly screening drivers, failing to remove dangerous drivers, and misrepresenting its safety practices.\n\n"
-        "For example, the New York Times uncovered sealed court documents showing that over 400,000 incidents of sexual assault and misconduct were reported to Uber between 2017 and 2022 . . . which is about 1 incident every 8 minutes."
-    )
-
-    # Pickup / Drop-off (extension to Q2)
-    st.markdown("**Pickup / Drop-off (extension to Q2)**")
-    st.caption("Let’s anchor the timeline and route.")
-    pickup = st.text_input("Pickup location (address/description)", key="pickup")
-    dropoff = st.text_input("Drop-off location (address/description)", key="dropoff")
-    if pickup.strip() or dropoff.strip():
-        script_block(
-            "“Thank you — those locations help lock in the route and jurisdiction. "
-            "If you remember nearby landmarks or cross-streets, we can add those too. You’re doing great.”"
-        )
-
-    # Q3 — Confident receipt request (uses PC name)
-    st.markdown("**Q3. Receipts / Proof**")
-    pc_name = caller_full_name or caller_legal_name or "there"
-    st.markdown(
-        f"<div class='callout'>"
-        f"<b>{pc_name}</b>, we need a copy of the ride receipt — "
-        f"<u>both</u> the <b>Email Copy</b> and the <b>In-App Receipt</b> (or a <b>screenshot of the receipt</b>). "
-        f"These are some of the strongest pieces of proof we can attach to your file."
-        f"</div>", unsafe_allow_html=True
-    )
-    receipt_evidence = st.multiselect(
-        "What can you provide as receipt evidence?",
-        ["PDF", "Email", "Screenshot of Receipt", "In-App Receipt (screenshot)", "Other"],
-        key="receipt_evidence"
-    )
-    receipt_evidence_other = st.text_input("If Other, describe", key="receipt_evidence_other")
-    if receipt_evidence_other and "Other" not in receipt_evidence:
-        receipt_evidence.append(f"Other: {receipt_evidence_other.strip()}")
-    if receipt_evidence:
-        script_block("“Perfect — those receipts and screenshots directly link the ride to your account and timestamp the trip.”")
-
-    # Uploads (includes audio/video; counts for Wagstaff evidence)
-    proof_uploads = st.file_uploader(
-        "Upload now (ride receipt, therapy/medical note, police confirmation, audio/video) — images, PDFs, audio, or video",
-        type=["pdf", "png", "jpg", "jpeg", "heic", "mp4", "mov", "m4a", "mp3", "wav"],
-        accept_multiple_files=True,
-        key="proof_uploads"
-    )
-    uploaded_files = proof_uploads or []
-    uploaded_names = [f.name for f in uploaded_files]
-    any_pdf_uploaded = any(n.lower().endswith(".pdf") for n in uploaded_names)
-    any_av_uploaded = any(n.lower().endswith(ext) for n in uploaded_names for ext in (".mp4",".mov",".m4a",".mp3",".wav"))
-    if uploaded_names:
-        script_block("“Thanks for those uploads — I see them here and will attach them to your file.”")
-
-    # SMS flow
-    st.markdown("**SMS for Documentation**")
-    script_block(
-        "“I’m going to send you an SMS containing my email address. "
-        "You can send the necessary documentation later today, or even as we speak — whichever is easier.”"
-    )
-    sms_phone = st.text_input("Phone number where you receive SMS", key="sms_phone")
-    sms_is_new = st.selectbox("Is this a new phone number? or Did you recently change your phone number?",
-                              ["No, same number","Yes, it's new / I recently changed"], key="sms_is_new")
-    if sms_phone and sms_is_new:
-        st.session_state["caller_phone"] = sms_phone
-        script_block("“Thanks — I’ll use this as your best contact number going forward.”")
-    st.button("Mark SMS sent (placeholder)", key="btn_sms_sent")
-
-    # ---- Education #1B (second half of HOW THIS HAPPENED) ----
-    script_block(
-        "[[ Now when you consider that Uber originally only reported about 12,500 incidents during that same period, you can argue the company has been seriously misleading the level of safety it offers passengers. ]]\n\n"
-        "Now, we know many people don’t report these incidents. So, coming forward helps you and others obtain justice and compensation. "
-        "[[ And, it truly does help force Uber & Lyft to pay for their negligence, and provide real safety measures so these incidents stop happening.]]"
-    )
-
-    st.markdown("---")
-
-    # =========================
-    # LEVEL 2 — Reporting, Date/Time, Scope (Orange)
-    # =========================
-    st.markdown("<div class='level-pill l-orange'>Level 2 — Reporting, Date/Time, Scope</div>", unsafe_allow_html=True)
-
-    # Q4 — Date/Time
-    st.markdown("**Q4. Do you remember the date this happened?**")
-    has_incident_date = st.toggle("Caller confirms they know the date", value=False, key="q4_hasdate")
-    incident_date = st.date_input("Select Incident Date", value=TODAY.date(), key="q4_date") if has_incident_date else None
-    incident_time = st.time_input("Incident Time (for timing rules)", value=time(21, 0), key="time_for_calc")
-    if has_incident_date and incident_date:
-        script_block("“Thanks — the specific date lets the attorneys verify deadlines and request the correct records.”")
-
-    # Q5 — Reporting
-    st.markdown("**Q5. Did you report the incident to anyone?** (Uber/Lyft, Police, Physician, Therapist, Family/Friend)")
-    st.caption("Choose everything that applies — even telling a trusted person helps build the timeline.")
-    reported_to = st.multiselect(
-        "Select all that apply",
-        ["Rideshare Company","Physician","Friend or Family Member","Therapist","Police Department","NO (DQ, UNLESS TIER 1 OR MINOR)"],
-        key="q5_reported"
-    )
-    if reported_to:
-        script_block(f"“Thank you — noting {', '.join(reported_to)} helps us build a reliable timeline for your case.”")
-
-    # Per-channel details
-    report_dates = {}
-    family_report_dt = None
-
-    # Family/Friend
-    fam_first = fam_last = fam_phone = ""
-    if "Friend or Family Member" in reported_to:
-        st.markdown("**Family/Friend Contact Details**")
-        fam_first = st.text_input("First name (Family/Friend)", key="fam_first")
-        fam_last  = st.text_input("Last name (Family/Friend)", key="fam_last")
-        fam_phone = st.text_input("Phone number (Family/Friend)", key="fam_phone")
-        ff_date = st.date_input("Date informed Family/Friend", value=TODAY.date(), key="q5a_dt_ff")
-        ff_time = st.time_input("Time informed Family/Friend", value=time(21,0), key="q5a_tm_ff")
-        report_dates["Family/Friends"] = ff_date
-        family_report_dt = datetime.combine(ff_date, ff_time)
-
-    # Physician
-    phys_name = phys_fac = phys_addr = ""
-    if "Physician" in reported_to:
-        st.markdown("**Physician Details**")
-        phys_name = st.text_input("Physician Name", key="phys_name")
-        phys_fac  = st.text_input("Clinic/Hospital Name", key="phys_fac")
-        phys_addr = st.text_input("Clinic/Hospital Address", key="phys_addr")
-        report_dates["Physician"] = st.date_input("Date reported to Physician", value=TODAY.date(), key="q5a_dt_phys")
-
-    # Therapist
-    ther_name = ther_fac = ther_addr = ""
-    if "Therapist" in reported_to:
-        st.markdown("**Therapist Details**")
-        ther_name = st.text_input("Therapist Name", key="ther_name")
-        ther_fac  = st.text_input("Clinic/Hospital Name", key="ther_fac")
-        ther_addr = st.text_input("Clinic/Hospital Address", key="ther_addr")
-        report_dates["Therapist"] = st.date_input("Date reported to Therapist", value=TODAY.date(), key="q5a_dt_ther")
-
-    # Police
-    police_station = police_addr = ""
-    if "Police Department" in reported_to:
-        st.markdown("**Police Details**")
-        police_station = st.text_input("Name of Police Station", key="police_station")
-        police_addr    = st.text_input("Police Station Address", key="police_addr")
-        report_dates["Police"] = st.date_input("Date reported to Police", value=TODAY.date(), key="q5a_dt_police")
-
-    # Rideshare company channel
-    rep_rs_company = ""
-    if "Rideshare Company" in reported_to:
-        st.markdown("**Rideshare Company (reported)**")
-        rep_rs_company = st.selectbox("Which company did you report to?", ["Uber", "Lyft"], key="rep_rs_company")
-        report_dates["Rideshare company"] = st.date_input("Date reported to Rideshare company", value=TODAY.date(), key="q5a_dt_rs")
-
-    # If NOT reported to rideshare company: auto suggestion based on Q2
-    if "Rideshare Company" not in reported_to:
-        target = company if company in ("Uber","Lyft") else "the rideshare company"
-        script_block(f"Are you open if the Atty would request for you to report to {target} to strengthen your case?")
-
-    # Q6 — Scope
-    st.markdown("**Q6. Did the incident happen inside the car, just outside, or did it continue after you exited?**")
-    scope_choice = st.selectbox(
-        "Select scope",
-        ["Inside the car", "Just outside the car", "Furtherance from the car", "Unclear"],
-        key="scope_choice"
-    )
-    inside_near = scope_choice in ["Inside the car", "Just outside the car", "Furtherance from the car"]
-    if scope_choice and scope_choice != "Unclear":
-        script_block(f"“Got it — {scope_choice.lower()}. That helps confirm it occurred within the rideshare’s safety responsibility.”")
-
-    # ---- Education #2 ----
-    script_block(
-        "Education Insert #2 — “Safe Rides Fee”\n"
-        "Jay: “____, what’s especially troubling is that Uber and Lyft have had knowledge of these dangers since at least 2014.\n"
-        "That year, Uber introduced a $1 ‘Safe Rides Fee’ — claiming it funded driver checks and safety upgrades. "
-        "But investigations found that most of the $500 million collected went to profit, not safety.\n"
-        "They later just renamed it a ‘booking fee.’ Survivors were paying for safety that never arrived.”"
-    )
-
-    st.markdown("---")
-
-    # =========================
-    # LEVEL 3 — Injuries, Treatment, Meds (Light Green)
-    # =========================
-    st.markdown("<div class='level-pill l-lgreen'>Level 3 — Injuries, Treatment, Meds</div>", unsafe_allow_html=True)
-
-    # Q7 — Injuries
-    st.markdown("**Q7. Were you injured physically, or have you experienced emotional effects afterward?**")
-    injury_physical = st.checkbox("Physical injury", key="inj_physical")
-    injury_emotional = st.checkbox("Emotional effects (anxiety, nightmares, etc.)", key="inj_emotional")
-    injuries_summary = st.text_area("If comfortable, briefly describe injuries/effects", key="injuries_summary")
-    if injury_physical or injury_emotional or injuries_summary.strip():
-        script_block("“I’m sorry you’re dealing with these effects. Your health matters, and we’ll reflect this in the case.”")
-
-    # Q8 — Treatment (only if injured)
-    if (injury_physical or injury_emotional or injuries_summary.strip()):
-        st.markdown("**Q8. Have you spoken to a doctor, therapist, or counselor?**")
-        provider_name = st.text_input("Provider name (optional)", key="provider_name")
-        provider_facility = st.text_input("Facility/Clinic (optional)", key="provider_facility")
-        first_visit = st.date_input("Date of the first Visit", value=None, key="first_visit")
-        last_visit = st.date_input("Date of the last Visit", value=None, key="last_visit")
-        if provider_name.strip() or provider_facility.strip() or (first_visit or last_visit):
-            script_block("“Thank you — treatment notes are strong, objective support for your experience.”")
-    else:
-        provider_name = ""
-        provider_facility = ""
-        first_visit = None
-        last_visit = None
-
-    # Q9 — Meds
-    st.markdown("**Q9. Do you take any medications related to this?**")
-    medication_name = st.text_input("Medication (optional)", key="medication_name")
-    pharmacy_name = st.text_input("Pharmacy (optional)", key="pharmacy_name")
-    if medication_name.strip() or pharmacy_name.strip():
-        script_block("“Understood. Pharmacy records help connect treatment to what you went through.”")
-
-    st.markdown("---")
-
-    # =========================
-    # LEVEL 4 — Contact & Screening (Green)
-    # =========================
-    st.markdown("<div class='level-pill l-green'>Level 4 — Contact & Screening</div>", unsafe_allow_html=True)
-
-    st.markdown("### Contact & Screening")
-    caller_phone = st.text_input("Best phone number", value=st.session_state.get("caller_phone", ""), key="caller_phone")
-    caller_email = st.text_input("Best email", key="caller_email")
-    state = st.selectbox("Incident state", STATES, index=(STATES.index("California") if "California" in STATES else 0), key="q_state")
-
-    st.markdown("**Rideshare submission & response (if any)**")
-    rs_submit_how = st.text_input("How did you submit to Uber/Lyft? (email/app/other)", key="q8_submit_how")
-    rs_received_response = st.toggle("Company responded", value=False, key="q9_resp_toggle")
-    rs_response_detail = st.text_input("If yes, what did they say? (optional)", key="q9_resp_detail")
-
-    # If NOT submitted to Rideshare via app/email: show verbatim prompt
-    if not rs_submit_how.strip():
-        script_block(
-            "If not submitted to Rideshare via app or email:\n"
-            "If the law firm feels that it is best that you report the incident to Uber or Lyft via email or the app, would you be willing to do so?\n"
-            "If Yes: Okay, so you'd be willing to report the incident if the law firm recommends it — thank you for being open to that. I'm sure they will provide guidance. "
-            "It shows strength, and it could really help support your case.\n"
-            "If No or Unsure: Okay, so you're not comfortable reporting it through the app or email right now — I completely understand. "
-            "If the law firm thinks it's important later on, they'll walk you through what to do step by step. You're not alone in this."
-        )
-
-    st.markdown("**Standard Screening**")
-    gov_id = st.toggle("Government ID provided", value=False, key="elig_id")
-    female_rider = st.toggle("Female rider", value=False, key="elig_female")
-    rider_not_driver = st.toggle("Caller was the rider (not the driver)", value=True, key="elig_rider_not_driver")
-    has_atty = st.toggle("Already has an attorney", value=False, key="elig_atty")
-
-    # Empathetic felony question (verbatim you provided)
-    script_block("This will not affect your case, So the law firm can be prepared for any character issues, do you have any felonies or criminal history?")
-    felony_answer = st.radio("Please select one", ["No", "Yes"], horizontal=True, key="q10_felony")
-    felony = (felony_answer == "Yes")
-
-    # Weapons / force questions (updated)
-    st.markdown("**Force/Weapon by Driver (applies to both Wagstaff & Triten)**")
-    driver_weapon_used = st.radio(
-        "Did the driver threaten to use or actually use any weapons? Or use means of force during the sexual assault, such as gun, knife, or choking?",
-        ["No","Yes"], horizontal=True, key="driver_weapon_used"
-    )
-    driver_weapon_detail = ""
-    if driver_weapon_used == "Yes":
-        driver_weapon_detail = st.text_input("If yes, please elaborate", key="driver_weapon_detail")
-        script_block("“Okay, {detail}. That’s very serious and the details help paint a full picture of the situation. I’m so sorry that happened.”".replace("{detail}", driver_weapon_detail or "[detail noted]"))
-    else:
-        script_block("“Okay, although there was no weapon, this is still a very serious situation and does not change the magnitude of the incident.”")
-
-    st.markdown("**Victim carrying a weapon? (Wagstaff rule only)**")
-    victim_weapon = st.radio(
-        "Were you carrying a weapon at the time of the assault? (Personal defense tools like pepper spray/mace may not be a weapon.)",
-        ["No","Yes"], horizontal=True, key="victim_weapon"
-    )
-    non_lethal_choice = ""
-    if victim_weapon == "Yes":
-        non_lethal_list = [
-            "Pepper Spray","Personal Alarm","Stun Gun","Taser","Self-Defense Keychain","Tactical Flashlight","Groin Kickers","Personal Safety Apps",
-            "Defense Flares","Baton","Kubotan","Umbrella","Whistle","Combat Pen","Pocket Knife","Personal Baton","Nunchaku","Flashbang","Air Horn",
-            "Bear Spray","Sticky Foam","Tactical Scarf/Shawl","Self-Defense Ring","Hearing Protection","Other/Unlisted"
-        ]
-        non_lethal_choice = st.selectbox("If non-lethal/defensive item, select one", non_lethal_list, key="non_lethal_choice")
-
-    st.markdown("---")
-
-    # =========================
-    # Settlement Process + Education #3
-    # =========================
-    st.markdown("### Settlement Process")
-    script_block(
-        "Here’s what to expect: after discovery, the court schedules four bellwether test trials — real trials that guide settlement ranges for everyone else.\n"
-        "That means you won’t have to retell your story in court. Your records and documents will speak for you, and your settlement will be based on your individual experience."
-    )
-    # Education #3
-    script_block(
-        "Education Insert #3 — Law Firm & Contingency\n"
-        "Jay: “____, based on what you’ve told me, you Might have a valid case. Here’s how pursuing a settlement works:\n"
-        "You hire the law firm on a contingency basis — no upfront costs, no out-of-pocket fees. You only owe if they win you a recovery.\n"
-        "We are the intake center for The Wagstaff Law Firm. Their attorneys are nationally recognized — many named Super Lawyers (top 5% of all attorneys). "
-        "Judges across the country have appointed them to nine national Plaintiff Steering Committees, reserved for the top trial lawyers in corporate negligence cases.\n"
-        "They’re now applying that same leadership to hold Uber and Lyft accountable for failing survivors like you.”"
-    )
-
-    # =========================
-    # Identity for Records (Full SSN + last4 fallback)
-    # =========================
-    st.markdown("### Identity for Records")
-    pc_name_local = caller_full_name or caller_legal_name or "there"
-    st.markdown(f"**{pc_name_local}, I need your Social Security Number.**")
-
-    # Split your SSN education into two separate blocks as requested earlier
-    script_block(
-        "The hospital must ensure they send the correct information. For legal purposes and proper documentation, "
-        "we need your full name, address, date of birth, and Social Security number."
-    )
-    script_block(
-        "I understand your concerns about sharing your Social Security number, but it’s essential for protecting your identity and ensuring that any settlement goes to the right person. "
-        "This helps prevent relatives from falsely claiming the settlement and avoids potential financial issues. Your cooperation is vital for a smooth legal process."
-    )
-
-    full_ssn = st.text_input("Social Security Number (###-##-####)", key="full_ssn")
-    st.caption("If you prefer, you can share just the **last 4 digits**; those are often enough for HIPAA releases.")
-    ssn_last4 = st.text_input("SSN last 4 (optional)", max_chars=4, key="ssn_last4")
-    full_ssn_on_file = bool(full_ssn.strip())
-
-    # ========= Calculations =========
-    used_date = (incident_date or TODAY.date())
-    incident_time_obj = incident_time or time(0, 0)
-    incident_dt = datetime.combine(used_date, incident_time_obj)
-
-    category = sa_category(act_flags)
-    sol_state = STATE_ALIAS.get(state, state)
-    sol_years, sol_rule_text, used_sa = sol_rule_for(sol_state, category)
-
-    if sol_years is None:
-        sol_end = None
-        file_by_deadline = None
-        sol_time_ok = True
-    else:
-        sol_end = incident_dt + relativedelta(years=+int(sol_years))
-        file_by_deadline = sol_end - timedelta(days=45)
-        sol_time_ok = TODAY <= sol_end
-
-    # earliest report math
-    all_dates = [d for d in report_dates.values() if d]
-    if family_report_dt:
-        all_dates.append(family_report_dt.date())
-    earliest_report_date = min(all_dates) if all_dates else None
-    delta_days = (earliest_report_date - incident_dt.date()).days if earliest_report_date else None
-
-    earliest_channels = []
-    if earliest_report_date:
-        for k, v in report_dates.items():
-            if v == earliest_report_date:
-                earliest_channels.append(k)
-    earliest_is_family = (earliest_channels == ["Family/Friends"]) or (set(earliest_channels) == {"Family/Friends"})
-
-    # =========================
-    # Eligibility Logic
-    # =========================
-
-    # Base disqualifiers across both firms (verbal-only or attempt-only)
-    base_disqualifier = verbal_only or attempt_only
-
-    # Wagstaff — accepts Uber or Lyft; requires report (or audio/video), no felony, scope, tier, SOL OK, no atty
-    has_allowed_report = any(ch in report_dates for ch in ["Rideshare company","Police","Therapist","Physician"]) or ("Family/Friends" in report_dates)
-    within_24h_family_ok = True
-    if set(report_dates.keys()) == {"Family/Friends"}:
-        if not family_report_dt:
-            within_24h_family_ok = False
-        else:
-            delta_hours = (family_report_dt - incident_dt).total_seconds() / 3600.0
-            within_24h_family_ok = (0 <= delta_hours <= 24.0)
-    wag_report_ok = (has_allowed_report and (within_24h_family_ok or not set(report_dates.keys()) == {"Family/Friends"})) or any_av_uploaded
-    wag_common_ok = (not has_atty) and inside_near and base_tier_ok and sol_time_ok and (company in ("Uber","Lyft"))
-    wag_no_felony = (not felony)
-    wag_no_victim_weapon = (victim_weapon == "No")  # Wagstaff-only rule
-    wag_ok = wag_common_ok and wag_report_ok and wag_no_felony and wag_no_victim_weapon and (not base_disqualifier)
-
-    # Wagstaff reasons when NOT eligible
-    wag_reasons = []
-    if not (company in ("Uber","Lyft")): wag_reasons.append("Company must be Uber or Lyft.")
-    if has_atty: wag_reasons.append("Already has an attorney.")
-    if not inside_near: wag_reasons.append("Incident not confirmed inside/just outside the vehicle.")
-    if not base_tier_ok: wag_reasons.append("Tier 1 or Tier 2 acts required.")
-    if not sol_time_ok: wag_reasons.append("Statute of limitations appears to be passed.")
-    if not wag_report_ok: wag_reasons.append("No qualifying report (or audio/video evidence).")
-    if not wag_no_felony: wag_reasons.append("Felony history disqualifies for Wagstaff.")
-    if victim_weapon == "Yes": wag_reasons.append("Victim was carrying a weapon (Wagstaff does not accept).")
-    if base_disqualifier:
-        if verbal_only: wag_reasons.append("Verbal abuse only (no sexual acts).")
-        if attempt_only: wag_reasons.append("Attempt/minor contact only.")
-
-    # Triten — requires Email/PDF receipt, ID, female rider, not driver, report (family within 14d), no atty, tier, scope, SOL OK, Uber/Lyft
-    triten_receipt_ok = ("Email" in receipt_evidence) or ("PDF" in receipt_evidence) or any_pdf_uploaded
-    triten_id_ok = bool(gov_id)
-    triten_gender_ok = bool(female_rider)
-    triten_role_ok = bool(rider_not_driver)
-    triten_report_any = bool(report_dates) or bool(family_report_dt)
-    triten_family_14_ok = True
-    if triten_report_any and earliest_is_family:
-        triten_family_14_ok = (delta_days is not None) and (0 <= delta_days <= 14)
-    triten_no_atty = (not has_atty)
-    triten_tier_ok = base_tier_ok
-    triten_scope_ok = inside_near
-    triten_sol_ok = sol_time_ok
-    triten_company_ok = (company in ("Uber","Lyft"))
-    triten_ok = all([
-        triten_receipt_ok, triten_id_ok, triten_gender_ok, triten_role_ok,
-        triten_report_any, triten_family_14_ok, triten_no_atty, triten_tier_ok,
-        triten_scope_ok, triten_sol_ok, triten_company_ok
-    ]) and (not base_disqualifier)
-
-    # Triten reasons when NOT eligible
-    triten_reasons = []
-    if not (company in ("Uber","Lyft")): triten_reasons.append("Company must be Uber or Lyft.")
-    if not triten_receipt_ok: triten_reasons.append("Must provide Email or PDF copy of rideshare receipt.")
-    if not triten_id_ok: triten_reasons.append("Government ID is required.")
-    if not triten_gender_ok: triten_reasons.append("Female riders only.")
-    if not triten_role_ok: triten_reasons.append("Caller must be the rider (not the driver).")
-    if not triten_report_any: triten_reasons.append("No report date captured for any channel.")
-    elif earliest_is_family and not triten_family_14_ok:
-        triten_reasons.append("Family/Friend report must be within 14 days.")
-    if has_atty: triten_reasons.append("Already has an attorney.")
-    if not triten_tier_ok: triten_reasons.append("Tier 1 or Tier 2 acts required.")
-    if not triten_scope_ok: triten_reasons.append("Incident not confirmed inside/just outside the vehicle.")
-    if not triten_sol_ok: triten_reasons.append("Statute of limitations appears to be passed.")
-    if base_disqualifier:
-        if verbal_only: triten_reasons.append("Verbal abuse only (no sexual acts).")
-        if attempt_only: triten_reasons.append("Attempt/minor contact only.")
-
-    # =========================
-    # Eligibility Snapshot
-    # =========================
-    st.subheader("Eligibility Snapshot")
-    colA, colB, colC = st.columns(3)
-    with colA:
-        st.markdown("<div class='badge-note'>Tier</div>", unsafe_allow_html=True)
-        badge(base_tier_ok and (not base_disqualifier), tier_label if (tier_label != "Unclear" and not base_disqualifier) else "Tier unclear / DQ")
-    with colB:
-        st.markdown("<div class='badge-note'>Wagstaff</div>", unsafe_allow_html=True)
-        badge(wag_ok, "Eligible" if wag_ok else "Not Eligible")
-    with colC:
-        st.markdown("<div class='badge-note'>Triten</div>", unsafe_allow_html=True)
-        badge(triten_ok, "Eligible" if triten_ok else "Not Eligible")
-
-    # =========================
-    # Assign Law Firm
-    # =========================
-    st.subheader("Assign Law Firm")
-    firm_options = ["Wagstaff Law Firm", "Triten Law Group", "Other (type name)"]
-    if wag_ok:
-        default_idx = 0
-    elif triten_ok:
-        default_idx = 1
-    else:
-        default_idx = 2
-    assigned_firm_choice = st.selectbox("Choose firm for this PC", firm_options, index=default_idx, key="assigned_firm_choice")
-    custom_firm_name = ""
-    if assigned_firm_choice == "Other (type name)":
-        custom_firm_name = st.text_input("Enter firm name", key="custom_firm_name").strip()
-
-    def firm_header_and_short(choice, custom):
-        if choice == "Wagstaff Law Firm":
-            return "RIDESHARE Waggy | Retained", "Waggy", "Wagstaff Law Firm"
-        if choice == "Triten Law Group":
-            return "RIDESHARE Triten | Retained", "Triten", "Triten Law Group"
-        name = custom or "Other Firm"
-        return f"RIDESHARE {name} | Retained", name, name
-
-    note_header, firm_short, assigned_firm_name = firm_header_and_short(assigned_firm_choice, custom_firm_name)
-
-    # =========================
-    # Diagnostics
-    # =========================
-    st.subheader("Eligibility Diagnostics")
-    st.markdown("#### Wagstaff")
-    wag_lines = []
-    wag_lines.append(f"• Tier = {tier_label}.")
-    wag_lines.append(f"• Report OK? {'Yes' if wag_report_ok else 'No'} (allowed channels or audio/video evidence).")
-    if set(report_dates.keys()) == {"Family/Friends"}:
-        if family_report_dt:
-            delta_hours = (family_report_dt - incident_dt).total_seconds() / 3600.0
-            wag_lines.append(f"• Family-only report delta: {delta_hours:.1f} hours → {'OK (≤24h)' if within_24h_family_ok else 'Not OK (>24h)'}")
-        else:
-            wag_lines.append("• Family-only selected but time not provided.")
-    wag_lines.append(f"• No attorney: {not has_atty}")
-    wag_lines.append(f"• Inside/near scope: {inside_near}")
-    wag_lines.append(f"• Felony: {'No' if not felony else 'Yes (Wagstaff DQ)'}")
-    wag_lines.append(f"• Victim carrying weapon: {victim_weapon}")
-    wag_lines.append(f"• Company: {company}")
-    if sol_years is None:
-        wag_lines.append(f"• SOL: No SOL per SA extension ({sol_rule_text}) → timing OK.")
-    else:
-        if sol_time_ok:
-            wag_lines.append(f"• SOL open until {fmt_dt(sol_end)} ({sol_rule_text}).")
-        else:
-            wag_lines.append(f"• SOL passed — {fmt_dt(sol_end)} ({sol_rule_text}).")
-    st.markdown("<div class='kv'>" + "\n".join(wag_lines) + "</div>", unsafe_allow_html=True)
-
-    st.markdown("**Wagstaff — Reasons Not Eligible (if any):**")
-    st.markdown("<div class='kv'>" + ("\n".join([f"• {r}" for r in wag_reasons]) if wag_reasons else "• —") + "</div>", unsafe_allow_html=True)
-
-    st.markdown("#### Triten")
-    tri_lines = []
-    tri_lines.append(f"• Tier = {tier_label}.")
-    tri_lines.append(f"• Receipt (Email/PDF): {'Yes' if triten_receipt_ok else 'No'}")
-    tri_lines.append(f"• Government ID: {'Yes' if triten_id_ok else 'No'}")
-    tri_lines.append(f"• Female rider: {'Yes' if triten_gender_ok else 'No'}")
-    tri_lines.append(f"• Rider (not driver): {'Yes' if triten_role_ok else 'No'}")
-    if triten_report_any:
-        if earliest_is_family:
-            tri_lines.append(f"• Earliest report via Family/Friends; Δ days = {delta_days} → {'OK (≤14d)' if triten_family_14_ok else 'Not OK'}")
-        else:
-            tri_lines.append("• Report present via accepted channel.")
-    else:
-        tri_lines.append("• No report captured.")
-    tri_lines.append(f"• No attorney: {'Yes' if triten_no_atty else 'No'}")
-    tri_lines.append(f"• Scope inside/near: {'Yes' if triten_scope_ok else 'No'}")
-    tri_lines.append(f"• SOL OK: {'Yes' if triten_sol_ok else 'No'}")
-    tri_lines.append(f"• Company: {company}")
-    st.markdown("<div class='kv'>" + "\n".join(tri_lines) + "</div>", unsafe_allow_html=True)
-
-    st.markdown("**Triten — Reasons Not Eligible (if any):**")
-    st.markdown("<div class='kv'>" + ("\n".join([f"• {r}" for r in triten_reasons]) if triten_reasons else "• —") + "</div>", unsafe_allow_html=True)
-
-    # =========================
-    # Summary
-    # =========================
-    st.subheader("Summary")
-    sol_end_str = ("No SOL" if sol_years is None else (fmt_dt(sol_end) if sol_end else "—"))
-    file_by_str = ("N/A (No SOL)" if sol_years is None else (fmt_dt(file_by_deadline) if file_by_deadline else "—"))
-    report_dates_str = "; ".join([f"{k}: {fmt_date(v)}" for k, v in report_dates.items()]) if report_dates else "—"
-    family_dt_str = fmt_dt(family_report_dt) if family_report_dt else "—"
-
-    decision = {
-        "Assigned Firm": assigned_firm_name,
-        "Full Name": caller_full_name,
-        "Legal Name": caller_legal_name,
-        "Consent Recording": consent_recording,
-        "Phone": caller_phone,
-        "Email": caller_email,
-        "Company": company,
-        "State": state,
-        "Tier": tier_label,
-        "SA category for SOL": category or "—",
-        "Using SA extension?": "Yes" if (category and sol_state in SA_EXT) else "No (general tort)",
-        "SOL rule applied": sol_rule_text,
-        "SOL End (est.)": sol_end_str,
-        "File-by (SOL-45d)": file_by_str,
-        "Reported Dates": report_dates_str,
-        "Family/Friends Report (DateTime)": family_dt_str,
-        "Wagstaff Eligible?": "Eligible" if wag_ok else "Not Eligible",
-        "Triten Eligible?": "Eligible" if triten_ok else "Not Eligible",
-    }
-    st.dataframe(pd.DataFrame([decision]), use_container_width=True, height=360)
-
-    # =========================
-    # Detailed Report — Statement of the Case
-    # =========================
-    st.subheader("Detailed Report — Elements of Statement of the Case for RIDESHARE")
-
-    acts_selected = [k for k, v in act_flags.items() if v and k not in ("Kidnapping Off-Route w/ Threats", "False Imprisonment w/ Threats")]
-    aggr_selected = [k for k in ("Kidnapping Off-Route w/ Threats","False Imprisonment w/ Threats") if act_flags.get(k)]
-
-    line_items = []
-    def add_line(num, text): line_items.append(f"{num}. {text}")
-
-    add_line(1,  f"Caller Full / Legal: {caller_full_name or '—'} / {caller_legal_name or '—'}")
-    add_line(2,  f"Assigned Firm: {assigned_firm_name}")
-    add_line(3,  f"Platform: {company}")
-    add_line(4,  f"Receipt Evidence: {join_list(receipt_evidence)} | Files: {', '.join(uploaded_names) if uploaded_names else '—'}")
-    add_line(5,  f"Incident Date/Time: {(fmt_date(incident_date) if incident_date else 'UNKNOWN')} {incident_time.strftime('%H:%M') if incident_time else ''}")
-    add_line(6,  f"Reported to: {', '.join(reported_to) if reported_to else '—'} | Dates: {', '.join([f'{k}: {fmt_date(v)}' for k,v in report_dates.items()]) if report_dates else '—'}")
-    if "Friend or Family Member" in reported_to:
-        add_line(6.1, f"Family/Friend Contact: {(fam_first or '—')} {(fam_last or '')} | Phone: {fam_phone or '—'}")
-    if "Physician" in reported_to:
-        add_line(6.2, f"Physician: {phys_name or '—'} | Clinic/Hospital: {phys_fac or '—'} | Address: {phys_addr or '—'}")
-    if "Therapist" in reported_to:
-        add_line(6.3, f"Therapist: {ther_name or '—'} | Clinic/Hospital: {ther_fac or '—'} | Address: {ther_addr or '—'}")
-    if "Police Department" in reported_to:
-        add_line(6.4, f"Police Station: {police_station or '—'} | Address: {police_addr or '—'}")
-    if "Rideshare Company" in reported_to:
-        add_line(6.5, f"Rideshare Company (reported): {rep_rs_company or '—'}")
-    add_line(7,  f"Where it happened (scope): {scope_choice}")
-    add_line(8,  f"Pickup → Drop-off: {pickup or '—'} → {dropoff or '—'} | State: {state}")
-    add_line(9,  f"Injuries — Physical: {'Yes' if injury_physical else 'No'}, Emotional: {'Yes' if injury_emotional else 'No'} | Details: {injuries_summary or '—'}")
-    add_line(10, f"Provider: {provider_name or '—'} | Facility: {provider_facility or '—'} | First visit: {fmt_date(first_visit) if first_visit else '—'} | Last visit: {fmt_date(last_visit) if last_visit else '—'}")
-    add_line(11, f"Medication: {medication_name or '—'} | Pharmacy: {pharmacy_name or '—'}")
-    add_line(12, f"Submission: {rs_submit_how or '—'} | Company responded: {'Yes' if rs_received_response else 'No'} | Detail: {rs_response_detail or '—'}")
-    add_line(13, f"Phone / Email: {caller_phone or '—'} / {caller_email or '—'}")
-    add_line(14, f"Screen — Gov ID: {'Yes' if gov_id else 'No'} | Female: {'Yes' if female_rider else 'No'} | Rider (not driver): {'Yes' if rider_not_driver else 'No'} | Felony: {'Yes' if felony else 'No'} | Has Atty: {'Yes' if has_atty else 'No'} | SSN captured: {'Yes' if full_ssn_on_file or ssn_last4 else 'No'}")
-    add_line(15, f"Acts selected: {join_list(acts_selected)} | Aggravators: {join_list(aggr_selected)} | Verbal only: {'Yes' if verbal_only else 'No'} | Attempt only: {'Yes' if attempt_only else 'No'}")
-    add_line(16, f"Driver weapon/force: {driver_weapon_used}{(' — ' + driver_weapon_detail) if driver_weapon_detail else ''} | Victim weapon: {victim_weapon}{(' — ' + non_lethal_choice) if (victim_weapon=='Yes' and non_lethal_choice) else ''}")
-    add_line(17, f"Tier: {tier_label}")
-    add_line(18, f"SOL rule applied: {sol_rule_text} | SOL end: {('No SOL' if sol_years is None else fmt_dt(sol_end))} | File-by (SOL−45d): {file_by_str}")
-    if earliest_report_date is not None:
-        add_line(19, f"Earliest report: {fmt_date(earliest_report_date)} via {', '.join(earliest_channels) if earliest_channels else '—'} (Δ = {delta_days} day[s])")
-    else:
-        add_line(19, "Earliest report: —")
-    add_line(20, f"Wagstaff Eligibility: {'Eligible' if wag_ok else 'Not Eligible'}")
-    add_line(21, f"Triten Eligibility: {'Eligible' if triten_ok else 'Not Eligible'}")
-
-    elements = "\n".join([str(x) for x in line_items])
-    st.markdown(f"<div class='copy'>{elements}</div>", unsafe_allow_html=True)
-
-    # =========================
-    # Law Firm Note (Copy & Send)
-    # =========================
-    st.subheader("Law Firm Note (Copy & Send)")
-
-    # Marketing source dropdown (reflect into note)
-    marketing_source_choice = st.selectbox("Marketing Source", MARKETING_SOURCES, index=0, key="marketing_source_choice")
-
-    # GDrive + PLAID + ID
-    note_gdrive = st.text_input("GDrive URL (if any)", value="", key="note_gdrive")
-    note_plaid_passed = st.checkbox("PLAID Passed", value=False, key="note_plaid_passed")
-    id_types = ["Driver's License","State ID","Passport","Military ID","Permanent Resident Card","Other Government ID"]
-    id_type_used = st.selectbox("ID Provided (PLAID) — type", id_types, index=0, key="id_type_used")
-    note_receipt_pdf = st.checkbox("Uber/Lyft PDF Receipt and screenshot (reflects firm-specific platform only)", value=False, key="note_receipt_pdf")
-
-    # Build law firm note in the exact order you requested
-    created_str = TODAY.strftime("%B %d, %Y")
-    company_upper = (company or "").upper()
-    tier_case_str = "Unclear"
-    if (not base_disqualifier) and tier_label.startswith("Tier 1"):
-        tier_case_str = "1 Case"
-    elif (not base_disqualifier) and tier_label.startswith("Tier 2"):
-        tier_case_str = "2 Case"
-
-    show_company_for_note = "UBER" if company_upper == "UBER" else ("LYFT" if company_upper == "LYFT" else company_upper or "")
-
-    # Map receipt selection into a compact suffix
-    evidence_suffix = ""
-    if note_receipt_pdf:
-        has_pdf = ("PDF" in receipt_evidence) or any_pdf_uploaded
-        has_ss  = any("Screenshot" in x for x in receipt_evidence)
-        if has_pdf and has_ss:
-            evidence_suffix = " — PDF Receipt and screenshot"
-        elif has_pdf:
-            evidence_suffix = " — PDF Receipt"
-        elif has_ss:
-            evidence_suffix = " — Screenshot"
-
-    # Reporting details to reflect in notes
-    reporting_details = []
-    if reported_to:
-        reporting_details.append("Reported To/When:")
-        if "Rideshare Company" in reported_to:
-            reporting_details.append(f"- Rideshare company: {fmt_date(report_dates.get('Rideshare company'))} ({rep_rs_company or '—'})")
-        if "Police Department" in reported_to:
-            reporting_details.append(f"- Police: {fmt_date(report_dates.get('Police'))} — {police_station or '—'}, {police_addr or '—'}")
-        if "Therapist" in reported_to:
-            reporting_details.append(f"- Therapist: {fmt_date(report_dates.get('Therapist'))} — {ther_name or '—'}, {ther_fac or '—'}, {ther_addr or '—'}")
-        if "Physician" in reported_to:
-            reporting_details.append(f"- Physician: {fmt_date(report_dates.get('Physician'))} — {phys_name or '—'}, {phys_fac or '—'}, {phys_addr or '—'}")
-        if "Friend or Family Member" in reported_to:
-            reporting_details.append(f"- Family/Friend: {fmt_dt(family_report_dt) if family_report_dt else '—'} — {fam_first or '—'} {fam_last or ''} ({fam_phone or '—'})")
-    reporting_text = "\n".join(reporting_details) if reporting_details else ""
-
-    # Build note (include Full Legal Name line above Rideshare)
-    note_lines = [
-        f"{note_header}:",
-        f"Full Legal Name: {caller_legal_name or ''}",
-        f"Rideshare: {show_company_for_note}",
-        f"Tier: {tier_case_str}",
-        f"Source: {marketing_source_choice}",
-        f"Date Created: {created_str}",
-    ]
-    if full_ssn_on_file:
-        note_lines.append("Full SSN: Yes")
-    else:
-        note_lines.append("Full SSN: No")
-
-    # Platform-specific receipt reflection
-    if note_receipt_pdf and show_company_for_note in ("UBER","LYFT"):
-        note_lines.append(f"{show_company_for_note}{evidence_suffix}")
-    elif note_receipt_pdf:
-        note_lines.append(f"Rideshare{evidence_suffix}")
-
-    note_lines.append(f"ID Provided (PLAID): {id_type_used}")
-    note_lines.append(f"PLAID: {'Passed' if note_plaid_passed else 'Not Passed'}")
-
-    # Also include contact lines beneath if you still want them shown to staff
-    note_lines.append(f"Phone number: {caller_phone or ''}")
-    note_lines.append(f"Email: {caller_email or ''}")
-
-    if note_gdrive:
-        note_lines.append(f"Gdrive: {note_gdrive}")
-
-    if reporting_text:
-        note_lines.append("\n" + reporting_text)
-
-    if prior_firm_any:
-        note_lines.append(f"Prior firm signed/disqualified: YES{(' — ' + prior_firm_note) if prior_firm_note else ''}")
-
-    lawfirm_note = "\n".join(note_lines)
-    st.markdown(f"<div class='copy'>{lawfirm_note}</div>", unsafe_allow_html=True)
-
-    st.download_button(
-        "Download Law Firm Note (.txt)",
-        data=lawfirm_note.encode("utf-8"),
-        file_name="lawfirm_note.txt",
-        mime="text/plain"
-    )
-
-    # Notepad-friendly Detailed Report
-    detailed_report_txt = "Detailed Report — Elements of Statement of the Case for RIDESHARE\n\n" + elements
-    st.download_button(
-        "Download Detailed Report (.txt)",
-        data=detailed_report_txt.encode("utf-8"),
-        file_name="statement_of_case.txt",
-        mime="text/plain"
-    )
-
-    # =========================
-    # Objection Scripts / Legend / References
-    # =========================
-    st.markdown("---")
-    st.header("Objection Script / Legend / References")
-    obj_key = st.selectbox(
-        "Select a script or reference",
-        sorted(list(OBJECTION_SCRIPTS.keys())),
-        index=0,
-        key="obj_script_select"
-    )
-    obj_text = OBJECTION_SCRIPTS.get(obj_key, "")
-    if obj_text.startswith("https://") or obj_text.startswith("http://"):
-        st.markdown(f"[Open reference link]({obj_text})")
-    else:
-        script_block(obj_text)
-
-    # =========================
-    # Firm-Specific Client Contact Details (Bottom)
-    # =========================
-    st.markdown("---")
-    st.header("Firm-Specific Client Contact Details")
-
-    pre_first, pre_mid, pre_last = split_legal_name(caller_legal_name)
-    pre_email = caller_email or ""
-    pre_home = ""
-    pre_cell = st.session_state.get("caller_phone", "") or ""
-    pre_city = ""
-    pre_state_idx = STATE_LIST_FORM.index(state) if state in STATE_LIST_FORM else 0
-    pre_zip = ""
-
-    client_contact_txt_lines = []
-
-    if assigned_firm_name == "Triten Law Group":
-        st.subheader("TriTen – Intake CLIENT CONTACT DETAILS")
-
-        tri_first = st.text_input("First Name", value=pre_first, key="tri_first")
-        tri_middle = st.text_input("Middle Name", value=pre_mid, key="tri_middle")
-        tri_last = st.text_input("Last Name", value=pre_last, key="tri_last")
-
-        tri_maiden = st.text_input("Maiden Name (if applicable)", key="tri_maiden")
-        tri_pref_name = st.text_input("Preferred Name", key="tri_pref_name")
-        tri_email = st.text_input("Primary Email", value=pre_email, key="tri_email")
-
-        tri_addr = st.text_input("Mailing Address", key="tri_addr")
-        tri_city = st.text_input("City", value=pre_city, key="tri_city")
-        tri_state = st.selectbox("State", STATE_LIST_FORM, index=pre_state_idx, key="tri_state")
-        tri_zip = st.text_input("Zip", value=pre_zip, key="tri_zip")
-
-        tri_home_phone = st.text_input("Home Phone No.", value=pre_home, key="tri_home_phone")
-        tri_cell_phone = st.text_input("Cell Phone No.", value=pre_cell, key="tri_cell_phone")
-        tri_best_time = st.text_input("Best Time to Contact", key="tri_best_time")
-        tri_pref_method = st.selectbox("Preferred Method of Contact", ["Phone", "Email", "Phone & Email"], index=2, key="tri_pref_method")
-
-        tri_dob = st.date_input("Date of Birth (mm-dd-yyyy)", value=None,
-                                min_value=date(1969,1,1), max_value=TODAY.date(), key="tri_dob")
-        tri_age = calc_age(tri_dob) if tri_dob else ""
-        st.caption(f"Age: {tri_age if tri_age!='' else '—'}")
-
-        # Reflect full SSN captured above into TriTen field
-        tri_ssn = st.text_input("Social Security No.", value=(full_ssn if full_ssn else ""), key="tri_ssn")
-
-        tri_claim_for = st.radio("Does the claim pertain to you or another person?", ["Myself","Someone else"], horizontal=True, key="tri_claim_for")
-        tri_marital = st.selectbox("Current marital status", ["Single","Married","Divorced","Widowed"], key="tri_marital")
-
-        # Affirmation at the end of TriTen section
-        st.markdown("---")
-        st.markdown("**Affirmation**")
-        tri_affirmation = st.radio(
-            "[Having just confirmed all the answers you have provided in response to all the questions] "
-            "Do you hereby affirm that the information submitted by you is true and correct in all respects, "
-            "including whether you've ever signed up with another law firm?",
-            ["Yes", "No"], horizontal=True, key="tri_affirmation"
-        )
-        st.markdown("**INTAKE ENDS HERE**")
-
-        # Build client contact TXT (TriTen)
-        client_contact_txt_lines = [
-            "TriTen – Intake CLIENT CONTACT DETAILS",
-            f"Client Name: {tri_first} {tri_middle} {tri_last}".strip(),
-            f"Maiden Name: {tri_maiden}",
-            f"Preferred Name: {tri_pref_name}",
-            f"Primary Email: {tri_email}",
-            f"Mailing Address: {tri_addr}",
-            f"City: {tri_city}",
-            f"State: {tri_state}",
-            f"Zip: {tri_zip}",
-            f"Home Phone No.: {tri_home_phone}",
-            f"Cell Phone No.: {tri_cell_phone}",
-            f"Best Time to Contact: {tri_best_time}",
-            f"Preferred Method of Contact: {tri_pref_method}",
-            f"DOB: {fmt_date(tri_dob) if tri_dob else ''}",
-            f"Age: {tri_age}",
-            f"Social Security No.: {tri_ssn}",
-            f"Claim pertains to: {tri_claim_for}",
-            f"Marital status: {tri_marital}",
-            f"Affirmation: {tri_affirmation}",
-        ]
-
-    elif assigned_firm_name == "Wagstaff Law Firm":
-        st.subheader("Wagstaff – CLIENT CONTACT DETAILS")
-
-        wag_first = st.text_input("First Name", value=pre_first, key="wag_first")
-        wag_middle = st.text_input("Middle Name", value=pre_mid, key="wag_middle")
-        wag_last = st.text_input("Last Name", value=pre_last, key="wag_last")
-
-        wag_email = st.text_input("Primary Email", value=pre_email, key="wag_email")
-        wag_addr = st.text_input("Mailing Address", key="wag_addr")
-        wag_city = st.text_input("City", value=pre_city, key="wag_city")
-        wag_state = st.selectbox("State", STATE_LIST_FORM, index=pre_state_idx, key="wag_state")
-        wag_zip = st.text_input("Zip", value=pre_zip, key="wag_zip")
-        wag_home_phone = st.text_input("Home Phone No.", value=pre_home, key="wag_home_phone")
-        wag_cell_phone = st.text_input("Cell Phone No.", value=pre_cell, key="wag_cell_phone")
-        wag_best_time = st.text_input("Best Time to Contact", value="", key="wag_best_time")
-        wag_pref_method = st.selectbox("Preferred Method of Contact", ["Phone", "Email", "Phone & Email"], index=2, key="wag_pref_method")
-
-        wag_dob = st.date_input("Date of Birth (mm-dd-yyyy)", value=None,
-                                min_value=date(1969,1,1), max_value=TODAY.date(), key="wag_dob")
-        wag_age = calc_age(wag_dob) if wag_dob else ""
-        st.caption(f"Age: {wag_age if wag_age!='' else '—'}")
-
-        # Reflect full SSN captured above into Wagstaff field
-        wag_ssn = st.text_input("Social Security No.", value=(full_ssn if full_ssn else ""), key="wag_ssn")
-
-        wag_claim_for = st.radio("Does the claim pertain to you or another person?", ["Myself","Someone Else"], horizontal=True, key="wag_claim_for")
-
-        st.caption(f"Prior firm signed/disqualified earlier: {'Yes' if prior_firm_any else 'No'}"
-                   f"{(' — ' + prior_firm_note) if (prior_firm_any and prior_firm_note) else ''}")
-
-        st.subheader("INJURED PARTY DETAILS")
-        inj_full = st.text_input("Injured/Deceased Party's Full Name (First, Middle, & Last Name)", value=f"{pre_first} {pre_mid} {pre_last}".strip(), key="wag_inj_full")
-        inj_gender_default = "Female" if female_rider else "—"
-        inj_gender = st.text_input("Injured Party Gender", value=inj_gender_default, key="wag_inj_gender")
-        inj_dob = st.date_input("Injured/Deceased Party's DOB (mm-dd-yyyy)", value=None,
-                                min_value=date(1969,1,1), max_value=TODAY.date(), key="wag_inj_dob")
-
-        # Build client contact TXT (Wagstaff)
-        client_contact_txt_lines = [
-            "Wagstaff – CLIENT CONTACT DETAILS",
-            f"Client Name: {wag_first} {wag_middle} {wag_last}".strip(),
-            f"Primary Email: {wag_email}",
-            f"Mailing Address: {wag_addr}",
-            f"City: {wag_city}",
-            f"State: {wag_state}",
-            f"Zip: {wag_zip}",
-            f"Home Phone No.: {wag_home_phone}",
-            f"Cell Phone No.: {wag_cell_phone}",
-            f"Best Time to Contact: {wag_best_time}",
-            f"Preferred Method of Contact: {wag_pref_method}",
-            f"DOB: {fmt_date(wag_dob) if wag_dob else ''}",
-            f"Age: {wag_age}",
-            f"Social Security No.: {wag_ssn}",
-            f"Claim pertains to: {wag_claim_for}",
-            f"Injured Party: {inj_full}",
-            f"Injured Gender: {inj_gender}",
-            f"Injured DOB: {fmt_date(inj_dob) if inj_dob else ''}",
-        ]
-
-    else:
-        st.info("Select a firm above to reveal the tailored contact section.")
-
-    # Download client contact TXT
-    if client_contact_txt_lines:
-        client_contact_txt = "\n".join(client_contact_txt_lines)
-        st.download_button(
-            "Download Client Contact Details (.txt)",
-            data=client_contact_txt.encode("utf-8"),
-            file_name="client_contact_details.txt",
-            mime="text/plain"
-        )
-
-    # =========================
-    # EXPORTS (TXT/CSV/XLSX)
-    # =========================
-    st.subheader("Export")
-
-    earliest_channels = []
-    if earliest_report_date:
-        for k, v in report_dates.items():
-            if v == earliest_report_date:
-                earliest_channels.append(k)
-    earliest_channels_str = ", ".join(earliest_channels) if earliest_channels else ""
-
-    export_payload = {
-        # Assignment
-        "AssignedFirm": assigned_firm_name,
-        "AssignedFirmShort": firm_short,
-        "LawFirmNoteHeader": note_header,
-        # Caller
-        "FullName": caller_full_name,
-        "LegalName": caller_legal_name,
-        "ConsentRecording": consent_recording,
-        "Phone": caller_phone,
-        "Email": caller_email,
-        # Prior firm info
-        "PriorFirmSigned": prior_firm_any,
-        "PriorFirmNote": prior_firm_note,
-        # Ride
-        "Company": company, "Pickup": pickup, "Dropoff": dropoff, "State": state,
-        "IncidentDate": fmt_date(incident_date) if incident_date else "UNKNOWN",
-        "IncidentTime": incident_time.strftime("%H:%M"),
-        # Evidence
-        "ReceiptEvidence": ", ".join(receipt_evidence) if receipt_evidence else "",
-        "UploadedFiles": ", ".join(uploaded_names) if uploaded_names else "",
-        "AnyPDFUploaded": any_pdf_uploaded,
-        "AnyAudioVideoUploaded": any_av_uploaded,
-        # Reporting
-        "ReportedTo": ", ".join(reported_to) if reported_to else "",
-        "ReportDates": "; ".join([f"{k}: {fmt_date(v)}" for k, v in report_dates.items()]) if report_dates else "",
-        "FamilyReportDateTime": (fmt_dt(family_report_dt) if family_report_dt else "—"),
-        "FamilyFirstName": fam_first, "FamilyLastName": fam_last, "FamilyPhone": fam_phone,
-        "PhysicianName": phys_name, "PhysicianClinicHospital": phys_fac, "PhysicianAddress": phys_addr,
-        "TherapistName": ther_name, "TherapistClinicHospital": ther_fac, "TherapistAddress": ther_addr,
-        "PoliceStation": police_station, "PoliceAddress": police_addr,
-        "ReportedRideshareCompany": rep_rs_company,
-        # Submission/response
-        "SubmittedHow": rs_submit_how, "CompanyResponded": rs_received_response, "CompanyResponseDetail": rs_response_detail,
-        # Health
-        "InjuryPhysical": injury_physical, "InjuryEmotional": injury_emotional, "InjuriesSummary": injuries_summary,
-        "ProviderName": provider_name, "ProviderFacility": provider_facility,
-        "FirstVisit": fmt_date(first_visit) if first_visit else "—",
-        "LastVisit": fmt_date(last_visit) if last_visit else "—",
-        # Weapons
-        "DriverWeaponUsed": (driver_weapon_used == "Yes"),
-        "DriverWeaponDetail": driver_weapon_detail,
-        "VictimWeapon": victim_weapon,
-        "NonLethalChoice": non_lethal_choice,
-        # Identity
-        "FullSSN": full_ssn, "SSN_Last4": ssn_last4, "FullSSN_OnFile": full_ssn_on_file,
-        # Screening
-        "GovIDProvided": gov_id, "FemaleRider": female_rider, "RiderNotDriver": rider_not_driver, "HasAttorney": has_atty, "Felony": felony,
-        "VerbalOnly": verbal_only, "AttemptOnly": attempt_only,
-        # Acts
-        "Acts_RapePenetration": rape, "Acts_ForcedOralForcedTouch": forced_oral, "Acts_TouchingKissing": touching,
-        "Acts_Exposure": exposure, "Acts_Masturbation": masturb, "Agg_Kidnap": kidnap, "Agg_Imprison": imprison,
-        "Acts_Selected": ", ".join(acts_selected) if acts_selected else "", "Aggravators_Selected": ", ".join(aggr_selected) if aggr_selected else "",
-        # SOL
-        "SA_Category": category or "—", "SA_Extension_Used": (STATE_ALIAS.get(state, state) in SA_EXT) and bool(category),
-        "SOL_Rule_Text": sol_rule_text, "SOL_Years": ("No SOL" if sol_years is None else sol_years),
-        "SOL_End": ("No SOL" if sol_years is None else fmt_dt(sol_end)), "FileBy": ("N/A (No SOL)" if sol_years is None else fmt_dt(file_by_deadline)),
-        "Earliest_Report_Date": (fmt_date(earliest_report_date) if earliest_report_date else "—"),
-        "Earliest_Report_Channels": earliest_channels_str, "Earliest_Is_Family": earliest_is_family,
-        "Earliest_Report_DeltaDays": (None if earliest_report_date is None else int(delta_days if delta_days is not None else -9999)),
-        # Eligibility
-        "Eligibility_Wagstaff": "Eligible" if wag_ok else "Not Eligible",
-        "Eligibility_Triten": "Eligible" if triten_ok else "Not Eligible",
-        "Wagstaff_Reasons": "; ".join(wag_reasons) if wag_reasons else "",
-        "Triten_Reasons": "; ".join(triten_reasons) if triten_reasons else "",
-        # Notes & Marketing
-        "MarketingSource": marketing_source_choice,
-        "LawFirmNote": lawfirm_note,
-        # Statement-of-case text
-        "Elements_Report": elements.strip()
-    }
-
-    # Add firm-specific sections into export
-    if assigned_firm_name == "Triten Law Group":
-        export_payload.update({
-            "TriTen_FirstName": st.session_state.get("tri_first",""),
-            "TriTen_MiddleName": st.session_state.get("tri_middle",""),
-            "TriTen_LastName": st.session_state.get("tri_last",""),
-            "TriTen_MaidenName": st.session_state.get("tri_maiden",""),
-            "TriTen_PreferredName": st.session_state.get("tri_pref_name",""),
-            "TriTen_Email": st.session_state.get("tri_email",""),
-            "TriTen_Address": st.session_state.get("tri_addr",""),
-            "TriTen_City": st.session_state.get("tri_city",""),
-            "TriTen_State": st.session_state.get("tri_state",""),
-            "TriTen_Zip": st.session_state.get("tri_zip",""),
-            "TriTen_HomePhone": st.session_state.get("tri_home_phone",""),
-            "TriTen_CellPhone": st.session_state.get("tri_cell_phone",""),
-            "TriTen_BestTime": st.session_state.get("tri_best_time",""),
-            "TriTen_PrefMethod": st.session_state.get("tri_pref_method",""),
-            "TriTen_DOB": fmt_date(st.session_state.get("tri_dob")) if st.session_state.get("tri_dob") else "",
-            "TriTen_Age": calc_age(st.session_state.get("tri_dob")) if st.session_state.get("tri_dob") else "",
-            "TriTen_SSN": st.session_state.get("tri_ssn", full_ssn),
-            "TriTen_ClaimFor": st.session_state.get("tri_claim_for",""),
-            "TriTen_Marital": st.session_state.get("tri_marital",""),
-            "TriTen_Affirmed": st.session_state.get("tri_affirmation",""),
-        })
-    elif assigned_firm_name == "Wagstaff Law Firm":
-        export_payload.update({
-            "Wag_FirstName": st.session_state.get("wag_first",""),
-            "Wag_MiddleName": st.session_state.get("wag_middle",""),
-            "Wag_LastName": st.session_state.get("wag_last",""),
-            "Wag_Email": st.session_state.get("wag_email",""),
-            "Wag_Address": st.session_state.get("wag_addr",""),
-            "Wag_City": st.session_state.get("wag_city",""),
-            "Wag_State": st.session_state.get("wag_state",""),
-            "Wag_Zip": st.session_state.get("wag_zip",""),
-            "Wag_HomePhone": st.session_state.get("wag_home_phone",""),
-            "Wag_CellPhone": st.session_state.get("wag_cell_phone",""),
-            "Wag_BestTime": st.session_state.get("wag_best_time",""),
-            "Wag_PrefMethod": st.session_state.get("wag_pref_method",""),
-            "Wag_DOB": fmt_date(st.session_state.get("wag_dob")) if st.session_state.get("wag_dob") else "",
-            "Wag_Age": calc_age(st.session_state.get("wag_dob")) if st.session_state.get("wag_dob") else "",
-            "Wag_SSN": st.session_state.get("wag_ssn", full_ssn),
-            "Wag_ClaimFor": st.session_state.get("wag_claim_for",""),
-            "Wag_PriorFirmSigned": prior_firm_any,
-            "Wag_PriorFirmNote": prior_firm_note,
-            "Wag_InjuredFullName": st.session_state.get("wag_inj_full",""),
-            "Wag_InjuredGender": st.session_state.get("wag_inj_gender",""),
-            "Wag_InjuredDOB": fmt_date(st.session_state.get("wag_inj_dob")) if st.session_state.get("wag_inj_dob") else "",
-        })
-
-    df_export = pd.DataFrame([export_payload])
-
-    # Formatted Excel (center + wrap) if engine present
-    xlsx_data = None
-    xlsx_msg = ""
-    if XLSX_ENGINE:
-        try:
-            xlsx_buf = BytesIO()
-            with pd.ExcelWriter(xlsx_buf, engine=XLSX_ENGINE) as writer:
-                df_export.to_excel(writer, index=False, sheet_name="Intake")
-                if XLSX_ENGINE == "xlsxwriter":
-                    workbook  = writer.book
-                    worksheet = writer.sheets["Intake"]
-                    fmt = workbook.add_format({"align": "center", "valign": "top", "text_wrap": True})
-                    for col_idx in range(len(df_export.columns)):
-                        worksheet.set_column(col_idx, col_idx, 28, fmt)
-                    worksheet.freeze_panes(1, 0)
-                elif XLSX_ENGINE == "openpyxl":
-                    ws = writer.sheets["Intake"]
-                    from openpyxl.styles import Alignment
-                    alignment = Alignment(horizontal="center", vertical="top", wrap_text=True)
-                    for col_cells in ws.columns:
-                        for cell in col_cells:
-                            cell.alignment = alignment
-                    for col in ws.columns:
-                        col_letter = col[0].column_letter
-                        ws.column_dimensions[col_letter].width = 28
-                    ws.freeze_panes = "A2"
-            xlsx_data = xlsx_buf.getvalue()
-        except Exception as e:
-            xlsx_msg = f"Excel export temporarily unavailable ({type(e).__name__}). Use TXT or CSV."
-    else:
-        xlsx_msg = "Excel engine not installed. Add 'xlsxwriter' or 'openpyxl' to requirements.txt to enable formatted Excel."
-
-    if xlsx_data:
-        st.download_button(
-            "Download Excel (formatted .xlsx)",
-            data=xlsx_data,
-            file_name="intake_decision.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-    else:
-        st.info(xlsx_msg)
-
-    st.download_button(
-        "Download CSV (legacy)",
-        data=df_export.to_csv(index=False).encode("utf-8"),
-        file_name="intake_decision.csv",
-        mime="text/csv"
-    )
-
-render()
+from time import perf_counter
+SCRIPT_T0 = perf_counter()  # every rerun's timing starts here, so a cold run counts its imports
+
+import sys
+# Command-line tools, no UI: `python -m intake_app qualify in.csv -o out.parquet` (batch qualifier),
+# `python -m intake_app calendar intake_store.sqlite3 -o upcoming.csv` (upcoming eligibility changes),
+# `python -m intake_app callbacks intake_store.sqlite3 --next 20` (next due callbacks),
+# `python -m intake_app narratives intake_store.sqlite3 -o mistiered.csv` (acts vs. narratives),
+# `python -m intake_app states intake_store.sqlite3 -o wrong_state.csv` (state vs. pickup / drop-off),
+# `python -m intake_app phones vendor_leads.csv -o leads_e164.csv` (phones to E.164)
+CLI_COMMANDS = {"qualify": "intake_batch", "calendar": "intake_timeline", "callbacks": "intake_callbacks",
+                "narratives": "intake_narrative", "states": "intake_gazetteer", "phones": "intake_phones"}
+if __name__ == "__main__" and sys.argv[1:2] and sys.argv[1] in CLI_COMMANDS and "streamlit" not in sys.modules:
+    import importlib
+    sys.exit(importlib.import_module(CLI_COMMANDS[sys.argv[1]]).main(sys.argv[2:]))
+
+import functools
+import json
+import os
+import uuid
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, date
+
+# pandas, the Excel engines and the PDF reader load on first use (summary table, exports, bulk
+# import, receipts), not at startup
+
+from intake_rules import (
+    STATES, SA_EXT,
+    fmt_date, fmt_dt, split_legal_name, calc_age,
+)
+from intake_graph import INTAKE_GRAPH, GraphState
+from intake_firms import FIRMS
+from intake_routing import RoutingLedger
+from intake_content import APP_CSS, STATE_LIST_FORM, MARKETING_SOURCES
+from intake_compose import (
+    firm_header_and_short, selected_acts, statement_of_case,
+    lawfirm_note as compose_lawfirm_note, export_payload as compose_export_payload,
+)
+from intake_export import payload_hash, build_csv, build_xlsx, daily_workbook_bytes
+from intake_store import IntakeStore
+from intake_uploads import spool_uploads, manifest_has, prune_spool, PDF_KINDS, AV_KINDS, KIND_LABELS
+from intake_receipts import RECEIPT_KINDS, RECEIPT_WORKERS, extract_receipt_file, found_anything
+from intake_autosave import DraftStore, snapshot_state, diff_state, draft_label, decode_value, AUTOSAVE_SKIP_KEYS
+from intake_profile import RenderProfile, timed, COLD_RENDER_BUDGET_MS, FIRST_PAINT_BUDGET_MS
+from intake_clock import parse_as_of
+from intake_timeline import timeline
+from intake_callbacks import CallbackQueue, archive_lead, archive_leads, callback_row
+from intake_scripts import ScriptIndex, load_scripts
+from intake_narrative import suggest_acts, compare_acts
+from intake_gazetteer import infer_state
+from intake_phones import parse_phone
+import intake_clock
+
+# =========================
+# PAGE SETUP & STYLES
+# =========================
+st.set_page_config(page_title="Rideshare Intake Qualifier", layout="wide")
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+# =========================
+# HELPERS
+# =========================
+def script_block(text: str):
+    if not text: return
+    st.markdown(f"<div class='script'>{text}</div>", unsafe_allow_html=True)
+
+def phone_hint(number):
+    # Under a phone input: the number as it will be dialled and where it rings, or why it can't be
+    if not str(number or "").strip(): return
+    p = parse_phone(number)
+    if not p["valid"]:
+        st.warning(f"Check this number: {p['issue']}.")
+        return
+    where = f"{p['state']} · {p['timezone']}" if p["state"] else p["issue"]
+    st.caption(" · ".join(x for x in (p["e164"] + (f" x{p['ext']}" if p["ext"] else ""), where) if x))
+
+def badge(ok: bool, label: str):
+    css = "badge-ok" if ok else "badge-no"
+    st.markdown(f"<div class='{css}'>{label}</div>", unsafe_allow_html=True)
+
+# =========================
+# SECTION STATE (fragments)
+# =========================
+# Each section is an st.fragment that reruns on its own when one of its widgets changes.
+# Values other sections read go through one shared dict in session state; a fragment rerun
+# escalates to a full app rerun only when something it published actually changed.
+def intake_ctx() -> dict:
+    return st.session_state.setdefault("_intake_ctx", {})
+
+def pull(*names):
+    ctx = intake_ctx()
+    return tuple(ctx[n] for n in names)
+
+def publish(values: dict, export_only: bool = False):
+    ctx = intake_ctx()
+    changed = [k for k, v in values.items() if k not in ctx or ctx[k] != v]
+    ctx.update(values)
+    if not changed or st.session_state.get("_full_run"):
+        return
+    # Values only the export reads matter once an export has been prepared
+    if export_only and not st.session_state.get("export_ready_hash"):
+        return
+    st.rerun(scope="app")
+
+# =========================
+# RENDER TIMING
+# =========================
+# Every section is wrapped so full runs and fragment-only reruns are both timed per section.
+def render_profile() -> RenderProfile:
+    return st.session_state.setdefault("_render_profile", RenderProfile())
+
+def profiled(section: str):
+    def wrap(fn):
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            full_run = bool(st.session_state.get("_full_run"))
+            with timed(render_profile(), section, full_run):
+                out = fn(*args, **kwargs)
+            if not full_run:
+                autosave()  # fragment-only rerun; full runs save once at the end of render()
+            return out
+        return run
+    return wrap
+
+# =========================
+# AUTOSAVE / RESUME
+# =========================
+# The answers are saved as a draft after every rerun (only the keys that changed, written by the
+# draft store's thread after a short debounce). The draft id rides in the URL, so a reconnect or
+# a restarted server reloads the intake; the sidebar picker resumes any of the agent's own
+# unfinished ones. SSNs are left out of drafts (intake_autosave.AUTOSAVE_SKIP_KEYS).
+@st.cache_resource
+def draft_store():
+    store = DraftStore()
+    store.prune()
+    return store
+
+def current_draft_id() -> str:
+    draft_id = st.session_state.get("_draft_id")
+    if not draft_id:
+        draft_id = st.session_state["_draft_id"] = uuid.uuid4().hex[:16]
+        st.query_params["draft"] = draft_id
+    return draft_id
+
+def signed_in_agent():
+    # The signed-in user when Streamlit auth is configured, else None
+    try:
+        if st.user.is_logged_in:
+            return st.user.get("email") or st.user.get("name")
+    except Exception:
+        pass
+    return None
+
+def current_agent():
+    # Who owns this session's drafts: the signed-in user, else the name entered in the Resume
+    # panel (kept in the URL, so a reconnect keeps it). None until there is one.
+    return signed_in_agent() or (st.query_params.get("agent") or "").strip().lower() or None
+
+def set_agent_name():
+    st.query_params["agent"] = st.session_state.get("resume_agent", "").strip().lower()
+
+def autosave():
+    snap = snapshot_state(st.session_state.to_dict().items())
+    try:
+        # The drafts writer failed on an earlier diff of this draft: send everything instead
+        draft_id = st.session_state.get("_draft_id")
+        full = bool(draft_id) and draft_store().needs_full(draft_id)
+        changed, removed = diff_state({} if full else st.session_state.get("_autosave_last", {}), snap)
+        if not changed and not removed and not full:
+            return
+        draft_store().put(current_draft_id(), changed, removed, draft_label(snap), current_agent(), full=full)
+    except Exception:
+        return  # autosave must never break a rerun; the same keys are retried next time
+    st.session_state["_autosave_last"] = snap
+
+def restore_draft(draft_id: str):
+    # Replaces this session's answers with the draft's (keys the draft lacks go back to defaults)
+    encoded = draft_store().load_encoded(draft_id)
+    for key in [*snapshot_state(st.session_state.to_dict().items()), *AUTOSAVE_SKIP_KEYS]:
+        if key not in encoded and key in st.session_state:
+            del st.session_state[key]
+    for key, value in encoded.items():
+        try:
+            st.session_state[key] = decode_value(value)
+        except StreamlitAPIException:
+            pass
+    st.session_state["_intake_ctx"] = {}
+    st.session_state["_draft_id"] = draft_id
+    st.session_state["_autosave_last"] = encoded
+    st.query_params["draft"] = draft_id
+
+def resume_from_url():
+    # New session on a URL that carries a draft id: reload it before any widget is drawn
+    if "_draft_id" not in st.session_state and st.query_params.get("draft"):
+        restore_draft(st.query_params["draft"])
+
+def admin_mode() -> bool:
+    # Server configuration only (an admin deployment); never something a URL can switch on
+    return os.environ.get("INTAKE_ADMIN") == "1"
+
+def supervisor_mode() -> bool:
+    # Admin deployments, or a signed-in user listed in INTAKE_SUPERVISORS (comma-separated emails).
+    # Only the auth identity counts: the Resume panel's agent name is typed in and proves nothing.
+    if admin_mode():
+        return True
+    user = (signed_in_agent() or "").strip().lower()
+    allowed = {u.strip().lower() for u in os.environ.get("INTAKE_SUPERVISORS", "").split(",") if u.strip()}
+    return bool(user) and user in allowed
+
+def as_of_override():
+    # On an admin server (INTAKE_ADMIN=1) the intake can be viewed as of another moment with
+    # ?as_of=2025-06-01 (or 2025-06-01T09:00). Saving and firm exports are off in that view.
+    value = st.query_params.get("as_of") if admin_mode() else None
+    if not value:
+        return None
+    try:
+        return parse_as_of(value)
+    except ValueError as e:
+        st.warning(f"{e} Using the current time.")
+        return None
+
+# Read from the clock (intake_clock) on every full run, so a long-lived server never decides on a
+# stale time; the as-of override only changes this session's view.
+AS_OF = as_of_override()
+TODAY = AS_OF or intake_clock.now()
+# The process-wide routing ledger and callback queue always run on the clock itself: an admin's
+# as-of view must not roll the month or reschedule callbacks for every other agent
+NOW = intake_clock.now()
+if AS_OF:
+    st.info(f"As-of mode: deadlines and eligibility are evaluated as of {fmt_dt(TODAY)}. "
+            "Monthly firm capacity and callbacks stay on the live clock; saving and firm exports are off.")
+
+# Leading underscore: Streamlit skips hashing the payload; export_hash is the cache key.
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_xlsx(export_hash: str, _payload: dict):
+    return build_xlsx(_payload)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def cached_csv(export_hash: str, _payload: dict):
+    return build_csv(_payload)
+
+# One store (and one group-commit writer thread) per process, shared by every session
+@st.cache_resource
+def intake_store():
+    return IntakeStore()
+
+@st.cache_resource
+def duplicate_index():
+    from intake_dedupe import DuplicateIndex  # pandas-backed hashing; first needed after Level 4
+    return DuplicateIndex()
+
+# Month-to-date placements per firm (capacity), read from the archive every few seconds
+@st.cache_resource
+def routing_ledger():
+    return RoutingLedger(intake_store().firm_counts)
+
+# Callbacks due across the archive (deadline first, in each claimant's contact window), rebuilt
+# from the archive once per process and kept current as agents save intakes
+@st.cache_resource
+def callback_queue():
+    queue = CallbackQueue()
+    now = intake_clock.now()
+    queue.rebuild(archive_leads(intake_store(), now), now)
+    return queue
+
+# Objection scripts (built-in + INTAKE_SCRIPTS_PATH files), indexed once per process
+@st.cache_resource
+def script_index():
+    return ScriptIndex(load_scripts())
+
+# Spooled proof files older than the retention window are cleared once per server process
+@st.cache_resource
+def pruned_spool():
+    return prune_spool()
+
+pruned_spool()
+
+@st.cache_resource
+def receipt_pool():
+    return ThreadPoolExecutor(max_workers=RECEIPT_WORKERS, thread_name_prefix="receipt")
+
+def submit_receipt_jobs() -> bool:
+    # Starts a background parse for every uploaded receipt not yet queued; True while any is running
+    manifest = {m["sha256"]: m for m in st.session_state.get("proof_manifest", []) if m["kind"] in RECEIPT_KINDS}
+    jobs = {sha: f for sha, f in st.session_state.get("receipt_jobs", {}).items() if sha in manifest}
+    for sha, m in manifest.items():
+        if sha not in jobs:
+            jobs[sha] = receipt_pool().submit(extract_receipt_file, m["path"], m["kind"])
+    st.session_state["receipt_jobs"] = jobs
+    return any(not f.done() for f in jobs.values())
+
+# =========================
+# APP
+# =========================
+st.title("Rideshare Intake Qualifier · Script-Calibrated (Vertical)")
+
+# Legend
+st.markdown(
+    "<div class='level-legend'>"
+    "<span class='level-pill l-yellow'>Level 1</span>"
+    "<span class='level-pill l-orange'>Level 2</span>"
+    "<span class='level-pill l-lgreen'>Level 3</span>"
+    "<span class='level-pill l-green'>Level 4</span>"
+    "</div>",
+    unsafe_allow_html=True
+)
+
+
+ACT_CHECKBOX_KEYS = {
+    "Rape/Penetration": "act_rape", "Forced Oral/Forced Touching": "act_forced_oral",
+    "Touching/Kissing w/o Consent": "act_touch", "Indecent Exposure": "act_exposure",
+    "Masturbation Observed": "act_masturb", "Kidnapping Off-Route w/ Threats": "act_kidnap",
+    "False Imprisonment w/ Threats": "act_imprison",
+}
+
+def tick_acts(labels):
+    for label in labels:
+        st.session_state[ACT_CHECKBOX_KEYS[label]] = True
+
+
+def use_incident_state(state):
+    st.session_state["q_state"] = state
+
+
+@st.fragment
+@profiled("Level 1")
+def section_level1():
+    # ---------- INTRODUCTION ----------
+    script_block(
+        "INTRODUCTION\n"
+        "Thank you for calling the Advocate Rights Center, this is **[Your Name]**. How are you doing today?\n\n"
+        "May I have your **full name**, and then your **full legal name** exactly as it appears on your ID?\n\n"
+        "Before we continue, may I have your **permission to record** this call for legal and training purposes? "
+        "It will remain private and confidential, and it’s never filed publicly unless you approve and a case goes to court. "
+        "Fewer than 1 in 1,000 cases ever do, since most resolve through settlement."
+    )
+    caller_full_name = st.text_input("Full name (as provided verbally)", key="caller_full_name")
+    caller_legal_name = st.text_input("Full legal name (exact on ID)", key="caller_legal_name")
+    consent_recording = st.toggle("Permission to record (private & confidential)", value=False, key="consent_recording")
+
+    # Prior firm question right under permission
+    st.markdown("**As far as you can remember, have you signed up with any Law Firm to represent you on this case but then got disqualified for any reason?**")
+    prior_firm_radio = st.radio("We still might be able to help but need to know.", ["No", "Yes"], horizontal=True, key="prior_firm_any")
+    prior_firm_any = (prior_firm_radio == "Yes")
+    prior_firm_note = ""
+    if prior_firm_any:
+        prior_firm_note = st.text_area("If yes, share anything you recall (optional — dates, firm name, reason):", key="prior_firm_note")
+        script_block("“Thank you for sharing that. Prior disqualifications can happen for technical reasons and do not close the door here. "
+                     "Knowing this helps us prevent any conflicts and move your file faster.”")
+    else:
+        script_block("“Thanks for confirming. That keeps the intake simple and avoids any duplicate-representation issues.”")
+
+    st.markdown("---")
+
+    # =========================
+    # LEVEL 1 — Story & First-Level Qualification (Yellow)
+    # =========================
+    st.markdown("<div class='level-pill l-yellow'>Level 1 — Story & First-Level Qualification</div>", unsafe_allow_html=True)
+
+    # Q1 — Narrative
+    st.markdown("**Q1. In your own words, please feel free to describe what happened during the ride.**")
+    narr = st.text_area("Caller narrative", key="q1_narr")
+    if narr.strip():
+        script_block(
+            "“Thank you for trusting me with that. What you’ve shared is painful and important. "
+            "You’re in control of this conversation, and we’ll move at your pace. "
+            "If anything feels hard to say, we can take a moment and continue when you’re ready.”"
+        )
+
+    # Acts (under Q1)
+    st.subheader("Acts (check all that apply)")
+    rape = st.checkbox("Rape/Penetration", key="act_rape")
+    forced_oral = st.checkbox("Forced Oral/Forced Touching", key="act_forced_oral")
+    touching = st.checkbox("Touching/Kissing w/o Consent", key="act_touch")
+    exposure = st.checkbox("Indecent Exposure", key="act_exposure")
+    masturb = st.checkbox("Masturbation Observed", key="act_masturb")
+    kidnap = st.checkbox("Kidnapping Off-Route w/ Threats (Tier-3 aggravator; must have Tier 1 or 2)", key="act_kidnap")
+    imprison = st.checkbox("False Imprisonment w/ Threats (Tier-3 aggravator; must have Tier 1 or 2)", key="act_imprison")
+    # These two flags drive DQ for both firms per your rule
+    verbal_only = st.checkbox("Verbal Abuse only (No Sexual Acts)", key="act_verbal_only")
+    attempt_only = st.checkbox("Attempt/minor contact only", key="act_attempt_only")
+
+    act_flags = {
+        "Rape/Penetration": rape,
+        "Forced Oral/Forced Touching": forced_oral,
+        "Touching/Kissing w/o Consent": touching,
+        "Indecent Exposure": exposure,
+        "Masturbation Observed": masturb,
+        "Kidnapping Off-Route w/ Threats": kidnap,
+        "False Imprisonment w/ Threats": imprison
+    }
+
+    # Acts the narrative points to but aren't ticked (suggestions only; the agent confirms)
+    if narr.strip():
+        hint = suggest_acts(narr)
+        missing, _ = compare_acts(hint["flags"], act_flags)
+        if hint["evidence"]:
+            st.caption("From the narrative: " + hint["tier"] + " — " + " · ".join(
+                f"{label} (“{', '.join(found)}”)" for label, found in hint["evidence"].items()))
+        if missing:
+            st.warning("The narrative suggests acts that aren't ticked: " + ", ".join(missing) + ".")
+            st.button("Tick the suggested acts", key="btn_narrative_acts", on_click=tick_acts, args=(missing,))
+
+    # Q2 — Platform
+    st.markdown("**Q2. Which rideshare platform was it?**")
+    company = st.selectbox("Select platform", ["Uber", "Lyft", "Other"], key="q2_company")
+    if company:
+        script_block(f"“Thanks for confirming it was {company}. That helps us pull the right records and policies.”")
+
+    # ---- Education #1A (moved above Pickup/Drop-off) ----
+    script_block(
+        "HOW THIS HAPPENED →  EDUCATE CLIENT / SAFETY ZONE\n"
+        "Well, let me tell you what people have uncovered about Rideshares and why people like you are coming forward. "
+        "And again, I appreciate you trusting us with this.\n\n"
+        "Uber & Lyft have been exposed for improperly screening drivers, failing to remove dangerous drivers, and misrepresenting its safety practices.\n\n"
+        "For example, the New York Times uncovered sealed court documents showing that over 400,000 incidents of sexual assault and misconduct were reported to Uber between 2017 and 2022 . . . which is about 1 incident every 8 minutes."
+    )
+
+    # Pickup / Drop-off (extension to Q2)
+    st.markdown("**Pickup / Drop-off (extension to Q2)**")
+    st.caption("Let’s anchor the timeline and route.")
+    pickup = st.text_input("Pickup location (address/description)", key="pickup")
+    dropoff = st.text_input("Drop-off location (address/description)", key="dropoff")
+    if pickup.strip() or dropoff.strip():
+        script_block(
+            "“Thank you — those locations help lock in the route and jurisdiction. "
+            "If you remember nearby landmarks or cross-streets, we can add those too. You’re doing great.”"
+        )
+
+    # Q3 — Confident receipt request (uses PC name)
+    st.markdown("**Q3. Receipts / Proof**")
+    pc_name = caller_full_name or caller_legal_name or "there"
+    st.markdown(
+        f"<div class='callout'>"
+        f"<b>{pc_name}</b>, we need a copy of the ride receipt — "
+        f"<u>both</u> the <b>Email Copy</b> and the <b>In-App Receipt</b> (or a <b>screenshot of the receipt</b>). "
+        f"These are some of the strongest pieces of proof we can attach to your file."
+        f"</div>", unsafe_allow_html=True
+    )
+    receipt_evidence = st.multiselect(
+        "What can you provide as receipt evidence?",
+        ["PDF", "Email", "Screenshot of Receipt", "In-App Receipt (screenshot)", "Other"],
+        key="receipt_evidence"
+    )
+    receipt_evidence_other = st.text_input("If Other, describe", key="receipt_evidence_other")
+    if receipt_evidence_other and "Other" not in receipt_evidence:
+        receipt_evidence.append(f"Other: {receipt_evidence_other.strip()}")
+    if receipt_evidence:
+        script_block("“Perfect — those receipts and screenshots directly link the ride to your account and timestamp the trip.”")
+
+    # Uploads (includes audio/video; counts for Wagstaff evidence). Files are spooled to disk as
+    # they arrive and the uploader is reset, so Streamlit drops its in-memory copy; the session
+    # keeps only the manifest. PDF / audio-video evidence is judged by file content, not the name.
+    upload_gen = st.session_state.get("proof_upload_gen", 0)
+    proof_uploads = st.file_uploader(
+        "Upload now (ride receipt, therapy/medical note, police confirmation, audio/video) — images, PDFs, audio, or video",
+        type=["pdf", "eml", "png", "jpg", "jpeg", "heic", "mp4", "mov", "m4a", "mp3", "wav"],
+        accept_multiple_files=True,
+        key=f"proof_uploads_{upload_gen}"
+    )
+    if proof_uploads:
+        manifest, problems = spool_uploads(proof_uploads, st.session_state.get("proof_manifest", []))
+        st.session_state["proof_manifest"] = manifest
+        st.session_state["proof_upload_problems"] = problems
+        st.session_state["proof_upload_gen"] = upload_gen + 1
+        st.rerun()
+    proof_manifest = st.session_state.get("proof_manifest", [])
+    for problem in st.session_state.get("proof_upload_problems", []):
+        st.warning(problem)
+    for m in proof_manifest:
+        label = KIND_LABELS.get(m["kind"], "unrecognized type")
+        note = "" if m["type_matches_name"] else f" — ⚠ content is {label}, not what the file name says"
+        st.caption(f"📎 {m['name']} · {m['size'] / (1024 * 1024):.1f} MB · {label}{note}")
+    if proof_manifest and st.button("Remove all uploads", key="btn_clear_uploads"):
+        st.session_state["proof_manifest"] = []
+        st.session_state["proof_upload_problems"] = []
+        st.rerun()
+    uploaded_names = [m["name"] for m in proof_manifest]
+    any_pdf_uploaded = manifest_has(proof_manifest, PDF_KINDS)
+    any_av_uploaded = manifest_has(proof_manifest, AV_KINDS)
+    if uploaded_names:
+        script_block("“Thanks for those uploads — I see them here and will attach them to your file.”")
+
+    # SMS flow
+    st.markdown("**SMS for Documentation**")
+    script_block(
+        "“I’m going to send you an SMS containing my email address. "
+        "You can send the necessary documentation later today, or even as we speak — whichever is easier.”"
+    )
+    sms_phone = st.text_input("Phone number where you receive SMS", key="sms_phone")
+    phone_hint(sms_phone)
+    sms_is_new = st.selectbox("Is this a new phone number? or Did you recently change your phone number?",
+                              ["No, same number","Yes, it's new / I recently changed"], key="sms_is_new")
+    if sms_phone and sms_is_new:
+        st.session_state["caller_phone"] = sms_phone
+        script_block("“Thanks — I’ll use this as your best contact number going forward.”")
+    st.button("Mark SMS sent (placeholder)", key="btn_sms_sent")
+
+    # ---- Education #1B (second half of HOW THIS HAPPENED) ----
+    script_block(
+        "[[ Now when you consider that Uber originally only reported about 12,500 incidents during that same period, you can argue the company has been seriously misleading the level of safety it offers passengers. ]]\n\n"
+        "Now, we know many people don’t report these incidents. So, coming forward helps you and others obtain justice and compensation. "
+        "[[ And, it truly does help force Uber & Lyft to pay for their negligence, and provide real safety measures so these incidents stop happening.]]"
+    )
+
+    st.markdown("---")
+
+    publish({
+        "caller_full_name": caller_full_name, "caller_legal_name": caller_legal_name, "consent_recording":
+        consent_recording, "prior_firm_any": prior_firm_any, "prior_firm_note": prior_firm_note,
+        "act_flags": act_flags, "rape": rape, "forced_oral": forced_oral, "touching": touching, "exposure":
+        exposure, "masturb": masturb, "kidnap": kidnap, "imprison": imprison, "verbal_only": verbal_only,
+        "attempt_only": attempt_only, "company": company, "pickup": pickup, "dropoff": dropoff,
+        "receipt_evidence": receipt_evidence, "uploaded_names": uploaded_names, "any_pdf_uploaded":
+        any_pdf_uploaded, "any_av_uploaded": any_av_uploaded, "sms_phone": sms_phone
+    })
+
+
+def apply_receipt_prefill(r: dict):
+    # Button callback: runs before the next rerun, so the widgets pick these values up
+    if r["company"]:
+        st.session_state["q2_company"] = r["company"]
+    if r["pickup"]:
+        st.session_state["pickup"] = r["pickup"]
+    if r["dropoff"]:
+        st.session_state["dropoff"] = r["dropoff"]
+    if r["trip_date"]:
+        st.session_state["q4_hasdate"] = True
+        st.session_state["q4_date"] = r["trip_date"]
+    if r["trip_time"]:
+        st.session_state["time_for_calc"] = r["trip_time"]
+
+@profiled("Receipt prefill")
+def section_receipt_prefill():
+    # Uploaded PDF / email receipts are read on a background pool; results show up here as
+    # prefill offers when ready, without the rerun ever waiting on a parse.
+    manifest = {m["sha256"]: m for m in st.session_state.get("proof_manifest", [])}
+    jobs = st.session_state.get("receipt_jobs", {})
+    if not jobs:
+        return
+
+    pending = 0
+    for sha, job in jobs.items():
+        if not job.done():
+            pending += 1
+            continue
+        r = job.result()
+        name = manifest[sha]["name"]
+        if r["error"] or not found_anything(r):
+            st.caption(f"🧾 {name}: no ride details found{(' (' + r['error'] + ')') if r['error'] else ''}.")
+            continue
+        trip = fmt_date(r["trip_date"]) if r["trip_date"] else "date ?"
+        if r["trip_time"]:
+            trip += " " + r["trip_time"].strftime("%H:%M")
+        st.markdown(
+            f"<div class='note-muted'>🧾 <b>{name}</b> — {r['company'] or 'platform ?'} · {trip}<br>"
+            f"Pickup: {r['pickup'] or '—'}<br>Drop-off: {r['dropoff'] or '—'}</div>",
+            unsafe_allow_html=True
+        )
+        st.button("Use these receipt details in the form", key=f"btn_receipt_apply_{sha[:16]}",
+                  on_click=apply_receipt_prefill, args=(r,))
+    if pending:
+        st.caption(f"🧾 Reading {pending} receipt(s) in the background…")
+    elif not st.session_state.get("_full_run"):
+        st.rerun(scope="app")  # all parsed: one full run drops the polling fragment
+
+
+@st.fragment
+@profiled("Level 2")
+def section_level2():
+    company, = pull("company")
+
+    # =========================
+    # LEVEL 2 — Reporting, Date/Time, Scope (Orange)
+    # =========================
+    st.markdown("<div class='level-pill l-orange'>Level 2 — Reporting, Date/Time, Scope</div>", unsafe_allow_html=True)
+
+    # Q4 — Date/Time
+    st.markdown("**Q4. Do you remember the date this happened?**")
+    has_incident_date = st.toggle("Caller confirms they know the date", value=False, key="q4_hasdate")
+    incident_date = st.date_input("Select Incident Date", value=TODAY.date(), key="q4_date") if has_incident_date else None
+    incident_time = st.time_input("Incident Time (for timing rules)", value=time(21, 0), key="time_for_calc")
+    if has_incident_date and incident_date:
+        script_block("“Thanks — the specific date lets the attorneys verify deadlines and request the correct records.”")
+
+    # Q5 — Reporting
+    st.markdown("**Q5. Did you report the incident to anyone?** (Uber/Lyft, Police, Physician, Therapist, Family/Friend)")
+    st.caption("Choose everything that applies — even telling a trusted person helps build the timeline.")
+    reported_to = st.multiselect(
+        "Select all that apply",
+        ["Rideshare Company","Physician","Friend or Family Member","Therapist","Police Department","NO (DQ, UNLESS TIER 1 OR MINOR)"],
+        key="q5_reported"
+    )
+    if reported_to:
+        script_block(f"“Thank you — noting {', '.join(reported_to)} helps us build a reliable timeline for your case.”")
+
+    # Per-channel details
+    report_dates = {}
+    family_report_dt = None
+
+    # Family/Friend
+    fam_first = fam_last = fam_phone = ""
+    if "Friend or Family Member" in reported_to:
+        st.markdown("**Family/Friend Contact Details**")
+        fam_first = st.text_input("First name (Family/Friend)", key="fam_first")
+        fam_last  = st.text_input("Last name (Family/Friend)", key="fam_last")
+        fam_phone = st.text_input("Phone number (Family/Friend)", key="fam_phone")
+        phone_hint(fam_phone)
+        ff_date = st.date_input("Date informed Family/Friend", value=TODAY.date(), key="q5a_dt_ff")
+        ff_time = st.time_input("Time informed Family/Friend", value=time(21,0), key="q5a_tm_ff")
+        report_dates["Family/Friends"] = ff_date
+        family_report_dt = datetime.combine(ff_date, ff_time)
+
+    # Physician
+    phys_name = phys_fac = phys_addr = ""
+    if "Physician" in reported_to:
+        st.markdown("**Physician Details**")
+        phys_name = st.text_input("Physician Name", key="phys_name")
+        phys_fac  = st.text_input("Clinic/Hospital Name", key="phys_fac")
+        phys_addr = st.text_input("Clinic/Hospital Address", key="phys_addr")
+        report_dates["Physician"] = st.date_input("Date reported to Physician", value=TODAY.date(), key="q5a_dt_phys")
+
+    # Therapist
+    ther_name = ther_fac = ther_addr = ""
+    if "Therapist" in reported_to:
+        st.markdown("**Therapist Details**")
+        ther_name = st.text_input("Therapist Name", key="ther_name")
+        ther_fac  = st.text_input("Clinic/Hospital Name", key="ther_fac")
+        ther_addr = st.text_input("Clinic/Hospital Address", key="ther_addr")
+        report_dates["Therapist"] = st.date_input("Date reported to Therapist", value=TODAY.date(), key="q5a_dt_ther")
+
+    # Police
+    police_station = police_addr = ""
+    if "Police Department" in reported_to:
+        st.markdown("**Police Details**")
+        police_station = st.text_input("Name of Police Station", key="police_station")
+        police_addr    = st.text_input("Police Station Address", key="police_addr")
+        report_dates["Police"] = st.date_input("Date reported to Police", value=TODAY.date(), key="q5a_dt_police")
+
+    # Rideshare company channel
+    rep_rs_company = ""
+    if "Rideshare Company" in reported_to:
+        st.markdown("**Rideshare Company (reported)**")
+        rep_rs_company = st.selectbox("Which company did you report to?", ["Uber", "Lyft"], key="rep_rs_company")
+        report_dates["Rideshare company"] = st.date_input("Date reported to Rideshare company", value=TODAY.date(), key="q5a_dt_rs")
+
+    # If NOT reported to rideshare company: auto suggestion based on Q2
+    if "Rideshare Company" not in reported_to:
+        target = company if company in ("Uber","Lyft") else "the rideshare company"
+        script_block(f"Are you open if the Atty would request for you to report to {target} to strengthen your case?")
+
+    # Q6 — Scope
+    st.markdown("**Q6. Did the incident happen inside the car, just outside, or did it continue after you exited?**")
+    scope_choice = st.selectbox(
+        "Select scope",
+        ["Inside the car", "Just outside the car", "Furtherance from the car", "Unclear"],
+        key="scope_choice"
+    )
+    if scope_choice and scope_choice != "Unclear":
+        script_block(f"“Got it — {scope_choice.lower()}. That helps confirm it occurred within the rideshare’s safety responsibility.”")
+
+    # ---- Education #2 ----
+    script_block(
+        "Education Insert #2 — “Safe Rides Fee”\n"
+        "Jay: “____, what’s especially troubling is that Uber and Lyft have had knowledge of these dangers since at least 2014.\n"
+        "That year, Uber introduced a $1 ‘Safe Rides Fee’ — claiming it funded driver checks and safety upgrades. "
+        "But investigations found that most of the $500 million collected went to profit, not safety.\n"
+        "They later just renamed it a ‘booking fee.’ Survivors were paying for safety that never arrived.”"
+    )
+
+    st.markdown("---")
+
+    publish({
+        "incident_date": incident_date, "incident_time": incident_time, "reported_to": reported_to,
+        "report_dates": report_dates, "family_report_dt": family_report_dt, "fam_first": fam_first,
+        "fam_last": fam_last, "fam_phone": fam_phone, "phys_name": phys_name, "phys_fac": phys_fac,
+        "phys_addr": phys_addr, "ther_name": ther_name, "ther_fac": ther_fac, "ther_addr": ther_addr,
+        "police_station": police_station, "police_addr": police_addr, "rep_rs_company": rep_rs_company,
+        "scope_choice": scope_choice
+    })
+
+
+@st.fragment
+@profiled("Level 3")
+def section_level3():
+    # =========================
+    # LEVEL 3 — Injuries, Treatment, Meds (Light Green)
+    # =========================
+    st.markdown("<div class='level-pill l-lgreen'>Level 3 — Injuries, Treatment, Meds</div>", unsafe_allow_html=True)
+
+    # Q7 — Injuries
+    st.markdown("**Q7. Were you injured physically, or have you experienced emotional effects afterward?**")
+    injury_physical = st.checkbox("Physical injury", key="inj_physical")
+    injury_emotional = st.checkbox("Emotional effects (anxiety, nightmares, etc.)", key="inj_emotional")
+    injuries_summary = st.text_area("If comfortable, briefly describe injuries/effects", key="injuries_summary")
+    if injury_physical or injury_emotional or injuries_summary.strip():
+        script_block("“I’m sorry you’re dealing with these effects. Your health matters, and we’ll reflect this in the case.”")
+
+    # Q8 — Treatment (only if injured)
+    if (injury_physical or injury_emotional or injuries_summary.strip()):
+        st.markdown("**Q8. Have you spoken to a doctor, therapist, or counselor?**")
+        provider_name = st.text_input("Provider name (optional)", key="provider_name")
+        provider_facility = st.text_input("Facility/Clinic (optional)", key="provider_facility")
+        first_visit = st.date_input("Date of the first Visit", value=None, key="first_visit")
+        last_visit = st.date_input("Date of the last Visit", value=None, key="last_visit")
+        if provider_name.strip() or provider_facility.strip() or (first_visit or last_visit):
+            script_block("“Thank you — treatment notes are strong, objective support for your experience.”")
+    else:
+        provider_name = ""
+        provider_facility = ""
+        first_visit = None
+        last_visit = None
+
+    # Q9 — Meds
+    st.markdown("**Q9. Do you take any medications related to this?**")
+    medication_name = st.text_input("Medication (optional)", key="medication_name")
+    pharmacy_name = st.text_input("Pharmacy (optional)", key="pharmacy_name")
+    if medication_name.strip() or pharmacy_name.strip():
+        script_block("“Understood. Pharmacy records help connect treatment to what you went through.”")
+
+    st.markdown("---")
+
+    publish({
+        "injury_physical": injury_physical, "injury_emotional": injury_emotional, "injuries_summary":
+        injuries_summary, "provider_name": provider_name, "provider_facility": provider_facility,
+        "first_visit": first_visit, "last_visit": last_visit, "medication_name": medication_name,
+        "pharmacy_name": pharmacy_name
+    })
+
+
+@st.fragment
+@profiled("Level 4")
+def section_level4():
+    caller_full_name, caller_legal_name, pickup, dropoff = pull("caller_full_name", "caller_legal_name", "pickup", "dropoff")
+
+    # =========================
+    # LEVEL 4 — Contact & Screening (Green)
+    # =========================
+    st.markdown("<div class='level-pill l-green'>Level 4 — Contact & Screening</div>", unsafe_allow_html=True)
+
+    st.markdown("### Contact & Screening")
+    caller_phone = st.text_input("Best phone number", value=st.session_state.get("caller_phone", ""), key="caller_phone")
+    phone_hint(caller_phone)
+    caller_email = st.text_input("Best email", key="caller_email")
+    state = st.selectbox("Incident state", STATES, index=(STATES.index("California") if "California" in STATES else 0), key="q_state")
+    try:
+        place = infer_state(pickup, dropoff)
+    except OSError:
+        place = None  # gazetteer table can't be written here; no hint
+    if place and place["state"] and place["state"] != state:
+        st.warning(f"The pickup / drop-off point to {place['state']}, not {state}.")
+        st.button(f"Use {place['state']}", key="btn_state_from_route", on_click=use_incident_state, args=(place["state"],))
+    elif place and place["conflict"]:
+        st.caption("Pickup and drop-off are in different states — the incident state is where it happened.")
+    elif place and not place["state"] and place["candidates"]:
+        st.caption("The pickup / drop-off city could be in " + " or ".join(place["candidates"]) + ".")
+
+    st.markdown("**Rideshare submission & response (if any)**")
+    rs_submit_how = st.text_input("How did you submit to Uber/Lyft? (email/app/other)", key="q8_submit_how")
+    rs_received_response = st.toggle("Company responded", value=False, key="q9_resp_toggle")
+    rs_response_detail = st.text_input("If yes, what did they say? (optional)", key="q9_resp_detail")
+
+    # If NOT submitted to Rideshare via app/email: show verbatim prompt
+    if not rs_submit_how.strip():
+        script_block(
+            "If not submitted to Rideshare via app or email:\n"
+            "If the law firm feels that it is best that you report the incident to Uber or Lyft via email or the app, would you be willing to do so?\n"
+            "If Yes: Okay, so you'd be willing to report the incident if the law firm recommends it — thank you for being open to that. I'm sure they will provide guidance. "
+            "It shows strength, and it could really help support your case.\n"
+            "If No or Unsure: Okay, so you're not comfortable reporting it through the app or email right now — I completely understand. "
+            "If the law firm thinks it's important later on, they'll walk you through what to do step by step. You're not alone in this."
+        )
+
+    st.markdown("**Standard Screening**")
+    gov_id = st.toggle("Government ID provided", value=False, key="elig_id")
+    female_rider = st.toggle("Female rider", value=False, key="elig_female")
+    rider_not_driver = st.toggle("Caller was the rider (not the driver)", value=True, key="elig_rider_not_driver")
+    has_atty = st.toggle("Already has an attorney", value=False, key="elig_atty")
+
+    # Empathetic felony question (verbatim you provided)
+    script_block("This will not affect your case, So the law firm can be prepared for any character issues, do you have any felonies or criminal history?")
+    felony_answer = st.radio("Please select one", ["No", "Yes"], horizontal=True, key="q10_felony")
+    felony = (felony_answer == "Yes")
+
+    # Weapons / force questions (updated)
+    st.markdown("**Force/Weapon by Driver (applies to both Wagstaff & Triten)**")
+    driver_weapon_used = st.radio(
+        "Did the driver threaten to use or actually use any weapons? Or use means of force during the sexual assault, such as gun, knife, or choking?",
+        ["No","Yes"], horizontal=True, key="driver_weapon_used"
+    )
+    driver_weapon_detail = ""
+    if driver_weapon_used == "Yes":
+        driver_weapon_detail = st.text_input("If yes, please elaborate", key="driver_weapon_detail")
+        script_block("“Okay, {detail}. That’s very serious and the details help paint a full picture of the situation. I’m so sorry that happened.”".replace("{detail}", driver_weapon_detail or "[detail noted]"))
+    else:
+        script_block("“Okay, although there was no weapon, this is still a very serious situation and does not change the magnitude of the incident.”")
+
+    st.markdown("**Victim carrying a weapon? (Wagstaff rule only)**")
+    victim_weapon = st.radio(
+        "Were you carrying a weapon at the time of the assault? (Personal defense tools like pepper spray/mace may not be a weapon.)",
+        ["No","Yes"], horizontal=True, key="victim_weapon"
+    )
+    non_lethal_choice = ""
+    if victim_weapon == "Yes":
+        non_lethal_list = [
+            "Pepper Spray","Personal Alarm","Stun Gun","Taser","Self-Defense Keychain","Tactical Flashlight","Groin Kickers","Personal Safety Apps",
+            "Defense Flares","Baton","Kubotan","Umbrella","Whistle","Combat Pen","Pocket Knife","Personal Baton","Nunchaku","Flashbang","Air Horn",
+            "Bear Spray","Sticky Foam","Tactical Scarf/Shawl","Self-Defense Ring","Hearing Protection","Other/Unlisted"
+        ]
+        non_lethal_choice = st.selectbox("If non-lethal/defensive item, select one", non_lethal_list, key="non_lethal_choice")
+
+    st.markdown("---")
+
+    # =========================
+    # Settlement Process + Education #3
+    # =========================
+    st.markdown("### Settlement Process")
+    script_block(
+        "Here’s what to expect: after discovery, the court schedules four bellwether test trials — real trials that guide settlement ranges for everyone else.\n"
+        "That means you won’t have to retell your story in court. Your records and documents will speak for you, and your settlement will be based on your individual experience."
+    )
+    # Education #3
+    script_block(
+        "Education Insert #3 — Law Firm & Contingency\n"
+        "Jay: “____, based on what you’ve told me, you Might have a valid case. Here’s how pursuing a settlement works:\n"
+        "You hire the law firm on a contingency basis — no upfront costs, no out-of-pocket fees. You only owe if they win you a recovery.\n"
+        "We are the intake center for The Wagstaff Law Firm. Their attorneys are nationally recognized — many named Super Lawyers (top 5% of all attorneys). "
+        "Judges across the country have appointed them to nine national Plaintiff Steering Committees, reserved for the top trial lawyers in corporate negligence cases.\n"
+        "They’re now applying that same leadership to hold Uber and Lyft accountable for failing survivors like you.”"
+    )
+
+    # =========================
+    # Identity for Records (Full SSN + last4 fallback)
+    # =========================
+    st.markdown("### Identity for Records")
+    pc_name_local = caller_full_name or caller_legal_name or "there"
+    st.markdown(f"**{pc_name_local}, I need your Social Security Number.**")
+
+    # Split your SSN education into two separate blocks as requested earlier
+    script_block(
+        "The hospital must ensure they send the correct information. For legal purposes and proper documentation, "
+        "we need your full name, address, date of birth, and Social Security number."
+    )
+    script_block(
+        "I understand your concerns about sharing your Social Security number, but it’s essential for protecting your identity and ensuring that any settlement goes to the right person. "
+        "This helps prevent relatives from falsely claiming the settlement and avoids potential financial issues. Your cooperation is vital for a smooth legal process."
+    )
+
+    full_ssn = st.text_input("Social Security Number (###-##-####)", key="full_ssn")
+    st.caption("If you prefer, you can share just the **last 4 digits**; those are often enough for HIPAA releases.")
+    ssn_last4 = st.text_input("SSN last 4 (optional)", max_chars=4, key="ssn_last4")
+    full_ssn_on_file = bool(full_ssn.strip())
+
+    publish({
+        "caller_phone": caller_phone, "caller_email": caller_email, "state": state, "rs_submit_how":
+        rs_submit_how, "rs_received_response": rs_received_response, "rs_response_detail":
+        rs_response_detail, "gov_id": gov_id, "female_rider": female_rider, "rider_not_driver":
+        rider_not_driver, "has_atty": has_atty, "felony": felony, "driver_weapon_used": driver_weapon_used,
+        "driver_weapon_detail": driver_weapon_detail, "victim_weapon": victim_weapon, "non_lethal_choice":
+        non_lethal_choice, "full_ssn": full_ssn, "ssn_last4": ssn_last4, "full_ssn_on_file":
+        full_ssn_on_file
+    })
+
+
+@profiled("Duplicate check")
+def section_duplicate_check():
+    caller_email, caller_legal_name, caller_phone, sms_phone = pull("caller_email", "caller_legal_name", "caller_phone", "sms_phone")
+
+    # Same claimant often arrives through several marketing sources; warn before the agent goes further
+    if not any([caller_phone, sms_phone, caller_email, caller_legal_name]):
+        return
+    try:
+        index = duplicate_index()
+        index.refresh(intake_store())
+        matches = index.match(
+            phones=[caller_phone, sms_phone], emails=[caller_email], legal_name=caller_legal_name,
+            exclude={st.session_state.get("saved_intake_id")},
+        )
+    except Exception:
+        return
+    if matches:
+        lines = [f"• #{i} — {label} ({', '.join(reasons)})" for i, reasons, label in matches[:5]]
+        st.warning("Possible duplicate lead — this caller matches a saved intake:\n\n" + "\n\n".join(lines))
+
+
+@profiled("Eligibility logic")
+def compute_eligibility():
+    # ========= Calculations & Eligibility Logic (intake_graph -> intake_eligibility) =========
+    # Memoized per session: only the nodes whose published inputs changed are recomputed.
+    graph = st.session_state.setdefault("_derived_graph", GraphState(INTAKE_GRAPH))
+    ev = graph.value("eligibility", {**intake_ctx(), "today": TODAY.date(), "now": TODAY})
+
+    publish({
+        "ev": ev, "tier_label": ev["tier_label"], "base_tier_ok": ev["base_tier_ok"], "category": ev["category"],
+        "sol_state": ev["sol_state"], "sol_years": ev["sol_years"], "sol_rule_text": ev["sol_rule_text"],
+        "sol_end": ev["sol_end"], "file_by_deadline": ev["file_by_deadline"], "sol_time_ok": ev["sol_time_ok"],
+        "earliest_report_date": ev["earliest_report_date"], "delta_days": ev["delta_days"],
+        "earliest_channels": ev["earliest_channels"], "earliest_is_family": ev["earliest_is_family"],
+        "base_disqualifier": ev["base_disqualifier"],
+        # <firm key>_ok / <firm key>_reasons for every configured firm (intake_firms)
+        **{f"{firm.key}_{part}": ev[f"{firm.key}_{part}"] for firm in FIRMS for part in ("ok", "reasons")},
+    })
+
+
+@st.fragment
+@profiled("Calculations")
+def section_eligibility_snapshot():
+    base_disqualifier, base_tier_ok, tier_label, state = pull("base_disqualifier", "base_tier_ok", "tier_label", "state")
+    firm_ok = {firm.key: intake_ctx()[f"{firm.key}_ok"] for firm in FIRMS}
+
+    # =========================
+    # Eligibility Snapshot
+    # =========================
+    st.subheader("Eligibility Snapshot")
+    cols = st.columns(1 + len(FIRMS))
+    with cols[0]:
+        st.markdown("<div class='badge-note'>Tier</div>", unsafe_allow_html=True)
+        badge(base_tier_ok and (not base_disqualifier), tier_label if (tier_label != "Unclear" and not base_disqualifier) else "Tier unclear / DQ")
+    for col, firm in zip(cols[1:], FIRMS):
+        with col:
+            st.markdown(f"<div class='badge-note'>{firm.label}</div>", unsafe_allow_html=True)
+            badge(firm_ok[firm.key], "Eligible" if firm_ok[firm.key] else "Not Eligible")
+
+    # =========================
+    # Assign Law Firm
+    # =========================
+    st.subheader("Assign Law Firm")
+    firm_options = [firm.name for firm in FIRMS] + ["Other (type name)"]
+    # Eligible firm with room this month (on pace first, then preference); a full firm only when
+    # every eligible firm is full; else "Other"
+    ranked = routing_ledger().rank(firm_ok, state, tier_label, NOW)
+    default_firm = ranked[0] if ranked else next((firm for firm in FIRMS if firm_ok[firm.key]), None)
+    default_idx = FIRMS.index(default_firm) if default_firm else len(FIRMS)
+    usage = [(firm, used, cap) for firm, used, cap in routing_ledger().usage(NOW) if cap is not None]
+    if usage:
+        st.caption("This month: " + " · ".join(f"{firm.label} {used}/{cap}" for firm, used, cap in usage))
+    else:
+        st.caption("No monthly firm caps configured (INTAKE_FIRM_CAPS): firms are suggested by preference only.")
+    full = [firm.label for firm, used, cap in usage if firm_ok[firm.key] and used >= cap]
+    if full:
+        st.warning(f"At monthly capacity: {', '.join(full)}.")
+    assigned_firm_choice = st.selectbox("Choose firm for this PC", firm_options, index=default_idx, key="assigned_firm_choice")
+    custom_firm_name = ""
+    if assigned_firm_choice == "Other (type name)":
+        custom_firm_name = st.text_input("Enter firm name", key="custom_firm_name").strip()
+
+    note_header, firm_short, assigned_firm_name = firm_header_and_short(assigned_firm_choice, custom_firm_name)
+
+    publish({
+        "assigned_firm_name": assigned_firm_name, "note_header": note_header, "firm_short": firm_short
+    })
+
+
+@profiled("Diagnostics")
+def section_diagnostics():
+    ev, = pull("ev")
+
+    # =========================
+    # Diagnostics
+    # =========================
+    # One block per firm, straight from its compiled rules (intake_firms): every rule with its
+    # outcome and the values it looked at, then the reasons the firm would decline.
+    st.subheader("Eligibility Diagnostics")
+    results = {}
+    for firm in FIRMS:
+        st.markdown(f"#### {firm.label}")
+        st.markdown("<div class='kv'>" + "\n".join(firm.diagnostics(ev, results)) + "</div>", unsafe_allow_html=True)
+        reasons = ev[f"{firm.key}_reasons"]
+        st.markdown(f"**{firm.label} — Reasons Not Eligible (if any):**")
+        st.markdown("<div class='kv'>" + ("\n".join([f"• {r}" for r in reasons]) if reasons else "• —") + "</div>", unsafe_allow_html=True)
+
+    # What changes from here with the answers as they are: SOL end / file-by for eligible firms,
+    # closing report windows for an intake that only lacks a report
+    incident_date, = pull("incident_date")
+    events = timeline(ev, TODAY, incident_known=incident_date is not None)
+    with st.expander(f"Upcoming eligibility changes ({len(events)})"):
+        lines = [f"• {fmt_dt(e['at'])} — {e['firm']}: {e['detail']}" for e in events]
+        st.markdown("<div class='kv'>" + ("\n".join(lines) if lines else "• none — nothing changes with time for this intake") + "</div>", unsafe_allow_html=True)
+
+    # Derived-value graph: which calculations reran this time and which answers triggered them
+    graph = st.session_state.get("_derived_graph")
+    if graph is not None:
+        with st.expander("Why did this change? (derived values recomputed this run)"):
+            st.markdown("<div class='kv'>" + "\n".join(f"• {line}" for line in graph.explain("eligibility")) + "</div>", unsafe_allow_html=True)
+
+
+@st.fragment
+@profiled("Detailed report")
+def section_report():
+    act_flags, assigned_firm_name, caller_email, caller_full_name, caller_legal_name, caller_phone = pull("act_flags", "assigned_firm_name", "caller_email", "caller_full_name", "caller_legal_name", "caller_phone")
+    category, company, consent_recording, family_report_dt, file_by_deadline, report_dates = pull("category", "company", "consent_recording", "family_report_dt", "file_by_deadline", "report_dates")
+    sol_end, sol_rule_text, sol_state, sol_years, state, tier_label = pull("sol_end", "sol_rule_text", "sol_state", "sol_years", "state", "tier_label")
+
+    # =========================
+    # Summary
+    # =========================
+    st.subheader("Summary")
+    sol_end_str = ("No SOL" if sol_years is None else (fmt_dt(sol_end) if sol_end else "—"))
+    file_by_str = ("N/A (No SOL)" if sol_years is None else (fmt_dt(file_by_deadline) if file_by_deadline else "—"))
+    report_dates_str = "; ".join([f"{k}: {fmt_date(v)}" for k, v in report_dates.items()]) if report_dates else "—"
+    family_dt_str = fmt_dt(family_report_dt) if family_report_dt else "—"
+
+    decision = {
+        "Assigned Firm": assigned_firm_name,
+        "Full Name": caller_full_name,
+        "Legal Name": caller_legal_name,
+        "Consent Recording": consent_recording,
+        "Phone": caller_phone,
+        "Email": caller_email,
+        "Company": company,
+        "State": state,
+        "Tier": tier_label,
+        "SA category for SOL": category or "—",
+        "Using SA extension?": "Yes" if (category and sol_state in SA_EXT) else "No (general tort)",
+        "SOL rule applied": sol_rule_text,
+        "SOL End (est.)": sol_end_str,
+        "File-by (SOL-45d)": file_by_str,
+        "Reported Dates": report_dates_str,
+        "Family/Friends Report (DateTime)": family_dt_str,
+        **{f"{firm.label} Eligible?": "Eligible" if intake_ctx()[f"{firm.key}_ok"] else "Not Eligible" for firm in FIRMS},
+    }
+    import pandas as pd
+    st.dataframe(pd.DataFrame([decision]), use_container_width=True, height=360)
+
+    # =========================
+    # Detailed Report — Statement of the Case
+    # =========================
+    st.subheader("Detailed Report — Elements of Statement of the Case for RIDESHARE")
+
+    acts_selected, aggr_selected = selected_acts(act_flags)
+    elements = statement_of_case(intake_ctx())
+    st.markdown(f"<div class='copy'>{elements}</div>", unsafe_allow_html=True)
+
+    # =========================
+    # Law Firm Note (Copy & Send)
+    # =========================
+    st.subheader("Law Firm Note (Copy & Send)")
+
+    # Marketing source dropdown (reflect into note)
+    marketing_source_choice = st.selectbox("Marketing Source", MARKETING_SOURCES, index=0, key="marketing_source_choice")
+
+    # GDrive + PLAID + ID
+    note_gdrive = st.text_input("GDrive URL (if any)", value="", key="note_gdrive")
+    note_plaid_passed = st.checkbox("PLAID Passed", value=False, key="note_plaid_passed")
+    id_types = ["Driver's License","State ID","Passport","Military ID","Permanent Resident Card","Other Government ID"]
+    id_type_used = st.selectbox("ID Provided (PLAID) — type", id_types, index=0, key="id_type_used")
+    note_receipt_pdf = st.checkbox("Uber/Lyft PDF Receipt and screenshot (reflects firm-specific platform only)", value=False, key="note_receipt_pdf")
+
+    # Build law firm note in the exact order you requested
+    lawfirm_note = compose_lawfirm_note({
+        **intake_ctx(), "marketing_source_choice": marketing_source_choice, "note_gdrive": note_gdrive,
+        "note_plaid_passed": note_plaid_passed, "id_type_used": id_type_used, "note_receipt_pdf": note_receipt_pdf,
+    }, TODAY)
+    st.markdown(f"<div class='copy'>{lawfirm_note}</div>", unsafe_allow_html=True)
+
+    st.download_button(
+        "Download Law Firm Note (.txt)",
+        data=lawfirm_note.encode("utf-8"),
+        file_name="lawfirm_note.txt",
+        mime="text/plain"
+    )
+
+    # Notepad-friendly Detailed Report
+    detailed_report_txt = "Detailed Report — Elements of Statement of the Case for RIDESHARE\n\n" + elements
+    st.download_button(
+        "Download Detailed Report (.txt)",
+        data=detailed_report_txt.encode("utf-8"),
+        file_name="statement_of_case.txt",
+        mime="text/plain"
+    )
+
+    publish({
+        "acts_selected": acts_selected, "aggr_selected": aggr_selected, "elements": elements,
+        "lawfirm_note": lawfirm_note, "marketing_source_choice": marketing_source_choice
+    }, export_only=True)
+
+
+@st.fragment
+@profiled("Objection scripts")
+def section_objections():
+    # =========================
+    # Objection Scripts / Legend / References
+    # =========================
+    st.markdown("---")
+    st.header("Objection Script / Legend / References")
+    index = script_index()
+    query = st.text_input("Search scripts (e.g. scam, fees, plaid)", key="obj_script_query")
+    if query.strip():
+        # Best matches first; the last word also matches as a prefix while it's being typed
+        topics = [title for title, _ in index.search(query, limit=15)]
+        completions = index.complete(query.split()[-1]) if not query[-1:].isspace() else []
+        if completions:
+            st.caption("Matching words: " + " · ".join(completions))
+        if not topics:
+            st.caption("No script matches — clear the search to browse every script.")
+            return
+    else:
+        topics = sorted(index.titles)
+    obj_key = st.selectbox(
+        "Select a script or reference",
+        topics,
+        index=0,
+        key="obj_script_select"
+    )
+    obj_text = index.text(obj_key)
+    if obj_text.startswith("https://") or obj_text.startswith("http://"):
+        st.markdown(f"[Open reference link]({obj_text})")
+    else:
+        script_block(obj_text)
+
+
+@st.fragment
+@profiled("Firm contact")
+def section_firm_contact():
+    assigned_firm_name, caller_email, caller_legal_name, female_rider, full_ssn, prior_firm_any = pull("assigned_firm_name", "caller_email", "caller_legal_name", "female_rider", "full_ssn", "prior_firm_any")
+    prior_firm_note, state = pull("prior_firm_note", "state")
+
+    # =========================
+    # Firm-Specific Client Contact Details (Bottom)
+    # =========================
+    st.markdown("---")
+    st.header("Firm-Specific Client Contact Details")
+
+    pre_first, pre_mid, pre_last = split_legal_name(caller_legal_name)
+    pre_email = caller_email or ""
+    pre_home = ""
+    pre_cell = st.session_state.get("caller_phone", "") or ""
+    pre_city = ""
+    pre_state_idx = STATE_LIST_FORM.index(state) if state in STATE_LIST_FORM else 0
+    pre_zip = ""
+
+    client_contact_txt_lines = []
+
+    if assigned_firm_name == "Triten Law Group":
+        st.subheader("TriTen – Intake CLIENT CONTACT DETAILS")
+
+        tri_first = st.text_input("First Name", value=pre_first, key="tri_first")
+        tri_middle = st.text_input("Middle Name", value=pre_mid, key="tri_middle")
+        tri_last = st.text_input("Last Name", value=pre_last, key="tri_last")
+
+        tri_maiden = st.text_input("Maiden Name (if applicable)", key="tri_maiden")
+        tri_pref_name = st.text_input("Preferred Name", key="tri_pref_name")
+        tri_email = st.text_input("Primary Email", value=pre_email, key="tri_email")
+
+        tri_addr = st.text_input("Mailing Address", key="tri_addr")
+        tri_city = st.text_input("City", value=pre_city, key="tri_city")
+        tri_state = st.selectbox("State", STATE_LIST_FORM, index=pre_state_idx, key="tri_state")
+        tri_zip = st.text_input("Zip", value=pre_zip, key="tri_zip")
+
+        tri_home_phone = st.text_input("Home Phone No.", value=pre_home, key="tri_home_phone")
+        phone_hint(tri_home_phone)
+        tri_cell_phone = st.text_input("Cell Phone No.", value=pre_cell, key="tri_cell_phone")
+        phone_hint(tri_cell_phone)
+        tri_best_time = st.text_input("Best Time to Contact", key="tri_best_time")
+        tri_pref_method = st.selectbox("Preferred Method of Contact", ["Phone", "Email", "Phone & Email"], index=2, key="tri_pref_method")
+
+        tri_dob = st.date_input("Date of Birth (mm-dd-yyyy)", value=None,
+                                min_value=date(1969,1,1), max_value=TODAY.date(), key="tri_dob")
+        tri_age = calc_age(tri_dob) if tri_dob else ""
+        st.caption(f"Age: {tri_age if tri_age!='' else '—'}")
+
+        # Reflect full SSN captured above into TriTen field
+        tri_ssn = st.text_input("Social Security No.", value=(full_ssn if full_ssn else ""), key="tri_ssn")
+
+        tri_claim_for = st.radio("Does the claim pertain to you or another person?", ["Myself","Someone else"], horizontal=True, key="tri_claim_for")
+        tri_marital = st.selectbox("Current marital status", ["Single","Married","Divorced","Widowed"], key="tri_marital")
+
+        # Affirmation at the end of TriTen section
+        st.markdown("---")
+        st.markdown("**Affirmation**")
+        tri_affirmation = st.radio(
+            "[Having just confirmed all the answers you have provided in response to all the questions] "
+            "Do you hereby affirm that the information submitted by you is true and correct in all respects, "
+            "including whether you've ever signed up with another law firm?",
+            ["Yes", "No"], horizontal=True, key="tri_affirmation"
+        )
+        st.markdown("**INTAKE ENDS HERE**")
+
+        # Build client contact TXT (TriTen)
+        client_contact_txt_lines = [
+            "TriTen – Intake CLIENT CONTACT DETAILS",
+            f"Client Name: {tri_first} {tri_middle} {tri_last}".strip(),
+            f"Maiden Name: {tri_maiden}",
+            f"Preferred Name: {tri_pref_name}",
+            f"Primary Email: {tri_email}",
+            f"Mailing Address: {tri_addr}",
+            f"City: {tri_city}",
+            f"State: {tri_state}",
+            f"Zip: {tri_zip}",
+            f"Home Phone No.: {tri_home_phone}",
+            f"Cell Phone No.: {tri_cell_phone}",
+            f"Best Time to Contact: {tri_best_time}",
+            f"Preferred Method of Contact: {tri_pref_method}",
+            f"DOB: {fmt_date(tri_dob) if tri_dob else ''}",
+            f"Age: {tri_age}",
+            f"Social Security No.: {tri_ssn}",
+            f"Claim pertains to: {tri_claim_for}",
+            f"Marital status: {tri_marital}",
+            f"Affirmation: {tri_affirmation}",
+        ]
+
+    elif assigned_firm_name == "Wagstaff Law Firm":
+        st.subheader("Wagstaff – CLIENT CONTACT DETAILS")
+
+        wag_first = st.text_input("First Name", value=pre_first, key="wag_first")
+        wag_middle = st.text_input("Middle Name", value=pre_mid, key="wag_middle")
+        wag_last = st.text_input("Last Name", value=pre_last, key="wag_last")
+
+        wag_email = st.text_input("Primary Email", value=pre_email, key="wag_email")
+        wag_addr = st.text_input("Mailing Address", key="wag_addr")
+        wag_city = st.text_input("City", value=pre_city, key="wag_city")
+        wag_state = st.selectbox("State", STATE_LIST_FORM, index=pre_state_idx, key="wag_state")
+        wag_zip = st.text_input("Zip", value=pre_zip, key="wag_zip")
+        wag_home_phone = st.text_input("Home Phone No.", value=pre_home, key="wag_home_phone")
+        phone_hint(wag_home_phone)
+        wag_cell_phone = st.text_input("Cell Phone No.", value=pre_cell, key="wag_cell_phone")
+        phone_hint(wag_cell_phone)
+        wag_best_time = st.text_input("Best Time to Contact", value="", key="wag_best_time")
+        wag_pref_method = st.selectbox("Preferred Method of Contact", ["Phone", "Email", "Phone & Email"], index=2, key="wag_pref_method")
+
+        wag_dob = st.date_input("Date of Birth (mm-dd-yyyy)", value=None,
+                                min_value=date(1969,1,1), max_value=TODAY.date(), key="wag_dob")
+        wag_age = calc_age(wag_dob) if wag_dob else ""
+        st.caption(f"Age: {wag_age if wag_age!='' else '—'}")
+
+        # Reflect full SSN captured above into Wagstaff field
+        wag_ssn = st.text_input("Social Security No.", value=(full_ssn if full_ssn else ""), key="wag_ssn")
+
+        wag_claim_for = st.radio("Does the claim pertain to you or another person?", ["Myself","Someone Else"], horizontal=True, key="wag_claim_for")
+
+        st.caption(f"Prior firm signed/disqualified earlier: {'Yes' if prior_firm_any else 'No'}"
+                   f"{(' — ' + prior_firm_note) if (prior_firm_any and prior_firm_note) else ''}")
+
+        st.subheader("INJURED PARTY DETAILS")
+        inj_full = st.text_input("Injured/Deceased Party's Full Name (First, Middle, & Last Name)", value=f"{pre_first} {pre_mid} {pre_last}".strip(), key="wag_inj_full")
+        inj_gender_default = "Female" if female_rider else "—"
+        inj_gender = st.text_input("Injured Party Gender", value=inj_gender_default, key="wag_inj_gender")
+        inj_dob = st.date_input("Injured/Deceased Party's DOB (mm-dd-yyyy)", value=None,
+                                min_value=date(1969,1,1), max_value=TODAY.date(), key="wag_inj_dob")
+
+        # Build client contact TXT (Wagstaff)
+        client_contact_txt_lines = [
+            "Wagstaff – CLIENT CONTACT DETAILS",
+            f"Client Name: {wag_first} {wag_middle} {wag_last}".strip(),
+            f"Primary Email: {wag_email}",
+            f"Mailing Address: {wag_addr}",
+            f"City: {wag_city}",
+            f"State: {wag_state}",
+            f"Zip: {wag_zip}",
+            f"Home Phone No.: {wag_home_phone}",
+            f"Cell Phone No.: {wag_cell_phone}",
+            f"Best Time to Contact: {wag_best_time}",
+            f"Preferred Method of Contact: {wag_pref_method}",
+            f"DOB: {fmt_date(wag_dob) if wag_dob else ''}",
+            f"Age: {wag_age}",
+            f"Social Security No.: {wag_ssn}",
+            f"Claim pertains to: {wag_claim_for}",
+            f"Injured Party: {inj_full}",
+            f"Injured Gender: {inj_gender}",
+            f"Injured DOB: {fmt_date(inj_dob) if inj_dob else ''}",
+        ]
+
+    else:
+        st.info("Select a firm above to reveal the tailored contact section.")
+
+    # Download client contact TXT
+    if client_contact_txt_lines:
+        client_contact_txt = "\n".join(client_contact_txt_lines)
+        st.download_button(
+            "Download Client Contact Details (.txt)",
+            data=client_contact_txt.encode("utf-8"),
+            file_name="client_contact_details.txt",
+            mime="text/plain"
+        )
+
+    publish({
+        "client_contact_txt_lines": client_contact_txt_lines
+    }, export_only=True)
+
+
+@st.fragment
+@profiled("Export")
+def section_export():
+    assigned_firm_name, full_ssn, prior_firm_any, prior_firm_note = pull("assigned_firm_name", "full_ssn", "prior_firm_any", "prior_firm_note")
+
+    # =========================
+    # EXPORTS (TXT/CSV/XLSX)
+    # =========================
+    st.subheader("Export")
+
+    export_payload = compose_export_payload(intake_ctx())
+
+    # Add firm-specific sections into export
+    if assigned_firm_name == "Triten Law Group":
+        export_payload.update({
+            "TriTen_FirstName": st.session_state.get("tri_first",""),
+            "TriTen_MiddleName": st.session_state.get("tri_middle",""),
+            "TriTen_LastName": st.session_state.get("tri_last",""),
+            "TriTen_MaidenName": st.session_state.get("tri_maiden",""),
+            "TriTen_PreferredName": st.session_state.get("tri_pref_name",""),
+            "TriTen_Email": st.session_state.get("tri_email",""),
+            "TriTen_Address": st.session_state.get("tri_addr",""),
+            "TriTen_City": st.session_state.get("tri_city",""),
+            "TriTen_State": st.session_state.get("tri_state",""),
+            "TriTen_Zip": st.session_state.get("tri_zip",""),
+            "TriTen_HomePhone": st.session_state.get("tri_home_phone",""),
+            "TriTen_CellPhone": st.session_state.get("tri_cell_phone",""),
+            "TriTen_BestTime": st.session_state.get("tri_best_time",""),
+            "TriTen_PrefMethod": st.session_state.get("tri_pref_method",""),
+            "TriTen_DOB": fmt_date(st.session_state.get("tri_dob")) if st.session_state.get("tri_dob") else "",
+            "TriTen_Age": calc_age(st.session_state.get("tri_dob")) if st.session_state.get("tri_dob") else "",
+            "TriTen_SSN": st.session_state.get("tri_ssn", full_ssn),
+            "TriTen_ClaimFor": st.session_state.get("tri_claim_for",""),
+            "TriTen_Marital": st.session_state.get("tri_marital",""),
+            "TriTen_Affirmed": st.session_state.get("tri_affirmation",""),
+        })
+    elif assigned_firm_name == "Wagstaff Law Firm":
+        export_payload.update({
+            "Wag_FirstName": st.session_state.get("wag_first",""),
+            "Wag_MiddleName": st.session_state.get("wag_middle",""),
+            "Wag_LastName": st.session_state.get("wag_last",""),
+            "Wag_Email": st.session_state.get("wag_email",""),
+            "Wag_Address": st.session_state.get("wag_addr",""),
+            "Wag_City": st.session_state.get("wag_city",""),
+            "Wag_State": st.session_state.get("wag_state",""),
+            "Wag_Zip": st.session_state.get("wag_zip",""),
+            "Wag_HomePhone": st.session_state.get("wag_home_phone",""),
+            "Wag_CellPhone": st.session_state.get("wag_cell_phone",""),
+            "Wag_BestTime": st.session_state.get("wag_best_time",""),
+            "Wag_PrefMethod": st.session_state.get("wag_pref_method",""),
+            "Wag_DOB": fmt_date(st.session_state.get("wag_dob")) if st.session_state.get("wag_dob") else "",
+            "Wag_Age": calc_age(st.session_state.get("wag_dob")) if st.session_state.get("wag_dob") else "",
+            "Wag_SSN": st.session_state.get("wag_ssn", full_ssn),
+            "Wag_ClaimFor": st.session_state.get("wag_claim_for",""),
+            "Wag_PriorFirmSigned": prior_firm_any,
+            "Wag_PriorFirmNote": prior_firm_note,
+            "Wag_InjuredFullName": st.session_state.get("wag_inj_full",""),
+            "Wag_InjuredGender": st.session_state.get("wag_inj_gender",""),
+            "Wag_InjuredDOB": fmt_date(st.session_state.get("wag_inj_dob")) if st.session_state.get("wag_inj_dob") else "",
+        })
+
+    # Exports are built only once the agent asks for them, and memoized by payload hash so
+    # repeat clicks (and other agents exporting the same intake) reuse the bytes.
+    if AS_OF:
+        # A backdated decision must never be archived, routed or sent to a firm
+        st.warning("As-of view: saving to the archive and firm exports are disabled.")
+        return
+    export_hash = payload_hash(export_payload)
+    if st.button("Save intake to archive", key="btn_save_intake"):
+        if st.session_state.get("saved_intake_hash") == export_hash:
+            st.info(f"Already saved (archive #{st.session_state.get('saved_intake_id')}).")
+        else:
+            try:
+                # The archive copy also keeps the caller's narrative (ARCHIVE_ONLY_KEYS: left out of
+                # every firm export, the daily workbook included)
+                archived = {**export_payload, "Narrative": st.session_state.get("q1_narr", "")}
+                saved_id = st.session_state.get("saved_intake_id")
+                # Saved, edited, saved again: rewrite the same archive row rather than adding one
+                resaved = bool(saved_id) and intake_store().update(saved_id, archived)
+                if resaved:
+                    st.session_state.setdefault("saved_intake_at", datetime.now())
+                else:
+                    saved_id = intake_store().save(archived)
+                    st.session_state["saved_intake_at"] = datetime.now()
+                routing_ledger().saved()
+                st.session_state["saved_intake_id"] = saved_id
+                duplicate_index().add_payload(saved_id, export_payload)
+                st.session_state["saved_intake_hash"] = export_hash
+                draft_store().finish(current_draft_id())
+                st.success(f"{'Updated' if resaved else 'Saved to'} archive #{saved_id}.")
+            except Exception as e:
+                st.error(f"Archive save failed ({type(e).__name__}). Download the exports below instead.")
+            else:
+                try:
+                    lead = archive_lead(saved_id, st.session_state["saved_intake_at"].isoformat(timespec="seconds"),
+                                        export_payload, NOW)
+                    if lead:
+                        callback_queue().push(lead, NOW)  # replaces the lead of an earlier save
+                    else:
+                        callback_queue().remove(saved_id)
+                except ValueError:
+                    callback_queue().remove(saved_id)  # typed-in state etc.: saved, just not scheduled
+    if st.button("Prepare Excel / CSV downloads", key="btn_prepare_exports"):
+        st.session_state["export_ready_hash"] = export_hash
+    ready_hash = st.session_state.get("export_ready_hash")
+    if ready_hash != export_hash:
+        if ready_hash:
+            st.caption("Intake changed since the last export was prepared — prepare it again to include the latest answers.")
+        return
+
+    t0 = perf_counter()
+    xlsx_data, xlsx_msg = cached_xlsx(export_hash, export_payload)
+    xlsx_seconds = perf_counter() - t0
+    t0 = perf_counter()
+    csv_data = cached_csv(export_hash, export_payload)
+    csv_seconds = perf_counter() - t0
+    if st.session_state.get("_export_timed_hash") != export_hash:
+        st.session_state["_export_timed_hash"] = export_hash
+        payload_bytes = len(json.dumps(export_payload, default=str).encode("utf-8"))
+        render_profile().record_export("xlsx", xlsx_seconds, len(xlsx_data or b""), payload_bytes)
+        render_profile().record_export("csv", csv_seconds, len(csv_data), payload_bytes)
+    if xlsx_data:
+        st.download_button(
+            "Download Excel (formatted .xlsx)",
+            data=xlsx_data,
+            file_name="intake_decision.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+    else:
+        st.info(xlsx_msg)
+
+    st.download_button(
+        "Download CSV (legacy)",
+        data=csv_data,
+        file_name="intake_decision.csv",
+        mime="text/csv"
+    )
+
+
+@st.fragment
+@profiled("Resume intake")
+def section_resume():
+    # =========================
+    # Resume an unfinished intake (autosaved drafts)
+    # =========================
+    st.header("Resume Intake")
+    if not signed_in_agent():
+        st.text_input("Your agent name", value=st.query_params.get("agent", ""), key="resume_agent",
+                      on_change=set_agent_name)
+    agent = current_agent()
+    if agent is None:
+        st.caption("Enter your agent name to see your unfinished intakes.")
+        return
+    current = st.session_state.get("_draft_id")
+    drafts = [d for d in draft_store().recent(agent) if d["draft_id"] != current]
+    if not drafts:
+        st.caption("No other unfinished intakes of yours.")
+        return
+    labels = {d["draft_id"]: f"{d['label'] or '(no name yet)'} — {d['updated_at'].replace('T', ' ')}" for d in drafts}
+    pick = st.selectbox("Unfinished intakes", list(labels), format_func=labels.get, key="resume_pick")
+    if st.button("Resume this intake", key="btn_resume_intake", on_click=restore_draft, args=(pick,)):
+        st.rerun(scope="app")
+
+
+def finish_callbacks(batch, labels):
+    # Reached leads leave the queue; the rest come back in their next window after the retry delay
+    reached = st.session_state.get("callback_reached") or []
+    for lead, label in zip(batch, labels):
+        if label in reached:
+            callback_queue().done(lead["id"])
+        else:
+            callback_queue().retry(lead["id"], intake_clock.now())
+    st.session_state.pop("callback_batch", None)
+    st.session_state.pop("callback_reached", None)
+
+
+@st.fragment
+@profiled("Callbacks")
+def section_callbacks():
+    # =========================
+    # Callback queue (archived leads due for a call now, nearest file-by first)
+    # =========================
+    # A fragment rerun doesn't refresh the module-level NOW, so everything here reads the clock
+    st.header("Callbacks")
+    batch = st.session_state.get("callback_batch")
+    if not batch:
+        n = st.number_input("How many", min_value=1, max_value=25, value=5, key="callback_n")
+        if not st.button("Get next callbacks", key="btn_callbacks_next"):
+            return
+        batch = st.session_state["callback_batch"] = callback_queue().pop_due(int(n))
+        if not batch:
+            st.caption("No callbacks due right now (outside every pending lead's contact window).")
+            return
+    import pandas as pd
+    st.dataframe(pd.DataFrame([callback_row(lead) for lead in batch]), hide_index=True, use_container_width=True)
+    labels = [f"#{lead['id']} {lead['name'] or lead['phone']}" for lead in batch]
+    st.multiselect("Reached", labels, key="callback_reached")
+    st.button("Finish callbacks", key="btn_callbacks_finish", on_click=finish_callbacks, args=(batch, labels))
+
+
+@st.fragment
+@profiled("Archive lookup")
+def section_archive_lookup():
+    # =========================
+    # Supervisor lookup (archived intakes)
+    # =========================
+    st.header("Intake Archive")
+    q_phone = st.text_input("Phone", key="arch_phone")
+    q_email = st.text_input("Email", key="arch_email")
+    q_name = st.text_input("Legal name (starts with)", key="arch_name")
+    q_state = st.selectbox("State", ["Any"] + STATES, key="arch_state")
+    q_firm = st.selectbox("Assigned firm", ["Any"] + [firm.name for firm in FIRMS], key="arch_firm")
+    if not any([q_phone.strip(), q_email.strip(), q_name.strip(), q_state != "Any", q_firm != "Any"]):
+        st.caption("Enter at least one filter to search saved intakes.")
+        return
+    try:
+        rows = intake_store().find(
+            phone=q_phone.strip() or None, email=q_email.strip() or None, legal_name=q_name.strip() or None,
+            state=None if q_state == "Any" else q_state, assigned_firm=None if q_firm == "Any" else q_firm,
+        )
+    except Exception as e:
+        st.error(f"Archive unavailable ({type(e).__name__}).")
+        return
+    if not rows:
+        st.caption("No saved intakes match.")
+        return
+    import pandas as pd
+    st.dataframe(pd.DataFrame([{
+        "ID": r["id"], "Saved": r["created_at"],
+        "Name": r["payload"].get("LegalName", ""), "Phone": r["payload"].get("Phone", ""),
+        "State": r["payload"].get("State", ""), "Incident": r["payload"].get("IncidentDate", ""),
+        "Firm": r["payload"].get("AssignedFirm", ""),
+    } for r in rows]), hide_index=True, use_container_width=True)
+
+
+@st.fragment
+@profiled("Daily workbook")
+def section_daily_workbook():
+    # =========================
+    # Daily workbook (every intake archived that day, one sheet per firm)
+    # =========================
+    st.header("Daily Workbook")
+    day = st.date_input("Intakes archived on", value=TODAY.date(), key="daily_wb_day")
+    if st.button("Build daily workbook", key="btn_daily_workbook"):
+        st.session_state.pop("daily_workbook", None)
+        with st.spinner("Building workbook…"):
+            data, rows, msg = daily_workbook_bytes(intake_store(), day)
+        if data is None:
+            st.info(msg)
+            return
+        st.session_state["daily_workbook"] = (day, rows, data)
+    built = st.session_state.get("daily_workbook")
+    if not built or built[0] != day:
+        return
+    st.download_button(
+        f"Download {built[0].isoformat()} workbook ({built[1]:,} intakes)",
+        data=built[2],
+        file_name=f"intakes_{built[0].isoformat()}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key="dl_daily_workbook",
+    )
+
+
+@st.fragment
+@profiled("Bulk import")
+def section_bulk_import():
+    # =========================
+    # Bulk lead import (vendor CSV / JSONL -> prioritized call list)
+    # =========================
+    st.header("Bulk Lead Import")
+    lead_file = st.file_uploader("Lead file (CSV or JSONL)", type=["csv", "jsonl", "ndjson"], key="bulk_lead_file")
+    if lead_file is None:
+        return
+    if st.button("Pre-qualify leads", key="btn_bulk_prequalify"):
+        from intake_import import prequalify_leads
+        from intake_routing import route_frame
+        bar = st.progress(0.0, text="Reading leads…")
+        total = max(lead_file.size, 1)
+        try:
+            call_list = prequalify_leads(
+                lead_file, now=TODAY,
+                progress=lambda n: bar.progress(min(lead_file.tell() / total, 1.0), text=f"{n:,} leads screened"),
+            )
+        except Exception as e:
+            bar.empty()
+            st.error(f"Could not read the lead file ({type(e).__name__}: {e}).")
+            return
+        bar.empty()
+        if not call_list.empty:
+            # Qualified leads matched to firms against what is left of this month's capacity
+            call_list["routed_firm"] = route_frame(call_list, routing_ledger().remaining(NOW))
+        st.session_state["bulk_call_list"] = (lead_file.file_id, call_list)
+    cached = st.session_state.get("bulk_call_list")
+    if not cached or cached[0] != lead_file.file_id:
+        return
+    call_list = cached[1]
+    if call_list.empty:
+        st.caption("No leads found in the file.")
+        return
+    counts = call_list["priority"].value_counts()
+    st.markdown(
+        f"**{len(call_list):,} leads** · 2+ firms: {counts.get(0, 0):,} · one firm: {counts.get(1, 0):,} · "
+        f"missing docs/details: {counts.get(2, 0):,} · disqualified: {counts.get(3, 0):,}"
+    )
+    routed = call_list["routed_firm"].value_counts()
+    st.caption("Routed within this month's capacity: " + " · ".join(
+        f"{firm.label} {routed.get(firm.name, 0):,}" for firm in FIRMS
+    ) + f" · no firm: {routed.get('', 0):,}")
+    st.download_button(
+        "Download call list (CSV)",
+        data=call_list.to_csv(index=False).encode("utf-8"),
+        file_name="prequalified_call_list.csv",
+        mime="text/csv",
+        key="dl_bulk_call_list",
+    )
+
+
+@st.fragment
+def section_timing_panel():
+    # =========================
+    # Admin: render timings (INTAKE_ADMIN=1)
+    # =========================
+    import pandas as pd
+    profile = render_profile()
+    with st.expander("⏱ Render timings (admin)"):
+        st.markdown(
+            f"Full runs: **{profile.full_runs}** · fragment reruns: **{profile.fragment_runs}** · "
+            f"last full run: **{profile.last_full_ms:.0f} ms**"
+        )
+        if profile.cold:
+            cold = profile.cold
+            st.markdown(
+                f"Cold start (first run in this server process): **{cold['total_ms']:.0f} ms** "
+                f"(budget {COLD_RENDER_BUDGET_MS:.0f}) · first paint **{cold['first_paint_ms']:.0f} ms** "
+                f"(budget {FIRST_PAINT_BUDGET_MS:.0f})" + (" · ⚠️ over budget" if cold["over_budget"] else "")
+            )
+        rows = sorted(profile.section_rows(), key=lambda r: -r["Last full run (ms)"])
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        if profile.exports:
+            st.markdown("**Export builds** (latest first)")
+            st.dataframe(pd.DataFrame(list(profile.exports)[::-1]), hide_index=True, use_container_width=True)
+        st.button("Refresh timings", key="btn_refresh_timings")
+
+
+def render():
+    # Full run: every section executes top to bottom. Between full runs each fragment reruns
+    # alone and only escalates to a full run when a value it publishes actually changes.
+    st.session_state["_full_run"] = True
+    render_profile().start_full(SCRIPT_T0)
+    try:
+        resume_from_url()
+        section_level1()
+        # Polls every 2s only while receipts are still being read
+        receipts_pending = submit_receipt_jobs()
+        st.fragment(section_receipt_prefill, run_every=("2s" if receipts_pending else None))()
+        section_level2()
+        section_level3()
+        section_level4()
+        section_duplicate_check()
+        compute_eligibility()
+        section_eligibility_snapshot()
+        section_diagnostics()
+        section_report()
+        section_objections()
+        section_firm_contact()
+        section_export()
+        with st.sidebar:
+            section_resume()
+            section_callbacks()
+            if supervisor_mode():
+                section_archive_lookup()
+                section_daily_workbook()
+            section_bulk_import()
+    finally:
+        st.session_state["_full_run"] = False
+        render_profile().end_full()
+        autosave()
+    if admin_mode():
+        with st.sidebar:
+            section_timing_panel()
+
+render()
@@ -0,0 +1,318 @@
+# Crash-safe intake drafts: debounced, diff-based autosave of a session's answers.
+#
+# After every rerun the app snapshots the persistable session keys (widget answers and a few
+# plain values such as the upload manifest), diffs them against the last snapshot and hands only
+# the changed keys to DraftStore.put(), which returns immediately. A writer thread waits for the
+# debounce window, merges everything queued per draft and appends one diff row per draft in a
+# single transaction. If that transaction fails, the draft is marked and the app's next put()
+# sends its whole snapshot as a reset row (full=True), so no key is lost with the failed diff.
+# load() folds a draft's diffs back into session values; long histories are compacted into one
+# base row.
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+from intake_store import DEFAULT_DB_PATH
+from intake_uploads import SPOOL_RETENTION_HOURS
+
+DRAFTS_DB_PATH = os.environ.get("INTAKE_DRAFTS_PATH", os.path.splitext(DEFAULT_DB_PATH)[0] + "_drafts.sqlite3")
+AUTOSAVE_DEBOUNCE_S = float(os.environ.get("INTAKE_AUTOSAVE_DEBOUNCE_S", 2.0))
+DRAFT_COMPACT_OPS = 50
+DRAFT_RETENTION_HOURS = SPOOL_RETENTION_HOURS  # drafts point at spooled uploads; expire together
+
+# Keys never saved: internals, buttons / downloads / uploaders (Streamlit can't set them) and the
+# sidebar's supervisor tools, which aren't part of the intake
+AUTOSAVE_SKIP_PREFIXES = ("_", "btn_", "dl_", "proof_uploads_", "arch_", "daily_wb_", "bulk_", "resume_",
+                          "callback_")
+# Identity numbers are never written to the drafts file (plaintext, kept for days); a resumed
+# draft asks for them again
+AUTOSAVE_SKIP_KEYS = frozenset({"full_ssn", "ssn_last4", "tri_ssn", "wag_ssn"})
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    draft_id   TEXT PRIMARY KEY,
+    label      TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    status     TEXT NOT NULL DEFAULT 'open',
+    ops        INTEGER NOT NULL DEFAULT 0,
+    agent      TEXT
+);
+CREATE TABLE IF NOT EXISTS draft_ops (
+    id       INTEGER PRIMARY KEY,
+    draft_id TEXT NOT NULL,
+    diff     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_draft_ops_draft ON draft_ops (draft_id, id);
+CREATE INDEX IF NOT EXISTS ix_drafts_status ON drafts (status, updated_at);
+"""
+# Drafts files created before drafts had an owner
+MIGRATIONS = {"agent": "ALTER TABLE drafts ADD COLUMN agent TEXT"}
+
+
+# =========================
+# SNAPSHOTS
+# =========================
+def encode_value(value):
+    # JSON-safe form of a session value; dates and times are tagged so they come back typed.
+    # Returns None for values that can't be saved (uploaded files, futures, frames...).
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, dtime):
+        return {"$time": value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        out = [encode_value(v) for v in value]
+        return None if any(o is None and v is not None for o, v in zip(out, value)) else out
+    if isinstance(value, dict) and all(isinstance(k, str) for k in value):
+        out = {k: encode_value(v) for k, v in value.items()}
+        return None if any(out[k] is None and v is not None for k, v in value.items()) else out
+    return None
+
+
+def decode_value(value):
+    if isinstance(value, list):
+        return [decode_value(v) for v in value]
+    if isinstance(value, dict):
+        if len(value) == 1:
+            (tag, raw), = value.items()
+            if tag == "$dt":
+                return datetime.fromisoformat(raw)
+            if tag == "$date":
+                return date.fromisoformat(raw)
+            if tag == "$time":
+                return dtime.fromisoformat(raw)
+        return {k: decode_value(v) for k, v in value.items()}
+    return value
+
+
+def snapshot_state(items):
+    # items: (key, value) pairs of the session state -> {key: encoded value} worth saving
+    snap = {}
+    for key, value in items:
+        if not isinstance(key, str) or key.startswith(AUTOSAVE_SKIP_PREFIXES) or key in AUTOSAVE_SKIP_KEYS:
+            continue
+        enc = encode_value(value)
+        if enc is not None or value is None:
+            snap[key] = enc
+    return snap
+
+
+def diff_state(prev, cur):
+    # -> (changed {key: encoded value}, removed [keys])
+    changed = {k: v for k, v in cur.items() if k not in prev or prev[k] != v}
+    removed = [k for k in prev if k not in cur]
+    return changed, removed
+
+
+def draft_label(values):
+    # Picker text from the caller's answers (decoded or encoded values both work)
+    name = values.get("caller_legal_name") or values.get("caller_full_name") or "(no name yet)"
+    parts = [name, values.get("caller_phone") or "", values.get("q_state") or ""]
+    return " · ".join(p for p in parts if p)
+
+
+# =========================
+# STORE
+# =========================
+class DraftStore:
+    def __init__(self, path=DRAFTS_DB_PATH, debounce_s=AUTOSAVE_DEBOUNCE_S):
+        self.path = path
+        self.debounce_s = debounce_s
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        self._failed = set()   # drafts whose last write failed; their next put() must be full
+        self._failed_lock = threading.Lock()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(drafts)")}
+        for column, sql in MIGRATIONS.items():
+            if column not in columns:
+                conn.execute(sql)
+        conn.close()
+        self._writer = threading.Thread(target=self._write_loop, name="intake-draft-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ---------- writes (queued, never block the rerun) ----------
+    def put(self, draft_id, changed, removed=(), label=None, agent=None, full=False):
+        # agent: who owns the draft (only they see it in the resume picker); None keeps the owner.
+        # full: `changed` is the whole snapshot and replaces everything written before.
+        if changed or removed or label is not None or full:
+            self._queue.put(("put", draft_id, dict(changed), list(removed), label, agent, full))
+
+    def needs_full(self, draft_id):
+        # True (once) after a write for draft_id failed: the caller resends its whole snapshot
+        with self._failed_lock:
+            if draft_id in self._failed:
+                self._failed.discard(draft_id)
+                return True
+        return False
+
+    def finish(self, draft_id):
+        # The intake was saved to the archive: drop it from the resume picker
+        self._queue.put(("finish", draft_id))
+
+    def flush(self, timeout=10):
+        # Waits until everything queued so far is written
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                break
+            # Debounce: whatever else arrives within the window goes into the same transaction
+            if batch[0][0] != "flush":
+                deadline = time.monotonic() + self.debounce_s
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        self._queue.put(None)
+                        break
+                    batch.append(item)
+                    if item[0] == "flush":
+                        break
+            else:
+                while not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is None:
+                        self._queue.put(None)
+                        break
+                    batch.append(item)
+            try:
+                self._write_batch(conn, batch)
+            except Exception:
+                # autosave must never take the app down; the drafts in the batch get a full
+                # snapshot on their next put()
+                with self._failed_lock:
+                    self._failed.update(item[1] for item in batch if item[0] == "put")
+            for item in batch:
+                if item[0] == "flush":
+                    item[1].set()
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        merged, finished = {}, []
+        for item in batch:
+            if item[0] == "put":
+                _, draft_id, changed, removed, label, agent, full = item
+                d = merged.setdefault(draft_id, {"set": {}, "del": set(), "label": None, "agent": None, "reset": False})
+                if full:
+                    d["set"], d["del"], d["reset"] = {}, set(), True
+                for k in removed:
+                    d["set"].pop(k, None)
+                    d["del"].add(k)
+                for k, v in changed.items():
+                    d["del"].discard(k)
+                    d["set"][k] = v
+                if label is not None:
+                    d["label"] = label
+                if agent is not None:
+                    d["agent"] = agent
+            elif item[0] == "finish":
+                finished.append(item[1])
+        if not merged and not finished:
+            return
+        now = datetime.now().isoformat(timespec="seconds")
+        with conn:  # one transaction for the whole debounce window
+            for draft_id, d in merged.items():
+                conn.execute(
+                    "INSERT INTO drafts (draft_id, label, created_at, updated_at, agent) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(draft_id) DO UPDATE SET updated_at = excluded.updated_at, "
+                    "label = COALESCE(excluded.label, drafts.label), "
+                    "agent = COALESCE(excluded.agent, drafts.agent), ops = drafts.ops + 1",
+                    (draft_id, d["label"], now, now, d["agent"]),
+                )
+                diff = {"set": d["set"], "del": sorted(d["del"])}
+                if d["reset"]:
+                    diff["reset"] = True
+                conn.execute("INSERT INTO draft_ops (draft_id, diff) VALUES (?, ?)",
+                             (draft_id, json.dumps(diff, ensure_ascii=False)))
+                ops = conn.execute("SELECT ops FROM drafts WHERE draft_id = ?", (draft_id,)).fetchone()[0]
+                if ops >= DRAFT_COMPACT_OPS:
+                    self._compact(conn, draft_id)
+            for draft_id in finished:
+                conn.execute("UPDATE drafts SET status = 'saved', updated_at = ? WHERE draft_id = ?", (now, draft_id))
+
+    def _compact(self, conn, draft_id):
+        state = _fold(conn, draft_id)
+        conn.execute("DELETE FROM draft_ops WHERE draft_id = ?", (draft_id,))
+        conn.execute("INSERT INTO draft_ops (draft_id, diff) VALUES (?, ?)",
+                     (draft_id, json.dumps({"set": state, "del": []}, ensure_ascii=False)))
+        conn.execute("UPDATE drafts SET ops = 1 WHERE draft_id = ?", (draft_id,))
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+    # ---------- reads ----------
+    def load_encoded(self, draft_id):
+        return _fold(self._reader(), draft_id)
+
+    def load(self, draft_id):
+        # {session key: value} as it was at the last write, {} if the draft is unknown
+        return {k: decode_value(v) for k, v in self.load_encoded(draft_id).items()}
+
+    def recent(self, agent, limit=20, hours=DRAFT_RETENTION_HOURS):
+        # `agent`'s open drafts touched in the last `hours`, newest first
+        since = (datetime.now() - timedelta(hours=hours)).isoformat(timespec="seconds")
+        rows = self._reader().execute(
+            "SELECT draft_id, label, created_at, updated_at FROM drafts "
+            "WHERE status = 'open' AND agent = ? AND updated_at >= ? ORDER BY updated_at DESC LIMIT ?",
+            (agent, since, int(limit)),
+        )
+        return [dict(r) for r in rows]
+
+    def prune(self, hours=DRAFT_RETENTION_HOURS):
+        # Deletes drafts (open or saved) untouched for `hours`; returns how many
+        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            with conn:
+                ids = [r[0] for r in conn.execute("SELECT draft_id FROM drafts WHERE updated_at < ?", (cutoff,))]
+                conn.executemany("DELETE FROM draft_ops WHERE draft_id = ?", [(i,) for i in ids])
+                conn.executemany("DELETE FROM drafts WHERE draft_id = ?", [(i,) for i in ids])
+        finally:
+            conn.close()
+        return len(ids)
+
+
+def _fold(conn, draft_id):
+    state = {}
+    for (diff,) in conn.execute("SELECT diff FROM draft_ops WHERE draft_id = ? ORDER BY id", (draft_id,)):
+        d = json.loads(diff)
+        if d.get("reset"):
+            state = {}
+        for k in d.get("del", ()):
+            state.pop(k, None)
+        state.update(d.get("set", {}))
+    return state
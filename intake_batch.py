@@ -0,0 +1,241 @@
+# Command-line batch qualifier: re-runs the intake decision over a whole file on every core.
+#
+#   python -m intake_app qualify intakes.csv -o decisions.parquet
+#   python -m intake_app qualify intake_store.sqlite3 -o nightly.csv --workers 16
+#
+# Input: CSV or JSONL rows in the export_payload shape (an export CSV, a dialer dump), or the
+# archive database itself (.sqlite3 / .db, read in id order). Rows are read in chunks and each
+# chunk is qualified in a worker process with the same code as the HTTP service (intake_service),
+# a bounded number of chunks in flight so memory stays flat on any file size. Results are written
+# in input order as they complete: .parquet (needs pyarrow), .csv or .jsonl.
+#
+# Each output row: input row / id, tier, SOL rule, years and dates, per firm eligible + reasons,
+# the recommended firm, and an error message for rows that couldn't be read.
+import argparse
+import csv
+import importlib.util
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from time import perf_counter
+
+from intake_firms import FIRMS
+from intake_service import qualified
+import intake_clock
+
+BATCH_CHUNK_ROWS = 2000
+BATCH_WORKERS = os.cpu_count() or 1
+PARQUET_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else None
+PARQUET_MISSING_MSG = "Parquet output needs 'pyarrow' (pip install pyarrow); or write .csv / .jsonl instead."
+ARCHIVE_EXTS = (".sqlite3", ".sqlite", ".db")
+JSONL_EXTS = (".jsonl", ".ndjson", ".json")
+OUTPUT_EXTS = (".parquet", ".csv", ".jsonl")
+
+
+# =========================
+# READING
+# =========================
+def _ext(path):
+    return os.path.splitext(str(path))[1].lower()
+
+
+def iter_intakes(source):
+    # Payload dicts in file order; archive rows carry their archive id as "id"
+    ext = _ext(source)
+    if ext in ARCHIVE_EXTS:
+        from intake_store import IntakeStore
+        store = IntakeStore(source)
+        try:
+            for intake_id, payload in store.iter_payloads():
+                yield {**payload, "id": intake_id}
+        finally:
+            store.close()
+    elif ext in JSONL_EXTS:
+        with open(source, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+def iter_chunks(source, chunk_rows=BATCH_CHUNK_ROWS):
+    # (first row number, [payloads]) per chunk
+    rows = iter_intakes(source)
+    row0 = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if not chunk:
+            return
+        yield row0, chunk
+        row0 += len(chunk)
+
+
+# =========================
+# QUALIFYING (worker side)
+# =========================
+def decision_row(d):
+    row = {
+        "Tier": d["tier_label"], "SA_Category": d["category"] or "", "SOL_Rule_Text": d["sol_rule_text"],
+        "SOL_Years": d["sol_years"], "SOL_End": d["sol_end"], "FileBy": d["file_by_deadline"],
+    }
+    for firm in FIRMS:
+        row[f"{firm.label}_Eligible"] = d[f"{firm.key}_ok"]
+        row[f"{firm.label}_Reasons"] = "; ".join(d[f"{firm.key}_reasons"])
+    row["RecommendedFirm"] = d["recommended_firm"]
+    return row
+
+
+def qualify_chunk(payloads, row0, now, note=False):
+    # One chunk -> typed result frame (same columns and dtypes for every chunk, so the writers can
+    # append); now is an ISO string so the task pickles cheaply
+    import pandas as pd
+    now = datetime.fromisoformat(now)
+    rows = []
+    for i, p in enumerate(payloads, start=row0):
+        out = {"row": i, "id": p.get("id") if isinstance(p, dict) else None, "error": None}
+        try:
+            d = qualified(p, now, note=note)
+            out.update(decision_row(d))
+            if note:
+                out["LawFirmNote"] = d["lawfirm_note"]
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            # A malformed row gets its error in the output; the rest of the file still runs
+            out["error"] = str(e) if isinstance(e, ValueError) else f"Unreadable intake ({type(e).__name__}: {e})."
+        rows.append(out)
+    frame = pd.DataFrame(rows, columns=output_columns(note))
+    frame["row"] = frame["row"].astype("int64")
+    frame["SOL_Years"] = pd.to_numeric(frame["SOL_Years"]).astype("Int64")  # <NA> = no SOL
+    for col in ("SOL_End", "FileBy"):
+        frame[col] = pd.to_datetime(frame[col]).astype("datetime64[ns]")    # NaT = no SOL
+    for firm in FIRMS:
+        frame[f"{firm.label}_Eligible"] = frame[f"{firm.label}_Eligible"].astype("boolean")
+    for col in frame.columns:
+        if col not in ("row", "SOL_Years", "SOL_End", "FileBy") and not col.endswith("_Eligible"):
+            frame[col] = frame[col].map(lambda v: None if v is None or v != v else str(v)).astype("string")
+    return frame
+
+
+def output_columns(note=False):
+    return (["row", "id", "Tier", "SA_Category", "SOL_Rule_Text", "SOL_Years", "SOL_End", "FileBy"]
+            + [col for firm in FIRMS for col in (f"{firm.label}_Eligible", f"{firm.label}_Reasons")]
+            + ["RecommendedFirm"] + (["LawFirmNote"] if note else []) + ["error"])
+
+
+# =========================
+# WRITING
+# =========================
+class ResultWriter:
+    # Appends result frames to .parquet / .csv / .jsonl as they arrive
+    def __init__(self, path):
+        self.path, self.ext = path, _ext(path)
+        if self.ext not in OUTPUT_EXTS:
+            raise ValueError(f"Output must end in one of {', '.join(OUTPUT_EXTS)} (got '{path}').")
+        if self.ext == ".parquet" and PARQUET_ENGINE is None:
+            raise ValueError(PARQUET_MISSING_MSG)
+        self._parquet = None
+        self._started = False
+
+    def write(self, frame):
+        if self.ext == ".parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        elif self.ext == ".csv":
+            frame.to_csv(self.path, mode="a" if self._started else "w", header=not self._started, index=False)
+        else:
+            with open(self.path, "a" if self._started else "w", encoding="utf-8") as f:
+                frame.to_json(f, orient="records", lines=True, date_format="iso", force_ascii=False)
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+# =========================
+# DRIVER
+# =========================
+def qualify_file(source, output, workers=BATCH_WORKERS, chunk_rows=BATCH_CHUNK_ROWS, now=None, note=False, progress=None):
+    # Returns run stats; progress(stats) is called after every chunk written.
+    # workers=0 qualifies in this process (debugging, tiny files).
+    if workers < 0 or chunk_rows < 1:
+        raise ValueError("workers must be >= 0 and chunk_rows >= 1.")
+    now = (now or intake_clock.now()).isoformat()
+    writer = ResultWriter(output)
+    stats = {"rows": 0, "errors": 0, "chunks": 0, "elapsed_s": 0.0, "rows_per_s": 0.0,
+             "eligible": {firm.label: 0 for firm in FIRMS}}
+    t0 = perf_counter()
+
+    def done(frame):
+        writer.write(frame)
+        stats["rows"] += len(frame)
+        stats["errors"] += int(frame["error"].notna().sum())
+        stats["chunks"] += 1
+        for firm in FIRMS:
+            stats["eligible"][firm.label] += int(frame[f"{firm.label}_Eligible"].fillna(False).sum())
+        stats["elapsed_s"] = perf_counter() - t0
+        stats["rows_per_s"] = stats["rows"] / stats["elapsed_s"] if stats["elapsed_s"] else 0.0
+        if progress:
+            progress(stats)
+
+    try:
+        if not workers:
+            for row0, chunk in iter_chunks(source, chunk_rows):
+                done(qualify_chunk(chunk, row0, now, note))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = deque()
+                for row0, chunk in iter_chunks(source, chunk_rows):
+                    pending.append(pool.submit(qualify_chunk, chunk, row0, now, note))
+                    # Two chunks per worker in flight keeps every core busy without reading ahead
+                    while len(pending) >= 2 * workers:
+                        done(pending.popleft().result())
+                while pending:
+                    done(pending.popleft().result())
+    finally:
+        writer.close()
+    return stats
+
+
+def _print_progress(stats):
+    print(f"\r{stats['rows']:>12,} intakes · {stats['rows_per_s']:>9,.0f}/s · {stats['elapsed_s']:>7.1f}s"
+          + (f" · {stats['errors']:,} errors" if stats["errors"] else ""), end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m intake_app qualify",
+                                 description="Qualify a file of intakes (export-payload CSV / JSONL, or the archive database) on all cores.")
+    ap.add_argument("input", help="intakes .csv / .jsonl, or the archive .sqlite3")
+    ap.add_argument("-o", "--output", required=True, help="results file: .parquet, .csv or .jsonl")
+    ap.add_argument("--workers", type=int, default=BATCH_WORKERS, help="worker processes (default: every core; 0 = this process)")
+    ap.add_argument("--chunk", type=int, default=BATCH_CHUNK_ROWS, help="intakes per worker task")
+    ap.add_argument("--now", help="evaluate as of this time (ISO, default: now)")
+    ap.add_argument("--with-note", action="store_true", help="also render the law firm note per intake")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        ap.error(f"no such file: {args.input}")
+    try:
+        now = datetime.fromisoformat(args.now) if args.now else None
+        stats = qualify_file(args.input, args.output, args.workers, args.chunk, now, args.with_note, _print_progress)
+    except ValueError as e:
+        ap.error(str(e))
+    print(file=sys.stderr)
+    pool = f"{args.workers} worker{'s' if args.workers != 1 else ''}" if args.workers else "in-process"
+    print(f"{stats['rows']:,} intakes in {stats['elapsed_s']:.1f}s ({stats['rows_per_s']:,.0f}/s, {pool}) -> {args.output}")
+    print(" · ".join(f"{label} eligible: {n:,}" for label, n in stats["eligible"].items())
+          + (f" · errors: {stats['errors']:,}" if stats["errors"] else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,587 @@
+# Repeatable benchmarks for the intake engine, the law firm text, the exports and a headless
+# full-script rerun of the app.
+#
+#   python intake_bench.py                                  # everything, default size
+#   python intake_bench.py --only eligibility,compose -n 5000 --seed 7
+#   python intake_bench.py --compare bench_results/<older>.json
+#
+# Intakes come from a seeded generator, so the same seed and size give the same workload on every
+# version. Results are written as JSON (bench_results/ by default) with the git revision and the
+# package versions, and --compare reports the per-item change against an earlier results file.
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import pickle
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, date, time, timedelta
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from intake_rules import STATES
+from intake_eligibility import ACT_FIELDS, REPORT_FIELDS, evaluate, evaluate_frame, tier_step, sol_step
+from intake_graph import INTAKE_GRAPH, GraphState, intake_record
+from intake_firms import FIRMS
+from intake_routing import route_frame
+from intake_service import pick_firm
+from intake_compose import firm_header_and_short, statement_of_case, lawfirm_note, export_payload
+from intake_export import XLSX_ENGINE, build_csv, build_xlsx
+from intake_profile import COLD_RENDER_BUDGET_MS, FIRST_PAINT_BUDGET_MS
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results")
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "intake_app.py")
+DEFAULT_COUNT = 2000
+DEFAULT_ROUNDS = 3
+REGRESSION_TOLERANCE = 0.10
+
+# =========================
+# SYNTHETIC INTAKES
+# =========================
+FIRST_NAMES = ("Maria", "Jessica", "Ashley", "Emily", "Sarah", "Aaliyah", "Priya", "Mei", "Sofia", "Hannah",
+               "Keisha", "Olivia", "Chloe", "Lauren", "Danielle", "Jordan", "Taylor", "Alex")
+LAST_NAMES = ("Garcia", "Johnson", "Smith", "Nguyen", "Williams", "Brown", "Martinez", "Davis", "Patel", "Kim",
+              "Lopez", "Wilson", "Anderson", "Thomas", "Moore", "Jackson", "O'Neil", "de la Cruz")
+STREETS = ("Main St", "Oak Ave", "Market St", "2nd Ave", "Broadway", "Elm St", "Sunset Blvd", "Lake Shore Dr")
+MARKETING_SOURCES = ("Client Referral", "DMEI", "DMEI Rideshare", "Facebook", "FB Rideshare", "Web Form Submission")
+REPORT_CHOICES = {  # reported-to option -> (report channel, share of callers who pick it)
+    "Rideshare Company": ("Rideshare company", 0.45),
+    "Physician": ("Physician", 0.30),
+    "Friend or Family Member": ("Family/Friends", 0.55),
+    "Therapist": ("Therapist", 0.25),
+    "Police Department": ("Police", 0.30),
+}
+NO_REPORT_CHOICE = "NO (DQ, UNLESS TIER 1 OR MINOR)"
+RECEIPT_CHOICES = ("PDF", "Email", "Screenshot of Receipt", "In-App Receipt (screenshot)")
+UPLOAD_POOL = (  # (file name, sniffed kind)
+    ("ride_receipt.pdf", "pdf"), ("receipt_email.eml", "eml"), ("screenshot.png", "png"),
+    ("therapy_note.jpeg", "jpeg"), ("voice_memo.m4a", "m4a"), ("dashcam.mp4", "mp4"),
+)
+SCOPES = ("Inside the car", "Just outside the car", "Furtherance from the car", "Unclear")
+TIER1_ACTS, TIER2_ACTS = ("rape", "forced_oral"), ("touching", "exposure", "masturb")
+ACT_LABELS = {field: label for label, field in ACT_FIELDS.items()}
+
+
+def _chance(rng, p):
+    return rng.random() < p
+
+
+def synth_intake(rng, today):
+    # One intake as the sections publish it (intake_app publish() keys), plus the note options
+    c = {}
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    middle = rng.choice(("", "", "Ann ", "Marie ", "J "))
+    c["caller_legal_name"] = f"{first} {middle}{last}"
+    c["caller_full_name"] = first if _chance(rng, 0.3) else f"{first} {last}"
+    c["consent_recording"] = _chance(rng, 0.9)
+    c["prior_firm_any"] = _chance(rng, 0.08)
+    c["prior_firm_note"] = "Signed in 2023, dropped for missing receipt" if c["prior_firm_any"] and _chance(rng, 0.6) else ""
+
+    # Acts: mostly one tier, sometimes both, sometimes nothing qualifying
+    flags = dict.fromkeys(ACT_FIELDS.values(), False)
+    roll = rng.random()
+    if roll < 0.35:
+        for f in rng.sample(TIER1_ACTS, rng.randint(1, 2)):
+            flags[f] = True
+    if 0.25 < roll < 0.80:
+        for f in rng.sample(TIER2_ACTS, rng.randint(1, 2)):
+            flags[f] = True
+    if roll < 0.80:
+        flags["kidnap"], flags["imprison"] = _chance(rng, 0.10), _chance(rng, 0.08)
+    c.update(flags)
+    c["act_flags"] = {ACT_LABELS[f]: v for f, v in flags.items()}
+    c["verbal_only"] = roll >= 0.80 and _chance(rng, 0.35)
+    c["attempt_only"] = roll >= 0.80 and not c["verbal_only"] and _chance(rng, 0.25)
+
+    c["company"] = rng.choices(("Uber", "Lyft", "Other"), (55, 40, 5))[0]
+    city = rng.choice(("Springfield", "Riverside", "Fairview", "Madison", "Georgetown"))
+    c["pickup"] = f"{rng.randint(10, 9999)} {rng.choice(STREETS)}, {city}" if _chance(rng, 0.85) else ""
+    c["dropoff"] = f"{rng.randint(10, 9999)} {rng.choice(STREETS)}, {city}" if _chance(rng, 0.80) else ""
+
+    # Receipts and uploads
+    c["receipt_evidence"] = [r for r in RECEIPT_CHOICES if _chance(rng, 0.3)]
+    uploads = rng.sample(UPLOAD_POOL, rng.choices((0, 1, 2, 3), (40, 30, 20, 10))[0])
+    c["uploaded_names"] = [name for name, _ in uploads]
+    c["any_pdf_uploaded"] = any(kind == "pdf" for _, kind in uploads)
+    c["any_av_uploaded"] = any(kind in ("m4a", "mp4") for _, kind in uploads)
+    c["sms_phone"] = ""
+
+    # Date / time: recent incidents are more common; some callers don't know the date
+    days_back = min(int(rng.expovariate(1 / 700)), 365 * 12)
+    incident_date = today - timedelta(days=days_back)
+    c["incident_date"] = incident_date if _chance(rng, 0.75) else None
+    c["incident_time"] = time(rng.randrange(24), rng.choice((0, 15, 30, 45)))
+
+    # Report channels, each with its own delay after the incident
+    reported_to = [choice for choice, (_, p) in REPORT_CHOICES.items() if _chance(rng, p)]
+    if not reported_to and _chance(rng, 0.4):
+        reported_to = [NO_REPORT_CHOICE]
+    c["reported_to"] = reported_to
+    base = c["incident_date"] or today
+    report_dates, family_report_dt = {}, None
+    for choice, (channel, _) in REPORT_CHOICES.items():
+        if choice not in reported_to:
+            continue
+        if channel == "Family/Friends":
+            family_report_dt = datetime.combine(base, c["incident_time"]) + timedelta(hours=rng.expovariate(1 / 30))
+            report_dates[channel] = family_report_dt.date()
+        else:
+            report_dates[channel] = min(base + timedelta(days=int(rng.expovariate(1 / 45))), today)
+    c["report_dates"] = {channel: report_dates[channel] for channel in REPORT_FIELDS if channel in report_dates}
+    c["family_report_dt"] = family_report_dt
+    fam = "Friend or Family Member" in reported_to
+    c["fam_first"], c["fam_last"] = (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)) if fam else ("", "")
+    c["fam_phone"] = f"({rng.randint(201, 989)}) 555-{rng.randint(0, 9999):04d}" if fam else ""
+    phys, ther, police = "Physician" in reported_to, "Therapist" in reported_to, "Police Department" in reported_to
+    c["phys_name"], c["phys_fac"] = ("Dr. " + rng.choice(LAST_NAMES), f"{city} General") if phys else ("", "")
+    c["phys_addr"] = f"{rng.randint(10, 999)} {rng.choice(STREETS)}" if phys else ""
+    c["ther_name"], c["ther_fac"] = (rng.choice(FIRST_NAMES) + " " + rng.choice(LAST_NAMES), f"{city} Counseling") if ther else ("", "")
+    c["ther_addr"] = f"{rng.randint(10, 999)} {rng.choice(STREETS)}" if ther else ""
+    c["police_station"] = f"{city} PD" if police else ""
+    c["police_addr"] = f"{rng.randint(10, 999)} {rng.choice(STREETS)}" if police else ""
+    c["rep_rs_company"] = (c["company"] if c["company"] != "Other" else "Uber") if "Rideshare Company" in reported_to else ""
+    c["scope_choice"] = rng.choices(SCOPES, (75, 10, 7, 8))[0]
+
+    # Injuries / treatment
+    c["injury_physical"], c["injury_emotional"] = _chance(rng, 0.3), _chance(rng, 0.8)
+    injured = c["injury_physical"] or c["injury_emotional"]
+    c["injuries_summary"] = "Anxiety, trouble sleeping" if injured and _chance(rng, 0.5) else ""
+    c["provider_name"] = "Dr. " + rng.choice(LAST_NAMES) if injured and _chance(rng, 0.4) else ""
+    c["provider_facility"] = f"{city} Clinic" if c["provider_name"] else ""
+    c["first_visit"] = base + timedelta(days=rng.randint(1, 60)) if c["provider_name"] else None
+    c["last_visit"] = c["first_visit"] + timedelta(days=rng.randint(0, 200)) if c["first_visit"] else None
+    c["medication_name"] = rng.choice(("", "", "Sertraline", "Trazodone"))
+    c["pharmacy_name"] = rng.choice(("CVS", "Walgreens")) if c["medication_name"] else ""
+
+    # Contact & screening
+    c["caller_phone"] = f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+    c["caller_email"] = f"{first.lower()}.{last.lower().replace(' ', '')}{rng.randint(1, 99)}@example.com" if _chance(rng, 0.85) else ""
+    c["state"] = rng.choice(STATES)
+    c["rs_submit_how"] = rng.choice(("", "app", "email")) if "Rideshare Company" in reported_to else ""
+    c["rs_received_response"] = bool(c["rs_submit_how"]) and _chance(rng, 0.5)
+    c["rs_response_detail"] = "Driver deactivated" if c["rs_received_response"] and _chance(rng, 0.5) else ""
+    c["gov_id"], c["female_rider"] = _chance(rng, 0.7), _chance(rng, 0.9)
+    c["rider_not_driver"], c["has_atty"] = _chance(rng, 0.97), _chance(rng, 0.05)
+    c["felony"] = _chance(rng, 0.06)
+    c["driver_weapon_used"] = "Yes" if _chance(rng, 0.1) else "No"
+    c["driver_weapon_detail"] = "Threatened with a knife" if c["driver_weapon_used"] == "Yes" else ""
+    c["victim_weapon"] = "Yes" if _chance(rng, 0.05) else "No"
+    c["non_lethal_choice"] = "Pepper Spray" if c["victim_weapon"] == "Yes" else ""
+    c["full_ssn"] = f"{rng.randint(100, 899)}-{rng.randint(10, 99)}-{rng.randint(1000, 9999)}" if _chance(rng, 0.5) else ""
+    c["ssn_last4"] = c["full_ssn"][-4:] if c["full_ssn"] else (f"{rng.randint(0, 9999):04d}" if _chance(rng, 0.3) else "")
+    c["full_ssn_on_file"] = bool(c["full_ssn"])
+
+    # Law firm note options
+    c["marketing_source_choice"] = rng.choice(MARKETING_SOURCES)
+    c["note_gdrive"] = "https://drive.example.com/f/" + "".join(rng.choices("abcdef0123456789", k=12)) if _chance(rng, 0.3) else ""
+    c["note_plaid_passed"], c["note_receipt_pdf"] = _chance(rng, 0.6), _chance(rng, 0.5)
+    c["id_type_used"] = rng.choice(("Driver's License", "State ID", "Passport"))
+    return c
+
+
+def synth_intakes(count, seed=0, today=None):
+    rng = random.Random(seed)
+    today = today or date.today()
+    return [synth_intake(rng, today) for _ in range(count)]
+
+
+def derive(c, now, graph=None):
+    # What compute_eligibility and the firm assignment publish, merged over the raw answers
+    graph = graph or GraphState(INTAKE_GRAPH)
+    ev = graph.value("eligibility", {**c, "today": now.date(), "now": now})
+    choice = pick_firm(ev, c["state"])
+    note_header, firm_short, assigned_firm_name = firm_header_and_short(choice, "")
+    return {**ev, **c, "ev": ev, "assigned_firm_name": assigned_firm_name, "note_header": note_header, "firm_short": firm_short}
+
+
+# =========================
+# TIMING
+# =========================
+def _timed_rounds(fn, rounds):
+    # Best-of-N like timeit: the GC is paused while a round runs
+    times = []
+    for _ in range(rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = perf_counter()
+            fn()
+            times.append(perf_counter() - t0)
+        finally:
+            gc.enable()
+    return times
+
+
+def _summary(times, items, **extra):
+    best = min(times)
+    return {
+        "items": items, "rounds": len(times),
+        "best_s": round(best, 6), "median_s": round(statistics.median(times), 6),
+        "per_item_us": round(best / max(items, 1) * 1e6, 3),
+        "items_per_s": round(items / best, 1) if best else None,
+        **extra,
+    }
+
+
+# =========================
+# BENCHMARKS
+# =========================
+# Each takes (intakes, now, rounds) and returns a summary dict.
+def bench_tier_sol(intakes, now, rounds):
+    def run():
+        for c in intakes:
+            tier = tier_step(c)
+            sol_step(c["state"], tier["category"], datetime.combine(c["incident_date"] or now.date(), c["incident_time"]))
+    return _summary(_timed_rounds(run, rounds), len(intakes))
+
+
+def bench_eligibility(intakes, now, rounds):
+    records = [intake_record(c, now.date()) for c in intakes]
+    def run():
+        for r in records:
+            evaluate(r, now=now)
+    return _summary(_timed_rounds(run, rounds), len(records))
+
+
+def bench_eligibility_graph(intakes, now, rounds):
+    # The in-app path: a warm per-session graph where one answer changed since the last rerun
+    graphs = []
+    for c in intakes:
+        g = GraphState(INTAKE_GRAPH)
+        g.value("eligibility", {**c, "today": now.date(), "now": now})
+        graphs.append(g)
+    edited = [{**c, "has_atty": not c["has_atty"]} for c in intakes]
+    def run():
+        for g, c, e in zip(graphs, intakes, edited):
+            g.value("eligibility", {**e, "today": now.date(), "now": now})
+            g.value("eligibility", {**c, "today": now.date(), "now": now})
+    return _summary(_timed_rounds(run, rounds), len(intakes) * 2)
+
+
+def bench_eligibility_frame(intakes, now, rounds):
+    df = pd.DataFrame([intake_record(c, now.date()) for c in intakes])
+    out = {}
+    def run():
+        out["frame"] = evaluate_frame(df, now=now)
+    summary = _summary(_timed_rounds(run, rounds), len(df))
+    for firm in FIRMS:
+        summary[f"{firm.key}_ok_share"] = round(float(out["frame"][f"{firm.key}_ok"].mean()), 4)
+    return summary
+
+
+def bench_routing(intakes, now, rounds):
+    # Batch matching with every firm capped at a third of the intakes it qualifies for
+    records = pd.DataFrame([intake_record(c, now.date()) for c in intakes])
+    frame = evaluate_frame(records, now=now).assign(state=records["state"])
+    capacity = {firm.key: int(frame[f"{firm.key}_ok"].sum()) // 3 for firm in FIRMS}
+    out = {}
+    def run():
+        out["routed"] = route_frame(frame, capacity)
+    summary = _summary(_timed_rounds(run, rounds), len(frame))
+    summary["placed_share"] = round(float((out["routed"] != "").mean()), 4)
+    return summary
+
+
+def bench_compose(intakes, now, rounds):
+    derived = [derive(c, now) for c in intakes]
+    def run():
+        for d in derived:
+            statement_of_case(d)
+            lawfirm_note(d, now)
+    return _summary(_timed_rounds(run, rounds), len(derived))
+
+
+def _composed(intakes, now):
+    # Derived values plus the note and statement text, as section_export sees them
+    derived = []
+    for c in intakes:
+        d = derive(c, now)
+        d["elements"], d["lawfirm_note"] = statement_of_case(d), lawfirm_note(d, now)
+        derived.append(d)
+    return derived
+
+
+def bench_export_payload(intakes, now, rounds):
+    derived = _composed(intakes, now)
+    def run():
+        for d in derived:
+            export_payload(d)
+    return _summary(_timed_rounds(run, rounds), len(derived))
+
+
+def bench_export_csv(intakes, now, rounds):
+    payloads = [export_payload(d) for d in _composed(intakes, now)]
+    sizes = []
+    def run():
+        sizes[:] = [len(build_csv(p)) for p in payloads]
+    return _summary(_timed_rounds(run, rounds), len(payloads), avg_bytes=round(statistics.mean(sizes)))
+
+
+def bench_export_xlsx(intakes, now, rounds):
+    if not XLSX_ENGINE:
+        return {"skipped": "no Excel engine installed"}
+    payloads = [export_payload(d) for d in _composed(intakes[:200], now)]  # a workbook per payload; 200 is plenty for a stable figure
+    sizes = []
+    def run():
+        sizes[:] = [len(build_xlsx(p)[0] or b"") for p in payloads]
+    return _summary(_timed_rounds(run, rounds), len(payloads), engine=XLSX_ENGINE, avg_bytes=round(statistics.mean(sizes)))
+
+
+# Synthetic answer -> widget key, for driving the real script headlessly
+APP_CHECKBOXES = {
+    "rape": "act_rape", "forced_oral": "act_forced_oral", "touching": "act_touch", "exposure": "act_exposure",
+    "masturb": "act_masturb", "kidnap": "act_kidnap", "imprison": "act_imprison",
+    "verbal_only": "act_verbal_only", "attempt_only": "act_attempt_only",
+}
+APP_TOGGLES = {"gov_id": "elig_id", "female_rider": "elig_female", "rider_not_driver": "elig_rider_not_driver", "has_atty": "elig_atty"}
+
+
+def _apply_answers(at, c):
+    for field, key in APP_CHECKBOXES.items():
+        at.checkbox(key=key).set_value(c[field])
+    for field, key in APP_TOGGLES.items():
+        at.toggle(key=key).set_value(c[field])
+    at.selectbox(key="q2_company").set_value(c["company"])
+    at.selectbox(key="q_state").set_value(c["state"])
+    at.selectbox(key="scope_choice").set_value(c["scope_choice"])
+    at.multiselect(key="q5_reported").set_value(c["reported_to"])
+    at.multiselect(key="receipt_evidence").set_value(c["receipt_evidence"])
+    at.text_input(key="caller_legal_name").input(c["caller_legal_name"])
+
+
+# Runs in a fresh interpreter: (sample intakes, rounds) pickled on stdin, rerun times on stdout
+APP_RERUN_SCRIPT = """
+import json, pickle, sys
+from time import perf_counter
+from streamlit.testing.v1 import AppTest
+from intake_bench import _apply_answers
+sample, rounds = pickle.load(sys.stdin.buffer)
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t0 = perf_counter()
+at.run()
+first_run, times, error = perf_counter() - t0, [], ""
+for _ in range(rounds):
+    for c in sample:
+        _apply_answers(at, c)
+        t0 = perf_counter()
+        at.run()
+        times.append(perf_counter() - t0)
+        if at.exception:
+            error = str(at.exception[0].value)
+            break
+    if error:
+        break
+print(json.dumps({"first_run_s": first_run, "times": times, "error": error}))
+"""
+
+
+def _scratch_env(scratch):
+    # A copy of the environment pointing the app's archive (and the drafts / gazetteer files next
+    # to it) at a scratch directory with the timing log off; the benchmark's own process is untouched
+    env = {**os.environ, "INTAKE_DB_PATH": os.path.join(scratch, "store.sqlite3"), "INTAKE_TIMING_LOG": "",
+           "PYTHONPATH": os.pathsep.join(filter(None, [os.path.dirname(APP_PATH), os.environ.get("PYTHONPATH")]))}
+    for name in ("INTAKE_DRAFTS_PATH", "INTAKE_GAZETTEER_PATH"):
+        env.pop(name, None)
+    return env
+
+
+def bench_app_rerun(intakes, now, rounds):
+    # Full script reruns through Streamlit's AppTest harness (no browser, no server), in a child
+    # interpreter whose archive and timing log live in a scratch directory, so a run leaves
+    # nothing behind.
+    if importlib.util.find_spec("streamlit") is None:
+        return {"skipped": "streamlit not installed"}
+    with tempfile.TemporaryDirectory(prefix="intake_bench_") as scratch:
+        proc = subprocess.run([sys.executable, "-c", APP_RERUN_SCRIPT, APP_PATH], input=pickle.dumps((intakes[:10], rounds)),
+                              capture_output=True, env=_scratch_env(scratch), timeout=1800)
+    try:
+        res = json.loads(proc.stdout.decode().strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {"error": (proc.stderr.decode(errors="replace").strip().splitlines() or ["no output"])[-1]}
+    if res["error"]:
+        return {"error": res["error"]}
+    times = res["times"]
+    return {
+        "items": len(times), "rounds": rounds, "first_run_s": round(res["first_run_s"], 4),
+        "best_s": round(min(times), 6), "median_s": round(statistics.median(times), 6),
+        "p95_s": round(float(np.percentile(times, 95)), 6),
+        "per_item_us": round(statistics.median(times) * 1e6, 1),
+    }
+
+
+# Runs in a fresh interpreter: one cold AppTest run, timed by the app's own RenderProfile
+COLD_START_SCRIPT = """
+import json, sys
+from time import perf_counter
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+t0 = perf_counter()
+at.run()
+wall = perf_counter() - t0
+cold = at.session_state["_render_profile"].cold if "_render_profile" in at.session_state else None
+print(json.dumps({"wall_s": wall, "cold": cold, "error": str(at.exception[0].value) if at.exception else "",
+                  "loaded": sorted(m for m in sys.argv[2:] if m in sys.modules)}))
+"""
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow", "xlsxwriter", "openpyxl", "pypdf")
+
+
+def bench_cold_start(intakes, now, rounds):
+    # First render of the app in a new process (what a freshly scaled-out replica pays), checked
+    # against the budgets in intake_profile. Each round is its own interpreter.
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="intake_bench_") as scratch:
+        env = _scratch_env(scratch)
+        for _ in range(rounds):
+            proc = subprocess.run([sys.executable, "-c", COLD_START_SCRIPT, APP_PATH, *HEAVY_MODULES],
+                                  capture_output=True, text=True, env=env, timeout=300)
+            try:
+                res = json.loads(proc.stdout.strip().splitlines()[-1])
+            except (IndexError, ValueError):
+                return {"error": (proc.stderr.strip().splitlines() or ["no output"])[-1]}
+            if res["error"] or not res["cold"]:
+                return {"error": res["error"] or "no cold-start record"}
+            runs.append(res)
+    totals = [r["cold"]["total_ms"] for r in runs]
+    paints = [r["cold"]["first_paint_ms"] for r in runs]
+    return {
+        "items": len(runs), "rounds": rounds,
+        "best_s": round(min(totals) / 1000, 4), "median_s": round(statistics.median(totals) / 1000, 4),
+        "per_item_us": round(statistics.median(totals) * 1000, 1),
+        "first_paint_ms": round(statistics.median(paints), 1),
+        "budget_ms": COLD_RENDER_BUDGET_MS, "first_paint_budget_ms": FIRST_PAINT_BUDGET_MS,
+        "over_budget": sorted({name for r in runs for name in r["cold"]["over_budget"]}),
+        "loaded_after_first_render": runs[-1]["loaded"],
+    }
+
+
+BENCHMARKS = {
+    "tier_sol": bench_tier_sol,
+    "eligibility": bench_eligibility,
+    "eligibility_graph": bench_eligibility_graph,
+    "eligibility_frame": bench_eligibility_frame,
+    "routing": bench_routing,
+    "compose": bench_compose,
+    "export_payload": bench_export_payload,
+    "export_csv": bench_export_csv,
+    "export_xlsx": bench_export_xlsx,
+    "app_rerun": bench_app_rerun,
+    "cold_start": bench_cold_start,
+}
+
+
+# =========================
+# RESULTS
+# =========================
+def _git_rev():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def _versions():
+    found = {"python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__}
+    try:
+        import streamlit
+        found["streamlit"] = streamlit.__version__
+    except Exception:
+        pass
+    found["xlsx_engine"] = XLSX_ENGINE
+    return found
+
+
+def run_benchmarks(names=None, count=DEFAULT_COUNT, seed=0, rounds=DEFAULT_ROUNDS, now=None, progress=None):
+    # The clock is pinned so the SOL / report windows see the same "now" on every version
+    now = now or datetime(2025, 1, 15, 12, 0)
+    intakes = synth_intakes(count, seed, today=now.date())
+    results = {}
+    for name in names or BENCHMARKS:
+        if progress:
+            progress(name)
+        results[name] = BENCHMARKS[name](intakes, now, rounds)
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"), "git_rev": _git_rev(),
+            "platform": platform.platform(), "versions": _versions(),
+            "count": count, "seed": seed, "rounds": rounds, "now": now.isoformat(),
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, tolerance=REGRESSION_TOLERANCE):
+    # Rows of (benchmark, old µs/item, new µs/item, ratio, regressed)
+    rows = []
+    for name, res in new["results"].items():
+        before = old["results"].get(name, {})
+        if "per_item_us" not in res or "per_item_us" not in before:
+            continue
+        ratio = res["per_item_us"] / before["per_item_us"] if before["per_item_us"] else float("inf")
+        rows.append((name, before["per_item_us"], res["per_item_us"], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Intake benchmarks (seeded synthetic intakes).")
+    ap.add_argument("--only", default="", help="comma-separated subset of: " + ", ".join(BENCHMARKS))
+    ap.add_argument("-n", "--count", type=int, default=DEFAULT_COUNT, help="synthetic intakes per benchmark")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    ap.add_argument("-o", "--output", help="results file (default: bench_results/bench_<time>_<rev>.json)")
+    ap.add_argument("--compare", help="earlier results file to compare against")
+    ap.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE, help="allowed slowdown before flagging (0.10 = 10%%)")
+    args = ap.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()] or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        ap.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    report = run_benchmarks(names, args.count, args.seed, args.rounds,
+                            progress=lambda n: print(f"… {n}", file=sys.stderr, flush=True))
+
+    for name, res in report["results"].items():
+        if "per_item_us" in res:
+            print(f"{name:<20} {res['per_item_us']:>12.1f} µs/item  ({res['items']} items, best of {res['rounds']})")
+            if "budget_ms" in res:
+                print(f"{'':<20} cold render {res['median_s'] * 1000:.0f} ms (budget {res['budget_ms']:.0f}) · first paint "
+                      f"{res['first_paint_ms']:.0f} ms (budget {res['first_paint_budget_ms']:.0f})"
+                      + (f" · OVER BUDGET: {', '.join(res['over_budget'])}" if res["over_budget"] else ""))
+        else:
+            print(f"{name:<20} {res.get('skipped') or res.get('error')}")
+
+    path = args.output
+    if not path:
+        os.makedirs(BENCH_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(BENCH_DIR, f"bench_{stamp}_{report['meta']['git_rev'] or 'nogit'}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"Results: {path}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        rows = compare(old, report, args.tolerance)
+        print(f"\nvs {args.compare} (rev {old['meta'].get('git_rev')}):")
+        if any(old["meta"].get(k) != report["meta"][k] for k in ("count", "seed", "now")):
+            print("note: the two runs used a different workload (count / seed / clock); ratios are only indicative")
+        for name, before, after, ratio, regressed in rows:
+            print(f"{name:<20} {before:>12.1f} → {after:>12.1f} µs/item  ×{ratio:.2f}{'  REGRESSION' if regressed else ''}")
+        if any(r[4] for r in rows):
+            return 1
+    if any(res.get("over_budget") for res in report["results"].values()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,437 @@
+# Callback queue: which archived lead an agent should call next, and whether they may call now.
+#
+# Each lead has
+#   a contact window   the claimant's "best time to contact" (TriTen_BestTime / Wag_BestTime, free
+#                      text: "mornings", "after 5pm", "weekdays 2-4pm") in the caller's time zone
+#                      (the phone's area code, else the incident state's), kept inside CALLING_HOURS;
+#                      no usable answer means any time in CALLING_HOURS
+#   a priority         file-by deadline first (soonest first, no SOL last), then missing evidence
+#                      (receipt, gov ID: more missing first), then lead age (oldest first)
+# Leads whose SOL has passed are never queued, and are dropped if it passes while they wait.
+#
+# CallbackQueue keeps two heaps: leads waiting for their window to open (by opening time) and leads
+# inside their window (by priority), shared by every agent. pop_due() moves
+# the leads whose window has opened across and pops the best n, O(log n) per lead; replaced and
+# removed leads are dropped lazily when they reach the top. Popped leads are claimed until done() /
+# retry(), or until CALLBACK_CLAIM_TTL runs out (the agent's session ended first), when the next
+# pop_due() requeues them. rebuild() heapifies a whole set in O(n); archive_leads() reads the
+# archive a chunk at a time for it:
+#
+#   python -m intake_app callbacks intake_store.sqlite3 --next 20
+import argparse
+import heapq
+import itertools
+import re
+import sys
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from intake_phones import format_phone, phone_timezone
+from intake_rules import STATE_TIMEZONES
+import intake_clock
+
+CALLING_HOURS = (8 * 60, 21 * 60)        # local minutes after midnight (8am-9pm)
+CALLBACK_RETRY_AFTER = timedelta(hours=3)
+CALLBACK_CLAIM_TTL = timedelta(hours=2)  # a popped batch not finished by then goes back in the queue
+CALLBACK_CHUNK_ROWS = 2000
+DEFAULT_TIMEZONE = "America/New_York"    # states the table doesn't know
+NO_DEADLINE = date.max.toordinal()
+
+DAY_PARTS = {
+    "morning": (9 * 60, 12 * 60), "lunch": (12 * 60, 13 * 60), "noon": (12 * 60, 13 * 60),
+    "afternoon": (12 * 60, 17 * 60), "after work": (17 * 60, 21 * 60), "evening": (17 * 60, 21 * 60),
+    "night": (18 * 60, 21 * 60),
+}
+ANYTIME_WORDS = ("anytime", "any time", "all day", "whenever", "flexible")
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+_CLOCK = r"(\d{1,2})(?::(\d{2}))?\s*([ap])?\.?m?\.?"
+_DAY = r"\b(mon|tue|wed|thu|fri|sat|sun)(?:day|sday|nesday|rsday|urday|s|r|rs)?s?\b\.?"
+_DAY_RANGE = re.compile(_DAY + r"\s*(?:-|–|to|thru|through)\s*" + _DAY)
+_DAY_NAME = re.compile(_DAY)
+_TIME_RANGE = re.compile(r"(?:between\s+)?\b" + _CLOCK + r"\s*(?:-|–|to|and|until|till)\s*" + _CLOCK)
+_AFTER = re.compile(r"\b(?:after|from|past)\s+" + _CLOCK)
+_BEFORE = re.compile(r"\b(?:before|until|till|by)\s+" + _CLOCK)
+_AT = re.compile(r"\b(\d{1,2})(?::(\d{2}))?\s*([ap])\.?m\b\.?")
+
+
+# =========================
+# CONTACT WINDOWS
+# =========================
+def _minutes(hour, minute, meridiem):
+    # meridiem "a" / "p" / None; a bare hour 1-7 reads as pm, 8-11 as am
+    hour, minute = int(hour), int(minute or 0)
+    if hour > 23 or minute > 59:
+        return None
+    if meridiem is None and 1 <= hour <= 7:
+        meridiem = "p"
+    if meridiem == "p" and hour < 12:
+        hour += 12
+    elif meridiem == "a" and hour == 12:
+        hour = 0
+    return hour * 60 + minute
+
+
+def _range_minutes(h1, m1, ap1, h2, m2, ap2):
+    # "2-4pm": the first time takes the second's am/pm unless that puts it after the end ("10-2pm")
+    if ap1 is None and ap2 is not None:
+        start = _minutes(h1, m1, ap2)
+        end = _minutes(h2, m2, ap2)
+        if start is not None and end is not None and start >= end:
+            start = _minutes(h1, m1, "a")
+        return start, end
+    return _minutes(h1, m1, ap1), _minutes(h2, m2, ap2)
+
+
+def _hour_from(start):
+    # "at 10am": the hour that follows
+    return (start, start + 60) if start is not None else (None, None)
+
+
+def contact_window(text):
+    # Free-text best time -> (weekdays 0=Mon.., [(start, end) local minutes]); never empty
+    text = " ".join(str(text or "").lower().split())
+    days = set()
+    for m in _DAY_RANGE.finditer(text):
+        a, b = WEEKDAYS.index(m.group(1)), WEEKDAYS.index(m.group(2))
+        days.update((a + i) % 7 for i in range((b - a) % 7 + 1))
+    text = _DAY_RANGE.sub(" ", text)
+    days.update(WEEKDAYS.index(m.group(1)) for m in _DAY_NAME.finditer(text))
+    text = _DAY_NAME.sub(" ", text)
+    if re.search(r"\bweekdays?\b", text):
+        days.update(range(5))
+    if re.search(r"\bweekends?\b", text):
+        days.update((5, 6))
+
+    spans = []
+    for pattern, build in (
+        (_TIME_RANGE, lambda g: _range_minutes(*g)),
+        (_AFTER, lambda g: (_minutes(*g), CALLING_HOURS[1])),
+        (_BEFORE, lambda g: (CALLING_HOURS[0], _minutes(*g))),
+        (_AT, lambda g: _hour_from(_minutes(*g))),
+    ):
+        for m in pattern.finditer(text):
+            spans.append(build(m.groups()))
+        text = pattern.sub(" ", text)
+    spans += [span for word, span in DAY_PARTS.items() if re.search(r"\b" + word, text)]
+    if any(word in text for word in ANYTIME_WORDS):
+        spans.append(CALLING_HOURS)
+
+    clamped = sorted({(max(s, CALLING_HOURS[0]), min(e, CALLING_HOURS[1])) for s, e in spans
+                      if s is not None and e is not None})
+    clamped = [(s, e) for s, e in clamped if s < e]
+    return frozenset(days or range(7)), clamped or [CALLING_HOURS]
+
+
+def caller_timezone(phone, state):
+    # IANA name: the phone's area-code zone, else the incident state's
+    return phone_timezone(phone) or STATE_TIMEZONES.get(state, DEFAULT_TIMEZONE)
+
+
+def lead_timezone(lead):
+    return ZoneInfo(lead["timezone"])
+
+
+def next_contact(window, tz, after):
+    # First moment at or after `after` (aware) inside the window -> (opens, closes), both aware
+    days, spans = window
+    local = after.astimezone(tz)
+    for offset in range(8):
+        day = local.date() + timedelta(days=offset)
+        if day.weekday() not in days:
+            continue
+        for start, end in spans:
+            opens = datetime.combine(day, time(start // 60, start % 60), tzinfo=tz)
+            closes = datetime.combine(day, time(end // 60, end % 60), tzinfo=tz)
+            if closes > after:
+                return max(opens, local), closes
+    raise ValueError("Contact window has no open time.")  # unreachable: days and spans are never empty
+
+
+def _utc(moment):
+    # Naive times (intake_clock, engine dates) are the server's local time
+    return moment.astimezone(timezone.utc)
+
+
+def _naive(moment):
+    return moment.astimezone().replace(tzinfo=None) if moment.tzinfo else moment
+
+
+# =========================
+# LEADS
+# =========================
+def missing_evidence(receipt, gov_id):
+    return [label for label, have in (("receipt", receipt), ("gov ID", gov_id)) if not have]
+
+
+def make_lead(intake_id, created_at, payload, sol_end, file_by, missing):
+    # One archived intake -> lead dict; None when there's no number to call
+    phone = str(payload.get("Phone") or "").strip()
+    if not phone:
+        return None
+    best_time = str(payload.get("TriTen_BestTime") or payload.get("Wag_BestTime") or "").strip()
+    return {
+        "id": intake_id, "created_at": str(created_at or ""),
+        "name": payload.get("LegalName") or payload.get("FullName") or "", "phone": phone,
+        "state": payload.get("State") or "", "firm": payload.get("AssignedFirm") or "",
+        "timezone": caller_timezone(phone, payload.get("State")),
+        "best_time": best_time, "window": contact_window(best_time),
+        "sol_end": sol_end, "file_by": file_by, "missing": missing, "attempts": 0,
+    }
+
+
+def callback_priority(lead):
+    # Smaller calls first; fixed per lead, so heap order never goes stale
+    file_by = lead["file_by"]
+    return (file_by.toordinal() if file_by is not None else NO_DEADLINE, -len(lead["missing"]),
+            lead["created_at"], str(lead["id"]))
+
+
+def sol_passed(lead, now):
+    return lead["sol_end"] is not None and _naive(now) > lead["sol_end"]
+
+
+def archive_lead(intake_id, created_at, payload, now=None):
+    # Single intake (the app, on save); ValueError on a payload the engine can't read
+    from intake_service import intake_from_payload
+    from intake_graph import intake_record
+    from intake_eligibility import evaluate
+    now = _naive(now or intake_clock.now())
+    r = intake_record(intake_from_payload(payload), now.date())
+    v = evaluate(r, now)
+    missing = missing_evidence(r["receipt_email"] or r["receipt_pdf"] or r["any_pdf_uploaded"], r["gov_id"])
+    return make_lead(intake_id, created_at, payload, v["sol_end"], v["file_by_deadline"], missing)
+
+
+def archive_leads(store, now=None, since=None, chunk_rows=CALLBACK_CHUNK_ROWS):
+    # Every archived intake (saved on / after `since`) still inside its SOL, evaluated a chunk at
+    # a time with evaluate_frame; unreadable intakes are skipped
+    import pandas as pd
+    from intake_eligibility import evaluate_frame
+    from intake_timeline import payload_records
+    now = _naive(now or intake_clock.now())
+    where, args = ("WHERE created_at >= ?", (str(since),)) if since else ("", ())
+    rows = store.iter_records(where, args)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_rows))
+        if not chunk:
+            return
+        records, _ = payload_records([{**p, "id": intake_id} for intake_id, _, p in chunk], today=now.date())
+        if not len(records):
+            continue
+        out = evaluate_frame(records, now)
+        keep = (out["sol_end"].isna() | (out["sol_end"] >= pd.Timestamp(now))).to_numpy()
+        receipt = (records["receipt_email"] | records["receipt_pdf"] | records["any_pdf_uploaded"]).to_numpy(dtype=bool)
+        gov_id = records["gov_id"].to_numpy(dtype=bool)
+        sol_end = out["sol_end"].astype(object).where(out["sol_end"].notna(), None).tolist()
+        file_by = out["file_by_deadline"].astype(object).where(out["file_by_deadline"].notna(), None).tolist()
+        position = {intake_id: i for i, intake_id in enumerate(records.index)}
+        for intake_id, created_at, payload in chunk:
+            i = position.get(intake_id)
+            if i is None or not keep[i]:
+                continue
+            lead = make_lead(intake_id, created_at, payload, _py(sol_end[i]), _py(file_by[i]),
+                             missing_evidence(receipt[i], gov_id[i]))
+            if lead:
+                yield lead
+
+
+def _py(value):
+    return value.to_pydatetime() if hasattr(value, "to_pydatetime") else value
+
+
+# =========================
+# QUEUE
+# =========================
+class CallbackQueue:
+    # Shared by every session in the process; all methods take `now` (default: intake_clock)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._leads = {}       # id -> lead (queued only)
+        self._seq = {}         # id -> current heap entry number; older entries are stale
+        self._waiting = []     # (opens ts, seq, id)
+        self._ready = []       # (priority, seq, id)
+        self._claimed = {}     # id -> (lead, expires ts) handed out by pop_due, until done() / retry()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._leads)
+
+    def _schedule(self, lead, after):
+        # -> (seq, opens ts): the lead's next window at / after `after`; fills opens / closes
+        opens, closes = next_contact(lead["window"], lead_timezone(lead), after)
+        lead["opens"], lead["closes"] = opens, closes
+        seq = next(self._counter)
+        self._leads[lead["id"]] = lead
+        self._seq[lead["id"]] = seq
+        return seq, opens.timestamp()
+
+    def _live(self, entry):
+        return self._seq.get(entry[-1]) == entry[-2]
+
+    def push(self, lead, now=None, after=None):
+        # Adds or replaces a lead; False (and not queued) once its SOL has passed
+        now = now or intake_clock.now()
+        with self._lock:
+            self._claimed.pop(lead["id"], None)
+            if sol_passed(lead, now):
+                self._forget(lead["id"])
+                return False
+            seq, opens = self._schedule(lead, _utc(max(after, now) if after else now))
+            heapq.heappush(self._waiting, (opens, seq, lead["id"]))
+            return True
+
+    def rebuild(self, leads, now=None):
+        # Replaces the whole queue in O(n) (heapify); returns how many leads were queued
+        now = now or intake_clock.now()
+        at = _utc(now)
+        with self._lock:
+            self._clear()
+            for lead in leads:
+                if not sol_passed(lead, now):
+                    seq, opens = self._schedule(lead, at)
+                    self._waiting.append((opens, seq, lead["id"]))
+            heapq.heapify(self._waiting)
+            self._promote(at.timestamp())
+            return len(self._leads)
+
+    def _forget(self, lead_id):
+        self._leads.pop(lead_id, None)
+        self._seq.pop(lead_id, None)
+
+    def remove(self, lead_id):
+        with self._lock:
+            self._forget(lead_id)
+            self._claimed.pop(lead_id, None)
+
+    def _promote(self, ts):
+        # Expired claims go back to waiting (a scan: claims are a few batches per agent at most),
+        # then leads whose window has opened move to the ready heap
+        expired = [lead_id for lead_id, (_, expires) in self._claimed.items() if expires <= ts]
+        if expired:
+            at = datetime.fromtimestamp(ts, timezone.utc)
+            for lead_id in expired:
+                lead, _ = self._claimed.pop(lead_id)
+                seq, opens = self._schedule(lead, at)
+                heapq.heappush(self._waiting, (opens, seq, lead_id))
+        moved = []
+        while self._waiting and self._waiting[0][0] <= ts:
+            entry = heapq.heappop(self._waiting)
+            if self._live(entry):
+                moved.append((callback_priority(self._leads[entry[-1]]), entry[-2], entry[-1]))
+        if len(moved) > len(self._ready):
+            self._ready += moved
+            heapq.heapify(self._ready)  # bulk move (rebuild, start of the day): O(n) instead of n pushes
+        else:
+            for entry in moved:
+                heapq.heappush(self._ready, entry)
+
+    def pop_due(self, n=1, now=None):
+        # The n best leads callable right now. They leave the queue until done() / retry(), or
+        # for CALLBACK_CLAIM_TTL.
+        now = now or intake_clock.now()
+        at = _utc(now)
+        ts = at.timestamp()
+        expires = ts + CALLBACK_CLAIM_TTL.total_seconds()
+        out = []
+        with self._lock:
+            self._promote(ts)
+            while len(out) < n and self._ready:
+                entry = heapq.heappop(self._ready)
+                if not self._live(entry):
+                    continue
+                lead_id = entry[-1]
+                lead = self._leads[lead_id]
+                self._forget(lead_id)
+                if sol_passed(lead, now):
+                    continue
+                if lead["closes"] <= at:
+                    # Window closed while it waited behind better leads: back to its next window
+                    seq, opens = self._schedule(lead, at)
+                    heapq.heappush(self._waiting, (opens, seq, lead_id))
+                    continue
+                self._claimed[lead_id] = (lead, expires)
+                out.append(lead)
+        return out
+
+    def done(self, lead_id):
+        # Reached (or no longer needs a call): out of the queue for good, even if the claim had
+        # expired and the lead was requeued meanwhile
+        with self._lock:
+            lead, _ = self._claimed.pop(lead_id, (self._leads.get(lead_id), None))
+            self._forget(lead_id)
+            return lead
+
+    def retry(self, lead_id, now=None, after=CALLBACK_RETRY_AFTER):
+        # No answer: back in the queue at the first window `after` from now
+        now = now or intake_clock.now()
+        with self._lock:
+            lead, _ = self._claimed.pop(lead_id, (None, None))
+        if lead is None:
+            return False  # claim expired: already back in the queue
+        lead["attempts"] += 1
+        return self.push(lead, now, now + after)
+
+    def upcoming(self, limit=20, now=None):
+        # Queued leads by window opening then priority, without claiming them (supervisor view)
+        now = now or intake_clock.now()
+        with self._lock:
+            leads = list(self._leads.values())
+        return heapq.nsmallest(limit, leads, key=lambda lead: (max(lead["opens"], _utc(now)), callback_priority(lead)))
+
+
+def callback_row(lead, now=None):
+    # Display row: local time at the claimant, window, deadline and what to collect
+    local = _utc(now or intake_clock.now()).astimezone(lead_timezone(lead))
+    return {
+        "ID": lead["id"], "Name": lead["name"], "Phone": format_phone(lead["phone"]), "State": lead["state"],
+        "Local time": local.strftime("%a %I:%M %p"),
+        "Call by": lead["closes"].strftime("%a %I:%M %p"),
+        "Best time": lead["best_time"] or "—",
+        "File by": lead["file_by"].strftime("%Y-%m-%d") if lead["file_by"] else "No SOL",
+        "Missing": ", ".join(lead["missing"]) or "—", "Attempts": lead["attempts"], "Firm": lead["firm"],
+    }
+
+
+# =========================
+# CLI
+# =========================
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m intake_app callbacks",
+                                 description="Rebuild the callback queue from the archive and list the next due callbacks.")
+    ap.add_argument("archive", help="archive .sqlite3")
+    ap.add_argument("--next", type=int, default=20, help="how many due callbacks to list")
+    ap.add_argument("--now", help="as of this time (ISO, default: now)")
+    ap.add_argument("--since", help="only intakes saved on / after this date")
+    args = ap.parse_args(argv)
+    from time import perf_counter
+    from intake_store import IntakeStore
+    try:
+        now = intake_clock.parse_as_of(args.now) if args.now else intake_clock.now()
+        store = IntakeStore(args.archive)
+        try:
+            t0 = perf_counter()
+            queue = CallbackQueue()
+            queued = queue.rebuild(archive_leads(store, now, args.since), now)
+            built = perf_counter() - t0
+        finally:
+            store.close()
+    except (ValueError, OSError) as e:
+        ap.error(str(e))
+    t0 = perf_counter()
+    due = queue.pop_due(args.next, now=now)
+    popped = perf_counter() - t0
+    print(f"{queued:,} leads queued in {built:.2f}s; {len(due)} due now (popped in {popped * 1000:.2f} ms)")
+    for lead in due:
+        row = callback_row(lead, now)
+        print(f"  #{row['ID']:<8} {row['File by']:<10} {row['Local time']:<14} {row['Phone']:<16} "
+              f"{row['State']:<14} missing: {row['Missing']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
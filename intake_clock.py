@@ -0,0 +1,57 @@
+# Injectable clock for every "what time is it" a decision depends on (SOL still open, the form's
+# default dates, month-to-date routing).
+#
+# Everything reads now() instead of datetime.now(), so a process can be pinned to one moment
+# (INTAKE_AS_OF=2025-06-01T09:00 for a replay or a demo) and code can swap the clock with
+# set_clock() / as_of() (tests, "what was the decision on this date"). Functions that take a
+# `now` argument still prefer it; the clock is only their default.
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, time
+
+AS_OF_ENV = "INTAKE_AS_OF"
+
+
+def parse_as_of(value):
+    # datetime, date or ISO string -> datetime; a bare date means the start of that day
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time(0, 0))
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"As-of '{value}' is not a date / time (expected ISO format, e.g. 2025-06-01 or 2025-06-01T09:00).") from None
+
+
+def system_clock():
+    return datetime.now()
+
+
+def fixed_clock(at):
+    at = parse_as_of(at)
+    return lambda: at
+
+
+_clock = fixed_clock(os.environ[AS_OF_ENV]) if os.environ.get(AS_OF_ENV) else system_clock
+
+
+def now():
+    return _clock()
+
+
+def set_clock(clock):
+    # clock: zero-argument callable returning a datetime. Returns the previous clock.
+    global _clock
+    previous, _clock = _clock, clock
+    return previous
+
+
+@contextmanager
+def as_of(at):
+    # Process-wide: for one session's as-of view pass `now` explicitly instead
+    previous = set_clock(fixed_clock(at))
+    try:
+        yield
+    finally:
+        set_clock(previous)
@@ -0,0 +1,260 @@
+# Text the intake produces for the law firm: the statement-of-the-case elements, the law firm
+# note and the export payload.
+#
+# Every function takes one flat dict with the values the intake sections publish (see publish()
+# in intake_app) plus the derived eligibility values, so the UI, the benchmarks and batch tools
+# compose exactly the same text without Streamlit.
+from intake_rules import STATE_ALIAS, SA_EXT, fmt_date, fmt_dt, join_list
+from intake_firms import FIRMS, FIRMS_BY_NAME
+
+AGGRAVATOR_ACTS = ("Kidnapping Off-Route w/ Threats", "False Imprisonment w/ Threats")
+NOTE_DEFAULTS = {
+    "marketing_source_choice": "", "note_gdrive": "", "note_plaid_passed": False,
+    "id_type_used": "Driver's License", "note_receipt_pdf": False,
+}
+
+
+def firm_header_and_short(choice, custom):
+    # (note header, short firm name, full firm name) for the firm picked in "Assign Law Firm"
+    firm = FIRMS_BY_NAME.get(choice)
+    if firm:
+        return f"RIDESHARE {firm.short} | Retained", firm.short, firm.name
+    name = custom or "Other Firm"
+    return f"RIDESHARE {name} | Retained", name, name
+
+
+def selected_acts(act_flags):
+    acts = [k for k, v in act_flags.items() if v and k not in AGGRAVATOR_ACTS]
+    aggr = [k for k in AGGRAVATOR_ACTS if act_flags.get(k)]
+    return acts, aggr
+
+
+def _file_by_str(c):
+    if c["sol_years"] is None:
+        return "N/A (No SOL)"
+    return fmt_dt(c["file_by_deadline"]) if c["file_by_deadline"] else "—"
+
+
+# =========================
+# STATEMENT OF THE CASE
+# =========================
+def statement_of_case(c):
+    acts_selected, aggr_selected = selected_acts(c["act_flags"])
+    reported_to, report_dates = c["reported_to"], c["report_dates"]
+    incident_time = c["incident_time"]
+
+    line_items = []
+    def add_line(num, text): line_items.append(f"{num}. {text}")
+
+    add_line(1,  f"Caller Full / Legal: {c['caller_full_name'] or '—'} / {c['caller_legal_name'] or '—'}")
+    add_line(2,  f"Assigned Firm: {c['assigned_firm_name']}")
+    add_line(3,  f"Platform: {c['company']}")
+    add_line(4,  f"Receipt Evidence: {join_list(c['receipt_evidence'])} | Files: {', '.join(c['uploaded_names']) if c['uploaded_names'] else '—'}")
+    add_line(5,  f"Incident Date/Time: {(fmt_date(c['incident_date']) if c['incident_date'] else 'UNKNOWN')} {incident_time.strftime('%H:%M') if incident_time else ''}")
+    add_line(6,  f"Reported to: {', '.join(reported_to) if reported_to else '—'} | Dates: {', '.join([f'{k}: {fmt_date(v)}' for k,v in report_dates.items()]) if report_dates else '—'}")
+    if "Friend or Family Member" in reported_to:
+        add_line(6.1, f"Family/Friend Contact: {(c['fam_first'] or '—')} {(c['fam_last'] or '')} | Phone: {c['fam_phone'] or '—'}")
+    if "Physician" in reported_to:
+        add_line(6.2, f"Physician: {c['phys_name'] or '—'} | Clinic/Hospital: {c['phys_fac'] or '—'} | Address: {c['phys_addr'] or '—'}")
+    if "Therapist" in reported_to:
+        add_line(6.3, f"Therapist: {c['ther_name'] or '—'} | Clinic/Hospital: {c['ther_fac'] or '—'} | Address: {c['ther_addr'] or '—'}")
+    if "Police Department" in reported_to:
+        add_line(6.4, f"Police Station: {c['police_station'] or '—'} | Address: {c['police_addr'] or '—'}")
+    if "Rideshare Company" in reported_to:
+        add_line(6.5, f"Rideshare Company (reported): {c['rep_rs_company'] or '—'}")
+    add_line(7,  f"Where it happened (scope): {c['scope_choice']}")
+    add_line(8,  f"Pickup → Drop-off: {c['pickup'] or '—'} → {c['dropoff'] or '—'} | State: {c['state']}")
+    add_line(9,  f"Injuries — Physical: {'Yes' if c['injury_physical'] else 'No'}, Emotional: {'Yes' if c['injury_emotional'] else 'No'} | Details: {c['injuries_summary'] or '—'}")
+    add_line(10, f"Provider: {c['provider_name'] or '—'} | Facility: {c['provider_facility'] or '—'} | First visit: {fmt_date(c['first_visit']) if c['first_visit'] else '—'} | Last visit: {fmt_date(c['last_visit']) if c['last_visit'] else '—'}")
+    add_line(11, f"Medication: {c['medication_name'] or '—'} | Pharmacy: {c['pharmacy_name'] or '—'}")
+    add_line(12, f"Submission: {c['rs_submit_how'] or '—'} | Company responded: {'Yes' if c['rs_received_response'] else 'No'} | Detail: {c['rs_response_detail'] or '—'}")
+    add_line(13, f"Phone / Email: {c['caller_phone'] or '—'} / {c['caller_email'] or '—'}")
+    add_line(14, f"Screen — Gov ID: {'Yes' if c['gov_id'] else 'No'} | Female: {'Yes' if c['female_rider'] else 'No'} | Rider (not driver): {'Yes' if c['rider_not_driver'] else 'No'} | Felony: {'Yes' if c['felony'] else 'No'} | Has Atty: {'Yes' if c['has_atty'] else 'No'} | SSN captured: {'Yes' if c['full_ssn_on_file'] or c['ssn_last4'] else 'No'}")
+    add_line(15, f"Acts selected: {join_list(acts_selected)} | Aggravators: {join_list(aggr_selected)} | Verbal only: {'Yes' if c['verbal_only'] else 'No'} | Attempt only: {'Yes' if c['attempt_only'] else 'No'}")
+    add_line(16, f"Driver weapon/force: {c['driver_weapon_used']}{(' — ' + c['driver_weapon_detail']) if c['driver_weapon_detail'] else ''} | Victim weapon: {c['victim_weapon']}{(' — ' + c['non_lethal_choice']) if (c['victim_weapon']=='Yes' and c['non_lethal_choice']) else ''}")
+    add_line(17, f"Tier: {c['tier_label']}")
+    add_line(18, f"SOL rule applied: {c['sol_rule_text']} | SOL end: {('No SOL' if c['sol_years'] is None else fmt_dt(c['sol_end']))} | File-by (SOL−45d): {_file_by_str(c)}")
+    if c["earliest_report_date"] is not None:
+        add_line(19, f"Earliest report: {fmt_date(c['earliest_report_date'])} via {', '.join(c['earliest_channels']) if c['earliest_channels'] else '—'} (Δ = {c['delta_days']} day[s])")
+    else:
+        add_line(19, "Earliest report: —")
+    for num, firm in enumerate(FIRMS, start=20):
+        add_line(num, f"{firm.label} Eligibility: {'Eligible' if c[f'{firm.key}_ok'] else 'Not Eligible'}")
+
+    return "\n".join([str(x) for x in line_items])
+
+
+# =========================
+# LAW FIRM NOTE
+# =========================
+def tier_case(tier_label, base_disqualifier):
+    if (not base_disqualifier) and tier_label.startswith("Tier 1"):
+        return "1 Case"
+    if (not base_disqualifier) and tier_label.startswith("Tier 2"):
+        return "2 Case"
+    return "Unclear"
+
+
+def lawfirm_note(c, created):
+    # created: the intake date shown as "Date Created"
+    c = {**NOTE_DEFAULTS, **c}
+    reported_to, report_dates = c["reported_to"], c["report_dates"]
+    receipt_evidence = c["receipt_evidence"]
+    created_str = created.strftime("%B %d, %Y")
+    company_upper = (c["company"] or "").upper()
+    tier_case_str = tier_case(c["tier_label"], c["base_disqualifier"])
+
+    show_company_for_note = "UBER" if company_upper == "UBER" else ("LYFT" if company_upper == "LYFT" else company_upper or "")
+
+    # Map receipt selection into a compact suffix
+    evidence_suffix = ""
+    if c["note_receipt_pdf"]:
+        has_pdf = ("PDF" in receipt_evidence) or c["any_pdf_uploaded"]
+        has_ss  = any("Screenshot" in x for x in receipt_evidence)
+        if has_pdf and has_ss:
+            evidence_suffix = " — PDF Receipt and screenshot"
+        elif has_pdf:
+            evidence_suffix = " — PDF Receipt"
+        elif has_ss:
+            evidence_suffix = " — Screenshot"
+
+    # Reporting details to reflect in notes
+    reporting_details = []
+    if reported_to:
+        reporting_details.append("Reported To/When:")
+        if "Rideshare Company" in reported_to:
+            reporting_details.append(f"- Rideshare company: {fmt_date(report_dates.get('Rideshare company'))} ({c['rep_rs_company'] or '—'})")
+        if "Police Department" in reported_to:
+            reporting_details.append(f"- Police: {fmt_date(report_dates.get('Police'))} — {c['police_station'] or '—'}, {c['police_addr'] or '—'}")
+        if "Therapist" in reported_to:
+            reporting_details.append(f"- Therapist: {fmt_date(report_dates.get('Therapist'))} — {c['ther_name'] or '—'}, {c['ther_fac'] or '—'}, {c['ther_addr'] or '—'}")
+        if "Physician" in reported_to:
+            reporting_details.append(f"- Physician: {fmt_date(report_dates.get('Physician'))} — {c['phys_name'] or '—'}, {c['phys_fac'] or '—'}, {c['phys_addr'] or '—'}")
+        if "Friend or Family Member" in reported_to:
+            reporting_details.append(f"- Family/Friend: {fmt_dt(c['family_report_dt']) if c['family_report_dt'] else '—'} — {c['fam_first'] or '—'} {c['fam_last'] or ''} ({c['fam_phone'] or '—'})")
+    reporting_text = "\n".join(reporting_details) if reporting_details else ""
+
+    # Build note (include Full Legal Name line above Rideshare)
+    note_lines = [
+        f"{c['note_header']}:",
+        f"Full Legal Name: {c['caller_legal_name'] or ''}",
+        f"Rideshare: {show_company_for_note}",
+        f"Tier: {tier_case_str}",
+        f"Source: {c['marketing_source_choice']}",
+        f"Date Created: {created_str}",
+    ]
+    if c["full_ssn_on_file"]:
+        note_lines.append("Full SSN: Yes")
+    else:
+        note_lines.append("Full SSN: No")
+
+    # Platform-specific receipt reflection
+    if c["note_receipt_pdf"] and show_company_for_note in ("UBER","LYFT"):
+        note_lines.append(f"{show_company_for_note}{evidence_suffix}")
+    elif c["note_receipt_pdf"]:
+        note_lines.append(f"Rideshare{evidence_suffix}")
+
+    note_lines.append(f"ID Provided (PLAID): {c['id_type_used']}")
+    note_lines.append(f"PLAID: {'Passed' if c['note_plaid_passed'] else 'Not Passed'}")
+
+    # Also include contact lines beneath if you still want them shown to staff
+    note_lines.append(f"Phone number: {c['caller_phone'] or ''}")
+    note_lines.append(f"Email: {c['caller_email'] or ''}")
+
+    if c["note_gdrive"]:
+        note_lines.append(f"Gdrive: {c['note_gdrive']}")
+
+    if reporting_text:
+        note_lines.append("\n" + reporting_text)
+
+    if c["prior_firm_any"]:
+        note_lines.append(f"Prior firm signed/disqualified: YES{(' — ' + c['prior_firm_note']) if c['prior_firm_note'] else ''}")
+
+    return "\n".join(note_lines)
+
+
+# =========================
+# EXPORT PAYLOAD
+# =========================
+def export_payload(c):
+    # The firm-specific retainer fields (Wag_* / TriTen_*) are added by the caller
+    report_dates, earliest_report_date = c["report_dates"], c["earliest_report_date"]
+    acts_selected, aggr_selected = selected_acts(c["act_flags"])
+    sol_years, delta_days = c["sol_years"], c["delta_days"]
+
+    earliest_channels = []
+    if earliest_report_date:
+        for k, v in report_dates.items():
+            if v == earliest_report_date:
+                earliest_channels.append(k)
+    earliest_channels_str = ", ".join(earliest_channels) if earliest_channels else ""
+
+    return {
+        # Assignment
+        "AssignedFirm": c["assigned_firm_name"],
+        "AssignedFirmShort": c["firm_short"],
+        "LawFirmNoteHeader": c["note_header"],
+        # Caller
+        "FullName": c["caller_full_name"],
+        "LegalName": c["caller_legal_name"],
+        "ConsentRecording": c["consent_recording"],
+        "Phone": c["caller_phone"],
+        "Email": c["caller_email"],
+        # Prior firm info
+        "PriorFirmSigned": c["prior_firm_any"],
+        "PriorFirmNote": c["prior_firm_note"],
+        # Ride
+        "Company": c["company"], "Pickup": c["pickup"], "Dropoff": c["dropoff"], "State": c["state"],
+        "IncidentDate": fmt_date(c["incident_date"]) if c["incident_date"] else "UNKNOWN",
+        "IncidentTime": c["incident_time"].strftime("%H:%M"),
+        # Evidence
+        "ReceiptEvidence": ", ".join(c["receipt_evidence"]) if c["receipt_evidence"] else "",
+        "UploadedFiles": ", ".join(c["uploaded_names"]) if c["uploaded_names"] else "",
+        "AnyPDFUploaded": c["any_pdf_uploaded"],
+        "AnyAudioVideoUploaded": c["any_av_uploaded"],
+        # Reporting
+        "ReportedTo": ", ".join(c["reported_to"]) if c["reported_to"] else "",
+        "ReportDates": "; ".join([f"{k}: {fmt_date(v)}" for k, v in report_dates.items()]) if report_dates else "",
+        "FamilyReportDateTime": (fmt_dt(c["family_report_dt"]) if c["family_report_dt"] else "—"),
+        "FamilyFirstName": c["fam_first"], "FamilyLastName": c["fam_last"], "FamilyPhone": c["fam_phone"],
+        "PhysicianName": c["phys_name"], "PhysicianClinicHospital": c["phys_fac"], "PhysicianAddress": c["phys_addr"],
+        "TherapistName": c["ther_name"], "TherapistClinicHospital": c["ther_fac"], "TherapistAddress": c["ther_addr"],
+        "PoliceStation": c["police_station"], "PoliceAddress": c["police_addr"],
+        "ReportedRideshareCompany": c["rep_rs_company"],
+        # Submission/response
+        "SubmittedHow": c["rs_submit_how"], "CompanyResponded": c["rs_received_response"], "CompanyResponseDetail": c["rs_response_detail"],
+        # Health
+        "InjuryPhysical": c["injury_physical"], "InjuryEmotional": c["injury_emotional"], "InjuriesSummary": c["injuries_summary"],
+        "ProviderName": c["provider_name"], "ProviderFacility": c["provider_facility"],
+        "FirstVisit": fmt_date(c["first_visit"]) if c["first_visit"] else "—",
+        "LastVisit": fmt_date(c["last_visit"]) if c["last_visit"] else "—",
+        # Weapons
+        "DriverWeaponUsed": (c["driver_weapon_used"] == "Yes"),
+        "DriverWeaponDetail": c["driver_weapon_detail"],
+        "VictimWeapon": c["victim_weapon"],
+        "NonLethalChoice": c["non_lethal_choice"],
+        # Identity
+        "FullSSN": c["full_ssn"], "SSN_Last4": c["ssn_last4"], "FullSSN_OnFile": c["full_ssn_on_file"],
+        # Screening
+        "GovIDProvided": c["gov_id"], "FemaleRider": c["female_rider"], "RiderNotDriver": c["rider_not_driver"], "HasAttorney": c["has_atty"], "Felony": c["felony"],
+        "VerbalOnly": c["verbal_only"], "AttemptOnly": c["attempt_only"],
+        # Acts
+        "Acts_RapePenetration": c["rape"], "Acts_ForcedOralForcedTouch": c["forced_oral"], "Acts_TouchingKissing": c["touching"],
+        "Acts_Exposure": c["exposure"], "Acts_Masturbation": c["masturb"], "Agg_Kidnap": c["kidnap"], "Agg_Imprison": c["imprison"],
+        "Acts_Selected": ", ".join(acts_selected) if acts_selected else "", "Aggravators_Selected": ", ".join(aggr_selected) if aggr_selected else "",
+        # SOL
+        "SA_Category": c["category"] or "—", "SA_Extension_Used": (STATE_ALIAS.get(c["state"], c["state"]) in SA_EXT) and bool(c["category"]),
+        "SOL_Rule_Text": c["sol_rule_text"], "SOL_Years": ("No SOL" if sol_years is None else sol_years),
+        "SOL_End": ("No SOL" if sol_years is None else fmt_dt(c["sol_end"])), "FileBy": ("N/A (No SOL)" if sol_years is None else fmt_dt(c["file_by_deadline"])),
+        "Earliest_Report_Date": (fmt_date(earliest_report_date) if earliest_report_date else "—"),
+        "Earliest_Report_Channels": earliest_channels_str, "Earliest_Is_Family": c["earliest_is_family"],
+        "Earliest_Report_DeltaDays": (None if earliest_report_date is None else int(delta_days if delta_days is not None else -9999)),
+        # Eligibility
+        **{f"Eligibility_{firm.label}": "Eligible" if c[f"{firm.key}_ok"] else "Not Eligible" for firm in FIRMS},
+        **{f"{firm.label}_Reasons": "; ".join(c[f"{firm.key}_reasons"]) for firm in FIRMS},
+        # Notes & Marketing
+        "MarketingSource": c["marketing_source_choice"],
+        "LawFirmNote": c["lawfirm_note"],
+        # Statement-of-case text
+        "Elements_Report": c["elements"].strip()
+    }
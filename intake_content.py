@@ -0,0 +1,199 @@
+# Static UI content: page styles, form option lists and the objection / reference scripts.
+#
+# Module level so each table is built once per server process instead of on every script rerun.
+
+# =========================
+# PAGE STYLES
+# =========================
+APP_CSS = """
+<style>
+h1 {font-size: 2.0rem !important;}
+h2 {font-size: 1.5rem !important; margin-top: 0.6rem;}
+.section {padding: 0.5rem 0 0.25rem 0;}
+.badge-ok   {background:#16a34a; color:white; padding:10px 14px; border-radius:10px; font-size:18px; text-align:center;}
+.badge-no   {background:#dc2626; color:white; padding:10px 14px; border-radius:10px; font-size:18px; text-align:center;}
+.badge-note {background:#1f2937; color:#f9fafb; padding:6px 10px; border-radius:10px; font-size:13px; display:inline-block; margin-bottom:4px;}
+.note-muted {border:1px dashed #d1d5db; border-radius:8px; padding:10px 12px; margin:8px 0; background:#f9fafb; color:#374151;}
+.script {border-left:4px solid #9ca3af; background:#f3f4f6; color:#111827; padding:12px 14px; border-radius:8px; margin:8px 0 12px 0; font-size:0.97rem; white-space:pre-wrap;}
+.callout {border-left:6px solid #2563eb; background:#eef2ff; color:#1e3a8a; padding:12px 14px; border-radius:12px; margin:8px 0 12px 0;}
+.small {font-size: 0.9rem; color:#4b5563;}
+hr {border:0; border-top:1px solid #e5e7eb; margin:12px 0;}
+[data-testid="stDataFrame"] div, [data-testid="stTable"] div {font-size: 1rem;}
+.copy {font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace; white-space:pre-wrap;}
+.kv {font-family: ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace; white-space:pre-wrap;}
+.level-legend {display:flex; gap:8px; align-items:center; margin:6px 0 10px 0;}
+.level-pill {padding:6px 10px; border-radius:12px; color:#111827; font-weight:600; border:1px solid #d1d5db;}
+.l-yellow {background:#fef9c3;}   /* Yellow */
+.l-orange {background:#ffedd5;}   /* Orange */
+.l-lgreen {background:#dcfce7;}   /* Light Green */
+.l-green  {background:#bbf7d0;}   /* Green */
+
+fieldset {border:1px dashed #d1d5db; padding:10px 12px; border-radius:8px;}
+legend {font-weight:600; color:#111827;}
+</style>
+"""
+
+# =========================
+# FORM OPTIONS
+# =========================
+STATE_LIST_FORM = [
+    "Alabama","Alaska","Arizona","Arkansas","California","Colorado","Connecticut","Delaware","Florida","Georgia","Hawaii",
+    "Idaho","Illinois","Indiana","Iowa","Kansas","Kentucky","Louisiana","Maine","Maryland","Massachusetts","Michigan",
+    "Minnesota","Mississippi","Missouri","Montana","Nebraska","Nevada","New Hampshire","New Jersey","New Mexico","New York",
+    "North Carolina","North Dakota","Ohio","Oklahoma","Oregon","Pennsylvania","Rhode Island","South Carolina","South Dakota",
+    "Tennessee","Texas","Utah","Vermont","Virginia","Washington","Washington DC","West Virginia","Wisconsin","Wyoming","Puerto Rico"
+]
+
+# Marketing sources
+MARKETING_SOURCES = [
+    "Client Referral","DMEI","DMEI Rideshare","Facebook","FB Rideshare","FB Rideshare Assault",
+    "FB RS Lawsuit","Main Office Line","Web Form Submission","Website Phone Call"
+]
+
+# =========================
+# OBJECTION SCRIPTS / REFERENCES
+# =========================
+OBJECTION_SCRIPTS = {
+    "Incident Not Qualified":
+        "I apologize, but the incident does not meet our firm's criteria. If that changes in the future, we'll contact you. "
+        "In the meantime, please consider reaching out to other law firms.",
+    "How much is the settlement":
+        "I don't want to misinform you, as it really depends on the specifics of your case and the trauma involved. "
+        "Factors like the incident and extent of damage are crucial. For example, in December 2022, the California Public Utilities "
+        "Commission approved a $9 million settlement with Uber for not properly documenting and reporting sexual assault incidents.",
+    "How much will the law firm charge me":
+        "The standard fee is 40%, typical for law firms due to the risks involved. Our experienced lawyers can help you secure a larger "
+        "settlement faster, and we’ll hire an expert witness to connect your health issues to your rideshare sexual assault case. "
+        "You won’t pay anything upfront—we’ll handle your medical records and evidence gathering. "
+        "Choosing a firm with seasoned professionals is crucial for achieving the best settlement. If we prove a link but don’t secure a settlement "
+        "(which is rare), you won't owe anything.",
+    "PC Disagreement Over 40% Fee":
+        "I respect your decision, but the standard fee is 40%. Other firms may not charge less due to the uncertainty of securing a settlement. "
+        "With our superlawyers and an expert witness, we’ll link your health issues to the rideshare sexual assault incident. You’re paying for convenience—"
+        "there’s no need to gather records or go to court. If you proceed today, we can help with no upfront payment.",
+    "Asking ID and other evidences":
+        "To qualify for a settlement, it's crucial to retrieve your medical records. This ensures the funds go to the right person, protecting your benefits "
+        "and strengthening your case. Please provide a copy of your government-issued ID and a selfie for verification. Additionally, any records, photos, "
+        "or medication bottles as proof would be valuable. Your evidence is essential for us to help you effectively.",
+    "Asking SSN":
+        "The hospital must ensure they send the correct information. For legal purposes and proper documentation, we need your full name, address, date of birth, "
+        "and Social Security number. I understand your concerns about sharing your Social Security number, but it’s essential for protecting your identity and ensuring "
+        "that any settlement goes to the right person. This helps prevent relatives from falsely claiming the settlement and avoids potential financial issues. "
+        "Your cooperation is vital for a smooth legal process.",
+    "Asking last 4 digits - SSN":
+        "Can I get the last four digits of your Social Security number for the HIPAA Release Form, which confirms your consent to release your medical records, "
+        "and rest assured, they will remain private and confidential since law firms don’t file them and can be sanctioned if they do.",
+    "I did not submit my information":
+        "You probably filled out a survey or form online. If you or a loved one were involved in a rideshare sexual assault incident, we can connect you with top attorneys "
+        "who are Super Lawyers. I'm here to help you pursue a settlement, and your case is important to us.",
+    "Where are you from":
+        "I'm calling from Dallas, Texas, representing the Advocate Rights Center, an intake center for ______ Law Firm. "
+        "We assist clients in pursuing settlements related to rideshare sexual assault incidents.",
+    "Scam Suspicions":
+        "I understand your concern, but I won’t need your financial information or bank details. I only require your basic information to pursue your claim. "
+        "Providing this information allows us to obtain essential records, like medical records and proof of injury, which are crucial for filing your claim and securing a settlement. "
+        "Your cooperation is vital for building a strong case.",
+    "Multi-District Litigation (MDL) vs. Class Action":
+        "In multi-district litigation (MDL), settlements are based on each individual impact of their injuries from a rideshare sexual assault, ensuring fair compensation. "
+        "On the other hand, class action lawsuits split settlements equally among all members, regardless of how much each person was affected.",
+    "Class Action Clarification":
+        "This isn't like a Class Action. Because each injury is different, the compensation is customized to match exactly what happened to you.",
+    "I Need a Local Law Firm":
+        "Claims about rideshare sexual assault incidents are now consolidated in the U.S. District Court for the Northern District of California under Judge Charles Breyer (MDL No. 3084). "
+        "You don’t need an attorney licensed in your state anymore, making the process faster and outcomes more predictable. You can choose the law firm you prefer. "
+        "We work with ______ Law, which has won hundreds of millions in liability settlements.",
+    "What kind of claim is this?":
+        "These are personal injury claims against the rideshare company for harm caused by incidents involving sexual assault. "
+        "Victims have suffered injuries resulting in pain, suffering, and long-term trauma. The rideshare company is primarily responsible due to negligence in failing to properly screen drivers.",
+    "Are settlements taxable?":
+        "I'm not a tax expert and can't provide tax advice, but generally, settlements for personal injury or emotional/psychological damage (pain and suffering) are non-taxable. "
+        "However, I can't confirm this definitively.",
+    "What happens if I die?":
+        "After you file the claim, the law firm will update it to name a new plaintiff, usually the estate administrator, since you can't represent yourself if you pass away. "
+        "It's a good idea to create a will to ensure your assets go to your heirs as you want; otherwise, state laws will apply. "
+        "A case manager will reach out after you sign the forms to verify your information and guide you through the process.",
+    "Reasons for Using Plaid":
+        "1) Verification: It helps confirm your identity and prevents impersonation, saving the law firm time and money on false claims.\n"
+        "2) Medical Records: Your government ID allows us to obtain medical records while following privacy laws (HIPAA).\n"
+        "3) Settlement Accuracy: We ensure settlement funds go to the right person and don’t ask for banking details until the law firm confirms the settlement.\n\n"
+        "These steps are important for protecting your case and ensuring everything runs smoothly.",
+    "Using Plaid: Quick Directions (verbal)":
+        "To use Plaid, click the link, and you'll be taken to their platform. Here’s what to do:\n\n"
+        "1. Enter the last four digits of your SSN.\n"
+        "2. Allow access to your camera to take photos of the front and back of your driver’s license.\n"
+        "3. Then, take a selfie by holding your phone up for about 10 seconds.\n"
+        "This process matches your selfie with your driver’s license to confirm your identity.",
+    "Has Attorney":
+        "To avoid double representation issues, please ensure you don't have another attorney for your rideshare sexual assault case. "
+        "If you do, we cannot assist you to protect your interests.",
+    "Unanswered Client Callback Script":
+        "The law firm has been trying to reach you to verify a few things. They might check in occasionally about your condition, "
+        "especially since complications can affect your settlement.\n\n"
+        "You can call them at (Number of Lawfirm). They might give you another number for direct contact with an attorney or paralegal, "
+        "but this number will connect you to their office.\n\n"
+        "Optional: If you can, let them know you have their number and will answer future calls. This builds trust and shows you’re engaged, "
+        "which is important since they will invest time and resources in your case.",
+    "RSA District Court?":
+        "Claims about rideshare sexual assault incidents are now consolidated in the U.S. District Court for the Northern District of California under Judge Charles Breyer (MDL No. 3084).",
+    "Rideshare Companies in Litigation":
+        "Uber, Lyft, Via, Ola, Grab, Didi Chuxing, Bolt, Gett",
+    "Settlement Claims in Rideshare Assault":
+        "• Medical Expenses: Treatment and rehabilitation costs.\n"
+        "• Emotional Distress: Compensation for psychological trauma.\n"
+        "• Lost Wages: Income loss due to inability to work.\n"
+        "• Punitive Damages: Penalties to deter misconduct.\n"
+        "• Legal Fees: Reimbursement for attorney costs.\n"
+        "• Pain and Suffering: Compensation for physical and emotional pain.\n"
+        "• Future Medical Costs: Estimated ongoing treatment expenses.\n"
+        "• Loss of Enjoyment: Diminished quality of life.\n"
+        "• Property Damage: Reimbursement for damaged personal items.\n"
+        "• Loss of Consortium: Claims for loss of companionship.",
+    "Medical Office Three-Way Call":
+        "We can do a three-way call with the medical office to confirm your injury. We'll ask them when you were last seen for your condition. "
+        "With your permission, we can record the call and send it to the law firm. They just need proof that you’re a genuine claimant. "
+        "This isn’t for evidence—your medical records will handle that—but to show that investing time and money in your case is worthwhile. "
+        "They want to avoid claims that look like a lottery ticket. They aren’t asking for guarantees.",
+    "Wagstaff Law Information":
+        "Wagstaff Lawfirm\n940 Lincoln St, Denver, CO 80203\n303-376-6360\nhttps://www.wagstafflawfirm.com/\n\n"
+        "About Us\nWagstaff Law Firm: National Mass Tort Attorneys with 40 years of experience. We offer a personal approach to help victims recover and hold negligent "
+        "parties accountable for maximum compensation. Contact us at (972) 573-6040 or visit https://www.wagstafflawfirm.com/",
+    "Instructions for Resending Rideshare Receipts":
+        "Uber: Go to the Activity tab, select the ride, click the Receipt icon, and then choose resend email.\n\n"
+        "Lyft: Open Lyft app > Ride history > Tap the ride > Scroll down > Tap 'Resend receipt' > Enter your email to send",
+    "How to Report an Assault to Uber/Lyft (link)":
+        "https://docs.google.com/document/d/1Oiljbf3oHqtoKDv2jArsXMIVw5hhuNrRiZ1MDl0aoqo/edit?usp=sharing",
+    "Script for Irate Callers (link)":
+        "https://docs.google.com/document/d/1wlQurtqG_0tVIUhBfHXL2R8fF58i8s64/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
+    "Responding to Law Firm (link)":
+        "https://docs.google.com/document/d/1BNJoF14vqEkH2WojUC_H7AsWUmu-ZC1NVmvO0J_GN9Q/edit?usp=sharing",
+    "Using Plaid: Quick Directions (doc link)":
+        "https://docs.google.com/document/d/1P_jodMzz-2vc0vQsDbgCimCBDGDHyuNaFqyE7KmbO5Y/edit?usp=sharing",
+    "ID and Proof Retrieval Script (link)":
+        "https://docs.google.com/document/d/1DTcBIWg4NJfEgETe4bwagbz4refPSyoP/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
+    "Mailer – Commitment Script (link)":
+        "https://docs.google.com/document/d/1VMxf5JcVIFN2ABXmkLHKdkvYJ6tfmSmIp0jlMrh7glE/edit?usp=sharing",
+    "Esign Guide Text (link)":
+        "https://docs.google.com/document/d/1e6sGJB8wRPwa2_sBEvLbDl4wUM4TsS8f46agwNWvIRE/edit?usp=sharing",
+    "Esign Guide Email (link)":
+        "https://docs.google.com/document/d/1zVTewqs7jtAB_yL0cdz8vz_8o-IfgoYVhj4KPNNG9M8/edit?usp=sharing",
+    "Identity Verification Links (site)":
+        "https://besthistorysites.net/",
+    "PLAID Link":
+        "https://advocaterightscenter.com/plaid_verification/",
+    "How to Send Plaid Link to Clients (link)":
+        "https://docs.google.com/document/d/1huakazfAU_-P3PORmcP5DLrdIn_pHRzGNjjdjnOWwVw/edit?usp=sharing",
+    "How to Guide Clients in Plaid Text (link)":
+        "https://docs.google.com/document/d/19Uj2gXI1WKOlnaVprvryvYipOgMAAum2gR4uDsMJ7B8/edit?usp=sharing",
+    "SOP for Plaid (link)":
+        "https://docs.google.com/document/d/1Rc_C3mqQ21CdpfbHAXzqDNernl32Jr-2/edit",
+    "Call Transfers with C9 and Law Ruler (link)":
+        "https://docs.google.com/document/d/1powoAbPlhqVV3q54ZlgFIZml70Iudrzh/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
+    "RSA - Objection Script (link)":
+        "https://docs.google.com/document/d/14fYJyeWYuuIbQmwrzGMCkuvnVoIwqrKy/edit?usp=sharing&ouid=116486877893425072265&rtpof=true&sd=true",
+    "Rideshare Waggy (SMS templates)":
+        "Lorenia: 213-347-9246\n"
+        "• We received your signed docs for your Rideshare Assault Claim. A paralegal from Wagstaff will call from 213-347-9246 within 5-10 business days.\n"
+        "• Hi Monica, the paralegal for your Rideshare Assault Claim is trying to reach you. Call her at 213-347-9246 to reconfirm your details."
+}
+
+OBJECTION_TOPICS = sorted(OBJECTION_SCRIPTS)
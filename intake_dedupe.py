@@ -0,0 +1,220 @@
+# Duplicate-lead detection on normalized phone / email / legal name.
+#
+# Identifiers are normalized (phones to E.164, by intake_phones) and hashed to 64-bit keys
+# (pandas' hash_array, so the single-lead and batch paths agree). DuplicateIndex answers "have we
+# seen this caller?" with dict lookups plus a fuzzy name pass restricted to one small block (first
+# initial + last-name prefix).
+# dedupe_frame clusters a whole lead file in one pass with vectorized normalization and a
+# union-find over the key columns.
+import re
+import threading
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+from intake_phones import e164, phone_key_column
+from intake_rules import split_legal_name
+
+FUZZY_NAME_THRESHOLD = 0.88
+NAME_BLOCK_PREFIX = 3
+_NON_ALPHA = re.compile(r"[^a-z]")
+
+
+# =========================
+# NORMALIZATION
+# =========================
+def norm_phone(phone):
+    # E.164; numbers that can't be dialled ("555-555-5555", 7 digits) never link leads
+    return e164(phone)
+
+
+def norm_email(email):
+    email = str(email or "").strip().lower()
+    if "@" not in email:
+        return ""
+    local, domain = email.rsplit("@", 1)
+    local = local.split("+", 1)[0]
+    if domain in ("gmail.com", "googlemail.com"):
+        local, domain = local.replace(".", ""), "gmail.com"
+    return f"{local}@{domain}"
+
+
+def _name_token(part):
+    return _NON_ALPHA.sub("", part.lower())
+
+
+def norm_name(legal_name):
+    # (first, last) as split_legal_name sees them; middle names are ignored for matching
+    first, _middle, last = split_legal_name(str(legal_name or ""))
+    return _name_token(first), _name_token(last)
+
+
+def name_block(first, last):
+    return f"{first[:1]}|{last[:NAME_BLOCK_PREFIX]}" if first and last else ""
+
+
+def hash_keys(kind, values):
+    # kind-prefixed so a phone can never collide with an email of the same text; "" -> 0 (no key)
+    values = np.asarray(values, dtype=object)
+    hashed = pd.util.hash_array(np.array([f"{kind}:{v}" for v in values], dtype=object))
+    hashed[values == ""] = 0
+    return hashed
+
+
+def lead_keys(phones=(), emails=(), legal_name=""):
+    first, last = norm_name(legal_name)
+    phones = [p for p in (norm_phone(p) for p in phones) if p]
+    emails = [e for e in (norm_email(e) for e in emails) if e]
+    return {
+        "phone": [int(h) for h in hash_keys("phone", phones)] if phones else [],
+        "email": [int(h) for h in hash_keys("email", emails)] if emails else [],
+        "name": int(hash_keys("name", [f"{first} {last}"])[0]) if first and last else 0,
+        "block": name_block(first, last),
+        "full_name": f"{first} {last}" if first and last else "",
+    }
+
+
+# =========================
+# INTERACTIVE INDEX
+# =========================
+class DuplicateIndex:
+    def __init__(self):
+        self.by_phone = {}
+        self.by_email = {}
+        self.by_name = {}
+        self.blocks = {}      # block -> list of (intake_id, "first last")
+        self.labels = {}      # intake_id -> short description for the warning
+        self.keys = {}        # intake_id -> its keys, so a re-saved intake drops the old ones
+        self.last_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, intake_id, phones=(), emails=(), legal_name="", label=""):
+        # Adds an intake, or replaces what was indexed for it under the same id
+        keys = lead_keys(phones, emails, legal_name)
+        with self._lock:
+            self._drop(intake_id)
+            self.keys[intake_id] = keys
+            for h in keys["phone"]:
+                self.by_phone.setdefault(h, set()).add(intake_id)
+            for h in keys["email"]:
+                self.by_email.setdefault(h, set()).add(intake_id)
+            if keys["name"]:
+                self.by_name.setdefault(keys["name"], set()).add(intake_id)
+                self.blocks.setdefault(keys["block"], []).append((intake_id, keys["full_name"]))
+            self.labels[intake_id] = label
+            self.last_id = max(self.last_id, intake_id)
+
+    def _drop(self, intake_id):
+        old = self.keys.pop(intake_id, None)
+        if old is None:
+            return
+        for index, hashes in ((self.by_phone, old["phone"]), (self.by_email, old["email"]),
+                              (self.by_name, [old["name"]] if old["name"] else [])):
+            for h in hashes:
+                ids = index.get(h)
+                if ids is not None:
+                    ids.discard(intake_id)
+                    if not ids:
+                        del index[h]
+        if old["block"]:
+            self.blocks[old["block"]] = [e for e in self.blocks.get(old["block"], ()) if e[0] != intake_id]
+
+    def add_payload(self, intake_id, payload):
+        self.add(
+            intake_id,
+            phones=[payload.get("Phone")],
+            emails=[payload.get("Email")],
+            legal_name=payload.get("LegalName"),
+            label=" · ".join(str(payload.get(k) or "—") for k in ("LegalName", "MarketingSource", "AssignedFirm")),
+        )
+
+    def refresh(self, store):
+        # Pull only intakes saved since the last refresh (by this or any other process)
+        for intake_id, payload in store.iter_payloads("WHERE id > ?", (self.last_id,)):
+            self.add_payload(intake_id, payload)
+
+    def match(self, phones=(), emails=(), legal_name="", exclude=()):
+        # Returns [(intake_id, [reasons], label)], strongest matches first
+        keys = lead_keys(phones, emails, legal_name)
+        hits = {}
+        with self._lock:
+            for h in keys["phone"]:
+                for i in self.by_phone.get(h, ()):
+                    hits.setdefault(i, []).append("same phone")
+            for h in keys["email"]:
+                for i in self.by_email.get(h, ()):
+                    hits.setdefault(i, []).append("same email")
+            exact = self.by_name.get(keys["name"], set()) if keys["name"] else set()
+            for i in exact:
+                hits.setdefault(i, []).append("same legal name")
+            if keys["block"]:
+                for i, other in self.blocks.get(keys["block"], ()):
+                    if i in exact:
+                        continue
+                    score = SequenceMatcher(None, keys["full_name"], other).ratio()
+                    if score >= FUZZY_NAME_THRESHOLD:
+                        hits.setdefault(i, []).append(f"similar name ({score:.0%})")
+            labels = dict(self.labels)
+        out = [(i, sorted(set(r)), labels.get(i, "")) for i, r in hits.items() if i not in exclude]
+        out.sort(key=lambda m: (-len(m[1]), -m[0]))
+        return out
+
+
+# =========================
+# BATCH DEDUPE
+# =========================
+def _key_column(series, kind, normalize):
+    # Normalize and hash each distinct value once, then broadcast back through the factor codes;
+    # uses the same scalar normalizers as the interactive index so both paths agree.
+    codes, uniques = pd.factorize(series.fillna("").astype(str), use_na_sentinel=False)
+    normalized = [normalize(v) for v in uniques]
+    return hash_keys(kind, normalized)[codes]
+
+
+def _scoped_name_key(value):
+    legal_name, scope = value.split("\x1f", 1)
+    first, last = norm_name(legal_name)
+    return f"{first} {last}|{scope}" if first and last else ""
+
+
+def _union_find(key_arrays, n):
+    # Label propagation with pointer jumping: every row ends up labelled with the smallest row
+    # position reachable through any shared key.
+    labels = np.arange(n)
+    while True:
+        before = labels.copy()
+        for keys in key_arrays:
+            has = keys != 0
+            if not has.any():
+                continue
+            group_min = pd.Series(labels[has]).groupby(keys[has]).transform("min").to_numpy()
+            labels[has] = np.minimum(labels[has], group_min)
+        labels = labels[labels]
+        if np.array_equal(labels, before):
+            return labels
+
+
+def dedupe_frame(df, phone_cols=("phone",), email_cols=("email",), name_col=None, name_scope_col=None):
+    # Adds dup_group (position of the first row in the cluster), dup_count and is_duplicate.
+    # A name only links rows together with name_scope_col (e.g. state or incident date), since
+    # an exact name alone ("Maria Garcia") is too common to merge on.
+    n = len(df)
+    key_arrays = []
+    # Phones share one key space so "phone" and "sms_phone" columns match each other
+    for col in phone_cols:
+        if col in df:
+            key_arrays.append(_key_column(phone_key_column(df[col]), "phone", str))
+    for col in email_cols:
+        if col in df:
+            key_arrays.append(_key_column(df[col], "email", norm_email))
+    if name_col in df and name_scope_col in df:
+        names = df[name_col].fillna("").astype(str)
+        scope = df[name_scope_col].fillna("").astype(str)
+        key_arrays.append(_key_column(names + "\x1f" + scope, "name", _scoped_name_key))
+    labels = _union_find(key_arrays, n)
+    out = df.copy()
+    out["dup_group"] = labels
+    out["dup_count"] = pd.Series(labels).map(pd.Series(labels).value_counts()).to_numpy()
+    out["is_duplicate"] = labels != np.arange(n)
+    return out
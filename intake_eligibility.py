@@ -0,0 +1,271 @@
+# Wagstaff / Triten eligibility engine.
+#
+# evaluate(record)      -> one intake (plain dict), returns the decision, reasons and the
+#                          intermediate values the UI shows in its diagnostics.
+# evaluate_frame(df)    -> many intakes (one row each), evaluated column-wise with no
+#                          per-row Python loop. Same field names as the single-record path.
+#
+# Both evaluate as of `now`, which defaults to intake_clock.now(); pass a past or future moment
+# to see the decision on that date.
+#
+# numpy / pandas are imported inside the batch functions, so the single-record path (the app,
+# the graph) starts without them.
+from datetime import datetime, time, timedelta
+
+from dateutil.relativedelta import relativedelta
+
+from intake_rules import (
+    STATE_ALIAS, FILE_BY_BUFFER_DAYS,
+    tier_and_aggravators, sa_category, sol_rule_for,
+)
+from intake_firms import FIRMS, decide_firms, firm_frame
+import intake_clock
+
+# =========================
+# RECORD SCHEMA
+# =========================
+# Act checkbox label -> record field
+ACT_FIELDS = {
+    "Rape/Penetration": "rape",
+    "Forced Oral/Forced Touching": "forced_oral",
+    "Touching/Kissing w/o Consent": "touching",
+    "Indecent Exposure": "exposure",
+    "Masturbation Observed": "masturb",
+    "Kidnapping Off-Route w/ Threats": "kidnap",
+    "False Imprisonment w/ Threats": "imprison",
+}
+
+# Report channel -> record field, in the order the form collects them.
+# Family/Friends is a datetime (the 24h rule needs the time); the others are dates.
+REPORT_FIELDS = {
+    "Family/Friends": "report_family",
+    "Physician": "report_physician",
+    "Therapist": "report_therapist",
+    "Police": "report_police",
+    "Rideshare company": "report_rideshare",
+}
+
+INTAKE_DEFAULTS = {
+    "company": "Uber",
+    "state": "California",
+    "incident_dt": None,        # None -> evaluated as "now" (same as the form without a date)
+    "rape": False, "forced_oral": False, "touching": False, "exposure": False, "masturb": False,
+    "kidnap": False, "imprison": False,
+    "verbal_only": False, "attempt_only": False,
+    "scope": "Inside the car",
+    "report_family": None, "report_physician": None, "report_therapist": None,
+    "report_police": None, "report_rideshare": None,
+    "receipt_email": False, "receipt_pdf": False,
+    "any_pdf_uploaded": False, "any_av_uploaded": False,
+    "gov_id": False, "female_rider": False, "rider_not_driver": True,
+    "has_atty": False, "felony": False, "victim_weapon": False,
+}
+
+# =========================
+# FIRM CHECKS
+# =========================
+# Yes/no answers passed to the firm rules as-is
+ANSWER_FIELDS = (
+    "has_atty", "felony", "victim_weapon", "gov_id", "female_rider", "rider_not_driver", "verbal_only", "attempt_only",
+    "receipt_email", "receipt_pdf", "any_pdf_uploaded", "any_av_uploaded",
+)
+# Firm criteria live in intake_firms as data; (check, reason shown when it fails) per firm, in order.
+FIRM_CHECKS = {firm.key: [(check, reason) for check, reason, _, _ in firm.checks] for firm in FIRMS}
+
+
+def _as_date(value):
+    if value is None or value != value:  # None / NaN / NaT
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+def _as_datetime(value):
+    if value is None or value != value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time(0, 0))
+
+
+# =========================
+# SINGLE RECORD
+# =========================
+# Each step is a pure function of its arguments so callers that track which inputs changed
+# (intake_graph) can memoize them individually; evaluate() just chains them.
+def tier_step(r):
+    act_flags = {label: bool(r[field]) for label, field in ACT_FIELDS.items()}
+    tier_label, aggr_list = tier_and_aggravators(act_flags)
+    return {
+        "tier_label": tier_label,
+        "aggr_list": aggr_list,
+        "base_tier": tier_label.split(" (+")[0],
+        "base_tier_ok": ("Tier 1" in tier_label) or ("Tier 2" in tier_label),
+        "category": sa_category(act_flags),
+    }
+
+
+def sol_step(state, category, incident_dt):
+    sol_state = STATE_ALIAS.get(state, state)
+    sol_years, sol_rule_text, used_sa = sol_rule_for(sol_state, category)
+    if sol_years is None:
+        sol_end = file_by_deadline = None
+    else:
+        sol_end = incident_dt + relativedelta(years=+int(sol_years))
+        file_by_deadline = sol_end - timedelta(days=FILE_BY_BUFFER_DAYS)
+    return {
+        "sol_state": sol_state, "sol_years": sol_years, "sol_rule_text": sol_rule_text, "used_sa": used_sa,
+        "sol_end": sol_end, "file_by_deadline": file_by_deadline,
+    }
+
+
+def sol_open(sol_end, now):
+    # No SOL end (no SOL per SA extension) -> always open
+    return sol_end is None or now <= sol_end
+
+
+def report_step(r, incident_dt):
+    v = {}
+    family_report_dt = _as_datetime(r["report_family"])
+    report_dates = {}
+    for channel, field in REPORT_FIELDS.items():
+        d = _as_date(r[field])
+        if d:
+            report_dates[channel] = d
+    earliest_report_date = min(report_dates.values()) if report_dates else None
+    delta_days = (earliest_report_date - incident_dt.date()).days if earliest_report_date else None
+    earliest_channels = [k for k, d in report_dates.items() if d == earliest_report_date]
+    earliest_is_family = (earliest_channels == ["Family/Friends"])
+    v.update(report_dates=report_dates, family_report_dt=family_report_dt,
+             earliest_report_date=earliest_report_date, delta_days=delta_days,
+             earliest_channels=earliest_channels, earliest_is_family=earliest_is_family)
+
+    # Facts the firm report rules read (their windows live in the firm specs)
+    family_only = set(report_dates) == {"Family/Friends"}
+    family_delta_hours = None
+    if family_only and family_report_dt:
+        family_delta_hours = (family_report_dt - incident_dt).total_seconds() / 3600.0
+    v.update(family_only=family_only, family_delta_hours=family_delta_hours, report_any=bool(report_dates))
+    return v
+
+
+def screening_step(r):
+    # The answers firm rules test, normalized to plain values
+    return {
+        "company": r["company"], "scope": r["scope"],
+        "has_atty": bool(r["has_atty"]), "felony": bool(r["felony"]), "victim_weapon": bool(r["victim_weapon"]),
+        "gov_id": bool(r["gov_id"]), "female_rider": bool(r["female_rider"]), "rider_not_driver": bool(r["rider_not_driver"]),
+        "verbal_only": bool(r["verbal_only"]), "attempt_only": bool(r["attempt_only"]),
+        "receipt_email": bool(r["receipt_email"]), "receipt_pdf": bool(r["receipt_pdf"]),
+        "any_pdf_uploaded": bool(r["any_pdf_uploaded"]), "any_av_uploaded": bool(r["any_av_uploaded"]),
+        "base_disqualifier": bool(r["verbal_only"] or r["attempt_only"]),
+    }
+
+
+def decide(v):
+    # Every firm's checks, reasons and verdict (see intake_firms)
+    return decide_firms(v)
+
+
+def evaluate(record, now=None):
+    now = now or intake_clock.now()
+    r = {**INTAKE_DEFAULTS, **record}
+    incident_dt = _as_datetime(r["incident_dt"]) or datetime.combine(now.date(), time(0, 0))
+    v = {"incident_dt": incident_dt}
+    v.update(tier_step(r))
+    v.update(sol_step(r["state"], v["category"], incident_dt))
+    v["sol_time_ok"] = sol_open(v["sol_end"], now)
+    v.update(report_step(r, incident_dt))
+    v.update(screening_step(r))
+    return decide(v)
+
+
+# =========================
+# BATCH (column-wise)
+# =========================
+def _bool_col(df, field):
+    import pandas as pd
+    if field not in df:
+        return pd.Series(INTAKE_DEFAULTS[field], index=df.index, dtype=bool)
+    return df[field].fillna(INTAKE_DEFAULTS[field]).astype(bool)
+
+
+def _str_col(df, field):
+    import pandas as pd
+    if field not in df:
+        return pd.Series(INTAKE_DEFAULTS[field], index=df.index, dtype=object)
+    return df[field].fillna(INTAKE_DEFAULTS[field]).astype(str)
+
+
+def _dt_col(df, field):
+    import pandas as pd
+    if field not in df:
+        return pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
+    return pd.to_datetime(df[field], errors="coerce").astype("datetime64[ns]")
+
+
+def evaluate_frame(df, now=None):
+    out, f = frame_facts(df, now)
+    for name, col in firm_frame(f, df.index).items():
+        out[name] = col
+    return out
+
+
+def frame_facts(df, now=None):
+    # (tier / SOL / report columns of evaluate_frame, batch facts the firm rules read)
+    import numpy as np
+    import pandas as pd
+    from intake_sol import sol_deadlines
+    now = pd.Timestamp(now or intake_clock.now())
+    idx = df.index
+    out = pd.DataFrame(index=idx)
+
+    flags = {field: _bool_col(df, field) for field in ACT_FIELDS.values()}
+    t1 = flags["rape"] | flags["forced_oral"]
+    t2 = flags["touching"] | flags["exposure"] | flags["masturb"]
+    base = pd.Series(np.select([t1, t2], ["Tier 1", "Tier 2"], "Unclear"), index=idx)
+    aggr = pd.Series(np.select(
+        [flags["kidnap"] & flags["imprison"], flags["kidnap"], flags["imprison"]],
+        ["Kidnapping w/ threats, False imprisonment w/ threats", "Kidnapping w/ threats", "False imprisonment w/ threats"],
+        "",
+    ), index=idx)
+    out["tier_label"] = base.where((base == "Unclear") | (aggr == ""), base + " (+ Aggravators: " + aggr + ")")
+
+    # SOL
+    incident_dt = _dt_col(df, "incident_dt").fillna(now.normalize())
+    category = pd.Series(np.select([t1, t2], ["penetration", "other"], ""), index=idx).replace("", None)
+    sol = sol_deadlines(_str_col(df, "state"), category, incident_dt, now=now)
+    sol_years = pd.Series(sol["sol_years"], index=idx)
+    sol_end = pd.Series(sol["sol_end"], index=idx)
+    out["sa_category"] = category
+    out["sol_years"] = sol_years
+    out["sol_end"] = sol_end
+    out["file_by_deadline"] = pd.Series(sol["file_by"], index=idx)
+    out["file_by_days_remaining"] = pd.Series(sol["days_remaining"], index=idx)
+
+    # Earliest report
+    family_dt = _dt_col(df, "report_family")
+    report_days = pd.DataFrame({
+        channel: (family_dt if field == "report_family" else _dt_col(df, field)).dt.normalize()
+        for channel, field in REPORT_FIELDS.items()
+    })
+    earliest = report_days.min(axis=1)
+    report_any = report_days.notna().any(axis=1)
+    at_earliest = report_days.eq(earliest, axis=0)
+    earliest_is_family = at_earliest["Family/Friends"] & (at_earliest.sum(axis=1) == 1)
+    delta_days = (earliest - incident_dt.dt.normalize()).dt.days
+    out["earliest_report_date"] = earliest
+    out["delta_days"] = delta_days
+    out["earliest_is_family"] = earliest_is_family
+
+    # Batch facts the firm rules read (intake_firms rule primitives, column form)
+    f = {
+        "company": _str_col(df, "company"), "scope": _str_col(df, "scope"), "base_tier": base,
+        "sol_time_ok": sol_years.isna() | (now <= sol_end),
+        "report_days": report_days, "family_dt": family_dt, "incident_dt": incident_dt,
+        "report_any": report_any, "at_earliest": at_earliest, "delta_days": delta_days,
+    }
+    for field in ANSWER_FIELDS:
+        f[field] = _bool_col(df, field)
+    return out, f
@@ -0,0 +1,193 @@
+# CSV / formatted XLSX builders for intake export_payloads.
+#
+# Kept free of Streamlit so the UI can defer and memoize them (keyed by payload_hash) and
+# batch tools can reuse the same formatting. Workbooks are written row by row in constant
+# memory (xlsxwriter constant_memory / openpyxl write-only), with the centered, wrapped,
+# frozen-header look applied once per column.
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta
+
+from intake_store import SSN_KEYS
+
+# =========================
+# EXCEL ENGINE DETECTION
+# =========================
+# Found without importing it; the engine (and pandas, for CSV) loads with the first export.
+if importlib.util.find_spec("xlsxwriter"):
+    XLSX_ENGINE = "xlsxwriter"
+elif importlib.util.find_spec("openpyxl"):
+    XLSX_ENGINE = "openpyxl"
+else:
+    XLSX_ENGINE = None
+
+XLSX_COLUMN_WIDTH = 28
+XLSX_MISSING_MSG = "Excel engine not installed. Add 'xlsxwriter' or 'openpyxl' to requirements.txt to enable formatted Excel."
+UNASSIGNED_SHEET = "Unassigned"
+# Keys only the archived copy carries (intake_app adds the caller's narrative on save); they stay
+# in-house and never reach a firm's daily workbook
+ARCHIVE_ONLY_KEYS = frozenset({"Narrative"})
+# Full SSNs go to a firm one intake at a time (TXT/CSV/XLSX of the current caller), never in bulk.
+# The archive no longer keeps them (intake_store.SSN_KEYS); skipped here as well in case a row does.
+WORKBOOK_SKIP_KEYS = ARCHIVE_ONLY_KEYS | SSN_KEYS
+
+
+def payload_hash(payload):
+    blob = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def build_csv(payload):
+    import pandas as pd
+    return pd.DataFrame([payload]).to_csv(index=False).encode("utf-8")
+
+
+# =========================
+# STREAMING WORKBOOK WRITER
+# =========================
+def sheet_name_for(firm):
+    # Excel sheet names: max 31 chars, none of []:*?/\
+    name = re.sub(r"[\[\]:*?/\\]", " ", str(firm or "")).strip()[:31]
+    return name or UNASSIGNED_SHEET
+
+
+def _cell(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    return str(value)
+
+
+def _write_xlsxwriter(target, sheets, rows):
+    # Cells carry no format of their own, so the column format (set once) applies to all of them.
+    import xlsxwriter
+    workbook = xlsxwriter.Workbook(target, {
+        "constant_memory": True, "strings_to_formulas": False, "strings_to_urls": False,
+    })
+    cell_fmt = workbook.add_format({"align": "center", "valign": "top", "text_wrap": True})
+    head_fmt = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top", "text_wrap": True})
+    state = {}
+    for name, columns in sheets.items():
+        worksheet = workbook.add_worksheet(name)
+        worksheet.set_column(0, max(len(columns) - 1, 0), XLSX_COLUMN_WIDTH, cell_fmt)
+        worksheet.freeze_panes(1, 0)
+        worksheet.write_row(0, 0, columns, head_fmt)
+        state[name] = [worksheet, columns, 1]
+    for name, payload in rows:
+        entry = state[name]
+        worksheet, columns, row = entry
+        worksheet.write_row(row, 0, [_cell(payload.get(c)) for c in columns])
+        entry[2] = row + 1
+    workbook.close()
+    return sum(entry[2] - 1 for entry in state.values())
+
+
+def _write_openpyxl(target, sheets, rows):
+    # Write-only mode streams rows to disk; the alignment is one shared style object.
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Font
+    from openpyxl.utils import get_column_letter
+    workbook = Workbook(write_only=True)
+    alignment = Alignment(horizontal="center", vertical="top", wrap_text=True)
+    bold = Font(bold=True)
+    state = {}
+    for name, columns in sheets.items():
+        ws = workbook.create_sheet(name)
+        for i in range(1, len(columns) + 1):
+            ws.column_dimensions[get_column_letter(i)].width = XLSX_COLUMN_WIDTH
+        ws.freeze_panes = "A2"
+        header = []
+        for c in columns:
+            cell = WriteOnlyCell(ws, value=c)
+            cell.font, cell.alignment = bold, alignment
+            header.append(cell)
+        ws.append(header)
+        state[name] = [ws, columns, 0]
+    for name, payload in rows:
+        entry = state[name]
+        ws, columns, _ = entry
+        out = []
+        for c in columns:
+            cell = WriteOnlyCell(ws, value=_cell(payload.get(c)))
+            if cell.data_type == "f":
+                cell.data_type = "s"  # answers are text, never formulas
+            cell.alignment = alignment
+            out.append(cell)
+        ws.append(out)
+        entry[2] += 1
+    workbook.save(target)
+    return sum(entry[2] for entry in state.values())
+
+
+def write_workbook(target, sheets, rows):
+    # sheets: {sheet name: column list}; rows: iterable of (sheet name, payload dict), consumed once.
+    # target: path or binary file object. Returns the number of data rows written.
+    if XLSX_ENGINE == "xlsxwriter":
+        return _write_xlsxwriter(target, sheets, rows)
+    if XLSX_ENGINE == "openpyxl":
+        return _write_openpyxl(target, sheets, rows)
+    raise RuntimeError(XLSX_MISSING_MSG)
+
+
+def build_xlsx(payload):
+    # Returns (bytes or None, message shown when Excel is unavailable)
+    if not XLSX_ENGINE:
+        return None, XLSX_MISSING_MSG
+    try:
+        with tempfile.TemporaryFile() as buf:
+            write_workbook(buf, {"Intake": list(payload)}, [("Intake", payload)])
+            buf.seek(0)
+            return buf.read(), ""
+    except Exception as e:
+        return None, f"Excel export temporarily unavailable ({type(e).__name__}). Use TXT or CSV."
+
+
+# =========================
+# DAILY WORKBOOK (archive)
+# =========================
+def _day_range(day):
+    return day.isoformat(), (day + timedelta(days=1)).isoformat()
+
+
+def build_daily_workbook(store, day, target):
+    # Every intake archived on `day`, one sheet per assigned firm. Two streaming passes over the
+    # archive: the first collects each sheet's columns (first-seen order), the second writes rows,
+    # so memory stays flat however many intakes the day has. Both passes read one snapshot, so an
+    # intake saved or re-saved in between can't bring a sheet or column the first pass didn't see.
+    # Returns (rows written, message).
+    if not XLSX_ENGINE:
+        return 0, XLSX_MISSING_MSG
+    where, args = "WHERE created_at >= ? AND created_at < ?", _day_range(day)
+    with store.snapshot():
+        sheets = {}
+        for _, payload in store.iter_payloads(where, args):
+            columns = sheets.setdefault(sheet_name_for(payload.get("AssignedFirm")), {})
+            for key in payload:
+                if key not in WORKBOOK_SKIP_KEYS:
+                    columns.setdefault(key, None)
+        if not sheets:
+            return 0, f"No intakes archived on {day.isoformat()}."
+        rows = ((sheet_name_for(p.get("AssignedFirm")), p) for _, p in store.iter_payloads(where, args))
+        written = write_workbook(target, {name: list(cols) for name, cols in sheets.items()}, rows)
+    return written, ""
+
+
+def daily_workbook_bytes(store, day):
+    # Builds the day's workbook and returns (xlsx bytes or None, rows, message). The file lives in
+    # a private temp dir that is removed before returning, so no copy outlives the download.
+    with tempfile.TemporaryDirectory(prefix="intakes_") as scratch:
+        path = os.path.join(scratch, f"intakes_{day.isoformat()}.xlsx")
+        try:
+            rows, msg = build_daily_workbook(store, day, path)
+            if not rows:
+                return None, 0, msg
+            with open(path, "rb") as fh:
+                return fh.read(), rows, ""
+        except Exception as e:
+            return None, 0, f"Daily workbook failed ({type(e).__name__})."
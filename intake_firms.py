@@ -0,0 +1,409 @@
+# Law firm acceptance criteria as data, compiled once into predicates.
+#
+# A firm spec is a plain dict (key, display name, note short name, label) with an ordered list of
+# rules. Each rule picks one primitive from RULE_KINDS, gives its parameters and the reason shown
+# when it fails. compile_firms() validates the specs and turns every distinct rule into one shared
+# Predicate, so ten firms that all require "no attorney" still run that test once per intake, and
+# once per column in batch. Adding a firm is a new spec here (or in the JSON file named by
+# INTAKE_FIRM_RULES), not new eligibility code. A spec may also carry a "routing" block (monthly
+# cap and preferences); see intake_routing. The built-in specs ship preferences only (Wagstaff
+# first, as before); until a firm has a monthly cap, capacity routing leaves it alone. Caps come
+# from INTAKE_FIRM_CAPS ("wag=120,triten=80") or the rules file.
+import json
+import os
+
+from intake_rules import (
+    RIDESHARE_COMPANIES, INSIDE_NEAR_SCOPES, FAMILY_WINDOW_HOURS_WAGSTAFF, FAMILY_WINDOW_DAYS_TRITEN, fmt_dt,
+)
+
+FIRM_RULES_PATH = os.environ.get("INTAKE_FIRM_RULES", "")
+FIRM_CAPS = os.environ.get("INTAKE_FIRM_CAPS", "")
+
+# =========================
+# FIRM SPECS
+# =========================
+# "check" names the result in the decision dict (the UI and the import ranking read some of them);
+# the same check name must mean the same rule in every firm.
+FIRM_SPECS = [
+    {
+        "key": "wag", "name": "Wagstaff Law Firm", "short": "Waggy", "label": "Wagstaff",
+        "routing": {"priority": 1.0},
+        "rules": [
+            {"check": "company_ok", "rule": "company", "allow": list(RIDESHARE_COMPANIES), "reason": "Company must be Uber or Lyft."},
+            {"check": "no_atty", "rule": "answer", "field": "has_atty", "equals": False, "reason": "Already has an attorney."},
+            {"check": "inside_near", "rule": "scope", "allow": list(INSIDE_NEAR_SCOPES), "reason": "Incident not confirmed inside/just outside the vehicle."},
+            {"check": "base_tier_ok", "rule": "tier", "allow": ["Tier 1", "Tier 2"], "reason": "Tier 1 or Tier 2 acts required."},
+            {"check": "sol_time_ok", "rule": "sol_open", "reason": "Statute of limitations appears to be passed."},
+            {"check": "wag_report_ok", "rule": "report", "family_only_hours": FAMILY_WINDOW_HOURS_WAGSTAFF,
+             "evidence": ["any_av_uploaded"], "reason": "No qualifying report (or audio/video evidence)."},
+            {"check": "no_felony", "rule": "answer", "field": "felony", "equals": False, "reason": "Felony history disqualifies for Wagstaff."},
+            {"check": "no_victim_weapon", "rule": "answer", "field": "victim_weapon", "equals": False, "reason": "Victim was carrying a weapon (Wagstaff does not accept)."},
+            {"check": "not_verbal_only", "rule": "answer", "field": "verbal_only", "equals": False, "reason": "Verbal abuse only (no sexual acts)."},
+            {"check": "not_attempt_only", "rule": "answer", "field": "attempt_only", "equals": False, "reason": "Attempt/minor contact only."},
+        ],
+    },
+    {
+        "key": "triten", "name": "Triten Law Group", "short": "Triten", "label": "Triten",
+        "routing": {"priority": 0.5},
+        "rules": [
+            {"check": "company_ok", "rule": "company", "allow": list(RIDESHARE_COMPANIES), "reason": "Company must be Uber or Lyft."},
+            {"check": "triten_receipt_ok", "rule": "evidence", "any_of": ["receipt_email", "receipt_pdf", "any_pdf_uploaded"],
+             "reason": "Must provide Email or PDF copy of rideshare receipt."},
+            {"check": "gov_id", "rule": "answer", "field": "gov_id", "equals": True, "reason": "Government ID is required."},
+            {"check": "female_rider", "rule": "answer", "field": "female_rider", "equals": True, "reason": "Female riders only."},
+            {"check": "rider_not_driver", "rule": "answer", "field": "rider_not_driver", "equals": True, "reason": "Caller must be the rider (not the driver)."},
+            {"check": "report_any", "rule": "report", "reason": "No report date captured for any channel."},
+            {"check": "triten_family_14_ok", "rule": "earliest_report_window", "channel": "Family/Friends",
+             "days": FAMILY_WINDOW_DAYS_TRITEN, "reason": "Family/Friend report must be within 14 days."},
+            {"check": "no_atty", "rule": "answer", "field": "has_atty", "equals": False, "reason": "Already has an attorney."},
+            {"check": "base_tier_ok", "rule": "tier", "allow": ["Tier 1", "Tier 2"], "reason": "Tier 1 or Tier 2 acts required."},
+            {"check": "inside_near", "rule": "scope", "allow": list(INSIDE_NEAR_SCOPES), "reason": "Incident not confirmed inside/just outside the vehicle."},
+            {"check": "sol_time_ok", "rule": "sol_open", "reason": "Statute of limitations appears to be passed."},
+            {"check": "not_verbal_only", "rule": "answer", "field": "verbal_only", "equals": False, "reason": "Verbal abuse only (no sexual acts)."},
+            {"check": "not_attempt_only", "rule": "answer", "field": "attempt_only", "equals": False, "reason": "Attempt/minor contact only."},
+        ],
+    },
+]
+
+# Yes/no answers a rule may test, with the label diagnostics show
+ANSWER_LABELS = {
+    "has_atty": "Already has an attorney", "felony": "Felony history", "victim_weapon": "Victim carrying a weapon",
+    "verbal_only": "Verbal abuse only", "attempt_only": "Attempt/minor contact only", "gov_id": "Government ID",
+    "female_rider": "Female rider", "rider_not_driver": "Rider (not driver)",
+}
+EVIDENCE_LABELS = {
+    "receipt_email": "Email receipt", "receipt_pdf": "PDF receipt", "any_pdf_uploaded": "PDF upload",
+    "any_av_uploaded": "audio/video upload",
+}
+REPORT_CHANNELS = ("Family/Friends", "Physician", "Therapist", "Police", "Rideshare company")
+FAMILY_CHANNEL = "Family/Friends"
+MAX_FIRM_RULES = 63  # failed rules are packed into one int64 bitmask per row
+
+
+def _yes(value):
+    return "Yes" if value else "No"
+
+
+# =========================
+# RULE PRIMITIVES
+# =========================
+# Each builder takes the rule's parameters and returns (title, test, column, describe):
+#   test(v)       -> bool for one decision dict (the values evaluate() / the graph derive)
+#   column(f)     -> boolean ndarray over the batch facts built by evaluate_frame
+#   describe(v)   -> the detail shown after the title in the diagnostics panel
+def _company(allow):
+    allow = tuple(allow)
+    return (
+        "Company",
+        lambda v: v["company"] in allow,
+        lambda f: f["company"].isin(allow).to_numpy(),
+        lambda v: f"{v['company']} (accepted: {', '.join(allow)})",
+    )
+
+
+def _scope(allow):
+    allow = tuple(allow)
+    return (
+        "Inside/near scope",
+        lambda v: v["scope"] in allow,
+        lambda f: f["scope"].isin(allow).to_numpy(),
+        lambda v: v["scope"],
+    )
+
+
+def _tier(allow):
+    allow = tuple(allow)
+    return (
+        "Tier",
+        lambda v: v["base_tier"] in allow,
+        lambda f: f["base_tier"].isin(allow).to_numpy(),
+        lambda v: f"{v['tier_label']} (accepted: {', '.join(allow)})",
+    )
+
+
+def _sol_open():
+    def describe(v):
+        if v["sol_years"] is None:
+            return f"No SOL per SA extension ({v['sol_rule_text']})"
+        return f"{'open until' if v['sol_time_ok'] else 'passed —'} {fmt_dt(v['sol_end'])} ({v['sol_rule_text']})"
+    return (
+        "SOL",
+        lambda v: bool(v["sol_time_ok"]),
+        lambda f: f["sol_time_ok"].to_numpy(dtype=bool),
+        describe,
+    )
+
+
+def _answer(field, equals):
+    if field not in ANSWER_LABELS:
+        raise ValueError(f"unknown answer field '{field}' (expected one of {', '.join(ANSWER_LABELS)})")
+    equals = bool(equals)
+    return (
+        ANSWER_LABELS[field],
+        lambda v: bool(v[field]) == equals,
+        lambda f: f[field].to_numpy(dtype=bool) == equals,
+        lambda v: _yes(v[field]),
+    )
+
+
+def _evidence(any_of):
+    any_of = tuple(any_of)
+    for field in any_of:
+        if field not in EVIDENCE_LABELS:
+            raise ValueError(f"unknown evidence field '{field}' (expected one of {', '.join(EVIDENCE_LABELS)})")
+
+    def column(f):
+        import numpy as np
+        out = np.zeros(len(f["company"]), dtype=bool)
+        for field in any_of:
+            out |= f[field].to_numpy(dtype=bool)
+        return out
+    return (
+        "Evidence (" + " / ".join(EVIDENCE_LABELS[x] for x in any_of) + ")",
+        lambda v: any(v[x] for x in any_of),
+        column,
+        lambda v: ", ".join(EVIDENCE_LABELS[x] for x in any_of if v[x]) or "none",
+    )
+
+
+def _report(channels=REPORT_CHANNELS, family_only_hours=None, evidence=()):
+    # A report on one of `channels`. With family_only_hours, a report made only to family/friends
+    # counts when it came within that many hours of the incident. Any `evidence` flag substitutes.
+    channels, evidence = tuple(channels), tuple(evidence)
+    for ch in channels:
+        if ch not in REPORT_CHANNELS:
+            raise ValueError(f"unknown report channel '{ch}'")
+    for field in evidence:
+        if field not in EVIDENCE_LABELS:
+            raise ValueError(f"unknown evidence field '{field}'")
+
+    def window(v):
+        # (report ok, family-only hours or None)
+        dates = [ch for ch in v["report_dates"] if ch in channels]
+        if not dates:
+            return False, None
+        if family_only_hours is None or dates != [FAMILY_CHANNEL]:
+            return True, None
+        if not v["family_report_dt"]:
+            return False, None
+        hours = (v["family_report_dt"] - v["incident_dt"]).total_seconds() / 3600.0
+        return 0 <= hours <= family_only_hours, hours
+
+    def test(v):
+        return window(v)[0] or any(v[x] for x in evidence)
+
+    def column(f):
+        days = f["report_days"][list(channels)]
+        present = days.notna()
+        ok = present.any(axis=1)
+        if family_only_hours is not None and FAMILY_CHANNEL in channels:
+            family_only = present[FAMILY_CHANNEL] & (present.sum(axis=1) == 1)
+            hours = (f["family_dt"] - f["incident_dt"]).dt.total_seconds() / 3600.0
+            ok &= ~family_only | hours.between(0, family_only_hours)
+        ok = ok.to_numpy(dtype=bool)
+        for field in evidence:
+            ok |= f[field].to_numpy(dtype=bool)
+        return ok
+
+    def describe(v):
+        used = [ch for ch in v["report_dates"] if ch in channels]
+        ok, hours = window(v)
+        subs = [EVIDENCE_LABELS[x] for x in evidence if v[x]]
+        if not used:
+            text = "no report on an accepted channel"
+        elif family_only_hours is not None and used == [FAMILY_CHANNEL]:
+            text = (f"Family/Friends only, {hours:.1f} hours after the incident (≤{family_only_hours:g}h)"
+                    if hours is not None else "Family/Friends only, time not provided")
+        else:
+            text = "via " + ", ".join(used)
+        if subs and not ok:
+            text += f"; {', '.join(subs)} counts instead"
+        return text
+
+    title = "Report" + ("" if channels == REPORT_CHANNELS else f" ({', '.join(channels)})")
+    return title, test, column, describe
+
+
+def _earliest_report_window(channel, days):
+    # When the earliest report went only to `channel`, it must be within `days` of the incident
+    if channel not in REPORT_CHANNELS:
+        raise ValueError(f"unknown report channel '{channel}'")
+
+    def applies(v):
+        return v["report_any"] and v["earliest_channels"] == [channel]
+
+    def test(v):
+        if not applies(v):
+            return True
+        return v["delta_days"] is not None and 0 <= v["delta_days"] <= days
+
+    def column(f):
+        at = f["at_earliest"]
+        applies_col = f["report_any"] & at[channel] & (at.sum(axis=1) == 1)
+        return (~applies_col | f["delta_days"].between(0, days)).to_numpy(dtype=bool)
+
+    def describe(v):
+        if not v["report_any"]:
+            return "no report captured"
+        if not applies(v):
+            return f"earliest report not via {channel} only"
+        return f"earliest via {channel}; Δ days = {v['delta_days']} (≤{days}d)"
+    return f"Earliest report via {channel}", test, column, describe
+
+
+RULE_KINDS = {
+    "company": _company,
+    "scope": _scope,
+    "tier": _tier,
+    "sol_open": _sol_open,
+    "answer": _answer,
+    "evidence": _evidence,
+    "report": _report,
+    "earliest_report_window": _earliest_report_window,
+}
+RULE_META = ("check", "rule", "reason", "title")
+
+
+# =========================
+# COMPILATION
+# =========================
+class Predicate:
+    def __init__(self, kind, params):
+        self.kind, self.params = kind, params
+        self.title, self.test, self.column, self.describe = RULE_KINDS[kind](**params)
+
+
+class CompiledFirm:
+    def __init__(self, key, name, short, label, checks, routing=None):
+        self.key, self.name, self.short, self.label = key, name, short, label
+        self.checks = checks  # [(check, reason, title, Predicate)] in spec order
+        self.routing = routing or {}  # capacity / preference block, read by intake_routing
+
+    def ok(self, v, results=None):
+        # Short-circuits on the first failing rule (routing / ranking only need yes or no)
+        results = {} if results is None else results
+        return all(_result(p, v, results) for _, _, _, p in self.checks)
+
+    def reasons(self, v, results=None):
+        results = {} if results is None else results
+        return [reason for _, reason, _, p in self.checks if not _result(p, v, results)]
+
+    def diagnostics(self, v, results=None):
+        results = {} if results is None else results
+        lines = []
+        for _, _, title, p in self.checks:
+            ok = _result(p, v, results)
+            lines.append(f"• {'✅' if ok else '❌'} {title}: {p.describe(v)}")
+        return lines
+
+
+def _result(predicate, v, results):
+    # results: Predicate -> bool, shared by every firm evaluated against the same decision dict
+    if predicate not in results:
+        results[predicate] = predicate.test(v)
+    return results[predicate]
+
+
+def compile_firms(specs):
+    predicates = {}    # (kind, params) -> Predicate, shared across firms
+    check_rules = {}   # check name -> (kind, params), one meaning per name
+    firms, keys = [], set()
+    for spec in specs:
+        key = spec.get("key")
+        if not key or key in keys:
+            raise ValueError(f"Firm spec needs a unique 'key' (got {key!r}).")
+        keys.add(key)
+        rules = spec.get("rules") or []
+        if len(rules) > MAX_FIRM_RULES:
+            raise ValueError(f"Firm '{key}': at most {MAX_FIRM_RULES} rules.")
+        checks = []
+        for i, rule in enumerate(rules):
+            kind = rule.get("rule")
+            if kind not in RULE_KINDS:
+                raise ValueError(f"Firm '{key}' rule {i + 1}: unknown rule '{kind}' (expected one of {', '.join(RULE_KINDS)}).")
+            params = {k: v for k, v in rule.items() if k not in RULE_META}
+            ident = (kind, json.dumps(params, sort_keys=True))
+            if ident not in predicates:
+                try:
+                    predicates[ident] = Predicate(kind, params)
+                except TypeError as e:
+                    raise ValueError(f"Firm '{key}' rule {i + 1} ({kind}): {e}") from None
+            pred = predicates[ident]
+            check = rule.get("check") or f"{key}_{kind}_{i + 1}"
+            if check_rules.setdefault(check, ident) != ident:
+                raise ValueError(f"Firm '{key}': check '{check}' already names a different rule.")
+            checks.append((check, rule.get("reason") or f"{pred.title} not met.", rule.get("title") or pred.title, pred))
+        firms.append(CompiledFirm(key, spec.get("name") or key, spec.get("short") or spec.get("name") or key,
+                                  spec.get("label") or spec.get("name") or key, checks, spec.get("routing")))
+    return firms
+
+
+def load_firm_specs(path):
+    with open(path, encoding="utf-8") as f:
+        specs = json.load(f)
+    return specs["firms"] if isinstance(specs, dict) else specs
+
+
+def with_caps(specs, caps):
+    # caps: "wag=120,triten=80" -> copies of the specs with those monthly caps in their routing
+    # blocks (ValueError on an unknown firm or a bad number)
+    specs = [{**spec, "routing": dict(spec.get("routing") or {})} for spec in specs]
+    by_key = {spec.get("key"): spec for spec in specs}
+    for part in filter(None, (p.strip() for p in caps.split(","))):
+        key, _, value = (x.strip() for x in part.partition("="))
+        if key not in by_key:
+            raise ValueError(f"INTAKE_FIRM_CAPS: unknown firm '{key}' (expected one of {', '.join(by_key)}).")
+        if not value.isdigit():
+            raise ValueError(f"INTAKE_FIRM_CAPS: '{part}' should read firm=whole number.")
+        by_key[key]["routing"]["monthly_cap"] = int(value)
+    return specs
+
+
+FIRMS = compile_firms(with_caps(load_firm_specs(FIRM_RULES_PATH) if FIRM_RULES_PATH else FIRM_SPECS, FIRM_CAPS))
+FIRMS_BY_NAME = {firm.name: firm for firm in FIRMS}
+
+
+# =========================
+# EVALUATION
+# =========================
+def decide_firms(v, firms=None):
+    # Adds every check, then <key>_ok / <key>_reasons per firm. Each distinct rule runs once.
+    results = {}
+    for firm in firms or FIRMS:
+        for check, _, _, p in firm.checks:
+            v[check] = _result(p, v, results)
+        v[f"{firm.key}_reasons"] = [reason for _, reason, _, p in firm.checks if not results[p]]
+        v[f"{firm.key}_ok"] = not v[f"{firm.key}_reasons"]
+    return v
+
+
+def rule_columns(f, firms=None):
+    # Predicate -> boolean ndarray over the batch, each distinct rule evaluated once
+    import numpy as np
+    columns = {}
+    for firm in firms or FIRMS:
+        for _, _, _, p in firm.checks:
+            if p not in columns:
+                columns[p] = np.asarray(p.column(f), dtype=bool)
+    return columns
+
+
+def firm_frame(f, index, firms=None):
+    # Batch: one boolean column per distinct rule, then per firm the failed rules are packed into
+    # a bitmask and only the distinct combinations are joined into reason text.
+    import numpy as np
+    import pandas as pd
+    firms = firms or FIRMS
+    columns, out = rule_columns(f, firms), {}
+    for firm in firms:
+        failed = np.zeros(len(index), dtype="int64")
+        for bit, (check, _, _, p) in enumerate(firm.checks):
+            failed |= (~columns[p]).astype("int64") << bit
+        codes, inverse = np.unique(failed, return_inverse=True)
+        texts = np.array(
+            ["; ".join(reason for bit, (_, reason, _, _) in enumerate(firm.checks) if code >> bit & 1) for code in codes],
+            dtype=object,
+        )
+        out[f"{firm.key}_ok"] = pd.Series(failed == 0, index=index)
+        out[f"{firm.key}_reasons"] = pd.Series(texts[inverse.reshape(-1)], index=index)
+    return out
@@ -0,0 +1,521 @@
+# Offline gazetteer: infers the incident state from the pickup / drop-off text (ZIP code, a
+# written state, or a city name), so a form left on the default state gets caught.
+#
+# Lookups go through one compact binary table, memory-mapped read-only and shared by every
+# session and worker process:
+#   ZIP code -> state, city     one byte + one uint32 per ZIP (00000-99999)
+#   city name -> state(s)       sorted records, binary-searched in place
+# The table is compiled on first use from the built-in data below (3-digit ZIP prefixes and the
+# larger cities of every state) plus, when INTAKE_GAZETTEER_CSV points at one, a full ZIP file
+# with zip, city and state columns (e.g. a Census ZCTA or USPS export), whose entries take
+# precedence. It's rebuilt whenever that source changes.
+#
+# Batch mode audits the recorded state of archived / exported intakes:
+#
+#   python -m intake_app states intake_store.sqlite3 -o wrong_state.csv
+import argparse
+import csv
+import functools
+import hashlib
+import importlib.util
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from time import perf_counter
+
+from intake_rules import STATES, STATE_ALIAS, USPS_STATE_CODES
+from intake_store import DEFAULT_DB_PATH
+
+GAZETTEER_PATH = os.environ.get("INTAKE_GAZETTEER_PATH", os.path.splitext(DEFAULT_DB_PATH)[0] + "_gazetteer.bin")
+GAZETTEER_CSV = os.environ.get("INTAKE_GAZETTEER_CSV", "")
+GAZETTEER_VERSION = "1"
+LOCATION_CACHE_SIZE = 4096
+ARROW = importlib.util.find_spec("pyarrow") is not None
+ZIP_COUNT = 100_000
+MAGIC = b"IGAZ"
+HEADER = struct.Struct("<4s20sIII")   # magic, source hash, states, cities, city block bytes
+
+# 3-digit ZIP prefix ranges (inclusive) per USPS state code; military, territory and unused
+# prefixes are left out
+ZIP3_RANGES = {
+    "AL": "350-369", "AK": "995-999", "AZ": "850-865", "AR": "716-729", "CA": "900-961", "CO": "800-816",
+    "CT": "060-069", "DC": "200, 202-205, 569", "DE": "197-199", "FL": "320-339, 341-349", "GA": "300-319, 398-399",
+    "HI": "967-968", "ID": "832-838", "IL": "600-629", "IN": "460-479", "IA": "500-528", "KS": "660-679",
+    "KY": "400-427", "LA": "700-714", "ME": "039-049", "MD": "206-219", "MA": "010-027, 055", "MI": "480-499",
+    "MN": "550-567", "MS": "386-397", "MO": "630-658", "MT": "590-599", "NE": "680-693", "NV": "889-898",
+    "NH": "030-038", "NJ": "070-089", "NM": "870-884", "NY": "005, 100-149", "NC": "270-289", "ND": "580-588",
+    "OH": "430-459", "OK": "730-731, 734-749", "OR": "970-979", "PA": "150-196", "RI": "028-029",
+    "SC": "290-299", "SD": "570-577", "TN": "370-385", "TX": "733, 750-799, 885", "UT": "840-847",
+    "VT": "050-054, 056-059", "VA": "201, 220-246", "WA": "980-994", "WV": "247-268", "WI": "530-549",
+    "WY": "820-831",
+}
+
+# Larger cities per USPS state code (names shared by several states stay ambiguous unless the
+# text also carries a ZIP or a state)
+STATE_CITIES = {
+    "AL": "Birmingham, Montgomery, Huntsville, Mobile, Tuscaloosa, Hoover, Auburn, Dothan",
+    "AK": "Anchorage, Fairbanks, Juneau, Wasilla",
+    "AZ": "Phoenix, Tucson, Mesa, Chandler, Gilbert, Glendale, Scottsdale, Peoria, Tempe, Surprise, Yuma, Flagstaff",
+    "AR": "Little Rock, Fort Smith, Fayetteville, Springdale, Jonesboro, Rogers, Conway, Bentonville",
+    "CA": "Los Angeles, San Diego, San Jose, San Francisco, Fresno, Sacramento, Long Beach, Oakland, Bakersfield, "
+          "Anaheim, Santa Ana, Riverside, Stockton, Irvine, Chula Vista, Fremont, San Bernardino, Modesto, Fontana, "
+          "Moreno Valley, Santa Clarita, Oxnard, Huntington Beach, Glendale, Ontario, Elk Grove, Rancho Cucamonga, "
+          "Oceanside, Garden Grove, Lancaster, Palmdale, Corona, Salinas, Hayward, Pomona, Sunnyvale, Escondido, "
+          "Torrance, Pasadena, Fullerton, Santa Clara, Berkeley, Inglewood, Burbank, Santa Monica, "
+          "Palo Alto, Malibu, Hollywood, West Hollywood, Beverly Hills, Richmond, Santa Barbara, San Mateo, "
+          "Daly City, Vallejo, Concord, Visalia, Thousand Oaks, Simi Valley, Roseville, Redding, Santa Rosa",
+    "CO": "Denver, Colorado Springs, Aurora, Fort Collins, Lakewood, Thornton, Arvada, Westminster, Pueblo, Boulder, "
+          "Greeley, Longmont, Loveland, Grand Junction",
+    "CT": "Bridgeport, New Haven, Stamford, Hartford, Waterbury, Norwalk, Danbury, New Britain, Greenwich",
+    "DC": "Washington DC, District of Columbia",
+    "DE": "Wilmington, Dover, Newark",
+    "FL": "Jacksonville, Miami, Tampa, Orlando, St. Petersburg, Saint Petersburg, Hialeah, Port St. Lucie, "
+          "Tallahassee, Cape Coral, Fort Lauderdale, Pembroke Pines, Hollywood, Gainesville, Miramar, Coral Springs, "
+          "Clearwater, Palm Bay, West Palm Beach, Lakeland, Pompano Beach, Miami Beach, Boca Raton, Sarasota, "
+          "Daytona Beach, Fort Myers, Naples, Kissimmee, Pensacola, Ocala, Key West, Doral",
+    "GA": "Atlanta, Augusta, Columbus, Macon, Savannah, Athens, Sandy Springs, South Fulton, Roswell, Johns Creek, "
+          "Alpharetta, Marietta, Decatur, Albany, Valdosta",
+    "HI": "Honolulu, Hilo, Kailua, Kapolei, Pearl City, Waipahu, Lahaina, Kahului",
+    "ID": "Boise, Meridian, Nampa, Idaho Falls, Caldwell, Pocatello, Coeur d'Alene, Twin Falls",
+    "IL": "Chicago, Aurora, Naperville, Joliet, Rockford, Springfield, Elgin, Peoria, Champaign, Evanston, "
+          "Schaumburg, Bloomington, Cicero, Waukegan, Oak Park",
+    "IN": "Indianapolis, Fort Wayne, Evansville, South Bend, Carmel, Fishers, Bloomington, Hammond, Gary, "
+          "Lafayette, Muncie",
+    "IA": "Des Moines, Cedar Rapids, Davenport, Sioux City, Iowa City, Ankeny, West Des Moines, Ames, Dubuque",
+    "KS": "Wichita, Overland Park, Kansas City, Olathe, Topeka, Lawrence, Shawnee, Lenexa",
+    "KY": "Louisville, Lexington, Bowling Green, Owensboro, Covington, Richmond, Georgetown, Frankfort",
+    "LA": "New Orleans, Baton Rouge, Shreveport, Lafayette, Lake Charles, Kenner, Bossier City, Monroe, Metairie",
+    "ME": "Portland, Lewiston, Bangor, South Portland, Auburn, Augusta, Biddeford",
+    "MD": "Baltimore, Columbia, Germantown, Silver Spring, Waldorf, Frederick, Ellicott City, Rockville, "
+          "Gaithersburg, Bethesda, Annapolis, Towson, Hagerstown",
+    "MA": "Boston, Worcester, Springfield, Cambridge, Lowell, Brockton, Quincy, Lynn, New Bedford, Fall River, "
+          "Newton, Somerville, Framingham",
+    "MI": "Detroit, Grand Rapids, Warren, Sterling Heights, Ann Arbor, Lansing, Dearborn, Clinton Township, Livonia, "
+          "Westland, Flint, Kalamazoo, Southfield",
+    "MN": "Minneapolis, Saint Paul, St. Paul, Rochester, Duluth, Bloomington, Brooklyn Park, Maple Grove, "
+          "Woodbury, St. Cloud",
+    "MS": "Jackson, Gulfport, Southaven, Biloxi, Hattiesburg, Olive Branch, Tupelo, Meridian",
+    "MO": "Kansas City, St. Louis, Saint Louis, Springfield, Columbia, Lee's Summit, O'Fallon, "
+          "St. Joseph, St. Charles, Joplin",
+    "MT": "Billings, Missoula, Great Falls, Bozeman, Butte, Helena, Kalispell",
+    "NE": "Omaha, Lincoln, Bellevue, Grand Island, Kearney",
+    "NV": "Las Vegas, Henderson, Reno, North Las Vegas, Sparks, Carson City",
+    "NH": "Manchester, Nashua, Concord, Derry, Dover, Rochester, Portsmouth",
+    "NJ": "Newark, Jersey City, Paterson, Elizabeth, Lakewood, Edison, Woodbridge, Toms River, Hamilton, Trenton, "
+          "Clifton, Camden, Hoboken, Atlantic City, Princeton, New Brunswick",
+    "NM": "Albuquerque, Las Cruces, Rio Rancho, Santa Fe, Roswell, Farmington",
+    "NY": "New York, New York City, NYC, Manhattan, Brooklyn, Queens, Bronx, Staten Island, Buffalo, Rochester, Yonkers, "
+          "Syracuse, Albany, New Rochelle, Mount Vernon, Schenectady, Utica, White Plains, Long Island, Ithaca",
+    "NC": "Charlotte, Raleigh, Greensboro, Durham, Winston-Salem, Fayetteville, Cary, Wilmington, High Point, "
+          "Concord, Asheville, Greenville, Chapel Hill",
+    "ND": "Fargo, Bismarck, Grand Forks, Minot, West Fargo",
+    "OH": "Columbus, Cleveland, Cincinnati, Toledo, Akron, Dayton, Parma, Canton, Youngstown, Lorain, Hamilton, "
+          "Springfield, Kettering",
+    "OK": "Oklahoma City, Tulsa, Norman, Broken Arrow, Edmond, Lawton, Midwest City, Stillwater",
+    "OR": "Portland, Salem, Eugene, Gresham, Hillsboro, Beaverton, Bend, Medford, Springfield, Corvallis",
+    "PA": "Philadelphia, Pittsburgh, Allentown, Erie, Scranton, Bethlehem, Lancaster, Harrisburg, "
+          "Wilkes-Barre, State College, York",
+    "RI": "Providence, Warwick, Cranston, Pawtucket, East Providence, Woonsocket, Newport",
+    "SC": "Charleston, Columbia, North Charleston, Mount Pleasant, Rock Hill, Greenville, Summerville, Sumter, "
+          "Myrtle Beach, Spartanburg",
+    "SD": "Sioux Falls, Rapid City, Aberdeen, Brookings, Watertown",
+    "TN": "Nashville, Memphis, Knoxville, Chattanooga, Clarksville, Murfreesboro, Jackson, Johnson City",
+    "TX": "Houston, San Antonio, Dallas, Austin, Fort Worth, El Paso, Arlington, Corpus Christi, Plano, Laredo, "
+          "Lubbock, Irving, Garland, Frisco, McKinney, Grand Prairie, Amarillo, Brownsville, Killeen, Pasadena, "
+          "Mesquite, McAllen, Denton, Waco, Midland, Odessa, Round Rock, The Woodlands, Sugar Land, Galveston, "
+          "Beaumont, Tyler, College Station, San Marcos",
+    "UT": "Salt Lake City, West Valley City, West Jordan, Provo, Orem, St. George, Ogden, Layton, Lehi",
+    "VT": "Burlington, South Burlington, Rutland, Montpelier",
+    "VA": "Virginia Beach, Chesapeake, Norfolk, Richmond, Arlington, Newport News, Alexandria, Hampton, Roanoke, "
+          "Portsmouth, Suffolk, Lynchburg, Charlottesville, Fairfax",
+    "WA": "Seattle, Spokane, Tacoma, Vancouver, Bellevue, Everett, Renton, Spokane Valley, Federal Way, "
+          "Yakima, Kirkland, Redmond, Bellingham, Olympia",
+    "WV": "Charleston, Huntington, Morgantown, Parkersburg, Wheeling",
+    "WI": "Milwaukee, Madison, Green Bay, Kenosha, Racine, Appleton, Waukesha, Eau Claire, Oshkosh",
+    "WY": "Cheyenne, Casper, Laramie, Gillette, Rock Springs, Jackson",
+}
+
+# RE2-compatible (no lookarounds) so the batch path can hand them to Arrow; group "m" each
+_ZIP_TAIL = r"^.*\D(?P<m>\d{5})(?:-\d{4})?(?:\D|$)"
+_ZIP_ONLY = r"^\s*(?P<m>\d{5})(?:-\d{4})?\s*$"
+# A bare USPS code counts only as its own comma-separated part ("Austin, TX") or right before a
+# ZIP ("Austin TX 78701"); "Downtown LA" or "Pick up at ME" aren't states. _CODE on the last part:
+_CODE_AFTER_COMMA = r",\s*(?P<m>[A-Z]{2}|D\.C)\.?\s*(?:\d{5}(?:-\d{4})?)?\s*$"
+_CODE_BEFORE_ZIP = r"(?:^|[^A-Za-z])(?P<m>[A-Z]{2}|D\.C)\.?\s*\d{5}(?:-\d{4})?\s*$"
+# Codes that are also everyday shorthand ("Hollywood, LA" is Los Angeles): a city recognized in
+# the same text that isn't in that state wins over the code
+AMBIGUOUS_CODES = frozenset({"LA"})
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# A state counts only at the end of an address part, ZIP aside ("Austin, TX 78701", "Reno Nevada"),
+# so "Virginia St" or "Washington Ave" don't read as states
+_TAIL = r"\.?\s*(?:\d{5}(?:-\d{4})?)?\s*$"
+_CODE = re.compile(r"(?<![A-Za-z])([A-Z]{2}|D\.C)\.?\s*(\d{5}(?:-\d{4})?)?\s*$")
+_ALIASES = {k.lower(): v for k, v in STATE_ALIAS.items()}
+_STATE_NAMES = sorted(set(STATES) | set(STATE_ALIAS), key=len, reverse=True)
+_STATE_NAME_RE = re.compile(r"(?<![a-z])(" + "|".join(re.escape(s.lower().rstrip(".")) for s in _STATE_NAMES) + ")" + _TAIL)
+
+
+def city_key(name):
+    # "St. Louis" / "saint louis" / "ST LOUIS" -> "saint louis"
+    key = " ".join(_NON_WORD.sub(" ", str(name or "").lower().replace("'", "")).split())
+    return re.sub(r"^(st|ste|mt|ft)\b", lambda m: {"st": "saint", "ste": "sainte", "mt": "mount", "ft": "fort"}[m.group(1)], key)
+
+
+def _state_name(value):
+    # USPS code or state name -> STATES name (None if unknown)
+    value = str(value or "").strip()
+    if value.upper() in USPS_STATE_CODES:
+        return USPS_STATE_CODES[value.upper()]
+    value = _ALIASES.get(value.lower(), value).lower()
+    return next((s for s in STATES if s.lower() == value), None)
+
+
+# =========================
+# COMPILED TABLE
+# =========================
+def _source_hash(source_csv):
+    h = hashlib.sha1(f"{GAZETTEER_VERSION}|{sys.byteorder}|{sorted(ZIP3_RANGES.items())}|{sorted(STATE_CITIES.items())}".encode())
+    if source_csv:
+        st = os.stat(source_csv)
+        h.update(f"|{os.path.abspath(source_csv)}|{st.st_size}|{st.st_mtime_ns}".encode())
+    return h.digest()
+
+
+def _prefix_ranges(spec):
+    for part in spec.split(","):
+        lo, _, hi = part.strip().partition("-")
+        yield int(lo), int(hi or lo)
+
+
+def compile_gazetteer(path, source_csv=""):
+    # Writes the binary table to `path` (atomically, so concurrent processes never see half a file)
+    states = [""] + STATES
+    index = {s: i for i, s in enumerate(states)}
+    zip_state = bytearray(ZIP_COUNT)
+    zip_city = array("I", bytes(4 * ZIP_COUNT))
+    cities = set()
+    for code, spec in ZIP3_RANGES.items():
+        s = index[USPS_STATE_CODES[code]]
+        for lo, hi in _prefix_ranges(spec):
+            zip_state[lo * 100:(hi + 1) * 100] = bytes([s]) * ((hi - lo + 1) * 100)
+    for code, names in STATE_CITIES.items():
+        cities.update((city_key(n), USPS_STATE_CODES[code]) for n in names.split(","))
+    by_zip = {}
+    if source_csv:
+        with open(source_csv, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            fields = {(name or "").strip().lower(): name for name in reader.fieldnames or []}
+            missing = [c for c in ("zip", "city", "state") if c not in fields]
+            if missing:
+                raise ValueError(f"{source_csv}: needs zip, city and state columns (missing {', '.join(missing)}).")
+            for row in reader:
+                z, state = str(row[fields["zip"]] or "").strip().zfill(5)[:5], _state_name(row[fields["state"]])
+                city = city_key(row[fields["city"]])
+                if not z.isdigit() or state is None:
+                    continue
+                zip_state[int(z)] = index[state]
+                if city:
+                    cities.add((city, state))
+                    by_zip[int(z)] = (city, state)
+    records = sorted(f"{city}\x1f{state}" for city, state in cities if city)
+    position = {r: i for i, r in enumerate(records)}
+    for z, (city, state) in by_zip.items():
+        zip_city[z] = position[f"{city}\x1f{state}"] + 1
+    block = bytearray()
+    offsets = array("I")
+    for r in records:
+        offsets.append(len(block))
+        block += r.encode("utf-8")
+    offsets.append(len(block))
+    names = "\x1e".join(states).encode("utf-8")
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, _source_hash(source_csv), len(names), len(records), len(block)))
+        f.write(names)
+        f.write(bytes(-len(names) % 4))  # keep the uint32 arrays aligned
+        f.write(zip_state)
+        f.write(zip_city.tobytes())
+        f.write(offsets.tobytes())
+        f.write(block)
+    os.replace(tmp, path)
+
+
+class Gazetteer:
+    # Read-only view of the compiled table; safe to share between threads
+    def __init__(self, path=GAZETTEER_PATH, source_csv=GAZETTEER_CSV):
+        digest = _source_hash(source_csv)
+        if not self._current(path, digest):
+            compile_gazetteer(path, source_csv)
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, names_len, n_cities, block_len = HEADER.unpack_from(self._mm, 0)
+        at = HEADER.size
+        self.states = bytes(self._mm[at:at + names_len]).decode("utf-8").split("\x1e")
+        at += names_len + (-names_len % 4)
+        self._zip_state_at = at
+        self._zip_state = memoryview(self._mm)[at:at + ZIP_COUNT]
+        at += ZIP_COUNT
+        self._zip_city = memoryview(self._mm)[at:at + 4 * ZIP_COUNT].cast("I")
+        at += 4 * ZIP_COUNT
+        self._offsets = memoryview(self._mm)[at:at + 4 * (n_cities + 1)].cast("I")
+        at += 4 * (n_cities + 1)
+        self._block = memoryview(self._mm)[at:at + block_len]
+        self.n_cities = n_cities
+
+    @staticmethod
+    def _current(path, digest):
+        try:
+            with open(path, "rb") as f:
+                head = f.read(HEADER.size)
+        except OSError:
+            return False
+        return len(head) == HEADER.size and HEADER.unpack(head)[:2] == (MAGIC, digest)
+
+    def _record(self, i):
+        city, _, state = bytes(self._block[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8").partition("\x1f")
+        return city, state
+
+    def zip_state(self, zip_code):
+        # "78701" -> "Texas" (None if unknown)
+        z = str(zip_code or "").strip()[:5]
+        if len(z) != 5 or not z.isdigit():
+            return None
+        return self.states[self._zip_state[int(z)]] or None
+
+    def zip_city(self, zip_code):
+        # Only known when the table was compiled with a ZIP file
+        z = str(zip_code or "").strip()[:5]
+        if len(z) != 5 or not z.isdigit() or not self._zip_city[int(z)]:
+            return None
+        return self._record(self._zip_city[int(z)] - 1)[0]
+
+    def city_states(self, name):
+        # City name -> every state with a city of that name, in name order
+        key = city_key(name)
+        lo, hi = 0, self.n_cities
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._record(mid)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        out = []
+        while lo < self.n_cities:
+            city, state = self._record(lo)
+            if city != key:
+                break
+            out.append(state)
+            lo += 1
+        return out
+
+    def zip_state_array(self):
+        # numpy view (no copy) of the ZIP -> state index table, for the batch path
+        import numpy as np
+        return np.frombuffer(self._mm, dtype=np.uint8, count=ZIP_COUNT, offset=self._zip_state_at)
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+
+def gazetteer():
+    # One table per process, opened on first use
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = Gazetteer()
+    return _gazetteer
+
+
+# =========================
+# TEXT -> STATE
+# =========================
+def find_zip(text):
+    # Last 5-digit group that isn't a leading house number ("123 Main St, Austin, TX 78701")
+    text = str(text or "")
+    m = re.search(_ZIP_TAIL, text, re.S) or re.match(_ZIP_ONLY, text)
+    return m.group(1) if m else None
+
+
+def _written(text):
+    # -> (state, USPS code it was written as, else None)
+    parts = str(text or "").split(",")
+    for i in range(len(parts) - 1, -1, -1):
+        part = parts[i].strip()
+        m = _CODE.search(part)
+        if m and (m.group(2) or (i and m.start() == 0)):
+            code = m.group(1).replace(".", "")
+            if code in USPS_STATE_CODES:
+                return USPS_STATE_CODES[code], code
+        m = _STATE_NAME_RE.search(part.lower())
+        if m:
+            return _state_name(m.group(1)) or _state_name(m.group(1) + "."), None
+    return None, None
+
+
+def written_state(text):
+    # A state spelled out ("Austin, Texas") or as a USPS code in capitals ("Austin, TX")
+    return _written(text)[0]
+
+
+def _city_candidates(text):
+    # Runs of one to three words in each comma-separated part, last part and longest run first
+    # ("st louis airport" -> ..., "saint louis", ...)
+    for part in reversed(str(text or "").split(",")):
+        words = city_key(part).split()
+        for n in (3, 2, 1):
+            for i in range(len(words) - n, -1, -1):
+                yield " ".join(words[i:i + n])
+
+
+@functools.lru_cache(maxsize=LOCATION_CACHE_SIZE)
+def parse_location(text):
+    # -> {"state", "source": "zip" | "state" | "city" | None, "city", "candidates"}; a written state
+    # beats a ZIP (a typo in five digits is likelier than in a state name), a ZIP beats a city,
+    # and a city beats an AMBIGUOUS_CODES code it isn't in
+    g = gazetteer()
+    zip_code = find_zip(text)
+    city, candidates = (g.zip_city(zip_code) if zip_code else None), []
+    for key in _city_candidates(text):
+        found = g.city_states(key)
+        if found:
+            city, candidates = key, found
+            break
+    state, code = _written(text)
+    if code in AMBIGUOUS_CODES and candidates and state not in candidates:
+        state = None
+    source = "state" if state else None
+    if state is None and zip_code:
+        state = g.zip_state(zip_code)
+        source = "zip" if state else None
+    if state is None and len(candidates) == 1:
+        state, source = candidates[0], "city"
+    return {"state": state, "source": source, "city": city, "candidates": candidates if state is None else []}
+
+
+def infer_state(pickup, dropoff=""):
+    # The incident state from the ride's pickup (preferred) or drop-off; None when neither says
+    p, d = parse_location(pickup or ""), parse_location(dropoff or "")
+    best = p if p["state"] else d
+    both = {x["state"] for x in (p, d) if x["state"]}
+    return {"state": best["state"], "source": best["source"], "pickup": p, "dropoff": d,
+            "conflict": len(both) > 1, "candidates": p["candidates"] or d["candidates"]}
+
+
+# =========================
+# BATCH
+# =========================
+def _extract(texts, pattern):
+    # Group "m" of `pattern` per text, as an object array (None where it doesn't match); run by
+    # Arrow's RE2 engine when pyarrow is installed, else by pandas row by row
+    import numpy as np
+    if not ARROW:
+        found = texts.str.extract(pattern, expand=False)
+        return found.astype(object).where(found.notna(), None).to_numpy(dtype=object)
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    found = pc.extract_regex(pa.array(texts.to_numpy(), type=pa.string()), pattern)
+    out = found.field("m").to_numpy(zero_copy_only=False).astype(object)
+    out[~found.is_valid().to_numpy(zero_copy_only=False)] = None
+    return np.asarray(out, dtype=object)
+
+
+def state_column(texts):
+    # Series of location text -> Series of inferred states (None where unknown), same answers as
+    # parse_location. The common shapes ("..., TX 78701", "..., TX", a bare ZIP) are read
+    # column-wise, ZIPs through the mapped table; the rest is parsed once per distinct text.
+    import numpy as np
+    import pandas as pd
+    g = gazetteer()
+    texts = texts.fillna("").astype(str)
+    out = np.full(len(texts), None, dtype=object)
+    code = _extract(texts, _CODE_AFTER_COMMA)
+    before_zip = _extract(texts, _CODE_BEFORE_ZIP)
+    code[code == None] = before_zip[code == None]  # noqa: E711 (element-wise)
+    code[np.isin(code, list(AMBIGUOUS_CODES))] = None  # may be a city's shorthand: parse_location decides
+    by_code = code != None  # noqa: E711
+    out[by_code] = [USPS_STATE_CODES.get(c.replace(".", "")) for c in code[by_code]]
+    by_code[by_code] = out[by_code] != None  # noqa: E711
+    bare = _extract(texts, _ZIP_ONLY)
+    by_zip = (bare != None) & ~by_code  # noqa: E711
+    table = np.array([s or None for s in g.states], dtype=object)
+    out[by_zip] = table[g.zip_state_array()[bare[by_zip].astype(np.int64)]]
+    rest = ~(by_code | by_zip)
+    parsed = {t: parse_location(t)["state"] for t in pd.unique(texts.to_numpy()[rest])}
+    out[rest] = [parsed[t] for t in texts.to_numpy()[rest]]
+    return pd.Series(out, index=texts.index, dtype=object)
+
+
+AUDIT_COLUMNS = ["row", "id", "RecordedState", "InferredState", "PickupState", "DropoffState", "Pickup", "Dropoff"]
+
+
+def audit_frame(df):
+    # df with State, Pickup, Dropoff (export payload names) -> every row with the state its
+    # locations point to; "Mismatch" where that's known and differs from the recorded one
+    import pandas as pd
+    empty = pd.Series("", index=df.index, dtype=object)
+    pickup, dropoff = state_column(df.get("Pickup", empty)), state_column(df.get("Dropoff", empty))
+    inferred = pickup.where(pickup.notna(), dropoff)
+    recorded = df.get("State", empty).fillna("").astype(str).map(lambda s: _state_name(s) or s)
+    return pd.DataFrame({
+        "id": df["id"] if "id" in df else pd.Series(df.index, index=df.index), "RecordedState": recorded,
+        "InferredState": inferred, "PickupState": pickup, "DropoffState": dropoff,
+        "Pickup": df.get("Pickup", empty), "Dropoff": df.get("Dropoff", empty),
+        "Mismatch": inferred.notna() & (inferred != recorded),
+    })
+
+
+def audit_file(source, output, progress=None):
+    # Returns stats; mismatched rows are written to `output` (.csv / .jsonl / .parquet) a chunk at a time
+    import pandas as pd
+    from intake_batch import iter_chunks, ResultWriter
+    writer = ResultWriter(output)
+    stats = {"intakes": 0, "located": 0, "wrong": 0, "elapsed_s": 0.0}
+    t0 = perf_counter()
+    written = False
+    try:
+        for row0, chunk in iter_chunks(source):
+            audit = audit_frame(pd.DataFrame(chunk, index=pd.RangeIndex(row0, row0 + len(chunk), name="row")))
+            wrong = audit[audit["Mismatch"]].drop(columns="Mismatch").reset_index()
+            stats["intakes"] += len(audit)
+            stats["located"] += int(audit["InferredState"].notna().sum())
+            stats["wrong"] += len(wrong)
+            if len(wrong):
+                wrong["id"] = wrong["id"].astype(str)
+                writer.write(wrong[AUDIT_COLUMNS].astype({c: "string" for c in AUDIT_COLUMNS[1:]}))
+                written = True
+            stats["elapsed_s"] = perf_counter() - t0
+            if progress:
+                progress(stats)
+        if not written:
+            writer.write(pd.DataFrame(columns=AUDIT_COLUMNS))  # header only: nothing to flag
+    finally:
+        writer.close()
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m intake_app states",
+                                 description="Flag intakes whose recorded state disagrees with their pickup / drop-off.")
+    ap.add_argument("input", help="archive .sqlite3, or intakes .csv / .jsonl")
+    ap.add_argument("-o", "--output", required=True, help="audit file: .csv, .jsonl or .parquet")
+    args = ap.parse_args(argv)
+    try:
+        stats = audit_file(args.input, args.output,
+                           lambda s: print(f"\r{s['intakes']:>12,} intakes", end="", file=sys.stderr, flush=True))
+    except (ValueError, OSError) as e:
+        ap.error(str(e))
+    print(file=sys.stderr)
+    print(f"{stats['intakes']:,} intakes in {stats['elapsed_s']:.1f}s; {stats['located']:,} with a recognizable "
+          f"location; {stats['wrong']:,} with a different recorded state -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# Small reactive graph for the values render() derives from the intake answers.
+#
+# A node declares the keys it reads (answers published by the intake sections, or other nodes)
+# and is recomputed only when one of those inputs compares unequal to the last run. GraphState
+# keeps the memo per session and records what was recomputed and why, so the UI can show why
+# a decision changed.
+from datetime import datetime, time
+
+import intake_clock
+from intake_eligibility import (
+    ACT_FIELDS, INTAKE_DEFAULTS, REPORT_FIELDS,
+    tier_step, sol_step, sol_open, report_step, screening_step, decide,
+)
+
+
+class DerivedGraph:
+    def __init__(self):
+        self.nodes = {}  # name -> (input keys, fn)
+
+    def derive(self, name, *inputs):
+        def register(fn):
+            if name in inputs:
+                raise ValueError(f"Node '{name}' cannot depend on itself.")
+            self.nodes[name] = (tuple(inputs), fn)
+            return fn
+        return register
+
+    def upstream(self, name):
+        # Every node `name` depends on (itself included), dependencies first.
+        order, seen = [], set()
+
+        def visit(n):
+            if n in seen or n not in self.nodes:
+                return
+            seen.add(n)
+            for i in self.nodes[n][0]:
+                visit(i)
+            order.append(n)
+        visit(name)
+        return order
+
+    def sources(self, name):
+        return sorted({i for n in self.upstream(name) for i in self.nodes[n][0] if i not in self.nodes})
+
+
+class GraphState:
+    def __init__(self, graph):
+        self.graph = graph
+        self.memo = {}        # node -> (input values, value)
+        self.last_pass = {}   # node -> list of input keys that changed ([] = served from memo)
+        self._pass = None
+
+    def value(self, name, sources):
+        self._pass = {}
+        self.last_pass = {}
+        try:
+            return self._get(name, sources)
+        finally:
+            self._pass = None
+
+    def _get(self, name, sources):
+        if name not in self.graph.nodes:
+            return sources[name]
+        if name in self._pass:
+            return self._pass[name]
+        inputs, fn = self.graph.nodes[name]
+        args = tuple(self._get(i, sources) for i in inputs)
+        cached = self.memo.get(name)
+        if cached is not None and cached[0] == args:
+            self.last_pass[name] = []
+            value = cached[1]
+        else:
+            old = cached[0] if cached is not None else (object(),) * len(inputs)
+            self.last_pass[name] = [i for i, a, b in zip(inputs, args, old) if a != b]
+            value = fn(*args)
+            self.memo[name] = (args, value)
+        self._pass[name] = value
+        return value
+
+    def recomputed(self):
+        return {n: changed for n, changed in self.last_pass.items() if changed}
+
+    def explain(self, name):
+        # One line per node upstream of `name`: recomputed (and which inputs changed) or cached.
+        lines = []
+        for n in self.graph.upstream(name):
+            inputs = self.graph.nodes[n][0]
+            changed = self.last_pass.get(n)
+            if changed is None:
+                status = "not evaluated"
+            elif changed:
+                status = "recomputed — changed: " + ", ".join(changed)
+            else:
+                status = "cached"
+            lines.append(f"{n} ← {', '.join(inputs)} | {status}")
+        return lines
+
+
+# =========================
+# INTAKE NODES
+# =========================
+# Sources are the values the intake sections publish (see publish() in intake_app) plus "today" / "now".
+INTAKE_GRAPH = DerivedGraph()
+ACT_KEYS = tuple(ACT_FIELDS.values())
+SCREENING_KEYS = (
+    "company", "scope_choice", "has_atty", "felony", "victim_weapon", "gov_id", "female_rider",
+    "rider_not_driver", "verbal_only", "attempt_only", "receipt_evidence", "any_pdf_uploaded", "any_av_uploaded",
+)
+
+
+@INTAKE_GRAPH.derive("incident_dt", "incident_date", "incident_time", "today")
+def _incident_dt(incident_date, incident_time, today):
+    return datetime.combine(incident_date or today, incident_time or time(0, 0))
+
+
+@INTAKE_GRAPH.derive("tier", *ACT_KEYS)
+def _tier(*flags):
+    return tier_step(dict(zip(ACT_KEYS, flags)))
+
+
+@INTAKE_GRAPH.derive("category", "tier")
+def _category(tier):
+    return tier["category"]
+
+
+@INTAKE_GRAPH.derive("sol", "state", "category", "incident_dt")
+def _sol(state, category, incident_dt):
+    return sol_step(state, category, incident_dt)
+
+
+# Kept apart from "sol" so the clock ticking between reruns only re-runs this comparison
+@INTAKE_GRAPH.derive("sol_time_ok", "sol", "now")
+def _sol_time_ok(sol, now):
+    return sol_open(sol["sol_end"], now)
+
+
+@INTAKE_GRAPH.derive("reports", "incident_dt", "report_dates", "family_report_dt")
+def _reports(incident_dt, report_dates, family_report_dt):
+    r = {field: report_dates.get(channel) for channel, field in REPORT_FIELDS.items()}
+    r["report_family"] = family_report_dt
+    return report_step(r, incident_dt)
+
+
+@INTAKE_GRAPH.derive("screening", *SCREENING_KEYS)
+def _screening(company, scope_choice, has_atty, felony, victim_weapon, gov_id, female_rider,
+               rider_not_driver, verbal_only, attempt_only, receipt_evidence, any_pdf_uploaded,
+               any_av_uploaded):
+    r = {**INTAKE_DEFAULTS,
+         "company": company, "scope": scope_choice, "has_atty": has_atty, "felony": felony,
+         "victim_weapon": (victim_weapon == "Yes"), "gov_id": gov_id, "female_rider": female_rider,
+         "rider_not_driver": rider_not_driver, "verbal_only": verbal_only, "attempt_only": attempt_only,
+         "receipt_email": "Email" in receipt_evidence, "receipt_pdf": "PDF" in receipt_evidence,
+         "any_pdf_uploaded": any_pdf_uploaded, "any_av_uploaded": any_av_uploaded}
+    return screening_step(r)
+
+
+@INTAKE_GRAPH.derive("eligibility", "incident_dt", "tier", "sol", "sol_time_ok", "reports", "screening")
+def _eligibility(incident_dt, tier, sol, sol_time_ok, reports, screening):
+    return decide({"incident_dt": incident_dt, **tier, **sol, "sol_time_ok": sol_time_ok, **reports, **screening})
+
+
+# =========================
+# FLAT RECORD
+# =========================
+def intake_record(c, today=None):
+    # The same answers as one flat evaluate() / evaluate_frame() record (timelines, benchmarks).
+    # An unknown incident date is today at the incident time, as _incident_dt builds it for the
+    # form; incident_known keeps the difference for the timeline.
+    today = today or intake_clock.now().date()
+    r = {field: c[field] for field in ACT_FIELDS.values()}
+    r.update({field: c["report_dates"].get(channel) for channel, field in REPORT_FIELDS.items()})
+    r.update(
+        company=c["company"], state=c["state"], scope=c["scope_choice"],
+        incident_dt=_incident_dt(c["incident_date"], c["incident_time"], today),
+        incident_known=c["incident_date"] is not None,
+        report_family=c["family_report_dt"], verbal_only=c["verbal_only"], attempt_only=c["attempt_only"],
+        receipt_email="Email" in c["receipt_evidence"], receipt_pdf="PDF" in c["receipt_evidence"],
+        any_pdf_uploaded=c["any_pdf_uploaded"], any_av_uploaded=c["any_av_uploaded"],
+        gov_id=c["gov_id"], female_rider=c["female_rider"], rider_not_driver=c["rider_not_driver"],
+        has_atty=c["has_atty"], felony=c["felony"], victim_weapon=(c["victim_weapon"] == "Yes"),
+    )
+    return r
@@ -0,0 +1,213 @@
+# Streaming bulk import of vendor lead files (CSV / JSONL) with pre-qualification.
+#
+# The file is read in fixed-size chunks; each chunk is mapped onto the engine's record fields
+# (see INTAKE_DEFAULTS) and run through evaluate_frame, so leads get the same Tier / SOL / firm
+# decision the form would give. Only a compact result row per lead is kept, then the whole list
+# is ranked so dialers call the leads most likely to qualify first.
+import os
+
+import numpy as np
+import pandas as pd
+
+from intake_rules import STATES, STATE_ALIAS, USPS_STATE_CODES, RIDESHARE_COMPANIES
+from intake_eligibility import ACT_FIELDS, REPORT_FIELDS, INTAKE_DEFAULTS, FIRM_CHECKS, evaluate_frame
+from intake_dedupe import dedupe_frame
+import intake_clock
+
+IMPORT_CHUNK_ROWS = 20_000
+
+# Vendor column names (lower-cased, spaces/dashes -> "_") accepted for each engine field
+COLUMN_ALIASES = {
+    "company": ("company", "rideshare_company", "platform", "rideshare"),
+    "state": ("state", "incident_state", "state_of_incident"),
+    "incident_date": ("incident_date", "date_of_incident", "ride_date", "incident_dt"),
+    "incident_time": ("incident_time", "time_of_incident", "ride_time"),
+    "acts": ("acts", "acts_selected", "incident_type", "what_happened"),
+    "reported_to": ("reported_to", "reported", "report_channels"),
+    "report_date": ("report_date", "date_reported"),
+    "scope": ("scope", "location_scope", "where_it_happened"),
+    "receipt_evidence": ("receipt_evidence", "receipt"),
+    "has_atty": ("has_atty", "has_attorney", "attorney", "represented"),
+    "felony": ("felony", "felony_history"),
+    "gov_id": ("gov_id", "government_id", "has_id"),
+    "female_rider": ("female_rider", "female"),
+    "rider_not_driver": ("rider_not_driver", "is_rider"),
+    "victim_weapon": ("victim_weapon",),
+    "verbal_only": ("verbal_only",),
+    "attempt_only": ("attempt_only",),
+    "phone": ("phone", "phone_number", "caller_phone", "mobile"),
+    "email": ("email", "email_address", "caller_email"),
+    "legal_name": ("legal_name", "full_name", "name", "caller_legal_name"),
+}
+PASSTHROUGH_FIELDS = ("legal_name", "phone", "email", "state", "company", "incident_date")
+BOOL_FIELDS = ("has_atty", "felony", "gov_id", "female_rider", "rider_not_driver", "victim_weapon", "verbal_only", "attempt_only")
+TRUTHY = {"1", "true", "yes", "y", "t", "x"}
+FALSY = {"0", "false", "no", "n", "f"}
+
+# Keywords in a free-text "reported to" cell -> report channel (labels as the form lists them)
+REPORT_KEYWORDS = {
+    "Family/Friends": ("family", "friend"),
+    "Physician": ("physician", "doctor", "hospital"),
+    "Therapist": ("therapist", "counselor"),
+    "Police": ("police",),
+    "Rideshare company": ("rideshare", "uber", "lyft"),
+}
+ACT_KEYWORDS = {field: (label.lower(), field) for label, field in ACT_FIELDS.items()}
+
+# Checks a lead can still satisfy on the call (documents, report details) vs. hard disqualifiers
+SOFT_CHECKS = ("wag_report_ok", "report_any", "triten_receipt_ok", "gov_id", "inside_near")
+SOFT_REASONS = tuple(sorted({reason for checks in FIRM_CHECKS.values() for check, reason in checks if check in SOFT_CHECKS}))
+_STATE_LOOKUP = {
+    **{s.lower(): s for s in STATES},
+    **{a.lower(): s for a, s in STATE_ALIAS.items()},
+    **{c.lower(): s for c, s in USPS_STATE_CODES.items()},
+}
+
+
+# =========================
+# READING
+# =========================
+def _canon(col):
+    return str(col).strip().lower().replace(" ", "_").replace("-", "_")
+
+
+def read_lead_chunks(source, chunk_rows=IMPORT_CHUNK_ROWS, fmt=None):
+    # source: path or file-like. fmt: "csv" / "jsonl" (guessed from the file name when omitted)
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    fmt = fmt or ("jsonl" if os.path.splitext(str(name))[1].lower() in (".jsonl", ".ndjson", ".json") else "csv")
+    if fmt == "jsonl":
+        reader = pd.read_json(source, lines=True, chunksize=chunk_rows, dtype=False)
+    else:
+        reader = pd.read_csv(source, chunksize=chunk_rows, dtype=str, keep_default_na=False)
+    with reader:
+        for chunk in reader:
+            yield chunk.rename(columns=_canon)
+
+
+# =========================
+# MAPPING
+# =========================
+def _pick(chunk, field):
+    for alias in COLUMN_ALIASES[field]:
+        if alias in chunk:
+            return chunk[alias].fillna("").astype(str)
+    return pd.Series("", index=chunk.index, dtype=object)
+
+
+def _map_distinct(series, fn):
+    # Vendor columns are low-cardinality (states, yes/no, act lists): map each distinct value once
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = [fn(v.strip()) for v in uniques]
+    return [m[codes] for m in np.array(mapped, dtype=object).reshape(len(mapped), -1).T]
+
+
+def _company(v):
+    v = v.title()
+    return (v if v in RIDESHARE_COMPANIES else "Other") if v else INTAKE_DEFAULTS["company"]
+
+
+def _bool_text(default):
+    def parse(v):
+        v = v.lower()
+        return True if v in TRUTHY else False if v in FALSY else default
+    return parse
+
+
+def _keyword_flags(table):
+    def parse(v):
+        v = v.lower()
+        return tuple(any(kw in v for kw in keywords) for keywords in table.values())
+    return parse
+
+
+def _dates(series):
+    return pd.to_datetime(series.replace("", None), errors="coerce", format="mixed").astype("datetime64[ns]")
+
+
+def map_lead_chunk(chunk, now):
+    # Vendor columns -> the flat record evaluate_frame expects; missing answers keep INTAKE_DEFAULTS.
+    rec = pd.DataFrame(index=chunk.index)
+
+    (rec["company"],) = _map_distinct(_pick(chunk, "company"), _company)
+    (rec["state"],) = _map_distinct(_pick(chunk, "state"), lambda v: _STATE_LOOKUP.get(v.lower(), ""))
+    (rec["scope"],) = _map_distinct(_pick(chunk, "scope"), lambda v: v or INTAKE_DEFAULTS["scope"])
+
+    # "14:30", "2:30 PM", "14:30:00" -> time of day; unparseable -> midnight (the form's default)
+    clock = _dates("2000-01-01 " + _pick(chunk, "incident_time").replace("", "00:00"))
+    rec["incident_dt"] = _dates(_pick(chunk, "incident_date")).dt.normalize() + (clock - pd.Timestamp("2000-01-01")).fillna(pd.Timedelta(0))
+
+    for field, flags in zip(ACT_KEYWORDS, _map_distinct(_pick(chunk, "acts"), _keyword_flags(ACT_KEYWORDS))):
+        rec[field] = flags.astype(bool)
+
+    # A listed channel without its own date gets the shared report_date, else "today" (the form's default)
+    listed = dict(zip(REPORT_KEYWORDS, _map_distinct(_pick(chunk, "reported_to"), _keyword_flags(REPORT_KEYWORDS))))
+    shared_date = _dates(_pick(chunk, "report_date")).fillna(pd.Timestamp(now).normalize())
+    for channel, field in REPORT_FIELDS.items():
+        on = listed[channel].astype(bool)
+        value = shared_date
+        if field in chunk:
+            own = _dates(chunk[field].fillna("").astype(str))
+            on = on | own.notna().to_numpy()
+            value = own.fillna(shared_date)
+        rec[field] = value.where(on, pd.NaT)
+
+    receipt = _map_distinct(_pick(chunk, "receipt_evidence"), _keyword_flags({"email": ("email",), "pdf": ("pdf",)}))
+    rec["receipt_email"], rec["receipt_pdf"] = (r.astype(bool) for r in receipt)
+    for field in BOOL_FIELDS:
+        (values,) = _map_distinct(_pick(chunk, field), _bool_text(INTAKE_DEFAULTS[field]))
+        rec[field] = values.astype(bool)
+    return rec
+
+
+# =========================
+# PRE-QUALIFICATION
+# =========================
+def _priority(ev):
+    # 0 = qualifies for two or more firms, 1 = one firm, 2 = only fixable gaps (documents / report
+    # details), 3 = hard disqualifier
+    n_ok = sum(ev[f"{key}_ok"].astype(int) for key in FIRM_CHECKS)
+    soft_only = np.ones(len(ev), dtype=bool)
+    for key in FIRM_CHECKS:
+        (only,) = _map_distinct(ev[f"{key}_reasons"], lambda v: all(r in SOFT_REASONS for r in v.split("; ") if r))
+        soft_only &= only.astype(bool)
+    return pd.Series(np.select([n_ok >= 2, n_ok == 1, soft_only], [0, 1, 2], 3), index=ev.index)
+
+
+def prequalify_chunk(chunk, now, row_offset=0):
+    rec = map_lead_chunk(chunk, now)
+    ev = evaluate_frame(rec, now=now)
+    out = pd.DataFrame({"lead_row": np.arange(row_offset, row_offset + len(chunk))}, index=chunk.index)
+    for field in PASSTHROUGH_FIELDS:
+        out[field] = _pick(chunk, field).str.strip()
+    out["state"] = rec["state"]
+    out["company"] = rec["company"]
+    # Unknown state has no SOL row, which the engine reads as "no SOL": confirm it on the call first
+    out["priority"] = _priority(ev).where(rec["state"] != "", lambda p: p.clip(lower=2))
+    cols = (["tier_label"] + [f"{key}_ok" for key in FIRM_CHECKS] + ["file_by_deadline", "file_by_days_remaining"]
+            + [f"{key}_reasons" for key in FIRM_CHECKS])
+    for col in cols:
+        out[col] = ev[col]
+    return out
+
+
+def prequalify_leads(source, chunk_rows=IMPORT_CHUNK_ROWS, now=None, dedupe=True, progress=None):
+    # Returns the prioritized call list (one compact row per lead; duplicates collapsed onto the
+    # best-ranked copy when dedupe=True). progress(rows_done) is called after every chunk.
+    now = pd.Timestamp(now or intake_clock.now())
+    parts, done = [], 0
+    for chunk in read_lead_chunks(source, chunk_rows):
+        parts.append(prequalify_chunk(chunk, now, done))
+        done += len(chunk)
+        if progress:
+            progress(done)
+    if not parts:
+        return pd.DataFrame()
+    leads = pd.concat(parts, ignore_index=True)
+    # Most likely to qualify first; within a priority, the nearest file-by deadline first ("No SOL" last)
+    leads = leads.sort_values(["priority", "file_by_days_remaining", "lead_row"], na_position="last", kind="stable")
+    leads = leads.reset_index(drop=True)
+    if dedupe:
+        leads = dedupe_frame(leads, phone_cols=("phone",), email_cols=("email",))
+        leads = leads[~leads["is_duplicate"]].drop(columns=["dup_group", "is_duplicate"]).reset_index(drop=True)
+    leads.insert(0, "call_rank", np.arange(1, len(leads) + 1))
+    return leads
@@ -0,0 +1,295 @@
+# Narrative matcher: suggests the act checkboxes (and so a provisional tier) from the caller's
+# own words, for the agent to confirm.
+#
+# NARRATIVE_LEXICON is a curated phrase list per act. Every phrase (plus the negation and threat
+# cues) is compiled once into one Aho-Corasick automaton over characters, so a narrative is
+# scanned in a single pass whatever the size of the lexicon. Phrases match whole words; a
+# trailing "*" matches any ending ("grop*" -> groped, groping). Where matches overlap the longest
+# wins ("touching himself" is masturbation, not touching). A negation cue only negates the act
+# it governs: the act must follow it directly or across at most NEGATION_WINDOW filler words
+# ("he didn't touch me", "no penetration", "didn't even try to touch"). Any other word, a comma,
+# colon, dash or sentence end in between leaves the act standing ("I did not consent, he raped
+# me", "he would not stop touching me", "I said no and he touched me"). The two aggravators also
+# need a threat somewhere in the narrative, as on the form.
+#
+# Batch mode re-reads archived / exported narratives ("Narrative") and lists the intakes whose
+# ticked acts disagree with their narrative:
+#
+#   python -m intake_app narratives intake_store.sqlite3 -o mistiered.csv
+import argparse
+import re
+import sys
+from collections import deque
+from time import perf_counter
+
+from intake_rules import tier_and_aggravators
+from intake_eligibility import ACT_FIELDS
+
+NEGATION_WINDOW = 3
+NARRATIVE_COLUMNS = ("Narrative", "narrative")
+
+# Act label (ACT_FIELDS) -> phrases
+NARRATIVE_LEXICON = {
+    "Rape/Penetration": (
+        "rape*", "raping", "penetrat*", "forced sex", "had sex with me", "sex with me", "intercourse",
+        "sodomi*", "inside me", "fingered me", "fingers inside", "fingers in my", "put his fingers in",
+        "put his hand in my pants",
+    ),
+    "Forced Oral/Forced Touching": (
+        "oral", "blow job", "blowjob", "go down on", "his mouth on my", "made me touch", "forced me to touch",
+        "forced my hand", "grabbed my hand and put", "put my hand on his", "made me give",
+    ),
+    "Touching/Kissing w/o Consent": (
+        "touch*", "grop*", "fondl*", "kiss*", "felt me up", "rubbed my", "rubbing my", "grabbed my",
+        "hand on my thigh", "hand on my leg", "hand up my", "licked", "squeezed my", "slapped my butt",
+    ),
+    "Indecent Exposure": (
+        "expos*", "flash*", "showed me his penis", "pulled out his penis", "took out his penis", "pants down",
+        "unzipped", "naked",
+    ),
+    "Masturbation Observed": (
+        "masturbat*", "jerking off", "jerked off", "jacking off", "touching himself", "playing with himself",
+        "stroking himself", "pleasuring himself",
+    ),
+    "Kidnapping Off-Route w/ Threats": (
+        "kidnap*", "off route", "wrong way", "wrong direction", "different direction", "changed the route",
+        "drove past my", "drove me somewhere", "drove me to a", "took me to a", "refused to stop",
+        "wouldnt stop the car", "would not stop the car",
+    ),
+    "False Imprisonment w/ Threats": (
+        "locked the door*", "child lock*", "doors locked", "wouldnt let me out", "would not let me out",
+        "wouldnt let me leave", "would not let me leave", "couldnt get out", "could not get out", "trapped",
+        "held me down", "pinned me", "blocked the door",
+    ),
+}
+NEGATION_CUES = (
+    "not", "no", "never", "without", "neither", "nor", "nobody", "didnt", "doesnt", "dont", "wasnt", "werent",
+    "hasnt", "hadnt", "isnt", "cannot",
+)
+# Words that may sit between a negation cue and the act it negates; any other word ("stop",
+# "care", "and"...) means the cue governs something else
+NEGATION_FILLERS = frozenset({
+    "try", "tried", "trying", "to", "even", "ever", "once", "actually", "really", "physically", "sexually",
+    "any", "a", "an", "the", "get", "got", "be", "been", "was", "were", "forced", "or",
+})
+THREAT_CUES = (
+    "threat*", "kill*", "gun", "knife", "weapon", "hurt me", "hurt you", "choke*", "strangl*", "hit me",
+    "beat me", "or else", "scared for my life",
+)
+AGGRAVATOR_ACTS = ("Kidnapping Off-Route w/ Threats", "False Imprisonment w/ Threats")
+
+_SENTENCE_END = re.compile(r"[.!?;\n]+")
+_CLAUSE_END = re.compile(r"[,:—–]+|\s-+\s")
+_NON_WORD = re.compile(r"[^a-z0-9.,]+")
+
+
+def normalize(text):
+    # Lower case, apostrophes dropped ("didn't" -> "didnt"), sentence ends -> " . " and commas,
+    # colons, dashes -> " , " (a negation doesn't reach past either), other non-alphanumerics ->
+    # one space; padded with a space at each end so every word has a boundary on both sides
+    text = str(text or "").lower().replace("'", "").replace("’", "")
+    text = _CLAUSE_END.sub(" , ", _SENTENCE_END.sub(" . ", text))
+    return " " + _NON_WORD.sub(" ", text).strip() + " "
+
+
+# =========================
+# AUTOMATON
+# =========================
+class PhraseMatcher:
+    # Aho-Corasick over characters: goto / fail / output tables built once, matched in one pass
+    def __init__(self, phrases):
+        # phrases: [(phrase, tag)]
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]          # state -> [(pattern index)]
+        self.patterns = []       # (tag, phrase, length, prefix)
+        for phrase, tag in phrases:
+            prefix = phrase.endswith("*")
+            key = normalize(phrase.rstrip("*"))[:-1]  # leading space anchors the word start
+            if key.strip() == "":
+                continue
+            if not prefix:
+                key += " "
+            state = 0
+            for ch in key:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append(len(self.patterns))
+            self.patterns.append((tag, phrase, len(key), prefix))
+        # Breadth-first failure links; each state's outputs include those of its failure state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def scan(self, text):
+        # Normalized text -> [(start, end, pattern index)] spanning whole words ("grop*" -> "groped")
+        goto, fail, out = self.goto, self.fail, self.out
+        hits = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for p in out[state]:
+                _, _, length, prefix = self.patterns[p]
+                end = text.find(" ", i + 1) if prefix else i
+                hits.append((i + 1 - length, end, p))
+        return hits
+
+
+def _compile():
+    phrases = [(p, label) for label, group in NARRATIVE_LEXICON.items() for p in group]
+    phrases += [(p, "negation") for p in NEGATION_CUES] + [(p, "threat") for p in THREAT_CUES]
+    return PhraseMatcher(phrases)
+
+
+MATCHER = _compile()
+
+
+# =========================
+# SUGGESTIONS
+# =========================
+def _longest(hits):
+    # Drops matches that sit inside a longer one
+    kept = []
+    for start, end, p in sorted(hits, key=lambda h: (h[0], -(h[1] - h[0]))):
+        if kept and start >= kept[-1][0] and end <= kept[-1][1]:
+            continue
+        kept.append((start, end, p))
+    return kept
+
+
+def _governs(between):
+    # between: the tokens from a negation cue to an act; True when the cue negates the act
+    return len(between) <= NEGATION_WINDOW and all(w in NEGATION_FILLERS for w in between)
+
+
+def suggest_acts(narrative, matcher=None):
+    # -> {"flags": {act label: bool}, "evidence": {act label: [phrases as written]}, "negated": [...],
+    #     "tier": provisional tier label, "aggravators": [...]}
+    matcher = matcher or MATCHER
+    text = normalize(narrative)
+    hits = matcher.scan(text)
+    acts = [h for h in hits if matcher.patterns[h[2]][0] not in ("negation", "threat")]
+    cues = [h for h in hits if matcher.patterns[h[2]][0] == "negation"]
+    threat = any(matcher.patterns[h[2]][0] == "threat" for h in hits)
+    evidence, negated = {}, []
+    for start, end, p in _longest(acts):
+        label = matcher.patterns[p][0]
+        found = text[start:end].strip()
+        if any(c_end <= start and _governs(text[c_end:start + 1].split()) for _, c_end, _ in cues):
+            negated.append(found)
+            continue
+        evidence.setdefault(label, [])
+        if found not in evidence[label]:
+            evidence[label].append(found)
+    flags = {label: label in evidence and (threat or label not in AGGRAVATOR_ACTS) for label in ACT_FIELDS}
+    tier, aggravators = tier_and_aggravators(flags)
+    return {"flags": flags, "evidence": {k: v for k, v in evidence.items() if flags[k]}, "negated": negated,
+            "tier": tier, "aggravators": aggravators}
+
+
+def compare_acts(suggested, ticked):
+    # suggested: suggest_acts() flags; ticked: {act label: bool} as recorded.
+    # -> (suggested but not ticked, ticked without support in the narrative)
+    missing = [label for label in ACT_FIELDS if suggested.get(label) and not ticked.get(label)]
+    unsupported = [label for label in ACT_FIELDS if ticked.get(label) and not suggested.get(label)]
+    return missing, unsupported
+
+
+# =========================
+# BATCH
+# =========================
+def audit_rows(payloads, row0=0, only_mismatched=True):
+    # Export-shaped intakes -> audit rows: recorded vs. suggested tier and the differing acts
+    from intake_service import ACT_COLUMNS, ACT_LABELS, TRUTHY
+    columns = {ACT_LABELS[field]: key for key, field in ACT_COLUMNS.items()}
+    rows = []
+    for i, p in enumerate(payloads, start=row0):
+        narrative = next((p[c] for c in NARRATIVE_COLUMNS if p.get(c)), "")
+        if not str(narrative).strip():
+            continue
+        ticked = {}
+        for label, key in columns.items():
+            value = p.get(key)
+            ticked[label] = value.strip().lower() in TRUTHY if isinstance(value, str) else bool(value)
+        s = suggest_acts(narrative)
+        missing, unsupported = compare_acts(s["flags"], ticked)
+        recorded = tier_and_aggravators(ticked)[0]
+        mismatch = recorded.split(" (+")[0] != s["tier"].split(" (+")[0] or bool(missing)
+        if mismatch or not only_mismatched:
+            rows.append({
+                "row": i, "id": p.get("id"), "RecordedTier": recorded, "SuggestedTier": s["tier"],
+                "NotTicked": "; ".join(missing), "NotInNarrative": "; ".join(unsupported),
+                "Evidence": "; ".join(f"{label}: {', '.join(found)}" for label, found in s["evidence"].items()),
+                "Mistiered": mismatch,
+            })
+    return rows
+
+
+def audit_file(source, output, only_mismatched=True, progress=None):
+    # Returns stats; rows are written to `output` (.csv / .jsonl / .parquet) a chunk at a time
+    import pandas as pd
+    from intake_batch import iter_chunks, ResultWriter
+    writer = ResultWriter(output)
+    stats = {"intakes": 0, "narratives": 0, "flagged": 0, "elapsed_s": 0.0}
+    columns = ["row", "id", "RecordedTier", "SuggestedTier", "NotTicked", "NotInNarrative", "Evidence", "Mistiered"]
+    t0 = perf_counter()
+    written = False
+    try:
+        for row0, chunk in iter_chunks(source):
+            rows = audit_rows(chunk, row0, only_mismatched=False)
+            flagged = [r for r in rows if r["Mistiered"]]
+            stats["intakes"] += len(chunk)
+            stats["narratives"] += len(rows)
+            stats["flagged"] += len(flagged)
+            keep = flagged if only_mismatched else rows
+            if keep:
+                frame = pd.DataFrame(keep, columns=columns)
+                frame["id"] = frame["id"].map(lambda v: None if v is None else str(v)).astype("string")
+                writer.write(frame)
+                written = True
+            stats["elapsed_s"] = perf_counter() - t0
+            if progress:
+                progress(stats)
+        if not written:
+            writer.write(pd.DataFrame(columns=columns))  # header only: nothing to flag
+    finally:
+        writer.close()
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m intake_app narratives",
+                                 description="Flag intakes whose ticked acts disagree with the caller's narrative.")
+    ap.add_argument("input", help="archive .sqlite3, or intakes .csv / .jsonl with a Narrative column")
+    ap.add_argument("-o", "--output", required=True, help="audit file: .csv, .jsonl or .parquet")
+    ap.add_argument("--all", action="store_true", help="write every intake with a narrative, not only flagged ones")
+    args = ap.parse_args(argv)
+    try:
+        stats = audit_file(args.input, args.output, not args.all,
+                           lambda s: print(f"\r{s['intakes']:>12,} intakes", end="", file=sys.stderr, flush=True))
+    except (ValueError, OSError) as e:
+        ap.error(str(e))
+    print(file=sys.stderr)
+    per = stats["elapsed_s"] / stats["narratives"] * 1000 if stats["narratives"] else 0.0
+    print(f"{stats['narratives']:,} narratives of {stats['intakes']:,} intakes in {stats['elapsed_s']:.1f}s "
+          f"({per:.2f} ms each); {stats['flagged']:,} likely mis-tiered -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+# Phone numbers: free text ("(512) 555-0134 ext 2", "+1 512.555.0134", "011 44 20 7946 0958") to
+# E.164, with a reason for numbers that can't be dialled and, for US numbers, the state and time
+# zone of the area code (an offline table, below).
+#
+# A number is valid when it is
+#   a NANP number   10 digits (a leading "1" / "+1" is dropped) with a real area code and exchange:
+#                   neither starts with 0 / 1 or is an N11 code, the area code isn't N9X or 900,
+#                   and it isn't 555-01xx or one digit repeated
+#   international   "+" or "011", then 8-15 digits
+# Extensions ("x12", "ext. 12", "#12") are split off, never part of the number. Valid area codes
+# outside the table (Canada, the Caribbean, new overlays) stay valid, without a state.
+#
+# parse_phone() is one number (LRU-cached: the same few numbers are re-read on every rerun);
+# normalize_phones() is a whole column, with string ops on Arrow and the digit checks in numpy,
+# for vendor lead files. Both give the same answers:
+#
+#   python -m intake_app phones vendor_leads.csv -o leads_e164.csv
+import argparse
+import functools
+import importlib.util
+import re
+import sys
+from time import perf_counter
+
+from intake_rules import STATE_TIMEZONES, USPS_STATE_CODES
+
+ARROW = importlib.util.find_spec("pyarrow") is not None
+PHONE_CACHE_SIZE = 4096
+PHONE_CHUNK_ROWS = 200_000
+INTL_DIGITS = (8, 15)
+TOLL_FREE = frozenset({"800", "833", "844", "855", "866", "877", "888"})
+PHONE_COLUMNS = ("e164", "national", "ext", "valid", "issue", "area_code", "state", "timezone")
+
+# Area codes per USPS state code
+STATE_AREA_CODES = {
+    "AL": "205 251 256 334 483 659 938", "AK": "907", "AZ": "480 520 602 623 928", "AR": "327 479 501 870",
+    "CA": "209 213 279 310 323 341 350 369 408 415 424 442 510 530 559 562 619 626 628 650 657 661 669 707 714 "
+          "738 747 760 805 818 820 831 840 858 909 916 925 949 951",
+    "CO": "303 719 720 748 970 983", "CT": "203 475 860 959", "DC": "202 771", "DE": "302",
+    "FL": "239 305 321 324 352 386 407 448 561 645 656 689 727 728 754 772 786 813 850 863 904 941 954",
+    "GA": "229 404 470 478 678 706 762 770 912 943", "HI": "808", "ID": "208 986",
+    "IL": "217 224 309 312 331 447 464 618 630 708 730 773 779 815 847 861 872", "IN": "219 260 317 463 574 765 812 930",
+    "IA": "319 515 563 641 712", "KS": "316 620 785 913", "KY": "270 364 502 606 859", "LA": "225 318 337 457 504 985",
+    "ME": "207", "MD": "227 240 301 410 443 667", "MA": "339 351 413 508 617 774 781 857 978",
+    "MI": "231 248 269 313 517 586 616 679 734 810 906 947 989", "MN": "218 320 507 612 651 763 924 952",
+    "MS": "228 471 601 662 769", "MO": "235 314 417 557 573 636 660 816 975", "MT": "406", "NE": "308 402 531",
+    "NV": "702 725 775", "NH": "603", "NJ": "201 551 609 640 732 848 856 862 908 973", "NM": "505 575",
+    "NY": "212 315 329 332 347 363 516 518 585 607 624 631 646 680 716 718 838 845 914 917 929 934",
+    "NC": "252 336 472 704 743 828 910 919 980 984", "ND": "701",
+    "OH": "216 220 234 283 326 330 380 419 436 440 513 567 614 740 937", "OK": "405 539 572 580 918",
+    "OR": "458 503 541 971", "PA": "215 223 267 272 412 445 484 570 582 610 717 724 814 835 878", "RI": "401",
+    "SC": "803 821 839 843 854 864", "SD": "605", "TN": "423 615 629 731 865 901 931",
+    "TX": "210 214 254 281 325 346 361 409 430 432 469 512 682 713 726 737 806 817 830 832 903 915 936 940 945 "
+          "956 972 979",
+    "UT": "385 435 801", "VT": "802", "VA": "276 434 540 571 686 703 757 804 826 948", "WA": "206 253 360 425 509 564",
+    "WV": "304 681", "WI": "262 274 353 414 534 608 715 920", "WY": "307",
+}
+
+# Area codes whose time zone isn't their state's (STATE_TIMEZONES); codes straddling a zone line
+# keep the state's
+AREA_TIMEZONES = {
+    "915": "America/Denver",                                    # El Paso
+    "423": "America/New_York", "865": "America/New_York",       # East Tennessee
+    "270": "America/Chicago", "364": "America/Chicago",         # Western Kentucky
+    "219": "America/Chicago",                                   # Northwest Indiana
+}
+
+AREA_STATES = {code: USPS_STATE_CODES[st] for st, codes in STATE_AREA_CODES.items() for code in codes.split()}
+
+# Extension at the end of the text
+# Patterns spell out ASCII classes so Python's re and Arrow's RE2 read them alike
+_EXT = r"(?i)[ \t]*(?:ext\.?|extension|x|#)[ \t]*[0-9]{1,6}[ \t]*$"
+_NON_DIGITS = r"[^0-9]"
+_EXT_RE = re.compile(_EXT)
+_NON_DIGIT = re.compile(_NON_DIGITS)
+
+
+def area_timezone(area_code):
+    # IANA zone name for a table area code (None for others)
+    state = AREA_STATES.get(area_code)
+    return AREA_TIMEZONES.get(area_code) or (STATE_TIMEZONES.get(state) if state else None)
+
+
+# =========================
+# ONE NUMBER
+# =========================
+def nanp_issue(national):
+    # Why 10 digits aren't a dialable NANP number ("" if they are); the order is the batch's too
+    if national[0] in "01":
+        return "area code can't start with 0 or 1"
+    if national[1:3] == "11":
+        return "N11 service code, not an area code"
+    if national[1] == "9":
+        return "reserved area code"
+    if national[:3] == "900":
+        return "premium-rate number"
+    if national[3] in "01":
+        return "exchange can't start with 0 or 1"
+    if national[4:6] == "11":
+        return "N11 exchange"
+    if national[3:8] == "55501":
+        return "fictional 555-01xx number"
+    if national == national[0] * 10:
+        return "one digit repeated"
+    return ""
+
+
+def _length_issue(n):
+    return "no digits" if n == 0 else f"{n} digits (needs 10)"
+
+
+def _split_ext(text):
+    m = _EXT_RE.search(text)
+    return (text[:m.start()], _NON_DIGIT.sub("", m.group(0))) if m else (text, "")
+
+
+@functools.lru_cache(maxsize=PHONE_CACHE_SIZE)
+def parse_phone(text):
+    # -> dict with PHONE_COLUMNS; e164 / national are "" for numbers that aren't valid
+    text = str(text or "").strip()
+    out = dict.fromkeys(PHONE_COLUMNS, "")
+    out.update(valid=False, state=None, timezone=None)
+    if not text:
+        out["issue"] = "missing"
+        return out
+    body, out["ext"] = _split_ext(text)
+    plus = body.startswith("+")
+    digits = _NON_DIGIT.sub("", body)
+    if (plus and len(digits) == 11 and digits[0] == "1") or (not plus and (len(digits) == 10 or (len(digits) == 11 and digits[0] == "1"))):
+        national = digits[-10:]
+        out["issue"] = nanp_issue(national)
+        if not out["issue"]:
+            area = national[:3]
+            out.update(e164="+1" + national, national=national, valid=True, area_code=area,
+                       state=AREA_STATES.get(area), timezone=area_timezone(area))
+            if area in TOLL_FREE:
+                out["issue"] = "toll-free"
+            elif area not in AREA_STATES:
+                out["issue"] = "area code outside the US table"
+        return out
+    if plus or (digits.startswith("011") and len(digits) > 11):
+        intl = digits if plus else digits[3:]
+        if INTL_DIGITS[0] <= len(intl) <= INTL_DIGITS[1] and intl[0] != "0":
+            out.update(e164="+" + intl, valid=True, issue="international")
+        else:
+            out["issue"] = "not a valid international number"
+        return out
+    out["issue"] = _length_issue(len(digits))
+    return out
+
+
+def e164(text):
+    # "(512) 555-0134" -> "+15125550134"; "" if not valid
+    return parse_phone(text)["e164"]
+
+
+def phone_timezone(text):
+    return parse_phone(text)["timezone"]
+
+
+def format_phone(text):
+    # For display: "(512) 555-0134 x2" for NANP numbers, E.164 for others, the text as typed if invalid
+    p = parse_phone(text)
+    if p["national"]:
+        n = p["national"]
+        shown = f"({n[:3]}) {n[3:6]}-{n[6:]}"
+    else:
+        shown = p["e164"] or str(text or "").strip()
+    return shown + (f" x{p['ext']}" if p["ext"] and p["valid"] else "")
+
+
+# =========================
+# BATCH (column-wise)
+# =========================
+def _digit_matrix(values):
+    # equal-length digit strings -> (n, width) uint8 array of digit values
+    import numpy as np
+    width = len(values[0]) if len(values) else 10
+    return (np.frombuffer("".join(values).encode("ascii"), dtype=np.uint8).reshape(-1, width) - 48).astype(np.int16)
+
+
+def _nanp_issues(d):
+    # Vectorized nanp_issue over a (n, 10) digit matrix
+    import numpy as np
+    conditions = [
+        d[:, 0] <= 1,
+        (d[:, 1] == 1) & (d[:, 2] == 1),
+        d[:, 1] == 9,
+        (d[:, 0] == 9) & (d[:, 1] == 0) & (d[:, 2] == 0),
+        d[:, 3] <= 1,
+        (d[:, 4] == 1) & (d[:, 5] == 1),
+        (d[:, 3] == 5) & (d[:, 4] == 5) & (d[:, 5] == 5) & (d[:, 6] == 0) & (d[:, 7] == 1),
+        (d == d[:, :1]).all(axis=1),
+    ]
+    labels = ["area code can't start with 0 or 1", "N11 service code, not an area code", "reserved area code",
+              "premium-rate number", "exchange can't start with 0 or 1", "N11 exchange", "fictional 555-01xx number",
+              "one digit repeated"]
+    return np.select(conditions, np.array(labels, dtype=object), default="").astype(object)
+
+
+@functools.lru_cache(maxsize=1)
+def _area_arrays():
+    # code, state, time zone and note per area code 000-999, for indexing by the numeric code
+    import numpy as np
+    codes = [f"{i:03d}" for i in range(1000)]
+    notes = ["toll-free" if c in TOLL_FREE else ("" if c in AREA_STATES else "area code outside the US table") for c in codes]
+    return (np.array(codes, dtype=object), np.array([AREA_STATES.get(c) for c in codes], dtype=object),
+            np.array([area_timezone(c) for c in codes], dtype=object), np.array(notes, dtype=object))
+
+
+def normalize_phones(texts):
+    # Series of phone text -> DataFrame with PHONE_COLUMNS, same index, same answers as parse_phone
+    import numpy as np
+    import pandas as pd
+    texts = texts.fillna("").astype(str)
+    s = texts.astype("string[pyarrow]" if ARROW else "string").str.strip()
+    body = s.str.replace(_EXT, "", regex=True)
+    size = len(texts)
+    ext = np.full(size, "", dtype=object)
+    has_ext = (body.str.len() != s.str.len()).to_numpy(dtype=bool)
+    if has_ext.any():
+        tails = [t[len(b):] for t, b in zip(s.to_numpy(dtype=object)[has_ext], body.to_numpy(dtype=object)[has_ext])]
+        ext[has_ext] = [_NON_DIGIT.sub("", t) for t in tails]
+    plus = body.str.startswith("+").to_numpy(dtype=bool)
+    digits = body.str.replace(_NON_DIGITS, "", regex=True)
+    n = digits.str.len().to_numpy(dtype=np.int64)
+    lead1 = digits.str.startswith("1").to_numpy(dtype=bool)
+    starts011 = digits.str.startswith("011").to_numpy(dtype=bool)
+    empty = (s.str.len() == 0).to_numpy(dtype=bool)
+
+    nanp = ~empty & ((plus & (n == 11) & lead1) | (~plus & ((n == 10) | ((n == 11) & lead1))))
+    intl = ~empty & ~nanp & (plus | (starts011 & (n > 11)))
+    other = ~empty & ~nanp & ~intl
+
+    e = np.full(size, "", dtype=object)
+    national = np.full(size, "", dtype=object)
+    issue = np.full(size, "", dtype=object)
+    valid = np.zeros(size, dtype=bool)
+    area = np.full(size, "", dtype=object)
+    state = np.full(size, None, dtype=object)
+    tz = np.full(size, None, dtype=object)
+    issue[empty] = "missing"
+
+    dig = digits.to_numpy(dtype=object)
+    if nanp.any():
+        nat = digits.str.slice(start=-10).to_numpy(dtype=object)[nanp]
+        d = _digit_matrix(list(nat))
+        problems = _nanp_issues(d)
+        ok = problems == ""
+        ok_rows = np.flatnonzero(nanp)[ok]
+        issue[nanp] = problems
+        national[ok_rows] = nat[ok]
+        e[ok_rows] = ("+1" + pd.Series(nat[ok], dtype=object)).to_numpy(dtype=object)
+        valid[ok_rows] = True
+        codes, states, zones, notes = _area_arrays()
+        num = (d[ok, 0] * 100 + d[ok, 1] * 10 + d[ok, 2]).astype(np.int64)
+        area[ok_rows], state[ok_rows], tz[ok_rows], issue[ok_rows] = codes[num], states[num], zones[num], notes[num]
+    if intl.any():
+        rows = np.flatnonzero(intl)
+        idig = np.where(plus[rows], dig[rows], np.array([x[3:] for x in dig[rows]], dtype=object))
+        lengths = np.array([len(x) for x in idig])
+        ok = (lengths >= INTL_DIGITS[0]) & (lengths <= INTL_DIGITS[1]) & np.array([x[:1] != "0" for x in idig])
+        e[rows[ok]] = np.array(["+" + x for x in idig[ok]], dtype=object)
+        valid[rows[ok]] = True
+        issue[rows] = np.where(ok, "international", "not a valid international number")
+    if other.any():
+        issue[other] = pd.Series(n[other]).map({k: _length_issue(k) for k in np.unique(n[other])}).to_numpy(dtype=object)
+
+    return pd.DataFrame({"e164": e, "national": national, "ext": ext,
+                         "valid": valid, "issue": issue, "area_code": area, "state": state, "timezone": tz},
+                        index=texts.index)
+
+
+def phone_key_column(texts):
+    # Dedupe key per number: E.164 for valid numbers, "" for the rest
+    return normalize_phones(texts)["e164"]
+
+
+# =========================
+# FILES
+# =========================
+def iter_frames(source, chunk_rows=PHONE_CHUNK_ROWS):
+    # (first row number, DataFrame of text columns) per chunk: CSV through pandas' C reader,
+    # archives and JSONL through intake_batch
+    import pandas as pd
+    from intake_batch import ARCHIVE_EXTS, JSONL_EXTS, _ext, iter_chunks
+    if _ext(source) in ARCHIVE_EXTS + JSONL_EXTS:
+        for row0, chunk in iter_chunks(source, chunk_rows):
+            yield row0, pd.DataFrame(chunk, index=pd.RangeIndex(row0, row0 + len(chunk)))
+        return
+    row0 = 0
+    for frame in pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_rows, encoding="utf-8-sig"):
+        yield row0, frame
+        row0 += len(frame)
+
+
+def phone_columns(columns):
+    return [c for c in columns if "phone" in str(c).lower()]
+
+
+def normalize_file(source, output, columns=None, progress=None):
+    # Adds <col>_e164, <col>_valid, <col>_issue, <col>_state, <col>_timezone for each phone column
+    # (default: every column with "phone" in its name). Returns {column: {"valid", "invalid"}} plus totals.
+    from intake_batch import ResultWriter
+    writer = ResultWriter(output)
+    stats = {"rows": 0, "elapsed_s": 0.0, "columns": {}}
+    t0 = perf_counter()
+    try:
+        for _, frame in iter_frames(source):
+            cols = columns or phone_columns(frame.columns)
+            if not cols:
+                raise ValueError(f"{source}: no phone columns (name them with 'phone', or pass --columns).")
+            missing = [c for c in cols if c not in frame]
+            if missing:
+                raise ValueError(f"{source}: no column(s) {', '.join(missing)}.")
+            out = frame.copy()
+            for col in cols:
+                p = normalize_phones(frame[col])
+                for field in ("e164", "valid", "issue", "state", "timezone"):
+                    out[f"{col}_{field}"] = p[field]
+                c = stats["columns"].setdefault(col, {"valid": 0, "invalid": 0, "blank": 0})
+                blank = int((p["issue"] == "missing").sum())
+                c["valid"] += int(p["valid"].sum())
+                c["blank"] += blank
+                c["invalid"] += len(p) - int(p["valid"].sum()) - blank
+            writer.write(out.astype({c: "string" for c in out.columns if not c.endswith("_valid")}))
+            stats["rows"] += len(frame)
+            stats["elapsed_s"] = perf_counter() - t0
+            if progress:
+                progress(stats)
+    finally:
+        writer.close()
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m intake_app phones",
+                                 description="Normalize phone columns to E.164 and flag numbers that can't be dialled.")
+    ap.add_argument("input", help="lead file .csv / .jsonl, or an archive .sqlite3")
+    ap.add_argument("-o", "--output", required=True, help="output file: .csv, .jsonl or .parquet")
+    ap.add_argument("--columns", nargs="+", help="phone columns (default: every column with 'phone' in its name)")
+    args = ap.parse_args(argv)
+    try:
+        stats = normalize_file(args.input, args.output, args.columns,
+                               lambda s: print(f"\r{s['rows']:>12,} rows", end="", file=sys.stderr, flush=True))
+    except (ValueError, OSError) as e:
+        ap.error(str(e))
+    print(file=sys.stderr)
+    print(f"{stats['rows']:,} rows in {stats['elapsed_s']:.1f}s -> {args.output}")
+    for col, c in stats["columns"].items():
+        print(f"  {col:<20} {c['valid']:>10,} valid {c['invalid']:>10,} invalid {c['blank']:>10,} blank")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
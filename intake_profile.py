@@ -0,0 +1,131 @@
+# Render timing: per-section wall time, rerun counts and export build cost.
+#
+# One RenderProfile lives in each session. The app wraps every section so both full runs and
+# fragment-only reruns are measured; each run (and each export build) is also appended to a
+# rotating JSONL log so slow reruns in production can be traced to a section afterwards.
+#
+# The first full run in a server process is the cold start: it also pays for the module imports
+# and is checked against COLD_RENDER_BUDGET_MS (whole page) and FIRST_PAINT_BUDGET_MS (time until
+# the first section, i.e. the start of the form, is on screen).
+import json
+import logging
+import os
+import uuid
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from time import perf_counter
+
+TIMING_LOG_PATH = os.environ.get(
+    "INTAKE_TIMING_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intake_timing.jsonl")
+)
+TIMING_LOG_MAX_BYTES = 5 * 1024 * 1024
+TIMING_LOG_BACKUPS = 5
+COLD_RENDER_BUDGET_MS = float(os.environ.get("INTAKE_COLD_RENDER_BUDGET_MS", 2500))
+FIRST_PAINT_BUDGET_MS = float(os.environ.get("INTAKE_FIRST_PAINT_BUDGET_MS", 1000))
+
+_timing_logger = None
+_cold = {"pending": True}  # first full run in this process not seen yet
+
+
+def timing_logger():
+    # Set INTAKE_TIMING_LOG="" to turn the file log off
+    global _timing_logger
+    if _timing_logger is None:
+        logger = logging.getLogger("intake.timing")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if TIMING_LOG_PATH and not logger.handlers:
+            handler = RotatingFileHandler(TIMING_LOG_PATH, maxBytes=TIMING_LOG_MAX_BYTES,
+                                          backupCount=TIMING_LOG_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger.addHandler(handler)
+        _timing_logger = logger
+    return _timing_logger
+
+
+class RenderProfile:
+    def __init__(self):
+        self.session_id = uuid.uuid4().hex[:12]
+        self.full_runs = 0
+        self.fragment_runs = 0
+        self.current = {}       # section -> ms, full run in progress
+        self.last_full = {}     # section -> ms, last completed full run
+        self.last_full_ms = 0.0
+        self.first_paint_ms = None  # current full run: ms until its first section finished
+        self.cold = None            # {"total_ms", "first_paint_ms", "over_budget"} if this session saw the cold start
+        self.stats = {}         # section -> [calls, total ms, max ms]
+        self.exports = deque(maxlen=20)
+        self._t0 = None
+
+    def _log(self, record):
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "session": self.session_id, **record}
+        try:
+            timing_logger().info(json.dumps(record))
+        except Exception:
+            pass  # timing must never break a rerun
+
+    def start_full(self, t0=None):
+        # t0: when the script run began (before its imports), if known
+        self.full_runs += 1
+        self.current = {}
+        self.first_paint_ms = None
+        self._t0 = t0 if t0 is not None else perf_counter()
+
+    def end_full(self):
+        if self._t0 is None:
+            return
+        self.last_full_ms = (perf_counter() - self._t0) * 1000
+        self.last_full = dict(self.current)
+        self._t0 = None
+        record = {"kind": "full", "run": self.full_runs, "total_ms": round(self.last_full_ms, 2),
+                  "first_paint_ms": round(self.first_paint_ms or 0.0, 2),
+                  "sections": {k: round(v, 2) for k, v in self.last_full.items()}}
+        if _cold.pop("pending", False):
+            over = [name for name, ms, budget in (
+                ("total", self.last_full_ms, COLD_RENDER_BUDGET_MS),
+                ("first_paint", self.first_paint_ms or 0.0, FIRST_PAINT_BUDGET_MS),
+            ) if ms > budget]
+            self.cold = {"total_ms": self.last_full_ms, "first_paint_ms": self.first_paint_ms or 0.0, "over_budget": over}
+            record.update(cold=True, over_budget=over)
+        self._log(record)
+
+    def record(self, section, seconds, full_run):
+        ms = seconds * 1000
+        s = self.stats.setdefault(section, [0, 0.0, 0.0])
+        s[0] += 1
+        s[1] += ms
+        s[2] = max(s[2], ms)
+        if full_run:
+            self.current[section] = self.current.get(section, 0.0) + ms
+            if self.first_paint_ms is None and self._t0 is not None:
+                self.first_paint_ms = (perf_counter() - self._t0) * 1000
+        else:
+            self.fragment_runs += 1
+            self._log({"kind": "fragment", "section": section, "ms": round(ms, 2)})
+
+    def record_export(self, fmt, seconds, size_bytes, payload_bytes):
+        entry = {"fmt": fmt, "ms": round(seconds * 1000, 2), "bytes": size_bytes, "payload_bytes": payload_bytes}
+        self.exports.append(entry)
+        self._log({"kind": "export", **entry})
+
+    def section_rows(self):
+        return [
+            {"Section": name, "Last full run (ms)": round(self.last_full.get(name, 0.0), 1),
+             "Avg (ms)": round(total / calls, 1), "Max (ms)": round(peak, 1), "Runs": calls}
+            for name, (calls, total, peak) in self.stats.items()
+        ]
+
+
+class timed:
+    # with timed(profile, "Level 1", full_run): ...
+    def __init__(self, profile, section, full_run):
+        self.profile, self.section, self.full_run = profile, section, full_run
+
+    def __enter__(self):
+        self._t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.record(self.section, perf_counter() - self._t0, self.full_run)
+        return False
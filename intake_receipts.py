@@ -0,0 +1,214 @@
+# Ride-receipt extraction (Uber / Lyft PDF receipts and .eml email receipts).
+#
+# extract_receipt_file(path, kind) -> platform, trip date/time, pickup and drop-off, for the UI
+# to offer as prefills. It is a plain top-level function so the app can run it on a thread pool
+# (the rerun never waits on it) and extract_receipts can fan a whole archive out to processes.
+import email
+import html
+import importlib.util
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from email import policy
+
+from dateutil import parser as date_parser
+
+from intake_uploads import sniff_kind
+
+# =========================
+# PDF TEXT ENGINE DETECTION
+# =========================
+# Found without importing it; the reader loads with the first PDF receipt.
+if importlib.util.find_spec("pypdf"):
+    PDF_TEXT_ENGINE = "pypdf"
+elif importlib.util.find_spec("pdfminer"):
+    PDF_TEXT_ENGINE = "pdfminer"
+else:
+    PDF_TEXT_ENGINE = None
+
+RECEIPT_KINDS = ("pdf", "eml")
+RECEIPT_MAX_PAGES = 3
+RECEIPT_WORKERS = 2
+
+_MONTHS = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?"
+DATE_PATTERNS = (
+    re.compile(rf"\b{_MONTHS}\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}}\b", re.I),
+    re.compile(r"\b\d{1,2}/\d{1,2}/\d{2,4}\b"),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+)
+TIME_PATTERN = re.compile(r"\b\d{1,2}:\d{2}(?:\s*[AaPp]\.?[Mm]\.?)?")
+PICKUP_LABEL = re.compile(r"^(?:pick[\s-]?up(?:\s+location)?|from)\b\W*", re.I)
+DROPOFF_LABEL = re.compile(r"^(?:drop[\s-]?off(?:\s+location)?|destination)\b\W*", re.I)
+# Uber-style stop lines: "9:41 PM | 123 Main St, Austin, TX" (the time may also sit alone on the line before)
+STOP_LINE = re.compile(r"^(\d{1,2}:\d{2}\s*[AaPp]\.?[Mm]\.?)\s*[|·\-–]?\s*(.*)$")
+ADDRESS_HINT = re.compile(r"\d+\s+\w+|,\s*[A-Z]{2}\b|,\s*\w+")
+
+
+# =========================
+# TEXT
+# =========================
+def _html_to_text(markup):
+    markup = re.sub(r"(?is)<(script|style).*?</\1>", " ", markup)
+    markup = re.sub(r"(?i)<br\s*/?>|</(p|div|tr|td|li|h\d)>", "\n", markup)
+    return html.unescape(re.sub(r"<[^>]+>", " ", markup))
+
+
+def eml_text(path):
+    # Returns (body text, headers dict)
+    with open(path, "rb") as f:
+        msg = email.message_from_binary_file(f, policy=policy.default)
+    headers = {"from": str(msg.get("From", "")), "subject": str(msg.get("Subject", "")), "date": str(msg.get("Date", ""))}
+    body = msg.get_body(preferencelist=("plain", "html"))
+    text = ""
+    if body is not None:
+        text = body.get_content()
+        if body.get_content_type() == "text/html":
+            text = _html_to_text(text)
+    return headers["subject"] + "\n" + text, headers
+
+
+def pdf_text(path, max_pages=RECEIPT_MAX_PAGES):
+    if PDF_TEXT_ENGINE == "pypdf":
+        import pypdf
+        reader = pypdf.PdfReader(path)
+        return "\n".join((page.extract_text() or "") for page in reader.pages[:max_pages])
+    if PDF_TEXT_ENGINE == "pdfminer":
+        import pdfminer.high_level
+        return pdfminer.high_level.extract_text(path, maxpages=max_pages)
+    raise RuntimeError("PDF text engine not installed. Add 'pypdf' to requirements.txt to read PDF receipts.")
+
+
+def _lines(text):
+    return [" ".join(line.split()) for line in text.splitlines() if line.strip()]
+
+
+# =========================
+# FIELD EXTRACTION
+# =========================
+def _company(text, sender=""):
+    low = (sender + " " + text).lower()
+    uber, lyft = len(re.findall(r"\buber\b", low)), len(re.findall(r"\blyft\b", low))
+    if uber == lyft:
+        return None
+    return "Uber" if uber > lyft else "Lyft"
+
+
+def _parse_date(value):
+    try:
+        return date_parser.parse(value, fuzzy=True).date()
+    except (ValueError, OverflowError):
+        return None
+
+
+def _parse_time(value):
+    try:
+        return date_parser.parse(value.replace(".", "")).time()
+    except (ValueError, OverflowError):
+        return None
+
+
+def _first_date(text):
+    hits = [(m.start(), m.group(0)) for p in DATE_PATTERNS for m in p.finditer(text)]
+    for _, value in sorted(hits):
+        parsed = _parse_date(value)
+        if parsed:
+            return parsed
+    return None
+
+
+def _stops(lines):
+    # (pickup, dropoff, pickup time) from labelled lines first, else the first two timed stop lines
+    pickup = dropoff = pickup_time = None
+    for i, line in enumerate(lines):
+        nxt = lines[i + 1] if i + 1 < len(lines) else ""
+        for label, slot in ((PICKUP_LABEL, "pickup"), (DROPOFF_LABEL, "dropoff")):
+            if label.match(line):
+                rest = label.sub("", line).strip()
+                m = STOP_LINE.match(rest)
+                when, rest = (m.group(1), m.group(2)) if m else (None, rest)
+                rest = rest or nxt
+                if slot == "pickup" and pickup is None:
+                    pickup, pickup_time = rest, when
+                elif slot == "dropoff" and dropoff is None:
+                    dropoff = rest
+    if pickup and dropoff:
+        return pickup, dropoff, pickup_time
+    timed = []
+    for i, line in enumerate(lines):
+        m = STOP_LINE.match(line)
+        if not m:
+            continue
+        where = m.group(2) or (lines[i + 1] if i + 1 < len(lines) else "")
+        if ADDRESS_HINT.search(where) and len(where) >= 6:
+            timed.append((m.group(1), where))
+    if len(timed) >= 2:
+        return timed[0][1], timed[1][1], timed[0][0]
+    return pickup, dropoff, pickup_time
+
+
+def extract_receipt(text, sender="", fallback_date=""):
+    lines = _lines(text)
+    pickup, dropoff, pickup_time = _stops(lines)
+    trip_date = _first_date(text) or (_parse_date(fallback_date) if fallback_date else None)
+    time_match = TIME_PATTERN.search(text)
+    trip_time = _parse_time(pickup_time) if pickup_time else (_parse_time(time_match.group(0)) if time_match else None)
+    return {
+        "company": _company(text, sender),
+        "trip_date": trip_date,
+        "trip_time": trip_time,
+        "pickup": pickup or "",
+        "dropoff": dropoff or "",
+    }
+
+
+def extract_receipt_file(path, kind):
+    # Never raises: failures come back in "error" so a bad file can't break the UI or a batch run
+    result = {"path": path, "kind": kind, "company": None, "trip_date": None, "trip_time": None,
+              "pickup": "", "dropoff": "", "error": ""}
+    try:
+        if kind == "eml":
+            text, headers = eml_text(path)
+            result.update(extract_receipt(text, sender=headers["from"], fallback_date=headers["date"]))
+        elif kind == "pdf":
+            result.update(extract_receipt(pdf_text(path)))
+        else:
+            result["error"] = f"Not a receipt file type ({kind})."
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def found_anything(result):
+    return any([result["company"], result["trip_date"], result["pickup"], result["dropoff"]])
+
+
+# =========================
+# BATCH
+# =========================
+def _kind_for(path):
+    # Same content sniffing as the upload spool, so a renamed file is judged by what it is
+    try:
+        with open(path, "rb") as f:
+            kind = sniff_kind(f.read(64))
+    except OSError:
+        kind = None
+    return kind or os.path.splitext(path)[1].lower().lstrip(".")
+
+
+def extract_receipts(paths, workers=None, chunksize=16):
+    # Archive backfill: one row per receipt file, parsed across worker processes
+    import pandas as pd
+    paths = list(paths)
+    kinds = [_kind_for(p) for p in paths]
+    if workers == 1 or len(paths) < 2:
+        rows = [extract_receipt_file(p, k) for p, k in zip(paths, kinds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(extract_receipt_file, paths, kinds, chunksize=chunksize))
+    df = pd.DataFrame(rows, columns=["path", "kind", "company", "trip_date", "trip_time", "pickup", "dropoff", "error"])
+    df["trip_dt"] = [
+        datetime.combine(d, t) if d and t else (datetime.combine(d, datetime.min.time()) if d else None)
+        for d, t in zip(df["trip_date"], df["trip_time"])
+    ]
+    return df
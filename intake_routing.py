@@ -0,0 +1,237 @@
+# Capacity-aware law firm routing.
+#
+# A firm spec (intake_firms) may carry a "routing" block:
+#   {"monthly_cap": 120, "priority": 1.0, "states": {"Texas": 2.0}, "tiers": {"Tier 1": 0.5}}
+# monthly_cap is how many intakes the firm takes per calendar month (omit for no cap); priority,
+# states and tiers add up to the preference for sending an intake to that firm.
+#
+# Batch mode (route_batch / route_frame) assigns a set of qualified intakes as a min-cost matching:
+# as many intakes as the remaining capacities allow are placed, then the summed preference is as
+# high as possible. Online mode (RoutingLedger) reads month-to-date placements from the archive and
+# ranks the firms for the intake on screen, steering away from firms that are running ahead of
+# their monthly pace so capacity is still there at the end of the month.
+#
+# numpy / pandas are only needed by the batch functions and are imported there.
+import heapq
+import threading
+from datetime import date, datetime, time
+from time import monotonic
+
+from intake_rules import STATES
+from intake_firms import FIRMS
+
+ROUTING_KEYS = ("monthly_cap", "priority", "states", "tiers")
+ROUTING_TIERS = ("Tier 1", "Tier 2")
+ROUTING_COUNTS_TTL = 5.0  # seconds a month-to-date read is reused before the archive is asked again
+
+
+# =========================
+# ROUTING TERMS
+# =========================
+def routing_terms(firm):
+    # Normalized routing block for a compiled firm; ValueError on a bad spec
+    r = firm.routing
+    unknown = sorted(set(r) - set(ROUTING_KEYS))
+    if unknown:
+        raise ValueError(f"Firm '{firm.key}' routing: unknown key(s) {', '.join(unknown)} (expected {', '.join(ROUTING_KEYS)}).")
+    cap = r.get("monthly_cap")
+    if cap is not None and (isinstance(cap, bool) or not isinstance(cap, int) or cap < 0):
+        raise ValueError(f"Firm '{firm.key}' routing: monthly_cap must be a whole number >= 0.")
+    try:
+        priority = float(r.get("priority", 0))
+        states = {str(k): float(v) for k, v in (r.get("states") or {}).items()}
+        tiers = {str(k): float(v) for k, v in (r.get("tiers") or {}).items()}
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(f"Firm '{firm.key}' routing: priority and state / tier weights must be numbers.") from None
+    bad = sorted(set(states) - set(STATES)) + sorted(set(tiers) - set(ROUTING_TIERS))
+    if bad:
+        raise ValueError(f"Firm '{firm.key}' routing: unknown state / tier {', '.join(bad)}.")
+    return {"monthly_cap": cap, "priority": priority, "states": states, "tiers": tiers}
+
+
+ROUTING = {firm.key: routing_terms(firm) for firm in FIRMS}
+
+
+def _terms(firm):
+    return ROUTING.get(firm.key) if firm in FIRMS else routing_terms(firm)
+
+
+def base_tier(tier_label):
+    return str(tier_label or "").split(" (+")[0]
+
+
+def preference(firm, state, tier_label):
+    t = _terms(firm)
+    return t["priority"] + t["states"].get(state, 0.0) + t["tiers"].get(base_tier(tier_label), 0.0)
+
+
+def preference_matrix(states, tier_labels, firms=None):
+    # (n intakes, k firms) preference scores, one vectorized map per firm
+    import numpy as np
+    import pandas as pd
+    firms = firms or FIRMS
+    states = pd.Series(states).fillna("").astype(str).reset_index(drop=True)
+    tiers = pd.Series(tier_labels).fillna("").astype(str).str.split(" (+", n=1, regex=False).str[0].reset_index(drop=True)
+    cols = []
+    for firm in firms:
+        t = _terms(firm)
+        col = t["priority"] + states.map(t["states"]).fillna(0.0) + tiers.map(t["tiers"]).fillna(0.0)
+        cols.append(col.to_numpy(dtype=float))
+    return np.column_stack(cols) if cols else np.zeros((len(states), 0))
+
+
+# =========================
+# BATCH MATCHING
+# =========================
+def route_batch(eligible, scores, capacity):
+    # eligible / scores: (n intakes, k firms); capacity: k remaining slots (None = no cap).
+    # Returns the firm index per intake, -1 where it can't be placed.
+    #
+    # Min-cost flow by successive shortest paths on the firm graph: intakes are added one at a time
+    # and each takes the cheapest path into a firm with room, possibly moving already-placed intakes
+    # one firm along (f -> g costs the cheapest such move out of f). Moves are kept in lazy heaps,
+    # so each intake costs O(k^3) heap peeks and the result is optimal for the whole batch.
+    import numpy as np
+    eligible = np.asarray(eligible, dtype=bool)
+    n, k = eligible.shape
+    scores = np.asarray(scores, dtype=float).reshape(n, k)
+    spread = float(np.ptp(scores[eligible])) if eligible.any() else 0.0
+    place = n * spread + 1.0  # one more placement outweighs any trade between preferences
+    cost = np.column_stack([np.where(eligible, -(place + scores), np.inf), np.zeros(n)])  # column k: not placed
+    cost = cost.tolist()
+    cap = [n if c is None else max(int(c), 0) for c in capacity] + [n]
+    load = [0] * (k + 1)
+    assign = [k] * n
+    moves = [[[] for _ in range(k + 1)] for _ in range(k + 1)]  # moves[f][g]: heap of (extra cost, j in f)
+    nodes = range(k + 1)
+    eps = 1e-9 * (place + 1.0)
+
+    def top(f, g):
+        heap = moves[f][g]
+        while heap and assign[heap[0][1]] != f:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def put(j, f):
+        assign[j] = f
+        load[f] += 1
+        if f == k:
+            return  # "not placed" never runs out of room, nothing is ever moved out of it
+        row = cost[j]
+        for g in nodes:
+            if g != f and row[g] != np.inf:
+                heapq.heappush(moves[f][g], (row[g] - row[f], j))
+
+    for i in range(n):
+        # dist[f]: cheapest way to free one slot in f (0 when it has room)
+        dist = [0.0 if load[f] < cap[f] else np.inf for f in nodes]
+        nxt = [None] * (k + 1)
+        for _ in range(k):
+            changed = False
+            for f in nodes:
+                for g in nodes:
+                    if g == f or dist[g] == np.inf:
+                        continue
+                    move = top(f, g)
+                    if move is not None and move[0] + dist[g] < dist[f] - eps:
+                        dist[f], nxt[f], changed = move[0] + dist[g], g, True
+            if not changed:
+                break
+        row = cost[i]
+        best = min(nodes, key=lambda f: row[f] + dist[f])
+        chain, f = [], best
+        while nxt[f] is not None and len(chain) <= k:
+            g = nxt[f]
+            chain.append((top(f, g)[1], f, g))
+            f = g
+        for j, f, g in chain:
+            load[f] -= 1
+            put(j, g)
+        put(i, best)
+    out = np.asarray(assign, dtype=int)
+    out[out == k] = -1
+    return out
+
+
+def route_frame(frame, capacity=None, firms=None):
+    # frame: evaluate_frame output or a call list (<key>_ok, state, tier_label columns).
+    # capacity: {firm key: remaining slots}, firms not listed are uncapped.
+    # Returns the routed firm name per row ("" = not placed).
+    import numpy as np
+    import pandas as pd
+    firms = firms or FIRMS
+    capacity = capacity or {}
+    if frame.empty or not firms:
+        return pd.Series("", index=frame.index, dtype=object)
+    eligible = np.column_stack([frame[f"{firm.key}_ok"].to_numpy(dtype=bool) for firm in firms])
+    scores = preference_matrix(frame["state"], frame["tier_label"], firms)
+    picks = route_batch(eligible, scores, [capacity.get(firm.key) for firm in firms])
+    names = np.array([firm.name for firm in firms] + [""], dtype=object)
+    return pd.Series(names[picks], index=frame.index)
+
+
+# =========================
+# ONLINE (LIVE) ROUTING
+# =========================
+def month_window(now):
+    start = date(now.year, now.month, 1)
+    end = date(now.year + (now.month == 12), now.month % 12 + 1, 1)
+    return start, end
+
+
+def month_elapsed(now):
+    start, end = (datetime.combine(d, time()) for d in month_window(now))
+    return (now - start) / (end - start)
+
+
+class RoutingLedger:
+    # Month-to-date placements per firm. counts(since, until) -> {AssignedFirm: intakes archived in
+    # [since, until)} (IntakeStore.firm_counts, an indexed GROUP BY) is the only source, so every
+    # process serving agents sees the same numbers, re-saves that change firm move a placement
+    # rather than add one, and the month turns by itself. A read is reused for `ttl` seconds;
+    # saved() drops it so this process sees its own save on the next rerun.
+    def __init__(self, counts, firms=None, ttl=ROUTING_COUNTS_TTL):
+        self.counts = counts
+        self.firms = firms or FIRMS
+        self.terms = {firm.key: _terms(firm) for firm in self.firms}
+        self.ttl = ttl
+        self._read = None  # ((year, month), monotonic time, {firm key: used})
+        self._lock = threading.Lock()
+
+    def _used(self, now):
+        month = (now.year, now.month)
+        with self._lock:
+            read = self._read
+        if read and read[0] == month and monotonic() - read[1] < self.ttl:
+            return read[2]
+        by_name = self.counts(*month_window(now))
+        used = {firm.key: int(by_name.get(firm.name, 0)) for firm in self.firms}
+        with self._lock:
+            self._read = (month, monotonic(), used)
+        return used
+
+    def saved(self):
+        # An intake was just saved or re-saved here: the next read goes to the archive
+        with self._lock:
+            self._read = None
+
+    def usage(self, now):
+        # [(firm, used this month, cap or None)]
+        used = self._used(now)
+        return [(firm, used[firm.key], self.terms[firm.key]["monthly_cap"]) for firm in self.firms]
+
+    def remaining(self, now):
+        # {firm key: slots left this month} for capped firms, the capacity argument of route_frame
+        return {firm.key: max(cap - used, 0) for firm, used, cap in self.usage(now) if cap is not None}
+
+    def rank(self, ok, state, tier_label, now):
+        # Eligible firms with room this month, best first: firms at or behind their monthly pace,
+        # then by preference, then spec order. ok: {firm key: eligible}.
+        elapsed = month_elapsed(now)
+        ranked = []
+        for i, (firm, used, cap) in enumerate(self.usage(now)):
+            if not ok.get(firm.key) or (cap is not None and used >= cap):
+                continue
+            ahead = cap is not None and used / cap > elapsed
+            ranked.append(((ahead, -preference(firm, state, tier_label), i), firm))
+        return [firm for _, firm in sorted(ranked, key=lambda r: r[0])]
@@ -0,0 +1,151 @@
+# Streamlit-free rule tables and helpers shared by the intake UI and the batch tools.
+from datetime import date
+
+# =========================
+# SOL TABLES
+# =========================
+TORT_SOL = {
+    # 1 year
+    "Kentucky": 1, "Louisiana": 1, "Tennessee": 1,
+    # 2 years
+    "Alabama": 2, "Alaska": 2, "Arizona": 2, "California": 2, "Colorado": 2, "Connecticut": 2, "Delaware": 2,
+    "Georgia": 2, "Hawaii": 2, "Idaho": 2, "Illinois": 2, "Indiana": 2, "Iowa": 2, "Kansas": 2, "Minnesota": 2,
+    "Nevada": 2, "New Jersey": 2, "Ohio": 2, "Oklahoma": 2, "Oregon": 2, "Pennsylvania": 2, "Texas": 2,
+    "Virginia": 2, "West Virginia": 2,
+    # 3 years
+    "Arkansas": 3, "D.C.": 3, "Maryland": 3, "Massachusetts": 3, "Michigan": 3, "Mississippi": 3, "Montana": 3,
+    "New Hampshire": 3, "New Mexico": 3, "New York": 3, "North Carolina": 3, "Rhode Island": 3, "South Carolina": 3,
+    "South Dakota": 3, "Vermont": 3, "Washington": 3, "Wisconsin": 3,
+    # 4 years
+    "Florida": 4, "Nebraska": 4, "Utah": 4, "Wyoming": 4,
+    # 5 years
+    "Missouri": 5,
+    # 6 years
+    "Maine": 6, "North Dakota": 6,
+}
+STATE_ALIAS = {"Washington DC": "D.C.", "District of Columbia": "D.C."}
+STATES = sorted(set(list(TORT_SOL.keys()) + ["D.C."]))
+USPS_STATE_CODES = {
+    "AL": "Alabama", "AK": "Alaska", "AZ": "Arizona", "AR": "Arkansas", "CA": "California", "CO": "Colorado",
+    "CT": "Connecticut", "DC": "D.C.", "DE": "Delaware", "FL": "Florida", "GA": "Georgia", "HI": "Hawaii",
+    "ID": "Idaho", "IL": "Illinois", "IN": "Indiana", "IA": "Iowa", "KS": "Kansas", "KY": "Kentucky",
+    "LA": "Louisiana", "ME": "Maine", "MD": "Maryland", "MA": "Massachusetts", "MI": "Michigan", "MN": "Minnesota",
+    "MS": "Mississippi", "MO": "Missouri", "MT": "Montana", "NE": "Nebraska", "NV": "Nevada", "NH": "New Hampshire",
+    "NJ": "New Jersey", "NM": "New Mexico", "NY": "New York", "NC": "North Carolina", "ND": "North Dakota",
+    "OH": "Ohio", "OK": "Oklahoma", "OR": "Oregon", "PA": "Pennsylvania", "RI": "Rhode Island", "SC": "South Carolina",
+    "SD": "South Dakota", "TN": "Tennessee", "TX": "Texas", "UT": "Utah", "VT": "Vermont", "VA": "Virginia",
+    "WA": "Washington", "WV": "West Virginia", "WI": "Wisconsin", "WY": "Wyoming",
+}
+# IANA time zone per state; states split across zones use the zone most residents live in
+STATE_TIMEZONES = {
+    "Alabama": "America/Chicago", "Alaska": "America/Anchorage", "Arizona": "America/Phoenix",
+    "Arkansas": "America/Chicago", "California": "America/Los_Angeles", "Colorado": "America/Denver",
+    "Connecticut": "America/New_York", "D.C.": "America/New_York", "Delaware": "America/New_York",
+    "Florida": "America/New_York", "Georgia": "America/New_York", "Hawaii": "Pacific/Honolulu",
+    "Idaho": "America/Boise", "Illinois": "America/Chicago", "Indiana": "America/Indiana/Indianapolis",
+    "Iowa": "America/Chicago", "Kansas": "America/Chicago", "Kentucky": "America/New_York",
+    "Louisiana": "America/Chicago", "Maine": "America/New_York", "Maryland": "America/New_York",
+    "Massachusetts": "America/New_York", "Michigan": "America/Detroit", "Minnesota": "America/Chicago",
+    "Mississippi": "America/Chicago", "Missouri": "America/Chicago", "Montana": "America/Denver",
+    "Nebraska": "America/Chicago", "Nevada": "America/Los_Angeles", "New Hampshire": "America/New_York",
+    "New Jersey": "America/New_York", "New Mexico": "America/Denver", "New York": "America/New_York",
+    "North Carolina": "America/New_York", "North Dakota": "America/Chicago", "Ohio": "America/New_York",
+    "Oklahoma": "America/Chicago", "Oregon": "America/Los_Angeles", "Pennsylvania": "America/New_York",
+    "Rhode Island": "America/New_York", "South Carolina": "America/New_York", "South Dakota": "America/Chicago",
+    "Tennessee": "America/Chicago", "Texas": "America/Chicago", "Utah": "America/Denver",
+    "Vermont": "America/New_York", "Virginia": "America/New_York", "Washington": "America/Los_Angeles",
+    "West Virginia": "America/New_York", "Wisconsin": "America/Chicago", "Wyoming": "America/Denver",
+}
+
+SA_EXT = {
+    "California":   {"penetration": None, "other": None,
+                     "summary": "No SOL for touching of sexual body parts, rape, digital penetration, oral penetration, vaginal penetration, anal penetration, etc."},
+    "New York":     {"penetration": 10,   "other": 10,
+                     "summary": "10-year SOL for touching of sexual body parts, rape, digital penetration, oral penetration, vaginal penetration, anal penetration, etc."},
+    "Texas":        {"penetration": 5,    "other": 2,
+                     "summary": "5-year SOL for rape/penetration of mouth, anus, or vagina; 2-year SOL for all other conduct."},
+    "Illinois":     {"penetration": None, "other": 2,
+                     "summary": "No SOL for rape/penetration of mouth, anus, or vagina; 2-year SOL for all other conduct."},
+    "Connecticut":  {"penetration": None, "other": 2,
+                     "summary": "No SOL for rape/penetration of mouth, anus, or vagina; 2-year SOL for all other conduct."},
+}
+
+# =========================
+# SHARED RULE CONSTANTS
+# =========================
+RIDESHARE_COMPANIES = ("Uber", "Lyft")
+INSIDE_NEAR_SCOPES = ("Inside the car", "Just outside the car", "Furtherance from the car")
+FILE_BY_BUFFER_DAYS = 45
+FAMILY_WINDOW_HOURS_WAGSTAFF = 24.0
+FAMILY_WINDOW_DAYS_TRITEN = 14
+
+# =========================
+# HELPERS
+# =========================
+def fmt_date(dt): return dt.strftime("%Y-%m-%d") if dt else "—"
+def fmt_dt(dt): return dt.strftime("%Y-%m-%d %H:%M") if dt else "—"
+
+def join_list(values, dash_if_empty=True):
+    if not values:
+        return "—" if dash_if_empty else ""
+    return ", ".join([str(v) for v in values])
+
+def tier_and_aggravators(flags):
+    t1 = bool(flags.get("Rape/Penetration") or flags.get("Forced Oral/Forced Touching"))
+    t2 = bool(flags.get("Touching/Kissing w/o Consent") or flags.get("Indecent Exposure") or flags.get("Masturbation Observed"))
+    aggr_kidnap = bool(flags.get("Kidnapping Off-Route w/ Threats"))
+    aggr_imprison = bool(flags.get("False Imprisonment w/ Threats"))
+    aggr = []
+    if aggr_kidnap: aggr.append("Kidnapping w/ threats")
+    if aggr_imprison: aggr.append("False imprisonment w/ threats")
+    if t1: base = "Tier 1"
+    elif t2: base = "Tier 2"
+    else: base = "Unclear"
+    label = f"{base} (+ Aggravators: {', '.join(aggr)})" if base in ("Tier 1","Tier 2") and aggr else base
+    return label, aggr
+
+def sa_category(flags):
+    if flags.get("Rape/Penetration") or flags.get("Forced Oral/Forced Touching"):
+        return "penetration"
+    if flags.get("Touching/Kissing w/o Consent") or flags.get("Indecent Exposure") or flags.get("Masturbation Observed"):
+        return "other"
+    return None
+
+def sol_rule_for(state, category):
+    if category and state in SA_EXT:
+        data = SA_EXT[state]
+        years = data[category]
+        summary = data["summary"]
+        return years, f"{state}: {summary}", True
+    years = TORT_SOL.get(state)
+    return years, f"{state}: General tort SOL = {years} year(s).", False
+
+def categorical_brief(flags):
+    buckets = []
+    if flags.get("Rape/Penetration"): buckets.append("rape/penetration")
+    if flags.get("Forced Oral/Forced Touching"): buckets.append("forced oral/forced touching")
+    if flags.get("Touching/Kissing w/o Consent"): buckets.append("unwanted touching/kissing")
+    if flags.get("Indecent Exposure"): buckets.append("indecent exposure")
+    if flags.get("Masturbation Observed"): buckets.append("masturbation observed")
+    if flags.get("Kidnapping Off-Route w/ Threats"): buckets.append("kidnapping w/ threats")
+    if flags.get("False Imprisonment w/ Threats"): buckets.append("false imprisonment w/ threats")
+    return ", ".join(buckets) if buckets else "—"
+
+def split_legal_name(full_legal: str):
+    first = middle = last = ""
+    if not full_legal:
+        return first, middle, last
+    parts = [p for p in full_legal.strip().split() if p]
+    if len(parts) == 1:
+        first = parts[0]
+    elif len(parts) == 2:
+        first, last = parts
+    else:
+        first, middle, last = parts[0], " ".join(parts[1:-1]), parts[-1]
+    return first, middle, last
+
+def calc_age(dob: date):
+    if not dob: return ""
+    today = date.today()
+    years = today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+    return max(0, years)
@@ -0,0 +1,166 @@
+# Objection script search: an inverted index over script titles and bodies, built once per
+# process, with BM25 ranking (a title word counts TITLE_WEIGHT times) and prefix completion, so the
+# word still being typed ("sett", "fe") already matches.
+#
+# Scripts are intake_content.OBJECTION_SCRIPTS plus any files on INTAKE_SCRIPTS_PATH
+# (os.pathsep-separated files or directories, read in name order):
+#   .md / .txt   one script per file: the first line is the title ("# " optional), the rest the text
+#   .json        {title: text}
+#   .jsonl       {"title": ..., "text": ...} per line
+# A file script with the title of a built-in one replaces it. Link-only scripts (a URL as the
+# text) are found by their title.
+import bisect
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from intake_content import OBJECTION_SCRIPTS
+
+SCRIPTS_PATH_ENV = "INTAKE_SCRIPTS_PATH"
+SCRIPT_FILE_EXTS = (".md", ".txt", ".json", ".jsonl")
+TITLE_WEIGHT = 3.0
+BM25_K1, BM25_B = 1.2, 0.75
+PREFIX_MATCH_WEIGHT = 0.8   # a completed word counts a little less than a typed one
+PREFIX_MAX_TERMS = 30
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do for from have i if in is it its me my of on or our so that the "
+    "their them they this to was we what when where which who will with you your".split()
+)
+
+_URL = re.compile(r"https?://\S+")
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+# =========================
+# TEXT
+# =========================
+def stem(word):
+    # Plurals only ("fees" -> "fee", "companies" -> "company"), so completions read as words
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes")):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def words(text):
+    # Lower-cased words with apostrophes dropped ("don't" -> "dont"), URLs skipped
+    return _WORD.findall(_URL.sub(" ", str(text or "").lower().replace("'", "").replace("’", "")))
+
+
+def terms(text):
+    return [stem(w) for w in words(text) if w not in STOPWORDS]
+
+
+# =========================
+# LOADING
+# =========================
+def _script_files(path):
+    if os.path.isdir(path):
+        return [os.path.join(path, name) for name in sorted(os.listdir(path))
+                if os.path.splitext(name)[1].lower() in SCRIPT_FILE_EXTS]
+    return [path]
+
+
+def read_script_file(path):
+    # One file -> {title: text}; ValueError on a file that doesn't fit its format
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, encoding="utf-8-sig") as f:
+        raw = f.read()
+    if ext == ".json":
+        data = json.loads(raw)
+        if not isinstance(data, dict) or not all(isinstance(v, str) for v in data.values()):
+            raise ValueError(f"{path}: expected a JSON object of title -> script text.")
+        return {str(k).strip(): v for k, v in data.items()}
+    if ext == ".jsonl":
+        out = {}
+        for n, line in enumerate(raw.splitlines(), start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict) or not row.get("title") or not isinstance(row.get("text"), str):
+                raise ValueError(f"{path}:{n}: expected {{\"title\": ..., \"text\": ...}}.")
+            out[str(row["title"]).strip()] = row["text"]
+        return out
+    if ext in (".md", ".txt"):
+        title, _, text = raw.strip().partition("\n")
+        title = title.lstrip("#").strip() or os.path.splitext(os.path.basename(path))[0]
+        return {title: text.strip()}
+    raise ValueError(f"{path}: script files must end in one of {', '.join(SCRIPT_FILE_EXTS)}.")
+
+
+def load_scripts(paths=None, base=None):
+    # Built-in scripts plus every file on `paths` (default: $INTAKE_SCRIPTS_PATH); later wins
+    if paths is None:
+        paths = [p for p in os.environ.get(SCRIPTS_PATH_ENV, "").split(os.pathsep) if p]
+    scripts = dict(OBJECTION_SCRIPTS if base is None else base)
+    for path in paths:
+        for file in _script_files(path):
+            scripts.update(read_script_file(file))
+    return scripts
+
+
+# =========================
+# INDEX
+# =========================
+class ScriptIndex:
+    # Read-only after __init__, so one instance serves every session
+    def __init__(self, scripts):
+        self.titles = list(scripts)
+        self.scripts = dict(scripts)
+        self.postings = {}                 # term -> [(doc, weighted tf)]
+        self.lengths = []
+        for doc, title in enumerate(self.titles):
+            tf = Counter()
+            for t in terms(title):
+                tf[t] += TITLE_WEIGHT
+            for t in terms(self.scripts[title]):
+                tf[t] += 1
+            self.lengths.append(sum(tf.values()))
+            for t, n in tf.items():
+                self.postings.setdefault(t, []).append((doc, n))
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 1.0
+        self.vocab = sorted(self.postings)
+        n = len(self.titles)
+        self.idf = {t: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for t, p in self.postings.items()}
+
+    def __len__(self):
+        return len(self.titles)
+
+    def text(self, title):
+        return self.scripts.get(title, "")
+
+    def complete(self, prefix, limit=8):
+        # Indexed words starting with `prefix`, most common first
+        prefix = stem(prefix.lower()) if len(prefix) > 3 else prefix.lower()
+        if not prefix:
+            return []
+        lo = bisect.bisect_left(self.vocab, prefix)
+        hi = bisect.bisect_left(self.vocab, prefix + "\uffff")
+        found = self.vocab[lo:hi]
+        return sorted(found, key=lambda t: (-len(self.postings[t]), t))[:limit]
+
+    def _expand(self, query):
+        # [(term, weight)]: whole words as typed; the last word also as a prefix unless the
+        # query ends in a space (the agent finished it)
+        typed = [w for w in words(query) if w not in STOPWORDS]
+        out = {stem(w): 1.0 for w in typed}
+        if typed and not query[-1:].isspace():
+            for t in self.complete(typed[-1], PREFIX_MAX_TERMS):
+                out.setdefault(t, PREFIX_MATCH_WEIGHT)
+        return [(t, w) for t, w in out.items() if t in self.postings]
+
+    def search(self, query, limit=10):
+        # -> [(title, score)], best first; [] for a query with no indexed words
+        scores = {}
+        for t, weight in self._expand(query):
+            idf = self.idf[t]
+            for doc, tf in self.postings[t]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / self.avg_length)
+                scores[doc] = scores.get(doc, 0.0) + weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda s: (-s[1], self.titles[s[0]]))[:limit]
+        return [(self.titles[doc], score) for doc, score in ranked]
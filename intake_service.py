@@ -0,0 +1,363 @@
+# Headless qualification service: the intake decision over HTTP/JSON, without the Streamlit UI.
+#
+#   python intake_service.py --port 8765 --workers 8
+#
+#   POST /qualify   one intake (a JSON object) -> one result object
+#                   a list of intakes, or {"intakes": [...], "now": "2025-06-01T12:00"} -> {"results": [...]}
+#   GET  /health    workers and firms
+#
+# Intakes use the export_payload shape (intake_compose): the same keys the app exports, with
+# dates as the export writes them ("2024-05-01", "2024-05-01 21:30", "UNKNOWN"). Only the answers
+# are read; derived columns (SOL_*, Eligibility_*...) are ignored and recomputed. Two optional
+# keys the export doesn't carry: "Scope" (where it happened, defaults to "Inside the car") and
+# "id", echoed back so batch callers can join results to their leads.
+#
+# Each result carries the tier, the SOL figures, every firm's eligibility and reasons (export
+# payload column names) and the rendered law firm note. A batch is split into chunks that run on
+# a process pool, so concurrent requests use every core; a bad intake in a batch gets
+# {"error": ...} in its slot instead of failing the request.
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, time as dtime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from intake_rules import STATES, STATE_ALIAS, USPS_STATE_CODES, RIDESHARE_COMPANIES
+from intake_eligibility import ACT_FIELDS, REPORT_FIELDS, INTAKE_DEFAULTS
+from intake_graph import INTAKE_GRAPH, GraphState
+from intake_firms import FIRMS, FIRMS_BY_NAME
+from intake_routing import preference
+from intake_compose import firm_header_and_short, statement_of_case, lawfirm_note, export_payload
+import intake_clock
+
+SERVICE_HOST = os.environ.get("INTAKE_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("INTAKE_SERVICE_PORT", 8765))
+SERVICE_WORKERS = int(os.environ.get("INTAKE_SERVICE_WORKERS", os.cpu_count() or 1))
+SERVICE_CHUNK = 250                      # intakes per pool task
+SERVICE_MAX_BODY = 64 * 1024 * 1024      # bytes per request
+
+# Export payload column -> act field
+ACT_COLUMNS = {
+    "Acts_RapePenetration": "rape", "Acts_ForcedOralForcedTouch": "forced_oral", "Acts_TouchingKissing": "touching",
+    "Acts_Exposure": "exposure", "Acts_Masturbation": "masturb", "Agg_Kidnap": "kidnap", "Agg_Imprison": "imprison",
+}
+ACT_LABELS = {field: label for label, field in ACT_FIELDS.items()}
+# Export payload column -> intake value, copied as text
+TEXT_COLUMNS = {
+    "FullName": "caller_full_name", "LegalName": "caller_legal_name", "Phone": "caller_phone", "Email": "caller_email",
+    "PriorFirmNote": "prior_firm_note", "Pickup": "pickup", "Dropoff": "dropoff",
+    "FamilyFirstName": "fam_first", "FamilyLastName": "fam_last", "FamilyPhone": "fam_phone",
+    "PhysicianName": "phys_name", "PhysicianClinicHospital": "phys_fac", "PhysicianAddress": "phys_addr",
+    "TherapistName": "ther_name", "TherapistClinicHospital": "ther_fac", "TherapistAddress": "ther_addr",
+    "PoliceStation": "police_station", "PoliceAddress": "police_addr", "ReportedRideshareCompany": "rep_rs_company",
+    "SubmittedHow": "rs_submit_how", "CompanyResponseDetail": "rs_response_detail", "InjuriesSummary": "injuries_summary",
+    "ProviderName": "provider_name", "ProviderFacility": "provider_facility", "DriverWeaponDetail": "driver_weapon_detail",
+    "NonLethalChoice": "non_lethal_choice", "FullSSN": "full_ssn", "SSN_Last4": "ssn_last4",
+    "MarketingSource": "marketing_source_choice",
+}
+# Export payload column -> intake value, read as yes/no
+FLAG_COLUMNS = {
+    "ConsentRecording": "consent_recording", "PriorFirmSigned": "prior_firm_any", "AnyPDFUploaded": "any_pdf_uploaded",
+    "AnyAudioVideoUploaded": "any_av_uploaded", "CompanyResponded": "rs_received_response",
+    "InjuryPhysical": "injury_physical", "InjuryEmotional": "injury_emotional", "FullSSN_OnFile": "full_ssn_on_file",
+    "GovIDProvided": "gov_id", "FemaleRider": "female_rider", "RiderNotDriver": "rider_not_driver",
+    "HasAttorney": "has_atty", "Felony": "felony", "VerbalOnly": "verbal_only", "AttemptOnly": "attempt_only",
+}
+# What a result carries, in export payload column names (plus "Tier")
+RESULT_COLUMNS = (
+    ["SA_Category", "SOL_Rule_Text", "SOL_Years", "SOL_End", "FileBy"]
+    + [f"Eligibility_{firm.label}" for firm in FIRMS] + [f"{firm.label}_Reasons" for firm in FIRMS]
+    + ["AssignedFirm", "LawFirmNote"]
+)
+EMPTY_VALUES = ("", "—", "UNKNOWN")
+TRUTHY = {"1", "true", "yes", "y", "t", "x"}
+_STATE_LOOKUP = {
+    **{s.lower(): s for s in STATES},
+    **{a.lower(): a for a in STATE_ALIAS},
+    **{c.lower(): s for c, s in USPS_STATE_CODES.items()},
+}
+
+
+# =========================
+# PAYLOAD -> INTAKE
+# =========================
+SCALARS = (str, int, float, bool)
+
+
+def _text(p, key):
+    value = p.get(key)
+    if value is not None and not isinstance(value, SCALARS):
+        raise ValueError(f"{key}: expected text, got {type(value).__name__}.")
+    return "" if value is None or str(value).strip() == "—" else str(value).strip()
+
+
+def _flag(p, key, default=False):
+    value = p.get(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in TRUTHY
+    return bool(value)
+
+
+def _list(p, key):
+    value = p.get(key) or []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(", ") if v.strip()]
+    if not isinstance(value, list) or not all(isinstance(v, SCALARS) for v in value):
+        raise ValueError(f"{key}: expected a list of text or 'A, B' text, got {type(value).__name__}.")
+    return [str(v) for v in value]
+
+
+def _parse(p, key, kind):
+    # kind: date / datetime / time; the export's placeholders ("—", "UNKNOWN") read as missing
+    value = p.get(key)
+    if value is None or (isinstance(value, str) and value.strip() in EMPTY_VALUES):
+        return None
+    try:
+        if kind is dtime:
+            return dtime.fromisoformat(str(value).strip())
+        parsed = datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{key}: '{value}' is not a valid {kind.__name__} (expected ISO format, e.g. 2024-05-01 21:30).") from None
+    return parsed.date() if kind is date else parsed
+
+
+def _report_dates(p):
+    # "Physician: 2024-05-02; Police: 2024-05-03" (or a {channel: date} object), in the form's channel order
+    raw = p.get("ReportDates") or {}
+    if isinstance(raw, str):
+        pairs = [part.split(":", 1) for part in raw.split(";") if part.strip()]
+        if any(len(pair) != 2 for pair in pairs):
+            raise ValueError(f"ReportDates: '{raw}' should read 'Channel: YYYY-MM-DD; ...'.")
+        raw = {k.strip(): v.strip() for k, v in pairs}
+    if not isinstance(raw, dict):
+        raise ValueError(f"ReportDates: expected 'Channel: YYYY-MM-DD; ...' or an object, got {type(raw).__name__}.")
+    unknown = sorted(set(raw) - set(REPORT_FIELDS))
+    if unknown:
+        raise ValueError(f"ReportDates: unknown channel(s) {', '.join(unknown)} (expected {', '.join(REPORT_FIELDS)}).")
+    dates = {channel: _parse(raw, channel, date) for channel in REPORT_FIELDS if channel in raw}
+    return {channel: d for channel, d in dates.items() if d}
+
+
+def intake_from_payload(p):
+    # export_payload-shaped dict -> the values the intake sections publish (ValueError on bad input)
+    if not isinstance(p, dict):
+        raise ValueError("An intake must be a JSON object.")
+    c = {field: _text(p, key) for key, field in TEXT_COLUMNS.items()}
+    c.update({field: _flag(p, key, INTAKE_DEFAULTS.get(field, False)) for key, field in FLAG_COLUMNS.items()})
+
+    state = _text(p, "State") or INTAKE_DEFAULTS["state"]
+    c["state"] = _STATE_LOOKUP.get(state.lower())
+    if c["state"] is None:
+        raise ValueError(f"State: unknown state '{state}'.")
+    company = _text(p, "Company") or INTAKE_DEFAULTS["company"]
+    c["company"] = next((co for co in RIDESHARE_COMPANIES if co.lower() == company.lower()), "Other")
+    c["scope_choice"] = _text(p, "Scope") or INTAKE_DEFAULTS["scope"]
+
+    flags = {field: _flag(p, key) for key, field in ACT_COLUMNS.items()}
+    c.update(flags)
+    c["act_flags"] = {ACT_LABELS[field]: v for field, v in flags.items()}
+
+    c["incident_date"] = _parse(p, "IncidentDate", date)
+    c["incident_time"] = _parse(p, "IncidentTime", dtime) or dtime(0, 0)
+    c["reported_to"] = _list(p, "ReportedTo")
+    c["report_dates"] = _report_dates(p)
+    c["family_report_dt"] = _parse(p, "FamilyReportDateTime", datetime)
+    family_day = c["report_dates"].get("Family/Friends")
+    if c["family_report_dt"] is None and family_day:
+        c["family_report_dt"] = datetime.combine(family_day, dtime(0, 0))
+    elif c["family_report_dt"] is not None and not family_day:
+        dates = {**c["report_dates"], "Family/Friends": c["family_report_dt"].date()}
+        c["report_dates"] = {ch: dates[ch] for ch in REPORT_FIELDS if ch in dates}
+
+    c["receipt_evidence"] = _list(p, "ReceiptEvidence")
+    c["uploaded_names"] = _list(p, "UploadedFiles")
+    c["first_visit"] = _parse(p, "FirstVisit", date)
+    c["last_visit"] = _parse(p, "LastVisit", date)
+    c["driver_weapon_used"] = "Yes" if _flag(p, "DriverWeaponUsed") else "No"
+    c["victim_weapon"] = "Yes" if _flag(p, "VictimWeapon") else "No"
+    c["medication_name"] = c["pharmacy_name"] = c["sms_phone"] = ""
+    c["assigned_firm_choice"] = _text(p, "AssignedFirm")
+    return c
+
+
+# =========================
+# QUALIFY
+# =========================
+def pick_firm(ev, state):
+    # Eligible firm with the highest routing preference (spec order breaks ties); the live
+    # month-to-date pacing stays with the app's RoutingLedger
+    ranked = [(-preference(firm, state, ev["tier_label"]), i, firm) for i, firm in enumerate(FIRMS) if ev[f"{firm.key}_ok"]]
+    return min(ranked)[2].name if ranked else "Other (type name)"
+
+
+def qualified(payload, now, note=True):
+    # One intake -> the app's derived values (eligibility, SOL, firm assignment); with note=True
+    # also the statement of the case and the law firm note
+    c = intake_from_payload(payload)
+    ev = GraphState(INTAKE_GRAPH).value("eligibility", {**c, "today": now.date(), "now": now})
+    choice = c.pop("assigned_firm_choice")
+    recommended = pick_firm(ev, c["state"])
+    if not choice or choice == "Other Firm":
+        choice = recommended
+    if choice in FIRMS_BY_NAME:
+        note_header, firm_short, assigned_firm_name = firm_header_and_short(choice, "")
+    else:
+        note_header, firm_short, assigned_firm_name = firm_header_and_short("Other (type name)", "" if choice == "Other (type name)" else choice)
+    d = {**ev, **c, "assigned_firm_name": assigned_firm_name, "note_header": note_header, "firm_short": firm_short,
+         "recommended_firm": recommended}
+    if note:
+        d["elements"] = statement_of_case(d)
+        d["lawfirm_note"] = lawfirm_note(d, now)
+    return d
+
+
+def qualify(payload, now=None):
+    # One intake -> {Tier, SOL..., Eligibility_<firm>, <firm>_Reasons, AssignedFirm, LawFirmNote}
+    d = qualified(payload, now or intake_clock.now())
+    out = export_payload(d)
+    result = {"Tier": d["tier_label"], **{k: out[k] for k in RESULT_COLUMNS}}
+    if "id" in payload:
+        result = {"id": payload["id"], **result}
+    return result
+
+
+def parse_now(value):
+    # The batch's "now" (ISO text) -> datetime; ValueError for anything else
+    if not isinstance(value, str):
+        raise ValueError(f"now: expected ISO text (e.g. 2025-06-01T12:00), got {type(value).__name__}.")
+    return datetime.fromisoformat(value)
+
+
+def qualify_many(payloads, now=None):
+    # Batch form for the pool: now as an ISO string (picklable), errors kept per intake
+    now = parse_now(now) if now else intake_clock.now()
+    results = []
+    for p in payloads:
+        try:
+            results.append(qualify(p, now))
+        except (ValueError, TypeError, AttributeError, KeyError) as e:
+            # Malformed input the checks above didn't catch still only fails its own slot
+            error = str(e) if isinstance(e, ValueError) else f"Unreadable intake ({type(e).__name__}: {e})."
+            results.append({**({"id": p["id"]} if isinstance(p, dict) and "id" in p else {}), "error": error})
+    return results
+
+
+# =========================
+# WORKER POOL
+# =========================
+def _warm(_):
+    return os.getpid()
+
+
+class QualifyService:
+    # workers=0 runs everything in the calling thread (debugging, tiny deployments)
+    def __init__(self, workers=SERVICE_WORKERS, chunk=SERVICE_CHUNK):
+        if workers < 0 or chunk < 1:
+            raise ValueError("workers must be >= 0 and chunk >= 1.")
+        self.workers, self.chunk = workers, chunk
+        self.pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+        if self.pool:
+            # Start every worker now, before the server's request threads exist
+            list(self.pool.map(_warm, range(workers)))
+
+    def run(self, payloads, now=None):
+        now = now.isoformat() if isinstance(now, datetime) else now
+        if self.pool is None:
+            return qualify_many(payloads, now)
+        chunks = [payloads[i:i + self.chunk] for i in range(0, len(payloads), self.chunk)]
+        futures = [self.pool.submit(qualify_many, chunk, now) for chunk in chunks]
+        return [r for f in futures for r in f.result()]
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(cancel_futures=True)
+
+
+# =========================
+# HTTP
+# =========================
+class QualifyHandler(BaseHTTPRequestHandler):
+    service = None  # set by serve()
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass  # one line per request is too much at dialer volume
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/health":
+            return self._send(404, {"error": "Not found."})
+        self._send(200, {"ok": True, "workers": self.service.workers, "firms": [firm.name for firm in FIRMS]})
+
+    def do_POST(self):
+        if self.path.split("?")[0] != "/qualify":
+            return self._send(404, {"error": "Not found."})
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > SERVICE_MAX_BODY:
+            self.close_connection = True
+            return self._send(413, {"error": f"Request body over {SERVICE_MAX_BODY} bytes; split the batch."})
+        try:
+            body = json.loads(self.rfile.read(length) or b"null")
+        except ValueError as e:
+            return self._send(400, {"error": f"Invalid JSON: {e}"})
+
+        now, single = None, isinstance(body, dict) and "intakes" not in body
+        if isinstance(body, dict) and "intakes" in body:
+            now, body = body.get("now"), body["intakes"]
+        if not single and not isinstance(body, list):
+            return self._send(400, {"error": "Send an intake object, a list of intakes or {\"intakes\": [...]}."})
+        try:
+            if now:
+                now = parse_now(now).isoformat()
+            t0 = time.perf_counter()
+            results = self.service.run([body] if single else body, now)
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        except BrokenProcessPool:
+            return self._send(503, {"error": "Worker pool is down; restart the service."})
+        except Exception as e:
+            # Never drop the connection without an answer
+            return self._send(500, {"error": f"Internal error ({type(e).__name__})."})
+        if single:
+            return self._send(400 if "error" in results[0] else 200, results[0])
+        self._send(200, {"results": results, "count": len(results),
+                         "elapsed_ms": round((time.perf_counter() - t0) * 1000, 1)})
+
+
+def serve(host=SERVICE_HOST, port=SERVICE_PORT, workers=SERVICE_WORKERS, chunk=SERVICE_CHUNK):
+    service = QualifyService(workers, chunk)
+    handler = type("Handler", (QualifyHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Intake qualification service on http://{host}:{server.server_port} ({workers or 'no'} worker processes)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Intake qualification service (HTTP/JSON).")
+    ap.add_argument("--host", default=SERVICE_HOST)
+    ap.add_argument("--port", type=int, default=SERVICE_PORT)
+    ap.add_argument("--workers", type=int, default=SERVICE_WORKERS, help="worker processes (0 = answer in the request thread)")
+    ap.add_argument("--chunk", type=int, default=SERVICE_CHUNK, help="intakes per worker task")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.chunk)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Vectorized SOL deadlines for whole lead backlogs.
+#
+# The (state, SA category) -> years lookup is built once from TORT_SOL / SA_EXT / STATE_ALIAS,
+# so a batch is a couple of index lookups plus numpy date math instead of a relativedelta per row.
+
+import numpy as np
+import pandas as pd
+
+from intake_rules import TORT_SOL, SA_EXT, STATE_ALIAS, FILE_BY_BUFFER_DAYS
+import intake_clock
+
+# =========================
+# PRECOMPUTED LOOKUP
+# =========================
+SOL_CATEGORIES = (None, "penetration", "other")
+
+
+def _build_years_table():
+    # Row per state name (aliases included); a trailing all-NaN row catches unknown states,
+    # which sol_rule_for also treats as "no SOL".
+    names = sorted(set(TORT_SOL) | set(SA_EXT) | set(STATE_ALIAS))
+    table = np.full((len(names) + 1, len(SOL_CATEGORIES)), np.nan)
+    for i, name in enumerate(names):
+        state = STATE_ALIAS.get(name, name)
+        general = TORT_SOL.get(state)
+        for j, category in enumerate(SOL_CATEGORIES):
+            years = SA_EXT[state][category] if (category and state in SA_EXT) else general
+            if years is not None:
+                table[i, j] = years
+    return pd.Index(names), table
+
+
+SOL_STATE_INDEX, SOL_YEARS_TABLE = _build_years_table()
+_CATEGORY_INDEX = pd.Index(SOL_CATEGORIES[1:])
+
+
+# =========================
+# VECTOR MATH
+# =========================
+def sol_years_for(states, categories):
+    rows = SOL_STATE_INDEX.get_indexer(pd.Index(states, dtype=object))  # -1 -> unknown row
+    cols = _CATEGORY_INDEX.get_indexer(pd.Index(categories, dtype=object)) + 1  # -1 -> None column
+    return SOL_YEARS_TABLE[rows, cols]
+
+
+def add_years(values, years):
+    # relativedelta(years=n) semantics: Feb 29 clamps to Feb 28 in non-leap target years.
+    a = np.asarray(values, dtype="datetime64[ns]")
+    years = np.asarray(years, dtype="float64")
+    n = np.nan_to_num(years, nan=0.0).astype("int64")
+    days = a.astype("datetime64[D]")
+    months = a.astype("datetime64[M]")
+    time_of_day = a - days.astype("datetime64[ns]")
+    day_of_month = (days - months.astype("datetime64[D]")).astype("int64")
+    target_month = (months.astype("int64") + 12 * n).astype("datetime64[M]")
+    month_len = ((target_month + 1).astype("datetime64[D]") - target_month.astype("datetime64[D]")).astype("int64")
+    out = (target_month.astype("datetime64[D]") + np.minimum(day_of_month, month_len - 1)).astype("datetime64[ns]") + time_of_day
+    out[np.isnan(years) | np.isnat(a)] = np.datetime64("NaT")
+    return out
+
+
+def sol_deadlines(states, categories, incident_dts, now=None):
+    # Returns numpy columns: sol_years (NaN = no SOL), sol_end, file_by (datetime64[ns], NaT = no SOL)
+    # and days_remaining until file_by (float, NaN = no SOL, negative = already past).
+    now = np.datetime64(now or intake_clock.now(), "ns")
+    sol_years = sol_years_for(states, categories)
+    sol_end = add_years(incident_dts, sol_years)
+    file_by = sol_end - np.timedelta64(FILE_BY_BUFFER_DAYS, "D")
+    days_remaining = (file_by - now) / np.timedelta64(1, "D")
+    return {
+        "sol_years": sol_years,
+        "sol_end": sol_end,
+        "file_by": file_by,
+        "days_remaining": days_remaining,
+    }
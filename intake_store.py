@@ -0,0 +1,295 @@
+# Local embedded archive of finished intakes (SQLite, WAL mode).
+#
+# Every export_payload is stored as JSON next to a few normalized, indexed lookup columns.
+# Writes from all sessions go through one writer thread that batches whatever is queued into a
+# single transaction (group commit), so concurrent agents share fsyncs instead of serializing
+# on them. Reads use a per-thread connection and never block on the writer under WAL.
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from intake_phones import parse_phone
+
+DEFAULT_DB_PATH = os.environ.get(
+    "INTAKE_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "intake_store.sqlite3")
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intakes (
+    id            INTEGER PRIMARY KEY,
+    created_at    TEXT NOT NULL,
+    phone_key     TEXT,
+    email_key     TEXT,
+    legal_name_key TEXT,
+    state         TEXT,
+    assigned_firm TEXT,
+    incident_date TEXT,
+    payload       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_intakes_phone ON intakes (phone_key);
+CREATE INDEX IF NOT EXISTS ix_intakes_email ON intakes (email_key);
+CREATE INDEX IF NOT EXISTS ix_intakes_legal_name ON intakes (legal_name_key);
+CREATE INDEX IF NOT EXISTS ix_intakes_state ON intakes (state, incident_date);
+CREATE INDEX IF NOT EXISTS ix_intakes_firm ON intakes (assigned_firm, created_at);
+CREATE INDEX IF NOT EXISTS ix_intakes_incident_date ON intakes (incident_date);
+CREATE INDEX IF NOT EXISTS ix_intakes_created_at ON intakes (created_at);
+"""
+
+INSERT_SQL = (
+    "INSERT INTO intakes (created_at, phone_key, email_key, legal_name_key, state, assigned_firm, incident_date, payload) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+# Full SSNs are sent to the firm with the intake's own export and never kept: the archive holds
+# SSN_Last4 / FullSSN_OnFile only. Archives written before that are scrubbed once on open
+# (PRAGMA user_version 0 -> 1).
+SSN_KEYS = frozenset({"FullSSN", "TriTen_SSN", "Wag_SSN"})
+SCRUB_SSN_SQL = (
+    "UPDATE intakes SET payload = json_remove(payload, " + ", ".join(f"'$.{k}'" for k in sorted(SSN_KEYS)) + ") "
+    "WHERE " + " OR ".join(f"json_extract(payload, '$.{k}') IS NOT NULL" for k in sorted(SSN_KEYS))
+)
+UPDATE_SQL = (
+    "UPDATE intakes SET phone_key = ?, email_key = ?, legal_name_key = ?, state = ?, assigned_firm = ?, "
+    "incident_date = ?, payload = ? WHERE id = ?"
+)
+
+
+# =========================
+# NORMALIZED KEYS
+# =========================
+def phone_key(phone):
+    # 10-digit national number for US numbers (extension and "+1" dropped); other text keeps
+    # its digits, as rows saved before intake_phones were keyed
+    national = parse_phone(phone)["national"]
+    if national:
+        return national
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits or None
+
+
+def email_key(email):
+    return (email or "").strip().lower() or None
+
+
+def name_key(name):
+    return " ".join((name or "").lower().split()) or None
+
+
+def _incident_date(payload):
+    value = payload.get("IncidentDate")
+    return value if value and re.fullmatch(r"\d{4}-\d{2}-\d{2}", str(value)) else None
+
+
+def _row_for(payload, created_at=None):
+    return (
+        created_at or datetime.now().isoformat(timespec="seconds"),
+        phone_key(payload.get("Phone")),
+        email_key(payload.get("Email")),
+        name_key(payload.get("LegalName")),
+        payload.get("State") or None,
+        payload.get("AssignedFirm") or None,
+        _incident_date(payload),
+        json.dumps({k: v for k, v in payload.items() if k not in SSN_KEYS}, default=str, ensure_ascii=False),
+    )
+
+
+class _PendingWrite:
+    __slots__ = ("rows", "update_ids", "ids", "error", "done")
+
+    def __init__(self, rows, update_ids=None):
+        self.rows = rows
+        self.update_ids = update_ids   # rewrite these archive rows instead of inserting
+        self.ids = []
+        self.error = None
+        self.done = threading.Event()
+
+
+# =========================
+# STORE
+# =========================
+class IntakeStore:
+    def __init__(self, path=DEFAULT_DB_PATH, batch_size=500, flush_ms=15):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_s = flush_ms / 1000.0
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        if conn.execute("PRAGMA user_version").fetchone()[0] < 1:
+            with conn:
+                conn.execute(SCRUB_SSN_SQL)
+                conn.execute("PRAGMA user_version = 1")
+        conn.close()
+        self._writer = threading.Thread(target=self._write_loop, name="intake-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _reader(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ---------- writes ----------
+    def save(self, payload, wait=True):
+        ids = self.save_many([payload], wait=wait)
+        return ids[0] if ids else None
+
+    def save_many(self, payloads, wait=True):
+        pending = _PendingWrite([_row_for(p) for p in payloads])
+        self._queue.put(pending)
+        if not wait:
+            return []
+        pending.done.wait()
+        if pending.error:
+            raise pending.error
+        return pending.ids
+
+    def update(self, intake_id, payload):
+        # Rewrites an archived intake in place (the agent saved, edited, saved again); keeps its id
+        # and save time. False if there's no such row.
+        pending = _PendingWrite([_row_for(payload)], update_ids=[int(intake_id)])
+        self._queue.put(pending)
+        pending.done.wait()
+        if pending.error:
+            raise pending.error
+        return pending.ids == [int(intake_id)]
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                break
+            deadline = time.monotonic() + self.flush_s
+            queued_rows = len(batch[0].rows)
+            while queued_rows < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+                queued_rows += len(item.rows)
+            try:
+                with conn:  # one transaction (one fsync) for the whole group
+                    for item in batch:
+                        if item.update_ids:
+                            for row, intake_id in zip(item.rows, item.update_ids):
+                                if conn.execute(UPDATE_SQL, (*row[1:], intake_id)).rowcount:
+                                    item.ids.append(intake_id)
+                            continue
+                        for row in item.rows:
+                            item.ids.append(conn.execute(INSERT_SQL, row).lastrowid)
+            except Exception as e:
+                for item in batch:
+                    item.ids = []
+                    item.error = e
+            finally:
+                for item in batch:
+                    item.done.set()
+        conn.close()
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+    # ---------- reads ----------
+    @contextmanager
+    def snapshot(self):
+        # Reads in this thread inside the block see one consistent archive (a WAL read
+        # transaction): saves and updates committed meanwhile stay invisible until it ends
+        conn = self._reader()
+        if conn.in_transaction:
+            yield
+            return
+        conn.execute("BEGIN")
+        try:
+            yield
+        finally:
+            conn.rollback()
+
+    def get(self, intake_id):
+        row = self._reader().execute("SELECT * FROM intakes WHERE id = ?", (intake_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def find(self, phone=None, email=None, legal_name=None, state=None, assigned_firm=None,
+             incident_from=None, incident_to=None, limit=50):
+        # Every filter maps onto an index; legal_name matches as a prefix ("jane q" finds "jane q public").
+        where, args = [], []
+        if phone:
+            where.append("phone_key = ?")
+            args.append(phone_key(phone))
+        if email:
+            where.append("email_key = ?")
+            args.append(email_key(email))
+        if legal_name:
+            prefix = name_key(legal_name)
+            where.append("legal_name_key >= ? AND legal_name_key < ?")
+            args += [prefix, prefix + "\uffff"]
+        if state:
+            where.append("state = ?")
+            args.append(state)
+        if assigned_firm:
+            where.append("assigned_firm = ?")
+            args.append(assigned_firm)
+        if incident_from:
+            where.append("incident_date >= ?")
+            args.append(str(incident_from))
+        if incident_to:
+            where.append("incident_date <= ?")
+            args.append(str(incident_to))
+        sql = "SELECT * FROM intakes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        return [_decode(r) for r in self._reader().execute(sql, args + [int(limit)])]
+
+    def iter_payloads(self, where="", args=(), batch_size=1000):
+        # Streams payloads in id order with a bounded fetch size (used by bulk exports).
+        for intake_id, _, payload in self.iter_records(where, args, batch_size):
+            yield intake_id, payload
+
+    def iter_records(self, where="", args=(), batch_size=1000):
+        # Same stream with the save time: (id, created_at, payload)
+        cur = self._reader().execute(f"SELECT id, created_at, payload FROM intakes {where} ORDER BY id", args)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row["id"], row["created_at"], json.loads(row["payload"])
+
+    def firm_counts(self, since, until):
+        # Archived intakes per assigned firm with since <= created_at < until (dates or ISO strings)
+        rows = self._reader().execute(
+            "SELECT assigned_firm, COUNT(*) FROM intakes WHERE created_at >= ? AND created_at < ? GROUP BY assigned_firm",
+            (str(since), str(until)),
+        )
+        return {firm: n for firm, n in rows if firm}
+
+    def count(self):
+        return self._reader().execute("SELECT COUNT(*) FROM intakes").fetchone()[0]
+
+
+def _decode(row):
+    return {"id": row["id"], "created_at": row["created_at"], "payload": json.loads(row["payload"])}
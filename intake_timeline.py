@@ -0,0 +1,216 @@
+# Eligibility timeline: the dates on which a firm's decision for an intake changes as time
+# passes, with the answers as they are.
+#
+#   sol_end       the SOL runs out; an eligible firm becomes ineligible
+#   file_by       the file-by date (SOL end minus the 45-day buffer) for an eligible firm
+#   family_24h    report windows counted from the incident (a firm's "report" rule with
+#   family_14d    family_only_hours, or an "earliest_report_window" rule): for an intake with no
+#                 report yet that only lacks the report, the moment a report to that channel
+#                 stops counting
+#
+# Events come from the firms' compiled rules (intake_firms), so a new firm or window is picked
+# up without code here. timeline() is one intake (the app's diagnostics); timeline_frame() is a
+# whole batch, column-wise, for the archive calendar:
+#
+#   python -m intake_app calendar intake_store.sqlite3 -o upcoming.csv --days 90
+#
+# Intakes without an incident date get no events (they're evaluated as if it happened today, at
+# the incident time).
+import argparse
+import sys
+from datetime import timedelta
+
+from intake_firms import FIRMS, rule_columns
+import intake_clock
+
+TIMELINE_COLUMNS = ("intake", "firm", "event", "at", "detail")
+REPORT_RULE_KINDS = ("report", "earliest_report_window")
+CALENDAR_DAYS = 90
+
+
+# =========================
+# EVENTS PER FIRM
+# =========================
+def _slug(channel):
+    return channel.split("/")[0].strip().lower().replace(" ", "_")
+
+
+def report_windows(firm):
+    # [(event, detail, length, whole days)] for the firm's windows counted from the incident.
+    # Hour windows close length after the incident; day windows at the start of the first day past.
+    out = []
+    for _, _, _, p in firm.checks:
+        if p.kind == "report" and p.params.get("family_only_hours") is not None:
+            hours = float(p.params["family_only_hours"])
+            out.append((f"family_{hours:g}h", f"Family/Friends report window closes ({hours:g}h after the incident)",
+                        timedelta(hours=hours), False))
+        elif p.kind == "earliest_report_window":
+            days, channel = int(p.params["days"]), p.params["channel"]
+            out.append((f"{_slug(channel)}_{days}d", f"{channel} report window closes ({days} days after the incident)",
+                        timedelta(days=days + 1), True))
+    return out
+
+
+def _window_close(incident_dt, length, whole_days):
+    start = incident_dt.replace(hour=0, minute=0, second=0, microsecond=0) if whole_days else incident_dt
+    return start + length
+
+
+def _sol_events(sol_end, file_by):
+    return [("sol_end", "SOL passes — no longer eligible", sol_end), ("file_by", "File-by deadline (SOL − 45 days)", file_by)]
+
+
+# =========================
+# ONE INTAKE
+# =========================
+def timeline(v, now=None, incident_known=True, firms=None):
+    # v: the decision dict from evaluate() / the eligibility graph (check results included).
+    # Returns upcoming events after `now`, soonest first: [{firm, event, at, detail}]
+    now = now or intake_clock.now()
+    if not incident_known:
+        return []
+    events = []
+    for firm in firms or FIRMS:
+        if v[f"{firm.key}_ok"] and v["sol_end"] is not None:
+            for event, detail, at in _sol_events(v["sol_end"], v["file_by_deadline"]):
+                if at > now:
+                    events.append({"firm": firm.label, "event": event, "at": at, "detail": detail})
+        if v["report_any"]:
+            continue
+        others_ok = all(v[check] for check, _, _, p in firm.checks if p.kind not in REPORT_RULE_KINDS + ("sol_open",))
+        for event, detail, length, whole_days in report_windows(firm):
+            at = _window_close(v["incident_dt"], length, whole_days)
+            if others_ok and at > now and (v["sol_end"] is None or at <= v["sol_end"]):
+                events.append({"firm": firm.label, "event": event, "at": at, "detail": detail})
+    return sorted(events, key=lambda e: (e["at"], e["firm"]))
+
+
+# =========================
+# BATCH (column-wise)
+# =========================
+def timeline_frame(df, now=None, until=None, firms=None):
+    # df: evaluate_frame records. Upcoming events after `now` (and up to `until`), one row each,
+    # soonest first; "intake" is the record's index label.
+    import numpy as np
+    import pandas as pd
+    from intake_eligibility import frame_facts
+    firms = firms or FIRMS
+    now = pd.Timestamp(now or intake_clock.now())
+    until = pd.Timestamp(until) if until is not None else None
+    out, f = frame_facts(df, now)
+    columns = rule_columns(f, firms)
+    if "incident_known" in df:
+        known = df["incident_known"].fillna(False).to_numpy(dtype=bool)
+    else:
+        known = (df["incident_dt"].notna() if "incident_dt" in df else pd.Series(False, index=df.index)).to_numpy(dtype=bool)
+    incident_dt = f["incident_dt"]
+    sol_end = out["sol_end"]
+    no_report = ~f["report_any"].to_numpy(dtype=bool)
+
+    parts = []
+
+    def add(mask, firm, event, detail, at):
+        at = pd.Series(at, index=df.index)
+        mask = mask & (at > now).to_numpy() & at.notna().to_numpy()
+        if until is not None:
+            mask &= (at <= until).to_numpy()
+        if mask.any():
+            parts.append(pd.DataFrame({"intake": df.index[mask], "firm": firm.label, "event": event,
+                                       "at": at[mask].to_numpy(), "detail": detail}))
+
+    for firm in firms:
+        ok = np.ones(len(df), dtype=bool)
+        others_ok = np.ones(len(df), dtype=bool)
+        for _, _, _, p in firm.checks:
+            ok &= columns[p]
+            if p.kind not in REPORT_RULE_KINDS + ("sol_open",):
+                others_ok &= columns[p]
+        for event, detail, at in _sol_events(sol_end, out["file_by_deadline"]):
+            add(ok & known, firm, event, detail, at)
+        for event, detail, length, whole_days in report_windows(firm):
+            at = (incident_dt.dt.normalize() if whole_days else incident_dt) + length
+            in_sol = (sol_end.isna() | (at <= sol_end)).to_numpy()
+            add(others_ok & known & no_report & in_sol, firm, event, detail, at)
+
+    if not parts:
+        return _empty_timeline()
+    events = pd.concat(parts, ignore_index=True)
+    return events.sort_values(["at", "intake", "firm"], kind="stable").reset_index(drop=True)[list(TIMELINE_COLUMNS)]
+
+
+def _empty_timeline():
+    import pandas as pd
+    return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if c == "at" else object) for c in TIMELINE_COLUMNS})
+
+
+# =========================
+# CALENDAR (archive / files)
+# =========================
+def payload_records(payloads, row0=0, today=None):
+    # export payloads -> (evaluate_frame records indexed by the payload "id" or row number, errors);
+    # `today` stands in for unknown incident dates (the as-of day)
+    import pandas as pd
+    from intake_service import intake_from_payload
+    from intake_graph import intake_record
+    records, ids, errors = [], [], []
+    for i, p in enumerate(payloads, start=row0):
+        key = p.get("id", i) if isinstance(p, dict) else i
+        try:
+            records.append(intake_record(intake_from_payload(p), today))
+            ids.append(key)
+        except ValueError as e:
+            errors.append((key, str(e)))
+    return pd.DataFrame(records, index=pd.Index(ids, name="intake")), errors
+
+
+def calendar_file(source, output=None, now=None, days=CALENDAR_DAYS, progress=None):
+    # Upcoming status changes for every intake in `source` (archive .sqlite3, export CSV / JSONL),
+    # within `days` of now. Returns (events frame, errors); written to `output` when given.
+    import pandas as pd
+    from intake_batch import iter_chunks, ResultWriter
+    now = pd.Timestamp(now or intake_clock.now())
+    until = now + pd.Timedelta(days=days) if days is not None else None
+    writer = ResultWriter(output) if output else None
+    parts, errors, done = [], [], 0
+    for row0, chunk in iter_chunks(source):
+        records, bad = payload_records(chunk, row0, now.date())
+        errors += bad
+        if len(records):
+            parts.append(timeline_frame(records, now, until))
+        done += len(chunk)
+        if progress:
+            progress(done)
+    events = pd.concat(parts, ignore_index=True) if parts else _empty_timeline()
+    events = events.sort_values(["at", "intake", "firm"], kind="stable").reset_index(drop=True)
+    if writer:
+        events["intake"] = events["intake"].astype(str)
+        writer.write(events)
+        writer.close()
+    return events, errors
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m intake_app calendar",
+                                 description="Upcoming eligibility changes (SOL end, file-by, report windows) for a file of intakes.")
+    ap.add_argument("input", help="archive .sqlite3, or intakes .csv / .jsonl")
+    ap.add_argument("-o", "--output", required=True, help="calendar file: .csv, .jsonl or .parquet")
+    ap.add_argument("--now", help="as of this time (ISO, default: now)")
+    ap.add_argument("--days", type=int, default=CALENDAR_DAYS, help="how far ahead to look")
+    args = ap.parse_args(argv)
+    try:
+        now = intake_clock.parse_as_of(args.now) if args.now else None
+        events, errors = calendar_file(args.input, args.output, now, args.days,
+                                       lambda n: print(f"\r{n:>12,} intakes", end="", file=sys.stderr, flush=True))
+    except (ValueError, OSError) as e:
+        ap.error(str(e))
+    print(file=sys.stderr)
+    counts = events.groupby(["firm", "event"]).size()
+    print(f"{len(events):,} events in the next {args.days} days -> {args.output}"
+          + (f" ({len(errors):,} unreadable intake(s) skipped)" if errors else ""))
+    for (firm, event), n in counts.items():
+        print(f"  {firm:<12} {event:<14} {n:>8,}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
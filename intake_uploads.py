@@ -0,0 +1,143 @@
+# Disk spool for proof uploads (receipts, notes, audio/video).
+#
+# Files are copied to a local spool directory in fixed-size chunks, hashed (SHA-256) on the way
+# and stored under their hash, so the same video uploaded twice is kept once. The real type comes
+# from the file's leading bytes, not its extension: a renamed .pdf does not count as a PDF receipt.
+# Callers keep only the small manifest dicts returned here, never the file bytes.
+import hashlib
+import os
+import re
+import tempfile
+import time
+
+SPOOL_DIR = os.environ.get("INTAKE_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "intake_spool"))
+SPOOL_CHUNK_BYTES = 1024 * 1024
+SESSION_UPLOAD_LIMIT_BYTES = int(os.environ.get("INTAKE_SESSION_UPLOAD_LIMIT_MB", "2048")) * 1024 * 1024
+SPOOL_RETENTION_HOURS = 72
+
+PDF_KINDS = ("pdf",)
+AV_KINDS = ("mp4", "mov", "m4a", "mp3", "wav")
+KIND_LABELS = {
+    "pdf": "PDF", "png": "PNG image", "jpeg": "JPEG image", "heic": "HEIC image",
+    "mp4": "MP4 video", "mov": "QuickTime video", "m4a": "M4A audio", "mp3": "MP3 audio", "wav": "WAV audio",
+    "eml": "Email message",
+}
+# Extension the agent sees -> kinds its content may legitimately sniff as
+EXTENSION_KINDS = {
+    ".pdf": ("pdf",), ".png": ("png",), ".jpg": ("jpeg",), ".jpeg": ("jpeg",), ".heic": ("heic",),
+    ".mp4": ("mp4", "mov", "m4a"), ".mov": ("mov", "mp4"), ".m4a": ("m4a", "mp4"), ".mp3": ("mp3",), ".wav": ("wav",),
+    ".eml": ("eml",),
+}
+_FTYP_BRANDS = {
+    b"qt  ": "mov",
+    b"M4A ": "m4a", b"M4B ": "m4a",
+    b"heic": "heic", b"heix": "heic", b"hevc": "heic", b"mif1": "heic", b"msf1": "heic",
+}
+_EMAIL_HEADER = re.compile(rb"^(?:Return-Path|Received|Delivered-To|From|To|Date|Subject|Message-ID|MIME-Version|X-[\w-]+):", re.I)
+
+
+# =========================
+# TYPE SNIFFING
+# =========================
+def sniff_kind(head):
+    # head: the first few dozen bytes of the file. Returns a KIND_LABELS key or None.
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[4:8] == b"ftyp":
+        return _FTYP_BRANDS.get(head[8:12], "mp4")
+    if head[4:8] in (b"moov", b"mdat", b"wide", b"free"):
+        return "mov"
+    if _EMAIL_HEADER.match(head):
+        return "eml"
+    if head.startswith(b"ID3") or (len(head) > 1 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+        return "mp3"
+    return None
+
+
+# =========================
+# SPOOLING
+# =========================
+def spool_file(fileobj, name, spool_dir=SPOOL_DIR, chunk_bytes=SPOOL_CHUNK_BYTES):
+    # Streams fileobj to <spool_dir>/<sha256><ext>; at most one chunk is in memory at a time.
+    os.makedirs(spool_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    size, head = 0, b""
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+    fd, tmp_path = tempfile.mkstemp(dir=spool_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = fileobj.read(chunk_bytes)
+                if not chunk:
+                    break
+                if len(head) < 64:
+                    head += chunk[:64 - len(head)]
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        ext = os.path.splitext(name)[1].lower()
+        path = os.path.join(spool_dir, sha256 + ext)
+        if os.path.exists(path):
+            os.remove(tmp_path)  # identical content already spooled
+            os.utime(path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    kind = sniff_kind(head)
+    return {
+        "name": name, "sha256": sha256, "size": size, "kind": kind, "path": path,
+        "type_matches_name": kind in EXTENSION_KINDS.get(ext, ()),
+    }
+
+
+def spool_uploads(files, manifest, limit_bytes=SESSION_UPLOAD_LIMIT_BYTES, spool_dir=SPOOL_DIR):
+    # Adds new uploads to the session manifest. Returns (manifest, problems); files over the
+    # session budget are skipped, and re-uploads of the same content are kept once.
+    manifest = list(manifest)
+    problems = []
+    used = sum(m["size"] for m in manifest)
+    seen = {m["sha256"] for m in manifest}
+    for f in files:
+        size = getattr(f, "size", 0)
+        if used + size > limit_bytes:
+            problems.append(f"{f.name}: skipped — over the {limit_bytes // (1024 * 1024)} MB upload limit for this intake.")
+            continue
+        entry = spool_file(f, f.name, spool_dir)
+        if entry["sha256"] in seen:
+            problems.append(f"{f.name}: same file already uploaded.")
+            continue
+        seen.add(entry["sha256"])
+        used += entry["size"]
+        manifest.append(entry)
+    return manifest, problems
+
+
+def manifest_has(manifest, kinds):
+    return any(m["kind"] in kinds for m in manifest)
+
+
+def prune_spool(spool_dir=SPOOL_DIR, max_age_hours=SPOOL_RETENTION_HOURS):
+    # Drops spooled files untouched for max_age_hours (and any stale partial writes)
+    if not os.path.isdir(spool_dir):
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for entry in os.scandir(spool_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError:
+            continue
+    return removed
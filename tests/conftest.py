@@ -0,0 +1,5 @@
+# The intake modules are flat files at the repo root, not a package
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from intake_autosave import (DRAFT_COMPACT_OPS, DraftStore, decode_value, diff_state, draft_label,
+                             encode_value, snapshot_state)
+
+
+@pytest.fixture
+def drafts(tmp_path):
+    s = DraftStore(str(tmp_path / "drafts.sqlite3"), debounce_s=0.01)
+    yield s
+    s.close()
+
+
+def test_values_round_trip():
+    value = {"when": datetime(2024, 5, 1, 14, 30), "day": date(2024, 5, 1), "at": time(9, 15),
+             "acts": ["touch", "kiss"], "n": 3, "ok": True, "none": None}
+    assert decode_value(encode_value(value)) == value
+    assert encode_value(object()) is None
+    assert encode_value([1, object()]) is None
+
+
+def test_snapshot_skips_internals_tools_and_ssns():
+    items = [("caller_phone", "512"), ("_draft_id", "x"), ("btn_save_intake", True), ("arch_phone", "1"),
+             ("full_ssn", "123-45-6789"), ("ssn_last4", "6789"), ("upload", object()), ("q4_date", None)]
+    assert snapshot_state(items) == {"caller_phone": "512", "q4_date": None}
+
+
+def test_diff_state():
+    assert diff_state({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 5, "d": 4}) == ({"b": 5, "d": 4}, ["c"])
+
+
+def test_draft_label():
+    assert draft_label({"caller_legal_name": "Jane Q Public", "q_state": "Texas"}) == "Jane Q Public · Texas"
+    assert draft_label({}) == "(no name yet)"
+
+
+def test_diffs_fold_back_into_the_session(drafts):
+    drafts.put("d1", {"a": 1, "b": 2}, label="Jane", agent="alice")
+    drafts.put("d1", {"b": 3}, ["a"])
+    drafts.put("d2", {"z": encode_value(date(2024, 5, 1))}, agent="bob")
+    assert drafts.flush()
+    assert drafts.load("d1") == {"b": 3}
+    assert drafts.load("d2") == {"z": date(2024, 5, 1)}
+    assert drafts.load("missing") == {}
+    assert [d["draft_id"] for d in drafts.recent("alice")] == ["d1"]
+    drafts.finish("d1")
+    assert drafts.flush()
+    assert drafts.recent("alice") == []
+
+
+def test_long_histories_are_compacted(drafts):
+    for i in range(DRAFT_COMPACT_OPS + 5):
+        drafts.put("d1", {"i": i, f"k{i % 3}": i})
+        assert drafts.flush()
+    ops = drafts._reader().execute("SELECT COUNT(*) FROM draft_ops WHERE draft_id = 'd1'").fetchone()[0]
+    assert ops < DRAFT_COMPACT_OPS
+    n = DRAFT_COMPACT_OPS + 4
+    assert drafts.load("d1") == {"i": n, "k0": n - n % 3, "k1": n - (n - 1) % 3, "k2": n - (n - 2) % 3}
+
+
+def test_failed_write_asks_for_a_full_snapshot(drafts):
+    drafts.put("d1", {"a": 1, "b": 2})
+    assert drafts.flush()
+    write_batch = drafts._write_batch
+
+    def fail(conn, batch):
+        raise OSError("disk full")
+    drafts._write_batch = fail
+    drafts.put("d1", {"a": 5}, ["b"])
+    assert drafts.flush()
+    drafts._write_batch = write_batch
+    assert drafts.load("d1") == {"a": 1, "b": 2}
+    assert drafts.needs_full("d1") and not drafts.needs_full("d1")
+    drafts.put("d1", {"a": 5, "c": 3}, full=True)
+    assert drafts.flush()
+    assert drafts.load("d1") == {"a": 5, "c": 3}
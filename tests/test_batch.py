@@ -0,0 +1,75 @@
+import csv
+import json
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from intake_batch import PARQUET_ENGINE, ResultWriter, iter_chunks, output_columns, qualify_file
+from intake_service import qualify
+from intake_store import IntakeStore
+
+NOW = datetime(2026, 1, 15, 12, 0)
+GOOD = {"LegalName": "Jane Q Public", "State": "Texas", "Company": "Uber", "IncidentDate": "2025-06-01",
+        "Acts_RapePenetration": "Yes", "ReportedTo": "Police", "ReportDates": "Police: 2025-06-02",
+        "ReceiptEvidence": "Email", "GovIDProvided": "Yes", "FemaleRider": "Yes", "RiderNotDriver": "Yes"}
+ROWS = [GOOD, {**GOOD, "State": "Atlantis"}, {**GOOD, "State": "Nevada", "Acts_RapePenetration": "No",
+                                              "Acts_TouchingKissing": "Yes"}] * 3
+
+
+def write_csv(path, rows):
+    keys = sorted({k for r in rows for k in r})
+    with open(path, "w", newline="") as f:
+        w = csv.DictWriter(f, keys)
+        w.writeheader()
+        w.writerows(rows)
+    return str(path)
+
+
+def test_iter_chunks_numbers_rows(tmp_path):
+    source = write_csv(tmp_path / "in.csv", ROWS)
+    assert [(row0, len(chunk)) for row0, chunk in iter_chunks(source, 4)] == [(0, 4), (4, 4), (8, 1)]
+
+
+@pytest.mark.parametrize("ext", [".csv", ".jsonl"] + ([".parquet"] if PARQUET_ENGINE else []))
+def test_qualify_file_matches_the_service(tmp_path, ext):
+    source, out = write_csv(tmp_path / "in.csv", ROWS), str(tmp_path / f"out{ext}")
+    stats = qualify_file(source, out, workers=0, chunk_rows=4, now=NOW)
+    assert (stats["rows"], stats["errors"], stats["chunks"]) == (9, 3, 3)
+    frame = (pd.read_csv(out) if ext == ".csv" else pd.read_json(out, lines=True) if ext == ".jsonl"
+             else pd.read_parquet(out))
+    assert list(frame.columns) == output_columns()
+    assert frame["row"].tolist() == list(range(9))
+    for i, p in enumerate(ROWS):
+        row = frame.iloc[i]
+        if p["State"] == "Atlantis":
+            assert row["error"] == "State: unknown state 'Atlantis'."
+            continue
+        expected = qualify(p, NOW)
+        assert row["Tier"] == expected["Tier"]
+        assert bool(row["Wagstaff_Eligible"]) == (expected["Eligibility_Wagstaff"] == "Eligible")
+        assert row["RecommendedFirm"] == expected["AssignedFirm"]
+
+
+def test_worker_pool_gives_the_same_rows(tmp_path):
+    source = write_csv(tmp_path / "in.csv", ROWS)
+    qualify_file(source, str(tmp_path / "serial.jsonl"), workers=0, chunk_rows=2, now=NOW)
+    qualify_file(source, str(tmp_path / "pool.jsonl"), workers=2, chunk_rows=2, now=NOW)
+    assert (tmp_path / "serial.jsonl").read_text() == (tmp_path / "pool.jsonl").read_text()
+
+
+def test_archive_input_carries_ids(tmp_path):
+    store = IntakeStore(str(tmp_path / "archive.sqlite3"))
+    ids = store.save_many([GOOD, {**GOOD, "State": "Atlantis"}])
+    store.close()
+    out = tmp_path / "out.jsonl"
+    qualify_file(str(tmp_path / "archive.sqlite3"), str(out), workers=0, now=NOW)
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [int(r["id"]) for r in rows] == ids and rows[1]["error"]
+
+
+def test_bad_output_or_arguments(tmp_path):
+    with pytest.raises(ValueError, match="Output must end"):
+        ResultWriter(str(tmp_path / "out.xlsx"))
+    with pytest.raises(ValueError):
+        qualify_file(write_csv(tmp_path / "in.csv", ROWS), str(tmp_path / "o.csv"), workers=-1)
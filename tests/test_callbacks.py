@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from intake_callbacks import (CALLBACK_CLAIM_TTL, CALLING_HOURS, CallbackQueue, callback_row, contact_window,
+                              make_lead, next_contact)
+
+CENTRAL = ZoneInfo("America/Chicago")
+WEEK = frozenset(range(7))
+
+
+def at(day, hour, minute=0):
+    # Wednesday 2026-03-04 is day 4; Texas numbers are on Central time
+    return datetime(2026, 3, day, hour, minute, tzinfo=CENTRAL)
+
+
+def lead(intake_id, best_time="", file_by=None, missing=(), created_at="2026-03-01", sol_end=None):
+    return make_lead(intake_id, created_at, {"Phone": "512-867-5309", "State": "Texas", "TriTen_BestTime": best_time},
+                     sol_end, file_by, list(missing))
+
+
+@pytest.mark.parametrize("text,window", [
+    ("", (WEEK, [CALLING_HOURS])),
+    ("anytime", (WEEK, [CALLING_HOURS])),
+    ("mornings", (WEEK, [(540, 720)])),
+    ("after 5pm", (WEEK, [(1020, 1260)])),
+    ("before 10", (WEEK, [(480, 600)])),
+    ("at 10am", (WEEK, [(600, 660)])),
+    ("weekdays 2-4pm", (frozenset(range(5)), [(840, 960)])),
+    ("Mon-Wed 10-2pm", (frozenset({0, 1, 2}), [(600, 840)])),
+    ("weekends evening", (frozenset({5, 6}), [(1020, 1260)])),
+    ("6am-11pm", (WEEK, [CALLING_HOURS])),
+])
+def test_contact_window(text, window):
+    assert contact_window(text) == window
+
+
+def test_next_contact_skips_to_the_next_allowed_day():
+    opens, closes = next_contact(contact_window("weekends 2-4pm"), CENTRAL, at(4, 15))
+    assert (opens, closes) == (at(7, 14), at(7, 16))
+    opens, _ = next_contact(contact_window(""), CENTRAL, at(4, 15))
+    assert opens == at(4, 15)
+
+
+def test_deadline_then_missing_evidence_then_age():
+    q = CallbackQueue()
+    q.rebuild([
+        lead(1, file_by=None),
+        lead(2, file_by=datetime(2026, 9, 1)),
+        lead(3, file_by=datetime(2026, 5, 1)),
+        lead(4, file_by=datetime(2026, 9, 1), missing=["receipt", "gov ID"]),
+        lead(5, file_by=datetime(2026, 9, 1), created_at="2026-02-01"),
+    ], at(4, 12))
+    assert [x["id"] for x in q.pop_due(5, now=at(4, 12))] == [3, 4, 5, 2, 1]
+
+
+def test_leads_wait_for_their_window():
+    q = CallbackQueue()
+    q.rebuild([lead(1, "after 5pm"), lead(2)], at(4, 12))
+    assert [x["id"] for x in q.pop_due(5, now=at(4, 12))] == [2]
+    q.done(2)
+    assert q.pop_due(5, now=at(4, 16)) == []
+    assert [x["id"] for x in q.pop_due(5, now=at(4, 18))] == [1]
+
+
+def test_window_that_closed_while_waiting_moves_to_the_next_day():
+    q = CallbackQueue()
+    q.rebuild([lead(1, "at 10am")], at(4, 10))
+    assert q.pop_due(1, now=at(4, 11, 30)) == []
+    assert len(q) == 1
+    (x,) = q.pop_due(1, now=at(5, 10, 15))
+    assert x["closes"] == at(5, 11)
+
+
+def test_sol_passed_leads_are_dropped():
+    q = CallbackQueue()
+    expires = at(4, 14).astimezone().replace(tzinfo=None)  # the engine's SOL end is naive server-local time
+    assert not q.push(lead(1, sol_end=datetime(2026, 3, 1)), at(4, 12))
+    assert q.push(lead(2, sol_end=expires), at(4, 9))
+    assert q.pop_due(1, now=at(5, 12)) == [] and len(q) == 0
+
+
+def test_retry_and_done():
+    q = CallbackQueue()
+    q.rebuild([lead(1), lead(2)], at(4, 12))
+    first, second = q.pop_due(2, now=at(4, 12))
+    assert q.done(first["id"]) is first and len(q) == 0
+    assert q.retry(second["id"], at(4, 12))
+    assert q.pop_due(1, now=at(4, 14)) == []
+    (again,) = q.pop_due(1, now=at(4, 15))
+    assert again["id"] == 2 and again["attempts"] == 1
+    assert not q.retry(99, at(4, 15))
+
+
+def test_unfinished_claims_are_requeued():
+    q = CallbackQueue()
+    q.rebuild([lead(1)], at(4, 9))
+    (claimed,) = q.pop_due(1, now=at(4, 9))
+    assert q.pop_due(1, now=at(4, 10)) == []
+    later = at(4, 9) + CALLBACK_CLAIM_TTL + timedelta(minutes=1)
+    assert [x["id"] for x in q.pop_due(1, now=later)] == [1]
+    q.rebuild([lead(2)], at(4, 9))
+    q.pop_due(1, now=at(4, 9))
+    q.pop_due(0, now=at(4, 9) + CALLBACK_CLAIM_TTL + timedelta(minutes=1))  # expires, back in the queue
+    assert q.done(2) is not None and len(q) == 0
+
+
+def test_upcoming_does_not_claim():
+    q = CallbackQueue()
+    q.rebuild([lead(1, "after 5pm"), lead(2)], at(4, 12))
+    assert [x["id"] for x in q.upcoming(now=at(4, 12))] == [2, 1]
+    assert len(q) == 2
+
+
+def test_callback_row():
+    x = lead(1, "after 5pm", file_by=datetime(2026, 5, 1), missing=["receipt"])
+    CallbackQueue().rebuild([x], at(4, 12))
+    row = callback_row(x, at(4, 12))
+    assert row["Local time"] == "Wed 12:00 PM" and row["Call by"] == "Wed 09:00 PM"
+    assert (row["File by"], row["Missing"], row["Best time"]) == ("2026-05-01", "receipt", "after 5pm")
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from intake_dedupe import DuplicateIndex, dedupe_frame, norm_email, norm_name
+
+
+def test_norm_email_folds_gmail_aliases():
+    assert norm_email(" Jane.Q.Public+rideshare@GoogleMail.com ") == "janeqpublic@gmail.com"
+    assert norm_email("jane.q+x@example.com") == "jane.q@example.com"
+    assert norm_email("not an email") == ""
+
+
+def test_norm_name_ignores_middle_names():
+    assert norm_name("Jane Quinn Public") == norm_name("jane public")
+
+
+def test_index_matches_phone_email_and_names():
+    index = DuplicateIndex()
+    index.add(1, phones=["(512) 867-5309"], emails=["jane@example.com"], legal_name="Jane Q Public", label="one")
+    index.add(2, phones=["512-472-0100"], legal_name="Jon Roe", label="two")
+    assert index.match(phones=["+1 512 867 5309"]) == [(1, ["same phone"], "one")]
+    assert [m[0] for m in index.match(emails=["JANE@example.com"])] == [1]
+    assert index.match(legal_name="Jane Public")[0][:2] == (1, ["same legal name"])
+    (intake_id, reasons, _), = index.match(legal_name="John Roe")
+    assert intake_id == 2 and reasons[0].startswith("similar name")
+    assert index.match(phones=["(512) 867-5309"], exclude={1}) == []
+
+
+def test_index_readd_replaces_the_old_keys():
+    index = DuplicateIndex()
+    index.add(1, phones=["(512) 867-5309"], legal_name="Jane Q Public")
+    index.add(1, phones=["(512) 472-0100"], legal_name="Jane Q Public")
+    assert index.match(phones=["(512) 867-5309"]) == []
+    assert [m[0] for m in index.match(phones=["512 472 0100"])] == [1]
+
+
+def test_strongest_match_first():
+    index = DuplicateIndex()
+    index.add(1, phones=["(512) 867-5309"])
+    index.add(2, phones=["(512) 867-5309"], emails=["jane@example.com"])
+    assert [m[0] for m in index.match(phones=["5128675309"], emails=["jane@example.com"])] == [2, 1]
+
+
+def test_dedupe_frame_clusters_through_shared_keys():
+    df = pd.DataFrame({
+        "phone": ["(512) 867-5309", "512.867.5309", None, "(212) 555-0142", None],
+        "email": ["a@example.com", None, "A@Example.com", None, None],
+        "name": ["Jane Public", "J Public", "Jane Public", "Maria Garcia", "Maria Garcia"],
+        "state": ["Texas", "Texas", "Texas", "New York", "Florida"],
+    })
+    out = dedupe_frame(df, name_col="name", name_scope_col="state")
+    assert out["dup_group"].tolist() == [0, 0, 0, 3, 4]
+    assert out["dup_count"].tolist() == [3, 3, 3, 1, 1]
+    assert out["is_duplicate"].tolist() == [False, True, True, False, False]
+
+
+def test_dedupe_frame_links_names_only_within_scope():
+    df = pd.DataFrame({"phone": [None, None], "email": [None, None],
+                       "name": ["Maria Garcia", "Maria Garcia"], "state": ["Texas", "Texas"]})
+    assert dedupe_frame(df)["dup_count"].tolist() == [1, 1]
+    assert dedupe_frame(df, name_col="name", name_scope_col="state")["dup_count"].tolist() == [2, 2]
+
+
+def test_fictitious_numbers_never_link():
+    index = DuplicateIndex()
+    index.add(1, phones=["555-555-5555"])
+    assert index.match(phones=["(555) 555-5555"]) == []
@@ -0,0 +1,77 @@
+from datetime import datetime, time
+
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from intake_bench import synth_intakes
+from intake_eligibility import evaluate, evaluate_frame
+from intake_graph import INTAKE_GRAPH, GraphState, intake_record
+from intake_rules import STATE_ALIAS, sa_category, sol_rule_for, tier_and_aggravators
+
+NOW = datetime(2026, 10, 18, 12, 0)
+INSIDE_NEAR = ("Inside the car", "Just outside the car", "Furtherance from the car")
+
+
+def baseline(c):
+    # The firm rules written out longhand, as the form applied them before the engine existed
+    incident_dt = datetime.combine(c["incident_date"] or NOW.date(), c["incident_time"] or time(0, 0))
+    tier_label, _ = tier_and_aggravators(c["act_flags"])
+    tier_ok = "Tier 1" in tier_label or "Tier 2" in tier_label
+    years, _, _ = sol_rule_for(STATE_ALIAS.get(c["state"], c["state"]), sa_category(c["act_flags"]))
+    sol_ok = years is None or NOW <= incident_dt + relativedelta(years=int(years))
+
+    reports, family = dict(c["report_dates"]), c["family_report_dt"]
+    days = [d for d in reports.values() if d] + ([family.date()] if family else [])
+    earliest = min(days) if days else None
+    earliest_is_family = [k for k, v in reports.items() if earliest and v == earliest] == ["Family/Friends"]
+    within_24h = True
+    if set(reports) == {"Family/Friends"}:
+        hours = (family - incident_dt).total_seconds() / 3600 if family else None
+        within_24h = hours is not None and 0 <= hours <= 24
+    wag_report = (bool(reports) and (within_24h or set(reports) != {"Family/Friends"})) or c["any_av_uploaded"]
+    family_14 = not (days and earliest_is_family) or 0 <= (earliest - incident_dt.date()).days <= 14
+
+    common = (not c["has_atty"] and c["scope_choice"] in INSIDE_NEAR and tier_ok and sol_ok
+              and c["company"] in ("Uber", "Lyft") and not (c["verbal_only"] or c["attempt_only"]))
+    wag = common and wag_report and not c["felony"] and c["victim_weapon"] == "No"
+    receipt = "Email" in c["receipt_evidence"] or "PDF" in c["receipt_evidence"] or c["any_pdf_uploaded"]
+    tri = (common and receipt and c["gov_id"] and c["female_rider"] and c["rider_not_driver"]
+           and bool(days) and family_14)
+    return wag, tri
+
+
+@pytest.fixture(scope="module")
+def intakes():
+    # Undated intakes included: the record, like the form, puts those today at the incident time
+    return synth_intakes(1500, seed=11, today=NOW.date())
+
+
+def test_evaluate_matches_baseline(intakes):
+    for c in intakes:
+        ev = evaluate(intake_record(c, NOW.date()), now=NOW)
+        assert (ev["wag_ok"], ev["triten_ok"]) == baseline(c)
+
+
+def test_graph_matches_evaluate(intakes):
+    for c in intakes[:300]:
+        g = GraphState(INTAKE_GRAPH).value("eligibility", {**c, "today": NOW.date(), "now": NOW})
+        ev = evaluate(intake_record(c, NOW.date()), now=NOW)
+        assert (g["wag_ok"], g["wag_report_ok"], g["triten_ok"], g["tier_label"], g["sol_end"]) == \
+            (ev["wag_ok"], ev["wag_report_ok"], ev["triten_ok"], ev["tier_label"], ev["sol_end"])
+
+
+def test_evaluate_frame_matches_evaluate(intakes):
+    records = [intake_record(c, NOW.date()) for c in intakes]
+    frame = evaluate_frame(pd.DataFrame(records), now=NOW)
+    for i, record in enumerate(records):
+        ev = evaluate(record, now=NOW)
+        row = frame.iloc[i]
+        assert row["tier_label"] == ev["tier_label"]
+        assert (bool(row["wag_ok"]), bool(row["triten_ok"])) == (ev["wag_ok"], ev["triten_ok"])
+        assert row["wag_reasons"] == "; ".join(ev["wag_reasons"])
+        assert row["triten_reasons"] == "; ".join(ev["triten_reasons"])
+        if ev["sol_end"] is None:
+            assert pd.isna(row["sol_end"])
+        else:
+            assert row["sol_end"] == pd.Timestamp(ev["sol_end"])
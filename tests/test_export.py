@@ -0,0 +1,62 @@
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+
+import pytest
+
+from intake_export import XLSX_ENGINE, build_csv, daily_workbook_bytes, payload_hash, sheet_name_for
+from intake_store import IntakeStore
+
+openpyxl = pytest.importorskip("openpyxl")
+needs_xlsx = pytest.mark.skipif(XLSX_ENGINE is None, reason="no Excel engine installed")
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = IntakeStore(str(tmp_path / "intakes.sqlite3"))
+    yield s
+    s.close()
+
+
+def intake(name, firm, **extra):
+    return {"LegalName": name, "AssignedFirm": firm, "SSN_Last4": "6789", "FullSSN": "123-45-6789",
+            "Narrative": "in-house only", **extra}
+
+
+def test_payload_hash_ignores_key_order():
+    assert payload_hash({"a": 1, "b": date(2024, 5, 1)}) == payload_hash({"b": date(2024, 5, 1), "a": 1})
+    assert payload_hash({"a": 1}) != payload_hash({"a": 2})
+
+
+def test_sheet_names_are_valid_for_excel():
+    assert sheet_name_for("Smith/Jones: [Trial] Lawyers of the Greater Southwest") == "Smith Jones   Trial  Lawyers of"
+    assert sheet_name_for("") == sheet_name_for(None) == "Unassigned"
+
+
+def test_build_csv():
+    assert build_csv({"LegalName": "Jane", "State": "Texas"}).decode().splitlines() == ["LegalName,State", "Jane,Texas"]
+
+
+@needs_xlsx
+def test_daily_workbook_one_sheet_per_firm_without_ssns_or_narrative(store):
+    store.save_many([intake("Jane Q Public", "Wagstaff Law Firm", Extra="=1+1"),
+                     intake("John Roe", "Triten Law Group"), intake("Ann Lee", "Wagstaff Law Firm"),
+                     intake("No Firm", "")])
+    before = set(os.listdir(tempfile.gettempdir()))
+    data, rows, msg = daily_workbook_bytes(store, date.today())
+    assert (rows, msg) == (4, "")
+    assert not {p for p in set(os.listdir(tempfile.gettempdir())) - before if p.startswith("intakes_")}
+    book = openpyxl.load_workbook(io.BytesIO(data))
+    assert book.sheetnames == ["Wagstaff Law Firm", "Triten Law Group", "Unassigned"]
+    sheet = [[c.value for c in row] for row in book["Wagstaff Law Firm"].iter_rows()]
+    assert sheet[0] == ["LegalName", "AssignedFirm", "SSN_Last4", "Extra"]
+    assert [r[0] for r in sheet[1:]] == ["Jane Q Public", "Ann Lee"]
+    assert sheet[1][3] == "=1+1" and book["Wagstaff Law Firm"]["D2"].data_type == "s"
+
+
+def test_daily_workbook_empty_day(store):
+    store.save(intake("Jane Q Public", "Wagstaff Law Firm"))
+    data, rows, msg = daily_workbook_bytes(store, date.today() - timedelta(days=1))
+    assert data is None and rows == 0
+    assert msg.startswith("No intakes archived") or XLSX_ENGINE is None
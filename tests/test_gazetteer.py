@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from intake_gazetteer import find_zip, infer_state, parse_location, state_column
+
+CASES = [
+    ("123 Main St, Austin, TX 78701", "Texas"),
+    ("Austin TX 78701", "Texas"),
+    ("Austin, TX", "Texas"),
+    ("1 Main St, Dallas, TX, USA", "Texas"),
+    ("Reno Nevada", "Nevada"),
+    ("Washington, D.C.", "D.C."),
+    ("78701", "Texas"),
+    ("St Louis airport", "Missouri"),
+    ("New Orleans, LA", "Louisiana"),
+    ("Lafayette, LA", "Louisiana"),
+    ("Portland, ME", "Maine"),
+    ("Los Angeles, LA", "California"),
+    # A bare code only after a comma or before a ZIP
+    ("Downtown LA", None),
+    ("Pick up at ME", None),
+    ("Washington Ave", None),
+    # A recognized city outside Louisiana wins over "LA"
+    ("Hollywood, LA", None),
+    ("", None),
+]
+
+
+@pytest.mark.parametrize("text,state", CASES)
+def test_parse_location(text, state):
+    assert parse_location(text)["state"] == state
+
+
+def test_ambiguous_code_leaves_the_city_candidates():
+    loc = parse_location("Hollywood, LA")
+    assert loc["city"] == "hollywood"
+    assert sorted(loc["candidates"]) == ["California", "Florida"]
+
+
+def test_state_column_matches_parse_location():
+    texts = pd.Series([t for t, _ in CASES] + [None, "Hollywood, LA 70112"])
+    expected = [parse_location(t or "")["state"] for t in texts]
+    assert state_column(texts).tolist() == expected
+
+
+def test_find_zip_skips_house_numbers():
+    assert find_zip("12345 Main St, Austin, TX 78701-1234") == "78701"
+    assert find_zip("12345 Main St") is None
+
+
+def test_infer_state_prefers_pickup_and_flags_conflicts():
+    out = infer_state("Austin, TX", "Reno, NV 89501")
+    assert out["state"] == "Texas" and out["source"] == "state" and out["conflict"]
+    assert infer_state("", "89501")["state"] == "Nevada"
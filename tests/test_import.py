@@ -0,0 +1,62 @@
+import io
+
+import pandas as pd
+
+from intake_import import prequalify_leads
+
+NOW = pd.Timestamp("2026-01-15 12:00")
+LEADS = """Full Name,Phone Number,Incident State,Rideshare,Date of Incident,Acts,Reported To,Report Date,Receipt,Has ID,Female
+Jane Public,(512) 867-5309,TX,uber,2025-06-01,rape,police,2025-06-02,email pdf,yes,yes
+Ann Roe,512-472-0100,Nevada,lyft,2025-05-01,touching,,,,yes,yes
+Jane P,512.867.5309,tx,uber,2025-06-01,rape,police,2025-06-02,email,yes,yes
+Old Case,(213) 482-0100,California,uber,2001-01-01,touching,police,2001-01-02,email,yes,yes
+Nowhere,(305) 482-0100,Atlantis,uber,2025-06-01,rape,police,2025-06-02,email,yes,yes
+"""
+
+
+def call_list(**kwargs):
+    return prequalify_leads(io.StringIO(LEADS), now=NOW, **kwargs)
+
+
+def test_vendor_columns_are_mapped():
+    leads = call_list(dedupe=False).set_index("lead_row").sort_index()
+    assert leads["state"].tolist() == ["Texas", "Nevada", "Texas", "California", ""]
+    assert leads["company"].tolist() == ["Uber", "Lyft", "Uber", "Uber", "Uber"]
+    assert leads.loc[0, "tier_label"] == "Tier 1"
+
+
+def test_ranked_most_likely_to_qualify_first():
+    leads = call_list()
+    assert leads["call_rank"].tolist() == [1, 2, 3, 4]
+    assert leads["lead_row"].tolist() == [0, 3, 1, 4]
+    assert leads["priority"].is_monotonic_increasing
+
+
+def test_unknown_state_is_never_top_priority():
+    leads = call_list().set_index("lead_row")
+    assert leads.loc[4, "state"] == "" and leads.loc[4, "priority"] >= 2
+
+
+def test_duplicates_collapse_onto_the_best_copy():
+    leads = call_list()
+    assert len(call_list(dedupe=False)) == 5 and len(leads) == 4
+    jane = leads[leads["lead_row"] == 0].iloc[0]
+    assert jane["dup_count"] == 2
+
+
+def test_chunk_size_does_not_change_the_result():
+    assert call_list(chunk_rows=2).equals(call_list(chunk_rows=1000))
+
+
+def test_jsonl_matches_csv(tmp_path):
+    path = tmp_path / "leads.jsonl"
+    pd.read_csv(io.StringIO(LEADS), dtype=str, keep_default_na=False).to_json(path, orient="records", lines=True)
+    from_jsonl = prequalify_leads(str(path), now=NOW)
+    assert from_jsonl["lead_row"].tolist() == call_list()["lead_row"].tolist()
+    assert from_jsonl["priority"].tolist() == call_list()["priority"].tolist()
+
+
+def test_progress_reports_rows_done():
+    seen = []
+    call_list(chunk_rows=2, progress=seen.append)
+    assert seen == [2, 4, 5]
@@ -0,0 +1,48 @@
+import pytest
+
+from intake_narrative import suggest_acts
+
+
+@pytest.mark.parametrize("narrative, tier", [
+    ("he raped me", "Tier 1"),
+    ("he touched me", "Tier 2"),
+    ("he did not touch me", "Unclear"),
+    ("nobody touched me", "Unclear"),
+    # negation cues
+    ("there was no penetration", "Unclear"),
+    ("no penetration, but he forced me to kiss him", "Tier 2"),
+    ("he left without touching me", "Unclear"),
+    ("he neither touched nor kissed me", "Unclear"),
+    ("he didn't try to touch me", "Unclear"),
+    # a negation doesn't reach past a sentence end or into the next clause
+    ("I said no and he touched me", "Tier 2"),
+    ("No. He groped me", "Tier 2"),
+    ("he didn't touch me but he kissed me", "Tier 2"),
+    ("I had no idea he would grope me", "Tier 2"),
+    ("I did not consent, he raped me", "Tier 1"),
+    ("it was not consensual, he penetrated me", "Tier 1"),
+    ("he did not care, he raped me", "Tier 1"),
+    ("he wasn't raped: he was touched", "Tier 2"),
+    # a cue negates only the act it governs, not one after another verb
+    ("He would not stop touching me", "Tier 2"),
+    ("he did not stop when I said no, he kept touching me", "Tier 2"),
+    ("he never once touched me", "Unclear"),
+])
+def test_tier(narrative, tier):
+    assert suggest_acts(narrative)["tier"] == tier
+
+
+def test_negated_phrases_are_reported():
+    s = suggest_acts("no penetration, but he forced me to kiss him")
+    assert s["negated"] == ["penetration"]
+    assert s["evidence"] == {"Touching/Kissing w/o Consent": ["kiss"]}
+
+
+def test_longest_match_wins():
+    s = suggest_acts("he was touching himself")
+    assert s["flags"]["Masturbation Observed"] and not s["flags"]["Touching/Kissing w/o Consent"]
+
+
+def test_aggravator_needs_a_threat():
+    assert not suggest_acts("he wouldn't let me out")["flags"]["False Imprisonment w/ Threats"]
+    assert suggest_acts("he wouldn't let me out and said he would kill me")["flags"]["False Imprisonment w/ Threats"]
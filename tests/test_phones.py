@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import intake_phones
+from intake_phones import PHONE_COLUMNS, e164, normalize_phones, parse_phone
+
+
+def sample_numbers(count=3000, seed=3):
+    rng = random.Random(seed)
+    shapes = ["{d}", "({a}) {b}-{c}", "+{d}", "1-{d}", "+1 {d}", "011 {d}", "{d} ext. 12", "{d} x5", "{d}#9",
+              "{a}.{b}.{c}", "\t{d}\n", "{d} X 123", " ", "", "call me", "５１２５５５０１３４"]
+    out = []
+    for _ in range(count):
+        d = "".join(rng.choice("0123456789") for _ in range(rng.choice([0, 3, 7, 9, 10, 10, 10, 11, 12, 14])))
+        out.append(rng.choice(shapes).format(d=d, a=d[:3], b=d[3:6], c=d[6:]))
+    return out + ["(512) 555-0134 ext 2", "+1 512.555.0134", "011 44 20 7946 0958", "800-555-1234", "555-555-5555",
+                  "2222222222", "+44 20 7946 0958", None]
+
+
+@pytest.mark.parametrize("arrow", [False, pytest.param(True, marks=pytest.mark.skipif(
+    not intake_phones.ARROW, reason="pyarrow not installed"))])
+def test_normalize_phones_matches_parse_phone(monkeypatch, arrow):
+    monkeypatch.setattr(intake_phones, "ARROW", arrow)
+    values = sample_numbers()
+    frame = normalize_phones(pd.Series(values, dtype=object))
+    for value, row in zip(values, frame.itertuples(index=False)):
+        batch = {k: (None if isinstance(v, float) and np.isnan(v) else v) for k, v in zip(PHONE_COLUMNS, row)}
+        batch["valid"] = bool(batch["valid"])
+        assert batch == parse_phone(value), value
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("(512) 867-5309", "+15128675309"),
+    ("+1 512.867.5309 x2", "+15128675309"),
+    ("1-512-867-5309", "+15128675309"),
+])
+def test_e164(text, expected):
+    assert e164(text) == expected
+
+
+def test_parse_phone_area_code():
+    p = parse_phone("(512) 867-5309 ext. 12")
+    assert (p["valid"], p["ext"], p["state"]) == (True, "12", "Texas")
+    assert not parse_phone("555-555-5555")["valid"]
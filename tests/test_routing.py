@@ -0,0 +1,71 @@
+import itertools
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from intake_firms import FIRMS
+from intake_routing import RoutingLedger, route_batch
+from intake_store import IntakeStore
+
+
+def brute_force(eligible, scores, capacity):
+    # Best (placed, summed preference) over every assignment
+    n, k = eligible.shape
+    best = (-1, -np.inf)
+    for assign in itertools.product(range(-1, k), repeat=n):
+        loads = [sum(1 for f in assign if f == g) for g in range(k)]
+        if any(c is not None and load > c for load, c in zip(loads, capacity)):
+            continue
+        if any(f >= 0 and not eligible[j, f] for j, f in enumerate(assign)):
+            continue
+        value = (sum(f >= 0 for f in assign), sum(scores[j, f] for j, f in enumerate(assign) if f >= 0))
+        best = max(best, value)
+    return best
+
+
+def value_of(assign, eligible, scores, capacity):
+    placed = [(j, f) for j, f in enumerate(assign) if f >= 0]
+    assert all(eligible[j, f] for j, f in placed)
+    for g, c in enumerate(capacity):
+        assert c is None or sum(1 for _, f in placed if f == g) <= c
+    return len(placed), sum(scores[j, f] for j, f in placed)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_route_batch_is_optimal(seed):
+    rng = np.random.default_rng(seed)
+    n, k = int(rng.integers(1, 7)), int(rng.integers(1, 4))
+    eligible = rng.random((n, k)) < 0.7
+    scores = rng.integers(0, 4, (n, k)).astype(float) + rng.random((n, k)).round(2)
+    capacity = [None if rng.random() < 0.2 else int(rng.integers(0, 3)) for _ in range(k)]
+    assign = route_batch(eligible, scores, capacity)
+    placed, total = value_of(assign, eligible, scores, capacity)
+    best_placed, best_total = brute_force(eligible, scores, capacity)
+    assert placed == best_placed
+    assert total == pytest.approx(best_total)
+
+
+def test_route_batch_prefers_more_placements_over_preference():
+    eligible = np.array([[True, True], [True, False]])
+    scores = np.array([[5.0, 0.0], [0.0, 0.0]])
+    assert list(route_batch(eligible, scores, [1, 1])) == [1, 0]
+
+
+def test_ledger_reads_month_to_date_from_the_archive(tmp_path):
+    store = IntakeStore(str(tmp_path / "intakes.sqlite3"))
+    try:
+        firm = FIRMS[0]
+        now = datetime.now()
+        ledger = RoutingLedger(store.firm_counts, ttl=60)
+        other = RoutingLedger(store.firm_counts, ttl=60)  # another process on the same archive
+        assert dict((f.key, used) for f, used, _ in ledger.usage(now))[firm.key] == 0
+        store.save({"LegalName": "Jane Q Public", "AssignedFirm": firm.name})
+        assert dict((f.key, used) for f, used, _ in ledger.usage(now))[firm.key] == 0  # cached read
+        ledger.saved()
+        assert dict((f.key, used) for f, used, _ in ledger.usage(now))[firm.key] == 1
+        assert dict((f.key, used) for f, used, _ in other.usage(now))[firm.key] == 1
+        next_month = now.replace(day=1) + timedelta(days=32)
+        assert dict((f.key, used) for f, used, _ in ledger.usage(next_month))[firm.key] == 0
+    finally:
+        store.close()
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from intake_content import OBJECTION_SCRIPTS
+from intake_scripts import ScriptIndex, load_scripts, read_script_file, stem, terms
+
+SCRIPTS = {
+    "Attorney fees": "There are no upfront fees. The firm is paid only if the case settles.",
+    "Why we need your SSN": "The firm uses the last four digits to confirm identity with the rideshare company.",
+    "Settlement timing": "Mass tort settlements can take years; the firm keeps you updated.",
+    "Privacy": "Your information stays confidential and is shared only with the assigned firm.",
+    "Fee agreement link": "https://example.com/fees.pdf",
+}
+
+
+@pytest.fixture
+def index():
+    return ScriptIndex(SCRIPTS)
+
+
+def test_stemming_and_terms():
+    assert [stem(w) for w in ("fees", "companies", "classes", "boxes", "status", "bus")] == \
+        ["fee", "company", "class", "box", "status", "bus"]
+    assert terms("What are the firm's fees? https://x.io/a") == ["firm", "fee"]
+
+
+def test_title_words_rank_first(index):
+    assert {title for title, _ in index.search("fees ")[:2]} == {"Attorney fees", "Fee agreement link"}
+    assert index.search("settlement ")[0][0] == "Settlement timing"
+    same_length = ScriptIndex({"Refund": "policy wording here", "Policy": "refund wording here"})
+    assert [title for title, _ in same_length.search("refund ")] == ["Refund", "Policy"]
+
+
+def test_word_being_typed_already_matches(index):
+    assert index.search("sett")[0][0] == "Settlement timing"
+    assert index.search("sett ") == []  # finished word: no prefix expansion
+    assert "settlement" in index.complete("sett")
+
+
+def test_link_only_scripts_are_found_by_title(index):
+    assert "Fee agreement link" in [title for title, _ in index.search("agreement")]
+
+
+def test_no_indexed_words(index):
+    assert index.search("") == [] and index.search("the and of") == [] and index.search("zebra ") == []
+    assert index.complete("") == []
+
+
+def test_scores_are_best_first(index):
+    scores = [score for _, score in index.search("firm")]
+    assert scores == sorted(scores, reverse=True) and len(scores) == 4
+
+
+def test_script_files(tmp_path):
+    (tmp_path / "a.md").write_text("# Attorney fees\nNo fees unless you win.\n")
+    (tmp_path / "b.json").write_text(json.dumps({"Callback": "We will call you back."}))
+    (tmp_path / "c.jsonl").write_text(json.dumps({"title": "Hours", "text": "9 to 5."}) + "\n\n")
+    (tmp_path / "notes.bin").write_text("ignored")
+    scripts = load_scripts([str(tmp_path)], base=SCRIPTS)
+    assert scripts["Attorney fees"] == "No fees unless you win."
+    assert scripts["Callback"] == "We will call you back." and scripts["Hours"] == "9 to 5."
+    assert len(load_scripts([])) == len(OBJECTION_SCRIPTS)
+
+
+@pytest.mark.parametrize("name,content", [
+    ("bad.json", "[1, 2]"),
+    ("bad.jsonl", '{"title": "x"}'),
+    ("bad.csv", "title,text"),
+])
+def test_bad_script_files(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        read_script_file(str(path))
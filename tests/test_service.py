@@ -0,0 +1,76 @@
+from datetime import date, datetime, time
+
+import pytest
+
+from intake_compose import export_payload
+from intake_service import intake_from_payload, parse_now, qualified, qualify, qualify_many
+
+NOW = datetime(2026, 1, 15, 12, 0)
+INTAKE = {
+    "id": 7, "LegalName": "Jane Q Public", "State": "TX", "Company": "uber",
+    "IncidentDate": "2025-06-01", "IncidentTime": "21:30", "Acts_RapePenetration": "Yes",
+    "ReportedTo": "Police", "ReportDates": "Police: 2025-06-02", "ReceiptEvidence": "Email",
+    "GovIDProvided": True, "FemaleRider": "yes", "RiderNotDriver": "yes",
+}
+
+
+def test_payload_is_read_like_the_form():
+    c = intake_from_payload(INTAKE)
+    assert (c["state"], c["company"], c["scope_choice"]) == ("Texas", "Uber", "Inside the car")
+    assert (c["incident_date"], c["incident_time"]) == (date(2025, 6, 1), time(21, 30))
+    assert c["rape"] and not c["touching"] and c["act_flags"]["Rape/Penetration"] is True
+    assert c["reported_to"] == ["Police"] and c["report_dates"] == {"Police": date(2025, 6, 2)}
+    assert c["gov_id"] and c["female_rider"] and not c["has_atty"]
+
+
+def test_placeholders_read_as_missing():
+    c = intake_from_payload({"State": "Texas", "IncidentDate": "UNKNOWN", "IncidentTime": "—", "LegalName": "—"})
+    assert c["incident_date"] is None and c["incident_time"] == time(0, 0) and c["caller_legal_name"] == ""
+
+
+def test_report_dates_as_object_and_family_datetime():
+    c = intake_from_payload({"State": "Texas", "ReportDates": {"Physician": "2025-06-03"},
+                             "FamilyReportDateTime": "2025-06-02 08:00"})
+    assert list(c["report_dates"]) == ["Family/Friends", "Physician"]
+    assert c["family_report_dt"] == datetime(2025, 6, 2, 8, 0)
+
+
+@pytest.mark.parametrize("payload,message", [
+    ("not an object", "must be a JSON object"),
+    ({"State": "Atlantis"}, "unknown state"),
+    ({"State": "Texas", "IncidentDate": "06/01/2025"}, "not a valid date"),
+    ({"State": "Texas", "ReportDates": "Police 2025-06-02"}, "should read"),
+    ({"State": "Texas", "ReportDates": {"Pigeon": "2025-06-02"}}, "unknown channel"),
+    ({"State": "Texas", "ReportedTo": {"Police": True}}, "expected a list"),
+    ({"State": "Texas", "LegalName": ["Jane"]}, "expected text"),
+])
+def test_bad_input_raises_value_error(payload, message):
+    with pytest.raises(ValueError, match=message):
+        intake_from_payload(payload)
+
+
+def test_qualify_result():
+    result = qualify(INTAKE, NOW)
+    assert result["id"] == 7 and result["Tier"] == "Tier 1"
+    assert (result["SOL_Years"], result["SOL_End"]) == (5, "2030-06-01 21:30")
+    assert result["Eligibility_Wagstaff"] == "Eligible" and result["AssignedFirm"] == "Wagstaff Law Firm"
+    assert "Full Legal Name: Jane Q Public" in result["LawFirmNote"]
+
+
+def test_export_payload_round_trips():
+    # What the app exports reads back to the same decision
+    again = qualify({**export_payload(qualified(INTAKE, NOW)), "id": 7}, NOW)
+    assert again == qualify(INTAKE, NOW)
+
+
+def test_batch_errors_stay_in_their_slot():
+    results = qualify_many([INTAKE, {"id": 3, "State": "Atlantis"}, "x"], "2026-01-15T12:00")
+    assert results[0]["id"] == 7 and "error" not in results[0]
+    assert results[1] == {"id": 3, "error": "State: unknown state 'Atlantis'."}
+    assert results[2] == {"error": "An intake must be a JSON object."}
+
+
+def test_parse_now():
+    assert parse_now("2026-01-15T12:00") == NOW
+    with pytest.raises(ValueError):
+        parse_now(20260115)
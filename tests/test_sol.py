@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from dateutil.relativedelta import relativedelta
+
+from intake_rules import FILE_BY_BUFFER_DAYS
+from intake_sol import add_years, sol_deadlines, sol_years_for
+
+
+@pytest.mark.parametrize("start, years, expected", [
+    (datetime(2020, 2, 29), 1, datetime(2021, 2, 28)),
+    (datetime(2020, 2, 29), 4, datetime(2024, 2, 29)),
+    (datetime(2020, 2, 29, 21, 30), 2, datetime(2022, 2, 28, 21, 30)),
+    (datetime(2019, 3, 1), 1, datetime(2020, 3, 1)),
+    (datetime(2023, 12, 31, 23, 59), 10, datetime(2033, 12, 31, 23, 59)),
+])
+def test_add_years(start, years, expected):
+    assert pd.Timestamp(add_years([start], [years])[0]) == expected
+
+
+def test_add_years_matches_relativedelta():
+    rng = np.random.default_rng(7)
+    starts = pd.Timestamp("1990-01-01") + pd.to_timedelta(rng.integers(0, 40 * 366, 5000), unit="D") \
+        + pd.to_timedelta(rng.integers(0, 24 * 60, 5000), unit="min")
+    starts = starts.append(pd.DatetimeIndex([f"{y}-02-29 08:15" for y in range(1992, 2029, 4)]))
+    years = rng.integers(1, 21, len(starts))
+    out = add_years(starts.to_numpy(), years)
+    for start, n, got in zip(starts, years, out):
+        assert pd.Timestamp(got) == start.to_pydatetime() + relativedelta(years=int(n))
+
+
+def test_add_years_missing():
+    out = add_years(np.array(["2020-01-01", "NaT"], dtype="datetime64[ns]"), [np.nan, 2])
+    assert np.isnat(out).all()
+
+
+def test_sol_deadlines():
+    years = sol_years_for(["Texas", "Narnia"], ["penetration", None])
+    assert np.isnan(years[1])
+    out = sol_deadlines(["Texas"], ["penetration"], np.array(["2020-02-29"], dtype="datetime64[ns]"),
+                        now=datetime(2021, 1, 1))
+    sol_end = pd.Timestamp(out["sol_end"][0])
+    assert sol_end == datetime(2020, 2, 29) + relativedelta(years=int(years[0]))
+    assert pd.Timestamp(out["file_by"][0]) == sol_end - pd.Timedelta(days=FILE_BY_BUFFER_DAYS)
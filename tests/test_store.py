@@ -0,0 +1,72 @@
+import pytest
+
+from intake_store import IntakeStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = IntakeStore(str(tmp_path / "intakes.sqlite3"))
+    yield s
+    s.close()
+
+
+def payload(name, phone="(512) 867-5309", firm="Wagstaff Law Firm"):
+    return {"LegalName": name, "Phone": phone, "Email": f"{name.split()[0].lower()}@example.com",
+            "State": "Texas", "AssignedFirm": firm, "IncidentDate": "2024-05-01"}
+
+
+def test_save_and_find(store):
+    ids = store.save_many([payload("Jane Q Public"), payload("John Roe", phone="512-555-0100")])
+    assert store.count() == 2
+    assert [r["id"] for r in store.find(phone="+1 512 867 5309")] == [ids[0]]
+    assert [r["id"] for r in store.find(legal_name="jane q")] == [ids[0]]
+    assert [r["id"] for r in store.find(email="JOHN@example.com ")] == [ids[1]]
+
+
+def test_update_rewrites_in_place(store):
+    intake_id = store.save(payload("Jane Q Public"))
+    created_at = store.get(intake_id)["created_at"]
+    assert store.update(intake_id, payload("Jane R Public", firm="Triten Law Group"))
+    assert store.count() == 1
+    row = store.get(intake_id)
+    assert row["created_at"] == created_at
+    assert row["payload"]["LegalName"] == "Jane R Public"
+    assert store.find(legal_name="jane q") == []
+    assert [r["id"] for r in store.find(assigned_firm="Triten Law Group")] == [intake_id]
+    assert not store.update(intake_id + 1, payload("Nobody"))
+
+
+def test_snapshot_hides_later_writes(store):
+    store.save(payload("Jane Q Public"))
+    with store.snapshot():
+        before = [i for i, _ in store.iter_payloads()]
+        store.save(payload("John Roe"))
+        assert [i for i, _ in store.iter_payloads()] == before
+    assert len(list(store.iter_payloads())) == 2
+
+
+def test_full_ssns_never_archived(store, tmp_path):
+    ssns = {"FullSSN": "123-45-6789", "TriTen_SSN": "123-45-6789", "Wag_SSN": "123-45-6789",
+            "SSN_Last4": "6789", "FullSSN_OnFile": True}
+    intake_id = store.save({**payload("Jane Q Public"), **ssns})
+    kept = store.get(intake_id)["payload"]
+    assert kept["SSN_Last4"] == "6789" and kept["FullSSN_OnFile"] is True
+    assert not {"FullSSN", "TriTen_SSN", "Wag_SSN"} & set(kept)
+
+    # An archive written before the scrub loses them on the next open
+    import json
+    import sqlite3
+    path = str(tmp_path / "old.sqlite3")
+    IntakeStore(path).close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("INSERT INTO intakes (created_at, payload) VALUES ('2024-05-01T09:00:00', ?)",
+                     (json.dumps({**payload("John Roe"), **ssns}),))
+        conn.execute("PRAGMA user_version = 0")
+    conn.close()
+    reopened = IntakeStore(path)
+    try:
+        (_, old), = reopened.iter_payloads()
+        assert old["SSN_Last4"] == "6789" and "FullSSN" not in old and "Wag_SSN" not in old
+    finally:
+        reopened.close()
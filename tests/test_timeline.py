@@ -0,0 +1,84 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import intake_clock
+from intake_eligibility import evaluate
+from intake_graph import intake_record
+from intake_service import intake_from_payload
+from intake_timeline import payload_records, timeline, timeline_frame
+
+NOW = datetime(2025, 6, 2, 12, 0)
+UNREPORTED = {"LegalName": "Jane Q Public", "State": "Texas", "Company": "Uber", "IncidentDate": "2025-06-01",
+              "IncidentTime": "21:30", "Acts_RapePenetration": "Yes", "ReceiptEvidence": "Email",
+              "GovIDProvided": "Yes", "FemaleRider": "Yes", "RiderNotDriver": "Yes"}
+REPORTED = {**UNREPORTED, "ReportedTo": "Police", "ReportDates": "Police: 2025-06-02"}
+
+
+def decision(payload, now):
+    return evaluate(intake_record(intake_from_payload(payload)), now)
+
+
+def test_unreported_intake_gets_its_report_windows():
+    events = timeline(decision(UNREPORTED, NOW), NOW)
+    assert [(e["firm"], e["event"], e["at"]) for e in events] == [
+        ("Wagstaff", "family_24h", datetime(2025, 6, 2, 21, 30)),
+        ("Triten", "family_14d", datetime(2025, 6, 16)),
+    ]
+
+
+def test_eligible_intake_gets_file_by_and_sol_end():
+    events = timeline(decision(REPORTED, NOW), NOW)
+    assert {(e["event"], e["at"]) for e in events} == {
+        ("file_by", datetime(2030, 4, 17, 21, 30)), ("sol_end", datetime(2030, 6, 1, 21, 30))}
+    assert len(events) == 4
+
+
+def test_decision_flips_at_the_sol_end():
+    sol_end = next(e["at"] for e in timeline(decision(REPORTED, NOW), NOW) if e["event"] == "sol_end")
+    assert decision(REPORTED, sol_end - timedelta(minutes=1))["wag_ok"]
+    assert not decision(REPORTED, sol_end + timedelta(minutes=1))["wag_ok"]
+
+
+def test_family_report_counts_only_inside_the_window():
+    closes = next(e["at"] for e in timeline(decision(UNREPORTED, NOW), NOW) if e["event"] == "family_24h")
+
+    def family_report(at):
+        return {**UNREPORTED, "ReportedTo": "Family/Friends", "FamilyReportDateTime": at.isoformat(sep=" ")}
+    assert decision(family_report(closes - timedelta(minutes=1)), closes)["wag_report_ok"]
+    assert not decision(family_report(closes + timedelta(minutes=1)), closes)["wag_report_ok"]
+
+
+def test_past_events_and_unknown_incident_dates_are_left_out():
+    assert timeline(decision(UNREPORTED, datetime(2025, 6, 20)), datetime(2025, 6, 20)) == []
+    assert timeline(decision(UNREPORTED, NOW), NOW, incident_known=False) == []
+
+
+def test_frame_matches_one_intake_at_a_time():
+    payloads = [{**UNREPORTED, "id": 1}, {**REPORTED, "id": 2}, {**UNREPORTED, "IncidentDate": "UNKNOWN", "id": 3},
+                {**REPORTED, "State": "California", "id": 4}]
+    records, errors = payload_records(payloads)
+    assert errors == []
+    frame = timeline_frame(records, NOW)
+    expected = sorted(
+        (p["id"], e["firm"], e["event"], e["at"]) for p in payloads if p["IncidentDate"] != "UNKNOWN"
+        for e in timeline(decision(p, NOW), NOW))
+    got = sorted(zip(frame["intake"], frame["firm"], frame["event"], (t.to_pydatetime() for t in frame["at"])))
+    assert got == expected
+    assert frame["at"].is_monotonic_increasing
+    assert (timeline_frame(records, NOW, until=datetime(2025, 7, 1))["intake"] == 1).all()
+
+
+def test_payload_records_keeps_errors():
+    records, errors = payload_records([{**UNREPORTED, "id": 9}, {"State": "Atlantis", "id": 10}])
+    assert list(records.index) == [9] and errors == [(10, "State: unknown state 'Atlantis'.")]
+
+
+def test_as_of_clock():
+    assert intake_clock.parse_as_of("2025-06-01") == datetime(2025, 6, 1)
+    assert intake_clock.parse_as_of(date(2025, 6, 1)) == datetime(2025, 6, 1)
+    with pytest.raises(ValueError):
+        intake_clock.parse_as_of("June 1st")
+    with intake_clock.as_of("2025-06-01T09:00"):
+        assert intake_clock.now() == datetime(2025, 6, 1, 9, 0)
+    assert intake_clock.now() != datetime(2025, 6, 1, 9, 0)
@@ -0,0 +1,65 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from intake_uploads import manifest_has, prune_spool, sniff_kind, spool_file, spool_uploads
+
+
+@pytest.mark.parametrize("head,kind", [
+    (b"%PDF-1.7\n", "pdf"),
+    (b"\x89PNG\r\n\x1a\n\x00\x00", "png"),
+    (b"\xff\xd8\xff\xe0\x00\x10JFIF", "jpeg"),
+    (b"RIFF\x24\x00\x00\x00WAVEfmt ", "wav"),
+    (b"\x00\x00\x00\x18ftypisom\x00\x00", "mp4"),
+    (b"\x00\x00\x00\x14ftypqt  \x00\x00", "mov"),
+    (b"\x00\x00\x00\x1cftypM4A \x00\x00", "m4a"),
+    (b"\x00\x00\x00\x18ftypheic\x00\x00", "heic"),
+    (b"\x00\x00\x00\x08wide\x00\x00", "mov"),
+    (b"ID3\x04\x00\x00", "mp3"),
+    (b"\xff\xfb\x90\x64", "mp3"),
+    (b"Received: from mail.example.com\r\n", "eml"),
+    (b"From: Uber Receipts <noreply@uber.com>\r\n", "eml"),
+    (b"PK\x03\x04", None),
+    (b"", None),
+])
+def test_sniff_kind(head, kind):
+    assert sniff_kind(head) == kind
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name, self.size = name, len(data)
+
+
+def test_spool_file_hashes_and_flags_renamed_files(tmp_path):
+    data = b"%PDF-1.4\n" + os.urandom(5000)
+    entry = spool_file(io.BytesIO(data), "receipt.pdf", str(tmp_path), chunk_bytes=1024)
+    assert entry["sha256"] == hashlib.sha256(data).hexdigest()
+    assert entry["size"] == len(data) and entry["kind"] == "pdf" and entry["type_matches_name"]
+    with open(entry["path"], "rb") as f:
+        assert f.read() == data
+    renamed = spool_file(io.BytesIO(b"\x89PNG\r\n\x1a\n" + data), "receipt.pdf", str(tmp_path))
+    assert renamed["kind"] == "png" and not renamed["type_matches_name"]
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".part")]
+
+
+def test_spool_uploads_keeps_duplicates_once_and_enforces_the_limit(tmp_path):
+    pdf, video = b"%PDF-1.4\n" + b"x" * 100, b"\x00\x00\x00\x18ftypisom" + b"y" * 200
+    manifest, problems = spool_uploads([Upload("a.pdf", pdf), Upload("copy.pdf", pdf)], [], spool_dir=str(tmp_path))
+    assert [m["name"] for m in manifest] == ["a.pdf"] and problems == ["copy.pdf: same file already uploaded."]
+    manifest, problems = spool_uploads([Upload("ride.mp4", video)], manifest, limit_bytes=250, spool_dir=str(tmp_path))
+    assert len(manifest) == 1 and "over the" in problems[0]
+    manifest, _ = spool_uploads([Upload("ride.mp4", video)], manifest, spool_dir=str(tmp_path))
+    assert manifest_has(manifest, ("pdf",)) and manifest_has(manifest, ("mp4", "mov"))
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_prune_spool_drops_old_files(tmp_path):
+    entry = spool_file(io.BytesIO(b"%PDF-1.4\n"), "a.pdf", str(tmp_path))
+    assert prune_spool(str(tmp_path), max_age_hours=1) == 0
+    os.utime(entry["path"], (0, 0))
+    assert prune_spool(str(tmp_path), max_age_hours=1) == 1
+    assert prune_spool(str(tmp_path / "missing")) == 0